@@ -4,6 +4,9 @@
 from riva.client.asr import (
     AudioChunkFileIterator,
     ASRService,
+    RealTimePacer,
+    StreamingSession,
+    StreamingSessionManager,
     add_audio_file_specs_to_config,
     add_word_boosting_to_config,
     add_speaker_diarization_to_config,
@@ -14,7 +17,14 @@ from riva.client.asr import (
     add_endpoint_parameters_to_config,
     add_custom_configuration_to_config,
 )
-from riva.client.auth import Auth
+from riva.client.auth import Auth, ChannelPool
+from riva.client.batch import BatchStats, BatchTranscriber, collect_audio_files
+from riva.client.cache import CacheStats, ResultCache
+from riva.client.capture import AudioRingBuffer, CaptureStats
+from riva.client.codecs import AudioEncoder, encode_audio
+from riva.client.health import HealthChecker
+from riva.client.metrics import LatencyRecorder, StreamRecord
+from riva.client.microbatch import NLPMicroBatcher
 from riva.client.nlp import (
     NLPService,
     extract_all_text_classes_and_confidences,
@@ -35,9 +45,21 @@ from riva.client.package_info import (
     __shortversion__,
     __version__,
 )
+from riva.client.results import CompactResult, WordList, compact_responses, compact_result
+from riva.client.sinks import (
+    ConsoleSink,
+    CsvSink,
+    FanOutSink,
+    JsonlSink,
+    ResultSink,
+    TranscriptSink,
+    TsvSink,
+    dispatch_responses,
+)
 from riva.client.proto.riva_asr_pb2 import RecognitionConfig, StreamingRecognitionConfig, EndpointingConfig
 from riva.client.proto.riva_audio_pb2 import AudioEncoding
 from riva.client.proto.riva_nlp_pb2 import AnalyzeIntentOptions
 from riva.client.proto.riva_nmt_pb2 import StreamingTranslateSpeechToSpeechConfig, TranslationConfig, SynthesizeSpeechConfig, StreamingTranslateSpeechToTextConfig
 from riva.client.tts import SpeechSynthesisService
+from riva.client.vad import EnergySpeechDetector, SilenceTrimmer, TimestampMap, trim_silence
 from riva.client.nmt import NeuralMachineTranslationClient
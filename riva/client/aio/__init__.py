@@ -0,0 +1,13 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+Asyncio versions of Riva services built on :mod:`grpc.aio`. Instances of :class:`Auth` and services have to be
+created and used inside one running event loop.
+"""
+
+from riva.client.aio.asr import ASRService
+from riva.client.aio.auth import AsyncChannelPool, Auth
+from riva.client.aio.nlp import NLPService
+from riva.client.aio.nmt import NeuralMachineTranslationClient
+from riva.client.aio.tts import SpeechSynthesisService
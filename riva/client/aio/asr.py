@@ -0,0 +1,162 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+from typing import AsyncGenerator, AsyncIterable, Iterable, Optional, Union
+
+import grpc
+
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_asr_pb2_grpc as rasr_srv
+from riva.client.aio.auth import Auth
+from riva.client.auth import compression_kwargs
+from riva.client.metrics import (
+    LatencyRecorder,
+    pcm_bytes_per_second,
+    start_record,
+    track_async_requests,
+    track_async_responses,
+)
+from riva.client.wire import AudioRequestFramer, framed_stream_method
+
+
+AudioChunks = Union[Iterable[bytes], AsyncIterable[bytes]]
+
+
+async def iterate_audio_chunks(audio_chunks: AudioChunks) -> AsyncGenerator[bytes, None]:
+    """
+    Iterates over both asynchronous and usual iterables. A usual iterable is consumed in an event loop thread, so
+    it must not block, e.g. :class:`riva.client.AudioChunkFileIterator` must be created without ``delay_callback``.
+    """
+    if hasattr(audio_chunks, '__aiter__'):
+        async for chunk in audio_chunks:
+            yield chunk
+    else:
+        for chunk in audio_chunks:
+            yield chunk
+
+
+async def streaming_request_generator(
+    audio_chunks: AudioChunks, streaming_config: rasr.StreamingRecognitionConfig
+) -> AsyncGenerator[rasr.StreamingRecognizeRequest, None]:
+    yield rasr.StreamingRecognizeRequest(streaming_config=streaming_config)
+    async for chunk in iterate_audio_chunks(audio_chunks):
+        yield rasr.StreamingRecognizeRequest(audio_content=bytes(chunk))
+
+
+async def framed_streaming_request_generator(
+    audio_chunks: AudioChunks,
+    streaming_config: rasr.StreamingRecognitionConfig,
+    framer: Optional[AudioRequestFramer] = None,
+) -> AsyncGenerator[Union[rasr.StreamingRecognizeRequest, bytes], None]:
+    framer = AudioRequestFramer() if framer is None else framer
+    yield rasr.StreamingRecognizeRequest(streaming_config=streaming_config)
+    async for chunk in iterate_audio_chunks(audio_chunks):
+        yield framer(chunk)
+
+
+class ASRService:
+    """
+    An asyncio version of :class:`riva.client.ASRService`. Provides streaming and offline recognition services.
+    Many streams can be served concurrently by one event loop.
+    """
+    def __init__(
+        self,
+        auth: Auth,
+        latency_recorder: Optional[LatencyRecorder] = None,
+        framed_audio_requests: bool = False,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            auth (:obj:`riva.client.aio.Auth`): an instance of :class:`riva.client.aio.Auth` which is used for
+                authentication metadata generation.
+            latency_recorder (:obj:`riva.client.metrics.LatencyRecorder`, `optional`): a recorder of timings of
+                streaming calls. Calls are not instrumented by default.
+            framed_audio_requests (:obj:`bool`, defaults to :obj:`False`): whether to frame audio chunks directly
+                into serialized requests. See :class:`riva.client.ASRService`.
+        """
+        self.auth = auth
+        self.latency_recorder = latency_recorder
+        self.stub = rasr_srv.RivaSpeechRecognitionStub(self.auth.channel)
+        self.framed_audio_requests = framed_audio_requests
+        if framed_audio_requests:
+            self._framer = AudioRequestFramer()
+            self._framed_streaming_recognize = framed_stream_method(
+                self.auth.channel,
+                rasr.DESCRIPTOR,
+                'RivaSpeechRecognition',
+                'StreamingRecognize',
+                rasr.StreamingRecognizeResponse,
+            )
+
+    async def streaming_response_generator(
+        self,
+        audio_chunks: AudioChunks,
+        streaming_config: rasr.StreamingRecognitionConfig,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> AsyncGenerator[rasr.StreamingRecognizeResponse, None]:
+        """
+        Generates speech recognition responses for fragments of speech audio in :param:`audio_chunks`.
+
+        Args:
+            audio_chunks (:obj:`Union[Iterable[bytes], AsyncIterable[bytes]]`): raw audio fragments of speech. If
+                audio is acquired in real time, then an asynchronous iterable should be used, so that an event loop
+                is not blocked while waiting for audio.
+            streaming_config (:obj:`riva.client.proto.riva_asr_pb2.StreamingRecognitionConfig`): a config for
+                streaming. See :meth:`riva.client.ASRService.streaming_response_generator`.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
+
+        Yields:
+            :obj:`riva.client.proto.riva_asr_pb2.StreamingRecognizeResponse`: responses for audio chunks in
+            :param:`audio_chunks`.
+        """
+        record = start_record(
+            self.latency_recorder,
+            'asr.streaming',
+            pcm_bytes_per_second(
+                streaming_config.config.sample_rate_hertz, streaming_config.config.audio_channel_count
+            ),
+        )
+        if self.framed_audio_requests:
+            requests = framed_streaming_request_generator(audio_chunks, streaming_config, self._framer)
+            method = self._framed_streaming_recognize
+        else:
+            requests = streaming_request_generator(audio_chunks, streaming_config)
+            method = self.stub.StreamingRecognize
+        if record is not None:
+            requests = track_async_requests(requests, record)
+        call = method(
+            requests,
+            metadata=self.auth.get_auth_metadata(),
+            **compression_kwargs(compression),
+        )
+        responses = call if record is None else track_async_responses(call, record)
+        async for response in responses:
+            yield response
+
+    async def offline_recognize(
+        self,
+        audio_bytes: bytes,
+        config: rasr.RecognitionConfig,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rasr.RecognizeResponse:
+        """
+        Performs speech recognition for raw audio in :param:`audio_bytes`. See
+        :meth:`riva.client.ASRService.offline_recognize`.
+
+        Args:
+            audio_bytes (:obj:`bytes`): a raw audio.
+            config (:obj:`riva.client.proto.riva_asr_pb2.RecognitionConfig`): a config for offline speech recognition.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
+
+        Returns:
+            :obj:`riva.client.proto.riva_asr_pb2.RecognizeResponse`: a response with results of :param:`audio_bytes`
+            processing.
+        """
+        request = rasr.RecognizeRequest(config=config, audio=audio_bytes)
+        return await self.stub.Recognize(
+            request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import os
+from typing import List, Optional, Tuple, Union
+
+import grpc
+
+from riva.client.auth import Auth as SyncAuth
+from riva.client.auth import ChannelOptions, ChannelPool, ChannelRegistry, create_channel_credentials
+
+
+def create_channel(
+    ssl_cert: Optional[Union[str, os.PathLike]] = None,
+    use_ssl: bool = False,
+    uri: str = "localhost:50051",
+    metadata: Optional[List[Tuple[str, str]]] = None,
+    options: Optional[ChannelOptions] = None,
+    compression: Optional[grpc.Compression] = None,
+) -> grpc.aio.Channel:
+    creds = create_channel_credentials(ssl_cert, use_ssl, metadata)
+    if creds is not None:
+        channel = grpc.aio.secure_channel(uri, creds, options=options, compression=compression)
+    else:
+        channel = grpc.aio.insecure_channel(uri, options=options, compression=compression)
+    return channel
+
+
+class AsyncChannelPool(ChannelPool, grpc.aio.Channel):
+    """
+    An asyncio version of :class:`riva.client.auth.ChannelPool`. Every call is sent to a channel selected by
+    the pool load balancing policy. A call is counted as outstanding until it is done.
+    """
+    calls_return_call_objects = True
+
+    async def close(self, grace: Optional[float] = None) -> None:
+        await asyncio.gather(*[channel.close(grace) for channel in self.channels])
+
+    def get_state(self, try_to_connect: bool = False) -> grpc.ChannelConnectivity:
+        """Returns the best state among states of all channels."""
+        states = [channel.get_state(try_to_connect) for channel in self.channels]
+        for state in [
+            grpc.ChannelConnectivity.READY,
+            grpc.ChannelConnectivity.CONNECTING,
+            grpc.ChannelConnectivity.IDLE,
+            grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+        ]:
+            if state in states:
+                return state
+        return grpc.ChannelConnectivity.SHUTDOWN
+
+    async def wait_for_state_change(self, last_observed_state: grpc.ChannelConnectivity) -> None:
+        tasks = [
+            asyncio.ensure_future(channel.wait_for_state_change(last_observed_state)) for channel in self.channels
+        ]
+        _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+
+    async def channel_ready(self) -> None:
+        """Waits until at least one of the channels is ready."""
+        tasks = [asyncio.ensure_future(channel.channel_ready()) for channel in self.channels]
+        _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+# Channels of :mod:`grpc.aio` are bound to an event loop, so they are not shared with synchronous clients.
+ASYNC_CHANNEL_REGISTRY = ChannelRegistry()
+
+
+class Auth(SyncAuth):
+    """
+    An asyncio version of :class:`riva.client.auth.Auth`. Channels are created with :mod:`grpc.aio` and have to be
+    used from one event loop. Parameters are the same as for :class:`riva.client.auth.Auth`.
+    """
+    _channel_factory = staticmethod(create_channel)
+    _channel_pool_class = AsyncChannelPool
+    _channel_registry = ASYNC_CHANNEL_REGISTRY
+
+    async def close(self, grace: Optional[float] = None) -> None:
+        await asyncio.gather(*[channel.close(grace) for channel in self._release_channels()])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
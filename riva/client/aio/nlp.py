@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+from typing import List, Optional, Union
+
+import grpc
+
+import riva.client.proto.riva_nlp_pb2 as rnlp
+import riva.client.proto.riva_nlp_pb2_grpc as rnlp_srv
+from riva.client.aio.auth import Auth
+from riva.client.auth import compression_kwargs
+from riva.client.nlp import prepare_text_class_request, prepare_token_class_request, prepare_transform_text_request
+
+
+class NLPService:
+    """
+    An asyncio version of :class:`riva.client.NLPService`. All methods are coroutines and take the same parameters
+    as methods of :class:`riva.client.NLPService` except for ``future`` parameter. Concurrent requests can be made
+    with :func:`asyncio.gather`.
+    """
+    def __init__(self, auth: Auth) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            auth (:obj:`riva.client.aio.Auth`): an instance of :class:`riva.client.aio.Auth` which is used for
+                authentication metadata generation.
+        """
+        self.auth = auth
+        self.stub = rnlp_srv.RivaLanguageUnderstandingStub(self.auth.channel)
+
+    async def classify_text(
+        self,
+        input_strings: Union[List[str], str],
+        model_name: str,
+        language_code: str = 'en-US',
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rnlp.TextClassResponse:
+        request = prepare_text_class_request(input_strings, model_name, language_code)
+        return await self.stub.ClassifyText(
+            request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
+
+    async def classify_tokens(
+        self,
+        input_strings: Union[List[str], str],
+        model_name: str,
+        language_code: str = 'en-US',
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rnlp.TokenClassResponse:
+        request = prepare_token_class_request(input_strings, model_name, language_code)
+        return await self.stub.ClassifyTokens(
+            request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
+
+    async def transform_text(
+        self,
+        input_strings: Union[List[str], str],
+        model_name: str,
+        language_code: str = 'en-US',
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rnlp.TextTransformResponse:
+        request = prepare_transform_text_request(input_strings, model_name, language_code)
+        return await self.stub.TransformText(
+            request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
+
+    async def analyze_entities(
+        self,
+        input_string: str,
+        language_code: str = 'en-US',
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rnlp.TokenClassResponse:
+        request = rnlp.AnalyzeEntitiesRequest(query=input_string)
+        request.options.lang = language_code
+        return await self.stub.AnalyzeEntities(
+            request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
+
+    async def analyze_intent(
+        self,
+        input_string: str,
+        options: Optional[rnlp.AnalyzeIntentOptions] = None,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rnlp.AnalyzeIntentResponse:
+        if options is None:
+            options = rnlp.AnalyzeIntentOptions()
+        request = rnlp.AnalyzeIntentRequest(query=input_string, options=options)
+        return await self.stub.AnalyzeIntent(
+            request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
+
+    async def punctuate_text(
+        self,
+        input_strings: Union[List[str], str],
+        model_name: Optional[str] = None,
+        language_code: str = 'en-US',
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rnlp.TextTransformResponse:
+        request = prepare_transform_text_request(input_strings, model_name, language_code)
+        return await self.stub.PunctuateText(
+            request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
+
+    async def natural_query(
+        self,
+        query: str,
+        context: str,
+        top_n: int = 1,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rnlp.NaturalQueryResponse:
+        request = rnlp.NaturalQueryRequest(query=query, context=context, top_n=top_n)
+        return await self.stub.NaturalQuery(
+            request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
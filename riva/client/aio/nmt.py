@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+from typing import AsyncGenerator, List, Optional, Union
+
+import grpc
+
+import riva.client.proto.riva_nmt_pb2 as riva_nmt
+import riva.client.proto.riva_nmt_pb2_grpc as riva_nmt_srv
+from riva.client.aio.asr import AudioChunks, iterate_audio_chunks
+from riva.client.aio.auth import Auth
+from riva.client.auth import compression_kwargs
+from riva.client.nmt import add_dnt_phrases_dict
+
+
+async def streaming_s2s_request_generator(
+    audio_chunks: AudioChunks, streaming_config: riva_nmt.StreamingTranslateSpeechToSpeechConfig
+) -> AsyncGenerator[riva_nmt.StreamingTranslateSpeechToSpeechRequest, None]:
+    yield riva_nmt.StreamingTranslateSpeechToSpeechRequest(config=streaming_config)
+    async for chunk in iterate_audio_chunks(audio_chunks):
+        yield riva_nmt.StreamingTranslateSpeechToSpeechRequest(audio_content=bytes(chunk))
+
+
+async def streaming_s2t_request_generator(
+    audio_chunks: AudioChunks, streaming_config: riva_nmt.StreamingTranslateSpeechToTextConfig
+) -> AsyncGenerator[riva_nmt.StreamingTranslateSpeechToTextRequest, None]:
+    yield riva_nmt.StreamingTranslateSpeechToTextRequest(config=streaming_config)
+    async for chunk in iterate_audio_chunks(audio_chunks):
+        yield riva_nmt.StreamingTranslateSpeechToTextRequest(audio_content=bytes(chunk))
+
+
+class NeuralMachineTranslationClient:
+    """
+    An asyncio version of :class:`riva.client.NeuralMachineTranslationClient`. Provides text translation and
+    streaming speech to speech and speech to text translation.
+    """
+    def __init__(self, auth: Auth) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            auth (:obj:`riva.client.aio.Auth`): an instance of :class:`riva.client.aio.Auth` which is used for
+                authentication metadata generation.
+        """
+        self.auth = auth
+        self.stub = riva_nmt_srv.RivaTranslationStub(self.auth.channel)
+
+    async def streaming_s2s_response_generator(
+        self,
+        audio_chunks: AudioChunks,
+        streaming_config: riva_nmt.StreamingTranslateSpeechToSpeechConfig,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> AsyncGenerator[riva_nmt.StreamingTranslateSpeechToSpeechResponse, None]:
+        call = self.stub.StreamingTranslateSpeechToSpeech(
+            streaming_s2s_request_generator(audio_chunks, streaming_config),
+            metadata=self.auth.get_auth_metadata(),
+            **compression_kwargs(compression),
+        )
+        async for response in call:
+            yield response
+
+    async def streaming_s2t_response_generator(
+        self,
+        audio_chunks: AudioChunks,
+        streaming_config: riva_nmt.StreamingTranslateSpeechToTextConfig,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> AsyncGenerator[riva_nmt.StreamingTranslateSpeechToTextResponse, None]:
+        call = self.stub.StreamingTranslateSpeechToText(
+            streaming_s2t_request_generator(audio_chunks, streaming_config),
+            metadata=self.auth.get_auth_metadata(),
+            **compression_kwargs(compression),
+        )
+        async for response in call:
+            yield response
+
+    async def translate(
+        self,
+        texts: List[str],
+        model: str,
+        source_language: str,
+        target_language: str,
+        dnt_phrases_dict: Optional[dict] = None,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> riva_nmt.TranslateTextResponse:
+        req = riva_nmt.TranslateTextRequest(
+            texts=texts,
+            model=model,
+            source_language=source_language,
+            target_language=target_language
+        )
+        add_dnt_phrases_dict(req, dnt_phrases_dict)
+        return await self.stub.TranslateText(
+            req, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
+
+    async def get_config(
+        self,
+        model: str,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> riva_nmt.AvailableLanguageResponse:
+        req = riva_nmt.AvailableLanguageRequest(model=model)
+        return await self.stub.ListSupportedLanguagePairs(
+            req, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+from typing import AsyncGenerator, Optional, Union
+
+import grpc
+
+import riva.client.proto.riva_tts_pb2 as rtts
+import riva.client.proto.riva_tts_pb2_grpc as rtts_srv
+from riva.client.aio.auth import Auth
+from riva.client.auth import compression_kwargs
+from riva.client.proto.riva_audio_pb2 import AudioEncoding
+from riva.client.tts import prepare_synthesize_request
+
+
+class SpeechSynthesisService:
+    """
+    An asyncio version of :class:`riva.client.SpeechSynthesisService`. Provides :meth:`synthesize` which returns
+    entire audio for a text and :meth:`synthesize_online` which yields audio in small chunks as it is becoming
+    available. Parameters of the methods are the same as in :class:`riva.client.SpeechSynthesisService`.
+    """
+    def __init__(self, auth: Auth) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            auth (:obj:`riva.client.aio.Auth`): an instance of :class:`riva.client.aio.Auth` which is used for
+                authentication metadata generation.
+        """
+        self.auth = auth
+        self.stub = rtts_srv.RivaSpeechSynthesisStub(self.auth.channel)
+
+    async def synthesize(
+        self,
+        text: str,
+        voice_name: Optional[str] = None,
+        language_code: str = 'en-US',
+        encoding: AudioEncoding = AudioEncoding.LINEAR_PCM,
+        sample_rate_hz: int = 44100,
+        audio_prompt_file: Optional[str] = None,
+        audio_prompt_encoding: AudioEncoding = AudioEncoding.LINEAR_PCM,
+        quality: int = 20,
+        custom_dictionary: Optional[dict] = None,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rtts.SynthesizeSpeechResponse:
+        req = prepare_synthesize_request(
+            text,
+            voice_name,
+            language_code,
+            encoding,
+            sample_rate_hz,
+            audio_prompt_file,
+            audio_prompt_encoding,
+            quality,
+            custom_dictionary,
+        )
+        return await self.stub.Synthesize(
+            req, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        )
+
+    async def synthesize_online(
+        self,
+        text: str,
+        voice_name: Optional[str] = None,
+        language_code: str = 'en-US',
+        encoding: AudioEncoding = AudioEncoding.LINEAR_PCM,
+        sample_rate_hz: int = 44100,
+        audio_prompt_file: Optional[str] = None,
+        audio_prompt_encoding: AudioEncoding = AudioEncoding.LINEAR_PCM,
+        quality: int = 20,
+        custom_dictionary: Optional[dict] = None,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> AsyncGenerator[rtts.SynthesizeSpeechResponse, None]:
+        req = prepare_synthesize_request(
+            text,
+            voice_name,
+            language_code,
+            encoding,
+            sample_rate_hz,
+            audio_prompt_file,
+            audio_prompt_encoding,
+            quality,
+            custom_dictionary,
+        )
+        async for response in self.stub.SynthesizeOnline(
+            req, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+        ):
+            yield response
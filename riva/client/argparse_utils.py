@@ -3,6 +3,8 @@
 
 import argparse
 
+from riva.client.auth import CHANNEL_OPTION_PROFILES, COMPRESSION_ALGORITHMS
+
 
 def add_asr_config_argparse_parameters(
     parser: argparse.ArgumentParser, max_alternatives: bool = False, profanity_filter: bool = False, word_time_offsets: bool = False
@@ -100,11 +102,71 @@ def add_asr_config_argparse_parameters(
     return parser
 
 
+def add_silence_trimming_argparse_parameters(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument(
+        "--trim-silence",
+        action='store_true',
+        help="Remove long silences from audio before sending it to a server. Word time offsets in responses are "
+        "rebased to original audio. Supported only for WAV files with LINEAR_PCM encoding.",
+    )
+    parser.add_argument(
+        "--silence-threshold-db",
+        type=float,
+        default=-45.0,
+        help="A level in dBFS below which audio is considered silence if `--trim-silence` is set.",
+    )
+    parser.add_argument(
+        "--min-silence",
+        type=float,
+        default=1.0,
+        help="A duration in seconds of the shortest silence which is shortened if `--trim-silence` is set.",
+    )
+    parser.add_argument(
+        "--silence-hangover",
+        type=float,
+        default=0.3,
+        help="A duration in seconds of silence kept before and after speech if `--trim-silence` is set.",
+    )
+    return parser
+
+
+def add_result_cache_argparse_parameters(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument(
+        "--result-cache",
+        help="A directory of an on-disk cache of recognition responses. If set, then a file is sent to a server "
+        "only if its audio or recognition config has changed since a previous run.",
+    )
+    parser.add_argument(
+        "--result-cache-size",
+        type=int,
+        default=1024,
+        help="A maximum size in megabytes of `--result-cache`. The least recently used responses are evicted.",
+    )
+    return parser
+
+
 def add_connection_argparse_parameters(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
-    parser.add_argument("--server", default="localhost:50051", help="URI to GRPC server endpoint.")
+    parser.add_argument(
+        "--server",
+        default="localhost:50051",
+        help="URI to GRPC server endpoint. Several comma separated URIs can be passed to spread requests across "
+        "several servers.",
+    )
     parser.add_argument("--ssl-cert", help="Path to SSL client certificates file.")
     parser.add_argument(
         "--use-ssl", action='store_true', help="Boolean to control if SSL/TLS encryption should be used."
     )
     parser.add_argument("--metadata", action='append', nargs='+', help="Send HTTP Header(s) to server")
+    parser.add_argument(
+        "--channel-options",
+        default="default",
+        choices=list(CHANNEL_OPTION_PROFILES),
+        help="A profile of gRPC channel options. `streaming` enables keepalive pings which keep idle connections "
+        "open, `high_throughput` additionally raises message size limits to 1 GB and increases flow control window.",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=list(COMPRESSION_ALGORITHMS),
+        help="A compression algorithm for requests. By default requests are not compressed.",
+    )
     return parser
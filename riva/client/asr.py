@@ -1,21 +1,52 @@
 # SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
 # SPDX-License-Identifier: MIT
 
-import io
+import asyncio
+import concurrent.futures
+import itertools
+import mmap
 import os
-import sys
+import random
+import threading
 import time
 import warnings
 import wave
+from collections import deque
 from pathlib import Path
-from typing import Callable, Dict, Generator, Iterable, List, Optional, TextIO, Union
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    TextIO,
+    Union,
+)
 
+import grpc
 from grpc._channel import _MultiThreadedRendezvous
 
 import riva.client
 import riva.client.proto.riva_asr_pb2 as rasr
 import riva.client.proto.riva_asr_pb2_grpc as rasr_srv
-from riva.client.auth import Auth
+from riva.client.auth import Auth, compression_kwargs
+from riva.client.cache import ResultCache
+from riva.client.metrics import (
+    LatencyRecorder,
+    pcm_bytes_per_second,
+    start_record,
+    track_requests,
+    track_responses,
+    track_unary_call,
+)
+from riva.client.segmentation import merge_segment_responses, plan_audio_segments
+from riva.client.sinks import PRINT_STREAMING_ADDITIONAL_INFO_MODES, ConsoleSink, ResultSink, dispatch_responses
+from riva.client.wire import AudioRequestFramer, framed_stream_method
 
 
 def get_wav_file_parameters(input_file: Union[str, os.PathLike]) -> Dict[str, Union[int, float]]:
@@ -42,49 +73,190 @@ def sleep_audio_length(audio_chunk: bytes, time_to_sleep: float) -> None:
     time.sleep(time_to_sleep)
 
 
+class RealTimePacer:
+    """
+    A delay callback for :class:`AudioChunkFileIterator` which releases audio chunks at a pace of an audio clock.
+    Unlike :func:`sleep_audio_length`, deadlines are anchored to a monotonic time of the first chunk, so time spent
+    on reading, request creation and sending is not added to delays and a stream does not drift behind real time.
+    A chunk is released when all audio it contains would have been captured by a microphone.
+
+    One instance has to be used for one stream. Call :meth:`reset` before reusing it.
+
+    .. code-block:: python
+
+        with riva.client.AudioChunkFileIterator(
+            "audio.wav", 1600, delay_callback=riva.client.RealTimePacer(speed=2.0)
+        ) as audio_chunks:
+            ...
+    """
+    def __init__(
+        self,
+        speed: float = 1.0,
+        jitter: float = 0.0,
+        burst: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            speed (:obj:`float`, defaults to :obj:`1.0`): a multiplier of an audio clock. Values greater than
+                :obj:`1.0` send audio faster than real time.
+            jitter (:obj:`float`, defaults to :obj:`0.0`): a maximum random delay in seconds added to a deadline of
+                every chunk. Jitter does not accumulate: every deadline is still computed from the start time.
+            burst (:obj:`float`, defaults to :obj:`0.0`): a duration of audio in seconds which is sent at once
+                without delays before pacing starts, e.g. to simulate audio buffered by a client before connecting.
+            clock (:obj:`Callable[[], float]`, defaults to :func:`time.monotonic`): a monotonic clock in seconds.
+            sleep (:obj:`Callable[[float], None]`, defaults to :func:`time.sleep`): a function used for waiting.
+            seed (:obj:`int`, `optional`): a seed for jitter generation.
+
+        Raises:
+            :obj:`ValueError`: if :param:`speed` is not positive or if :param:`jitter` or :param:`burst` are
+                negative.
+        """
+        if speed <= 0:
+            raise ValueError(f"Parameter `speed` has to be positive, whereas {speed} was given.")
+        if jitter < 0 or burst < 0:
+            raise ValueError(
+                f"Parameters `jitter` and `burst` have to be non-negative, whereas {jitter} and {burst} were given."
+            )
+        self.speed = speed
+        self.jitter = jitter
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._random = random.Random(seed)
+        self.reset()
+
+    def reset(self) -> None:
+        self.start_time: Optional[float] = None
+        self.audio_time = 0.0
+        # How many seconds the last chunk was released behind its deadline.
+        self.lag = 0.0
+
+    def __call__(self, audio_chunk: bytes, duration: float) -> None:
+        if self.start_time is None:
+            self.start_time = self.clock()
+        self.audio_time += duration
+        paced_audio_time = max(self.audio_time - self.burst, 0.0)
+        if paced_audio_time == 0.0:
+            return
+        deadline = self.start_time + paced_audio_time / self.speed
+        if self.jitter > 0:
+            deadline += self._random.uniform(0.0, self.jitter)
+        time_to_sleep = deadline - self.clock()
+        if time_to_sleep > 0:
+            self.sleep(time_to_sleep)
+            self.lag = 0.0
+        else:
+            self.lag = -time_to_sleep
+
+
 class AudioChunkFileIterator:
     def __init__(
         self,
         input_file: Union[str, os.PathLike],
         chunk_n_frames: int,
         delay_callback: Optional[Callable[[bytes, float], None]] = None,
+        use_mmap: bool = False,
     ) -> None:
+        """
+        Iterates over chunks of an audio file.
+
+        Args:
+            input_file (:obj:`Union[str, os.PathLike]`): a path to an audio file.
+            chunk_n_frames (:obj:`int`): a number of frames in one chunk. If a file is not a WAV file, then it is
+                a number of bytes in one chunk.
+            delay_callback (:obj:`Callable[[bytes, float], None]`, `optional`): a function which is called for every
+                chunk with chunk audio data and duration of the chunk in seconds, e.g. :class:`RealTimePacer`.
+                Supported only for WAV files.
+            use_mmap (:obj:`bool`, defaults to :obj:`False`): whether to map a file into memory and yield
+                :obj:`memoryview` slices instead of reading every chunk into new :obj:`bytes`. For WAV files
+                a header is skipped and only PCM data is yielded, so a recognition config has to contain
+                sample rate and number of channels (see :func:`add_audio_file_specs_to_config`). Chunks are
+                converted to :obj:`bytes` only when requests are created.
+        """
         self.input_file: Path = Path(input_file).expanduser()
         self.chunk_n_frames = chunk_n_frames
         self.delay_callback = delay_callback
+        self.use_mmap = use_mmap
         self.file_parameters = get_wav_file_parameters(self.input_file)
         self.file_object: Optional[typing.BinaryIO] = open(str(self.input_file), 'rb')
         if self.delay_callback and self.file_parameters is None:
             warnings.warn(f"delay_callback not supported for encoding other than LINEAR_PCM")
             self.delay_callback = None
         self.first_buffer = True
+        if self.file_parameters:
+            self.frame_size = self.file_parameters['sampwidth'] * self.file_parameters['nchannels']
+            self.chunk_n_bytes = self.chunk_n_frames * self.frame_size
+        else:
+            self.chunk_n_bytes = self.chunk_n_frames
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._position = 0
+        if self.use_mmap:
+            self._map_file()
 
-    def close(self) -> None:
+    def _map_file(self) -> None:
+        size = os.fstat(self.file_object.fileno()).st_size
+        if size > 0:
+            self._mmap = mmap.mmap(self.file_object.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+            if self.file_parameters:
+                start = self.file_parameters['data_offset']
+                end = min(start + self.file_parameters['nframes'] * self.frame_size, size)
+                self._view = self._view[start:end]
+        # A mapping stays valid after a file is closed.
         self.file_object.close()
         self.file_object = None
 
+    def close(self) -> None:
+        if self.file_object is not None:
+            self.file_object.close()
+            self.file_object = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Chunks yielded earlier are still referenced. Memory is unmapped when they are garbage collected.
+                pass
+            self._mmap = None
+
     def __enter__(self):
         return self
 
     def __exit__(self, type_, value, traceback) -> None:
-        if self.file_object is not None:
-            self.file_object.close()
+        self.close()
 
     def __iter__(self):
         return self
 
-    def __next__(self) -> bytes:
-        if self.file_parameters:
-            data = self.file_object.read(self.chunk_n_frames * self.file_parameters['sampwidth'] * self.file_parameters['nchannels'])
-        else:
-            data = self.file_object.read(self.chunk_n_frames)
+    def _next_mmap_chunk(self) -> memoryview:
+        if self._view is None or self._position >= len(self._view):
+            self.close()
+            raise StopIteration
+        data = self._view[self._position : self._position + self.chunk_n_bytes]
+        self._position += len(data)
+        if self.delay_callback is not None:
+            self.delay_callback(data, len(data) / self.frame_size / self.file_parameters['framerate'])
+        return data
+
+    def __next__(self) -> Union[bytes, memoryview]:
+        if self.use_mmap:
+            return self._next_mmap_chunk()
+        data = self.file_object.read(self.chunk_n_bytes)
         if not data:
             self.close()
             raise StopIteration
         if self.delay_callback is not None:
             offset = self.file_parameters['data_offset'] if self.first_buffer else 0
             self.delay_callback(
-                data[offset:], (len(data) - offset) / self.file_parameters['sampwidth'] / self.file_parameters['framerate']
+                data[offset:], (len(data) - offset) / self.frame_size / self.file_parameters['framerate']
             )
             self.first_buffer = False
         return data
@@ -173,9 +345,6 @@ def add_custom_configuration_to_config(
             raise ValueError(f"Invalid key:value pair {key_value}")
 
 
-PRINT_STREAMING_ADDITIONAL_INFO_MODES = ['no', 'time', 'confidence']
-
-
 def print_streaming(
     responses: Iterable[rasr.StreamingRecognizeResponse],
     output_file: Optional[Union[Union[os.PathLike, str, TextIO], List[Union[os.PathLike, str, TextIO]]]] = None,
@@ -214,110 +383,8 @@ def print_streaming(
     Raises:
         :obj:`ValueError`: if wrong :param:`additional_info` value is passed to this function.
     """
-    if additional_info not in PRINT_STREAMING_ADDITIONAL_INFO_MODES:
-        raise ValueError(
-            f"Not allowed value '{additional_info}' of parameter `additional_info`. "
-            f"Allowed values are {PRINT_STREAMING_ADDITIONAL_INFO_MODES}"
-        )
-    if additional_info != PRINT_STREAMING_ADDITIONAL_INFO_MODES[0] and show_intermediate:
-        warnings.warn(
-            f"`show_intermediate=True` will not work if "
-            f"`additional_info != {PRINT_STREAMING_ADDITIONAL_INFO_MODES[0]}`. `additional_info={additional_info}`"
-        )
-    if additional_info != PRINT_STREAMING_ADDITIONAL_INFO_MODES[1] and word_time_offsets:
-        warnings.warn(
-            f"`word_time_offsets=True` will not work if "
-            f"`additional_info != {PRINT_STREAMING_ADDITIONAL_INFO_MODES[1]}`. `additional_info={additional_info}"
-        )
-    if output_file is None:
-        output_file = [sys.stdout]
-    elif not isinstance(output_file, list):
-        output_file = [output_file]
-    file_opened = [False] * len(output_file)
-    try:
-        for i, elem in enumerate(output_file):
-            if isinstance(elem, io.TextIOBase):
-                file_opened[i] = False
-            else:
-                file_opened[i] = True
-                output_file[i] = Path(elem).expanduser().open(file_mode)
-        start_time = time.time()  # used in 'time` additional_info
-        num_chars_printed = 0  # used in 'no' additional_info
-        for response in responses:
-            if not response.results:
-                continue
-            partial_transcript = ""
-            for result in response.results:
-                if result.pipeline_states and len(result.pipeline_states.vad_probabilities) > 0:
-                    vad_prob_logs = "VAD States: "
-                    for vad_state in result.pipeline_states.vad_probabilities:
-                            vad_prob_logs += str(vad_state) + " "
-                    for i, f in enumerate(output_file):
-                        f.write(vad_prob_logs + "\n")
-                if not result.alternatives:
-                    continue
-                transcript = result.alternatives[0].transcript
-                if additional_info == 'no':
-                    if result.is_final:
-                        if show_intermediate:
-                            overwrite_chars = ' ' * (num_chars_printed - len(transcript))
-                            for i, f in enumerate(output_file):
-                                f.write("## " + transcript + (overwrite_chars if not file_opened[i] else '') + "\n")
-                            num_chars_printed = 0
-                        else:
-                            for i, alternative in enumerate(result.alternatives):
-                                for f in output_file:
-                                    f.write(
-                                        f'##'
-                                        + (f'(alternative {i + 1})' if i > 0 else '')
-                                        + f' {alternative.transcript}\n'
-                                    )
-                    else:
-                        partial_transcript += transcript
-                elif additional_info == 'time':
-                    if result.is_final:
-                        for i, alternative in enumerate(result.alternatives):
-                            for f in output_file:
-                                f.write(
-                                    f"Time {time.time() - start_time:.2f}s: Transcript {i}: {alternative.transcript}\n"
-                                )
-                        if word_time_offsets:
-                            for f in output_file:
-                                f.write("Timestamps:\n")
-                                f.write('{: <40s}{: <16s}{: <16s}\n'.format('Word', 'Start (ms)', 'End (ms)'))
-                                for word_info in result.alternatives[0].words:
-                                    f.write(
-                                        f'{word_info.word: <40s}{word_info.start_time: <16.0f}'
-                                        f'{word_info.end_time: <16.0f}\n'
-                                    )
-                    else:
-                        partial_transcript += transcript
-                else:  # additional_info == 'confidence'
-                    if result.is_final:
-                        for f in output_file:
-                            f.write(f'## {transcript}\n')
-                            f.write(f'Confidence: {result.alternatives[0].confidence:9.4f}\n')
-                    else:
-                        for f in output_file:
-                            f.write(f'>> {transcript}\n')
-                            f.write(f'Stability: {result.stability:9.4f}\n')
-            if additional_info == 'no':
-                if show_intermediate and partial_transcript != '':
-                    overwrite_chars = ' ' * (num_chars_printed - len(partial_transcript))
-                    for i, f in enumerate(output_file):
-                        f.write(">> " + partial_transcript + ('\n' if file_opened[i] else overwrite_chars + '\r'))
-                    num_chars_printed = len(partial_transcript) + 3
-            elif additional_info == 'time':
-                for f in output_file:
-                    if partial_transcript:
-                        f.write(f">>>Time {time.time():.2f}s: {partial_transcript}\n")
-            else:
-                for f in output_file:
-                    f.write('----\n')
-    finally:
-        for fo, elem in zip(file_opened, output_file):
-            if fo:
-                elem.close()
+    with ConsoleSink(output_file, additional_info, word_time_offsets, show_intermediate, file_mode) as sink:
+        dispatch_responses(responses, sink)
 
 
 def print_offline(response: rasr.RecognizeResponse) -> None:
@@ -334,24 +401,149 @@ def streaming_request_generator(
 ) -> Generator[rasr.StreamingRecognizeRequest, None, None]:
     yield rasr.StreamingRecognizeRequest(streaming_config=streaming_config)
     for chunk in audio_chunks:
-        yield rasr.StreamingRecognizeRequest(audio_content=chunk)
+        yield rasr.StreamingRecognizeRequest(audio_content=bytes(chunk))
+
+
+def framed_streaming_request_generator(
+    audio_chunks: Iterable[bytes],
+    streaming_config: rasr.StreamingRecognitionConfig,
+    framer: Optional[AudioRequestFramer] = None,
+) -> Generator[Union[rasr.StreamingRecognizeRequest, bytes], None, None]:
+    """
+    Works like :func:`streaming_request_generator` but yields audio requests as serialized bytes. Requests have to
+    be sent with a request serializer :func:`riva.client.wire.serialize_request`.
+    """
+    framer = AudioRequestFramer() if framer is None else framer
+    yield rasr.StreamingRecognizeRequest(streaming_config=streaming_config)
+    for chunk in audio_chunks:
+        yield framer(chunk)
+
+
+# Status codes after which a rolling stream is reopened and recent audio is replayed.
+ROLLING_STREAM_RETRY_CODES = [
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+    grpc.StatusCode.INTERNAL,
+]
+
+
+class _RollingAudioBuffer:
+    """
+    Reads audio chunks from one iterator for several consecutive streams and keeps audio which is not finalized yet,
+    so it can be replayed after a stream failure. Positions are byte offsets from the start of audio.
+    """
+    def __init__(self, audio_chunks: Iterable[bytes], max_buffered_bytes: int) -> None:
+        self.iterator = iter(audio_chunks)
+        self.max_buffered_bytes = max_buffered_bytes
+        self.chunks: deque = deque()  # (position, chunk) pairs
+        self.start = 0
+        self.end = 0
+        self.exhausted = False
+        self.dropped_bytes = 0
+        self._lock = threading.Lock()
+        self._source_lock = threading.Lock()
+
+    def _find(self, position: int) -> Optional[memoryview]:
+        position = max(position, self.start)
+        for chunk_position, chunk in self.chunks:
+            if chunk_position + len(chunk) > position:
+                return memoryview(chunk)[position - chunk_position:]
+        return None
+
+    def read(self, position: int) -> Optional[memoryview]:
+        """Returns audio starting at :param:`position` or :obj:`None` if audio is over."""
+        with self._lock:
+            if position < self.end:
+                return self._find(position)
+        with self._source_lock:
+            with self._lock:
+                # Another stream could read the source while this one was waiting.
+                if position < self.end:
+                    return self._find(position)
+                if self.exhausted:
+                    return None
+            chunk = next(self.iterator, None)
+            with self._lock:
+                if chunk is None:
+                    self.exhausted = True
+                    return None
+                chunk = bytes(chunk)
+                self.chunks.append((self.end, chunk))
+                self.end += len(chunk)
+                while (
+                    len(self.chunks) > 1
+                    and self.end - self.chunks[0][0] - len(self.chunks[0][1]) >= self.max_buffered_bytes
+                ):
+                    dropped_position, dropped = self.chunks.popleft()
+                    self.dropped_bytes += len(dropped)
+                    self.start = dropped_position + len(dropped)
+                return self._find(position)
+
+    def commit(self, position: int) -> None:
+        """Forgets audio before :param:`position` because it does not need to be replayed anymore."""
+        with self._lock:
+            while self.chunks and self.chunks[0][0] + len(self.chunks[0][1]) <= position:
+                self.chunks.popleft()
+            self.start = max(self.start, min(position, self.end))
+
+
+def _rebase_streaming_response(response: rasr.StreamingRecognizeResponse, offset: float) -> None:
+    offset_ms = round(offset * 1000)
+    for result in response.results:
+        result.audio_processed += offset
+        for alternative in result.alternatives:
+            for word in alternative.words:
+                word.start_time += offset_ms
+                word.end_time += offset_ms
 
 
 class ASRService:
     """Provides streaming and offline recognition services. Calls gRPC stubs with authentication metadata."""
-    def __init__(self, auth: Auth) -> None:
+    def __init__(
+        self,
+        auth: Auth,
+        latency_recorder: Optional[LatencyRecorder] = None,
+        framed_audio_requests: bool = False,
+        result_cache: Optional[ResultCache] = None,
+    ) -> None:
         """
         Initializes an instance of the class.
 
         Args:
             auth (:obj:`riva.client.auth.Auth`): an instance of :class:`riva.client.auth.Auth` which is used for
                 authentication metadata generation.
+            latency_recorder (:obj:`riva.client.metrics.LatencyRecorder`, `optional`): a recorder of timings of
+                streaming and offline recognition calls. Calls are not instrumented by default.
+            framed_audio_requests (:obj:`bool`, defaults to :obj:`False`): whether to frame audio chunks of
+                :meth:`streaming_response_generator` directly into serialized requests instead of creating
+                a protobuf message for every chunk. It saves an allocation and a copy of every chunk. Such calls
+                bypass :attr:`stub`, so they are not seen by code which replaces stub methods.
+            result_cache (:obj:`riva.client.cache.ResultCache`, `optional`): a cache of responses of
+                :meth:`offline_recognize` and of :meth:`streaming_response_generator` for not wrapped
+                :class:`AudioChunkFileIterator`. A server is called only if audio or a config has changed.
         """
         self.auth = auth
+        self.latency_recorder = latency_recorder
+        self.result_cache = result_cache
         self.stub = rasr_srv.RivaSpeechRecognitionStub(self.auth.channel)
+        self.framed_audio_requests = framed_audio_requests
+        if framed_audio_requests:
+            self._framer = AudioRequestFramer()
+            self._framed_streaming_recognize = framed_stream_method(
+                self.auth.channel,
+                rasr.DESCRIPTOR,
+                'RivaSpeechRecognition',
+                'StreamingRecognize',
+                rasr.StreamingRecognizeResponse,
+            )
 
     def streaming_response_generator(
-        self, audio_chunks: Iterable[bytes], streaming_config: rasr.StreamingRecognitionConfig
+        self,
+        audio_chunks: Iterable[bytes],
+        streaming_config: rasr.StreamingRecognitionConfig,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Generator[rasr.StreamingRecognizeResponse, None, None]:
         """
         Generates speech recognition responses for fragments of speech audio in :param:`audio_chunks`.
@@ -382,19 +574,193 @@ class ASRService:
                     config = RecognitionConfig(enable_automatic_punctuation=True)
                     streaming_config = StreamingRecognitionConfig(config, interim_results=True)
 
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
+
         Yields:
             :obj:`riva.client.proto.riva_asr_pb2.StreamingRecognizeResponse`: responses for audio chunks in
             :param:`audio_chunks`. You may find description of response fields in declaration of
             ``StreamingRecognizeResponse``
             message `here
             <https://docs.nvidia.com/deeplearning/riva/user-guide/docs/reference/protos/protos.html#riva-proto-riva-asr-proto>`_.
+            If :attr:`result_cache` is set and :param:`audio_chunks` is :class:`AudioChunkFileIterator`, then only
+            responses with final results are yielded.
         """
-        generator = streaming_request_generator(audio_chunks, streaming_config)
-        for response in self.stub.StreamingRecognize(generator, metadata=self.auth.get_auth_metadata()):
+        if self.result_cache is not None and isinstance(audio_chunks, AudioChunkFileIterator):
+            # Only a file iterator identifies its audio before it is read. Audio of other iterables is unknown.
+            key = self.result_cache.streaming_file_key(
+                audio_chunks.input_file, streaming_config, audio_chunks.chunk_n_frames
+            )
+            cached = self.result_cache.get_streaming(key)
+            if cached is not None:
+                yield from cached
+                return
+            responses = []
+            for response in self._streaming_response_generator(audio_chunks, streaming_config, compression):
+                responses.append(response)
+                yield response
+            self.result_cache.put_streaming(key, responses)
+            return
+        yield from self._streaming_response_generator(audio_chunks, streaming_config, compression)
+
+    def _streaming_response_generator(
+        self,
+        audio_chunks: Iterable[bytes],
+        streaming_config: rasr.StreamingRecognitionConfig,
+        compression: Optional[Union[str, grpc.Compression]],
+    ) -> Generator[rasr.StreamingRecognizeResponse, None, None]:
+        record = start_record(
+            self.latency_recorder,
+            'asr.streaming',
+            pcm_bytes_per_second(
+                streaming_config.config.sample_rate_hertz, streaming_config.config.audio_channel_count
+            ),
+        )
+        if self.framed_audio_requests:
+            requests = framed_streaming_request_generator(audio_chunks, streaming_config, self._framer)
+            method = self._framed_streaming_recognize
+        else:
+            requests = streaming_request_generator(audio_chunks, streaming_config)
+            method = self.stub.StreamingRecognize
+        generator = track_requests(requests, record)
+        for response in track_responses(
+            method(generator, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)),
+            record,
+        ):
             yield response
 
+    def rolling_streaming_response_generator(
+        self,
+        audio_chunks: Iterable[bytes],
+        streaming_config: rasr.StreamingRecognitionConfig,
+        max_stream_duration: float = 240.0,
+        max_replay_duration: float = 30.0,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+        sample_width: int = 2,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> Generator[rasr.StreamingRecognizeResponse, None, None]:
+        """
+        Generates speech recognition responses for unbounded audio, e.g. a 24/7 live feed. Unlike
+        :meth:`streaming_response_generator`, audio is sent in a sequence of ``StreamingRecognize`` calls:
+
+        - when a stream has received :param:`max_stream_duration` seconds of audio, it is closed after the next
+          final result and a new stream continues from the first chunk which was not sent, so no audio is lost;
+        - if a stream fails with one of :obj:`ROLLING_STREAM_RETRY_CODES`, a new stream is opened and audio
+          received after the last final result is replayed.
+
+        Word time offsets and ``audio_processed`` of results are rebased onto one timeline which starts at the
+        beginning of :param:`audio_chunks`. Responses do not carry result or utterance indices, so nothing else is
+        renumbered: field ``id`` is a request id of the stream which produced a response and changes after every
+        rollover or retry. Memory is bounded by :param:`max_replay_duration` of buffered audio. If
+        :attr:`framed_audio_requests` is set, then audio requests are framed as in
+        :meth:`streaming_response_generator`.
+
+        Args:
+            audio_chunks (:obj:`Iterable[bytes]`): raw PCM audio fragments without headers.
+            streaming_config (:obj:`riva.client.proto.riva_asr_pb2.StreamingRecognitionConfig`): a config for
+                streaming. Fields ``sample_rate_hertz`` and ``audio_channel_count`` of ``config`` are required.
+            max_stream_duration (:obj:`float`, defaults to :obj:`240.0`): a duration of audio in seconds after which
+                a stream is rolled over at the next final result.
+            max_replay_duration (:obj:`float`, defaults to :obj:`30.0`): a maximum duration of not finalized audio in
+                seconds which is kept for replay. Older audio is dropped and is not replayed after a failure.
+            max_retries (:obj:`int`, defaults to :obj:`5`): a maximum number of consecutive failed streams.
+            retry_backoff (:obj:`float`, defaults to :obj:`0.5`): an initial delay in seconds before reopening
+                a failed stream. The delay is doubled after every consecutive failure.
+            sample_width (:obj:`int`, defaults to :obj:`2`): a number of bytes in one sample.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for calls.
+
+        Yields:
+            :obj:`riva.client.proto.riva_asr_pb2.StreamingRecognizeResponse`: responses with rebased time offsets.
+
+        Raises:
+            :obj:`ValueError`: if sample rate is not set in :param:`streaming_config`.
+            :obj:`grpc.RpcError`: if a stream fails with a status not from :obj:`ROLLING_STREAM_RETRY_CODES` or if
+                :param:`max_retries` consecutive streams fail.
+        """
+        sample_rate = streaming_config.config.sample_rate_hertz
+        if not sample_rate:
+            raise ValueError("Field `config.sample_rate_hertz` of `streaming_config` is required for rolling streams.")
+        frame_size = sample_width * max(streaming_config.config.audio_channel_count, 1)
+        bytes_per_second = sample_rate * frame_size
+        audio = _RollingAudioBuffer(audio_chunks, int(max_replay_duration * bytes_per_second))
+        # A state shared with request generators which run in gRPC threads.
+        state = {'generation': 0, 'rollover': False, 'sent': 0}
+        stream_start = 0
+        num_failures = 0
+
+        if self.framed_audio_requests:
+            method = self._framed_streaming_recognize
+        else:
+            method = self.stub.StreamingRecognize
+
+        def requests(
+            generation: int, position: int
+        ) -> Generator[Union[rasr.StreamingRecognizeRequest, bytes], None, None]:
+            yield rasr.StreamingRecognizeRequest(streaming_config=streaming_config)
+            while state['generation'] == generation and not state['rollover']:
+                data = audio.read(position)
+                if data is None or state['generation'] != generation or state['rollover']:
+                    return
+                position += len(data)
+                state['sent'] = position
+                if self.framed_audio_requests:
+                    yield self._framer(data)
+                else:
+                    yield rasr.StreamingRecognizeRequest(audio_content=bytes(data))
+
+        while True:
+            state['rollover'] = False
+            state['sent'] = stream_start
+            offset = stream_start / bytes_per_second
+            committed = stream_start
+            record = start_record(self.latency_recorder, 'asr.streaming', bytes_per_second)
+            try:
+                for response in track_responses(
+                    method(
+                        track_requests(requests(state['generation'], stream_start), record),
+                        metadata=self.auth.get_auth_metadata(),
+                        **compression_kwargs(compression),
+                    ),
+                    record,
+                ):
+                    num_failures = 0
+                    for result in response.results:
+                        if result.is_final:
+                            processed = round(result.audio_processed * sample_rate) * frame_size
+                            committed = max(committed, stream_start + processed)
+                    audio.commit(committed)
+                    if state['sent'] - stream_start >= max_stream_duration * bytes_per_second and any(
+                        result.is_final for result in response.results
+                    ):
+                        state['rollover'] = True
+                    _rebase_streaming_response(response, offset)
+                    yield response
+            except grpc.RpcError as e:
+                state['generation'] += 1
+                num_failures += 1
+                if e.code() not in ROLLING_STREAM_RETRY_CODES or num_failures > max_retries:
+                    raise
+                if audio.start > committed:
+                    warnings.warn(
+                        f"{(audio.start - committed) / bytes_per_second:.2f}s of audio exceeded `max_replay_duration` "
+                        f"and is not replayed after a stream failure."
+                    )
+                time.sleep(retry_backoff * 2 ** (num_failures - 1))
+                stream_start = max(committed, audio.start)
+                continue
+            state['generation'] += 1
+            stream_start = state['sent']
+            if audio.read(stream_start) is None:
+                return
+            audio.commit(stream_start)
+
     def offline_recognize(
-        self, audio_bytes: bytes, config: rasr.RecognitionConfig, future: bool = False
+        self,
+        audio_bytes: bytes,
+        config: rasr.RecognitionConfig,
+        future: bool = False,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[rasr.RecognizeResponse, _MultiThreadedRendezvous]:
         """
         Performs speech recognition for raw audio in :param:`audio_bytes`. This method is for processing of
@@ -421,6 +787,8 @@ class ASRService:
                     config = RecognitionConfig(enable_automatic_punctuation=True)
             future (:obj:`bool`, defaults to :obj:`False`): whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
 
         Returns:
             :obj:`Union[riva.client.proto.riva_asr_pb2.RecognizeResponse, grpc._channel._MultiThreadedRendezvous]``: a
@@ -428,8 +796,486 @@ class ASRService:
             declaration of ``RecognizeResponse`` message `here
             <https://docs.nvidia.com/deeplearning/riva/user-guide/docs/reference/protos/protos.html#riva-proto-riva-asr-proto>`_.
             If :param:`future` is :obj:`True`, then a future object is returned. You may retrieve a response from a
-            future object by calling ``result()`` method.
+            future object by calling ``result()`` method. If :attr:`result_cache` has a response, then it is
+            returned without a call, and a future is a done :obj:`concurrent.futures.Future`.
         """
+        key = None
+        if self.result_cache is not None:
+            key = self.result_cache.offline_key(audio_bytes, config)
+            response = self.result_cache.get_offline(key)
+            if response is not None:
+                if not future:
+                    return response
+                done_future: concurrent.futures.Future = concurrent.futures.Future()
+                done_future.set_result(response)
+                return done_future
         request = rasr.RecognizeRequest(config=config, audio=audio_bytes)
         func = self.stub.Recognize.future if future else self.stub.Recognize
-        return func(request, metadata=self.auth.get_auth_metadata())
+        record = start_record(
+            self.latency_recorder,
+            'asr.offline',
+            pcm_bytes_per_second(config.sample_rate_hertz, config.audio_channel_count),
+        )
+        result = track_unary_call(
+            func,
+            request,
+            record,
+            future=future,
+            metadata=self.auth.get_auth_metadata(),
+            **compression_kwargs(compression),
+        )
+        if key is not None:
+            if future:
+
+                def on_done(done_future: Any) -> None:
+                    if not done_future.cancelled() and done_future.exception() is None:
+                        self.result_cache.put_offline(key, done_future.result())
+
+                result.add_done_callback(on_done)
+            else:
+                self.result_cache.put_offline(key, result)
+        return result
+
+    def offline_recognize_segmented(
+        self,
+        audio_bytes: Union[bytes, memoryview],
+        config: rasr.RecognitionConfig,
+        segment_duration: float = 30.0,
+        overlap: float = 0.0,
+        silence_search: float = 2.0,
+        max_in_flight: int = 4,
+        sample_width: int = 2,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> rasr.RecognizeResponse:
+        """
+        Performs speech recognition for long raw PCM audio in :param:`audio_bytes` by splitting it into segments
+        which are recognized concurrently. Segments are cut at the quietest points near segment boundaries or at
+        fixed windows with overlap. Results are stitched into one response, word time offsets are rebased to
+        a timeline of :param:`audio_bytes`, and words duplicated in overlaps are removed. Requests are spread over
+        all channels of :class:`riva.client.auth.Auth` if it has several.
+
+        Speaker tags of speaker diarization are assigned independently in every segment.
+
+        Args:
+            audio_bytes (:obj:`Union[bytes, memoryview]`): raw PCM audio without a header, e.g. a
+                :obj:`memoryview` of a memory mapped WAV file. Segments are copied only when requests are created.
+            config (:obj:`riva.client.proto.riva_asr_pb2.RecognitionConfig`): a config for offline speech
+                recognition. Fields ``sample_rate_hertz`` and ``audio_channel_count`` are required for splitting.
+            segment_duration (:obj:`float`, defaults to :obj:`30.0`): a maximum duration of a segment in seconds.
+            overlap (:obj:`float`, defaults to :obj:`0.0`): a duration in seconds by which neighboring segments
+                overlap. If it is positive, then word time offsets are requested even if they are disabled in
+                :param:`config`, because they are needed for deduplication.
+            silence_search (:obj:`float`, defaults to :obj:`2.0`): a duration in seconds at the end of every
+                segment in which the quietest point is looked for. If it is :obj:`0.0`, then audio is cut at fixed
+                windows.
+            max_in_flight (:obj:`int`, defaults to :obj:`4`): a maximum number of concurrent requests.
+            sample_width (:obj:`int`, defaults to :obj:`2`): a number of bytes in one sample.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
+
+        Returns:
+            :obj:`riva.client.proto.riva_asr_pb2.RecognizeResponse`: a response with results for all segments.
+
+        Raises:
+            :obj:`ValueError`: if :param:`config` does not contain sample rate or if :param:`max_in_flight` is not
+                positive.
+        """
+        if not config.sample_rate_hertz:
+            raise ValueError("Field `sample_rate_hertz` of `config` is required for segmented recognition.")
+        if max_in_flight < 1:
+            raise ValueError(f"Parameter `max_in_flight` has to be positive, whereas {max_in_flight} was given.")
+        n_channels = max(config.audio_channel_count, 1)
+        frame_size = sample_width * n_channels
+        audio = memoryview(audio_bytes).cast('B')
+        futures = deque()
+        responses = []
+        try:
+            segments = plan_audio_segments(
+                len(audio) // frame_size,
+                config.sample_rate_hertz,
+                segment_duration,
+                overlap,
+                pcm=audio,
+                silence_search=silence_search,
+                sample_width=sample_width,
+                n_channels=n_channels,
+            )
+            request_config = config
+            if overlap > 0 and not config.enable_word_time_offsets:
+                request_config = rasr.RecognitionConfig()
+                request_config.CopyFrom(config)
+                request_config.enable_word_time_offsets = True
+            for segment in segments:
+                if len(futures) >= max_in_flight:
+                    responses.append(futures.popleft().result())
+                with audio[segment.start_frame * frame_size : segment.end_frame * frame_size] as segment_audio:
+                    request = rasr.RecognizeRequest(config=request_config, audio=bytes(segment_audio))
+                futures.append(
+                    self.stub.Recognize.future(
+                        request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)
+                    )
+                )
+            while futures:
+                responses.append(futures.popleft().result())
+        finally:
+            for future in futures:
+                future.cancel()
+            # A traceback keeps this frame alive, so an export of a memory mapped file would prevent closing it.
+            audio.release()
+        return merge_segment_responses(
+            responses, segments, config.sample_rate_hertz, keep_words=config.enable_word_time_offsets
+        )
+
+
+# A marker which is put in a session queue after the last audio chunk.
+_END_OF_AUDIO = object()
+
+SessionCallback = Callable[['StreamingSession', rasr.StreamingRecognizeResponse], None]
+
+
+class _NoLimit:
+    async def __aenter__(self) -> None:
+        pass
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+class StreamingSession:
+    """
+    A streaming recognition session created by :meth:`StreamingSessionManager.open_session`. Audio is passed to
+    a session with :meth:`push` from any thread, or is read from an audio source given to
+    :meth:`StreamingSessionManager.open_session`.
+    """
+    def __init__(
+        self,
+        manager: 'StreamingSessionManager',
+        session_id: str,
+        on_response: Optional[SessionCallback] = None,
+        on_done: Optional[Callable[['StreamingSession', Optional[BaseException]], None]] = None,
+        sink: Optional[ResultSink] = None,
+    ) -> None:
+        self.manager = manager
+        self.session_id = session_id
+        self.on_response = on_response
+        self.on_done = on_done
+        self.sink = sink
+        self.num_responses = 0
+        self.ended = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._done_future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def push(self, chunk: bytes, timeout: Optional[float] = None) -> None:
+        """
+        Adds an audio chunk to a session. If :param:`StreamingSessionManager.max_buffered_chunks` chunks are waiting
+        to be sent, then the call blocks until a chunk is sent, so a fast producer is slowed down to a pace of
+        a stream instead of accumulating audio in memory.
+
+        Args:
+            chunk (:obj:`bytes`): raw audio.
+            timeout (:obj:`float`, `optional`): a maximum time in seconds to wait for a place in a buffer.
+
+        Raises:
+            :obj:`RuntimeError`: if :meth:`end` was called or a session is finished.
+            :obj:`concurrent.futures.TimeoutError`: if :param:`timeout` expired. A chunk is not added in this case.
+        """
+        if self.ended or self.done():
+            raise RuntimeError(f"Session '{self.session_id}' does not accept audio anymore.")
+        self._put(chunk, timeout)
+
+    def end(self, timeout: Optional[float] = None) -> None:
+        """Marks the end of audio. A session finishes after all responses are received."""
+        if not self.ended and not self.done():
+            self.ended = True
+            self._put(_END_OF_AUDIO, timeout)
+
+    async def _put_in_loop(self, item: Any) -> None:
+        if not self._queue.full():
+            self._queue.put_nowait(item)
+            return
+        put = asyncio.ensure_future(self._queue.put(item))
+        try:
+            await asyncio.wait([put, self._task], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # A chunk is not added if waiting is cancelled on timeout or if a session is finished and nobody reads
+            # the buffer.
+            put.cancel()
+        if put.cancelled():
+            raise RuntimeError(f"Session '{self.session_id}' does not accept audio anymore.")
+
+    def _put(self, item: Any, timeout: Optional[float]) -> None:
+        future = asyncio.run_coroutine_threadsafe(self._put_in_loop(item), self.manager.loop)
+        try:
+            future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def cancel(self) -> None:
+        """Cancels a session. :meth:`wait` raises :obj:`concurrent.futures.CancelledError` after that."""
+        self.manager.loop.call_soon_threadsafe(self._task.cancel)
+
+    def done(self) -> bool:
+        return self._done_future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Waits for the end of a session and raises an exception if a session failed."""
+        self._done_future.result(timeout)
+
+    async def _chunks(self) -> AsyncGenerator[bytes, None]:
+        while True:
+            chunk = await self._queue.get()
+            if chunk is _END_OF_AUDIO:
+                return
+            yield chunk
+
+    async def _feed(self, audio_source: Any) -> None:
+        if hasattr(audio_source, '__aiter__'):
+            async for chunk in audio_source:
+                await self._queue.put(chunk)
+        else:
+            # Usual iterables, e.g. files, sockets or queues, may block, so they are read by worker threads.
+            iterator = iter(audio_source)
+            loop = asyncio.get_running_loop()
+            while True:
+                chunk = await loop.run_in_executor(self.manager.executor, next, iterator, _END_OF_AUDIO)
+                if chunk is _END_OF_AUDIO:
+                    break
+                await self._queue.put(chunk)
+        self.ended = True
+        await self._queue.put(_END_OF_AUDIO)
+
+    async def _run(
+        self,
+        streaming_config: rasr.StreamingRecognitionConfig,
+        audio_source: Any,
+        compression: Optional[Union[str, grpc.Compression]],
+    ) -> None:
+        feeder = asyncio.ensure_future(self._feed(audio_source)) if audio_source is not None else None
+        try:
+            async with self.manager._stream_slots:
+                if self.sink is not None:
+                    self.sink.on_stream_start()
+                async for response in self.manager.asr_service.streaming_response_generator(
+                    self._chunks(), streaming_config, compression=compression
+                ):
+                    self.num_responses += 1
+                    if self.sink is not None:
+                        dispatch_responses((response,), self.sink)
+                    if self.on_response is not None:
+                        self.on_response(self, response)
+        finally:
+            if feeder is not None:
+                feeder.cancel()
+            if self.sink is not None:
+                self.sink.close()
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self.manager._forget(self)
+        if task.cancelled():
+            exception = concurrent.futures.CancelledError()
+            self._done_future.cancel()
+        else:
+            exception = task.exception()
+            if exception is None:
+                self._done_future.set_result(None)
+            else:
+                self._done_future.set_exception(exception)
+        if self.on_done is not None:
+            self.on_done(self, exception)
+
+
+class StreamingSessionManager:
+    """
+    Runs many streaming recognition sessions concurrently in one process without a thread per stream. All
+    ``StreamingRecognize`` calls are served by one asyncio event loop in a background thread and share channels of
+    one :class:`riva.client.aio.Auth`, which may be a pool of channels to several servers. Blocking audio sources
+    are read by a small fixed pool of worker threads.
+
+    Callbacks and sinks are called in the event loop thread, so they must not block. Slow consumers should pass
+    responses to another thread, e.g. through a :class:`queue.Queue`.
+
+    .. code-block:: python
+
+        with riva.client.StreamingSessionManager(
+            lambda: riva.client.aio.Auth(uri="node1:50051,node2:50051", channels_per_endpoint=8)
+        ) as manager:
+            session = manager.open_session(config, on_response=lambda session, response: ...)
+            for chunk in socket_chunks:
+                session.push(chunk)
+            session.end()
+            file_session = manager.open_session(
+                config, audio_source=riva.client.AudioChunkFileIterator("audio.wav", 1600)
+            )
+            manager.wait_all()
+    """
+    def __init__(
+        self,
+        auth_factory: Callable[[], Any],
+        max_buffered_chunks: int = 32,
+        max_concurrent_streams: Optional[int] = None,
+        source_workers: int = 4,
+        latency_recorder: Optional[LatencyRecorder] = None,
+        framed_audio_requests: bool = False,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            auth_factory (:obj:`Callable[[], riva.client.aio.Auth]`): a function which creates
+                :class:`riva.client.aio.Auth`. It is called in the event loop thread because :mod:`grpc.aio` channels
+                have to be created in the loop which uses them.
+            max_buffered_chunks (:obj:`int`, defaults to :obj:`32`): a maximum number of audio chunks waiting to be
+                sent in one session. :meth:`StreamingSession.push` blocks when this number is reached.
+            max_concurrent_streams (:obj:`int`, `optional`): a maximum number of concurrent ``StreamingRecognize``
+                calls. Sessions opened above this limit wait for a free slot. By default there is no limit.
+            source_workers (:obj:`int`, defaults to :obj:`4`): a number of threads which read blocking audio
+                sources.
+            latency_recorder (:obj:`riva.client.metrics.LatencyRecorder`, `optional`): a recorder of timings of
+                sessions. Sessions are not instrumented by default.
+            framed_audio_requests (:obj:`bool`, defaults to :obj:`False`): whether to frame audio chunks directly
+                into serialized requests. See :class:`ASRService`.
+        """
+        self.auth_factory = auth_factory
+        self.max_buffered_chunks = max_buffered_chunks
+        self.max_concurrent_streams = max_concurrent_streams
+        self.source_workers = source_workers
+        self.latency_recorder = latency_recorder
+        self.framed_audio_requests = framed_audio_requests
+        self.sessions: Dict[str, StreamingSession] = {}
+        # Sessions are opened in caller threads and forgotten in an event loop thread.
+        self._sessions_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self.auth = None
+        self.asr_service = None
+        self._thread: Optional[threading.Thread] = None
+        self._session_counter = itertools.count()
+
+    def _call(self, coroutine: Awaitable) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def _init_in_loop(self) -> None:
+        import riva.client.aio
+
+        self.auth = self.auth_factory()
+        self.asr_service = riva.client.aio.ASRService(
+            self.auth, latency_recorder=self.latency_recorder, framed_audio_requests=self.framed_audio_requests
+        )
+        self._stream_slots = (
+            asyncio.Semaphore(self.max_concurrent_streams) if self.max_concurrent_streams else _NoLimit()
+        )
+
+    def start(self) -> None:
+        """Starts an event loop thread. Called automatically by :meth:`open_session`."""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.source_workers, thread_name_prefix="riva-session-source"
+            )
+            self._thread = threading.Thread(target=self.loop.run_forever, name="riva-session-manager", daemon=True)
+            self._thread.start()
+            self._call(self._init_in_loop())
+
+    def _forget(self, session: StreamingSession) -> None:
+        with self._sessions_lock:
+            # A finished session must not remove a new session which reuses its identifier.
+            if self.sessions.get(session.session_id) is session:
+                del self.sessions[session.session_id]
+
+    async def _open_in_loop(
+        self,
+        session: StreamingSession,
+        streaming_config: rasr.StreamingRecognitionConfig,
+        audio_source: Any,
+        compression: Optional[Union[str, grpc.Compression]],
+    ) -> None:
+        session._queue = asyncio.Queue(maxsize=self.max_buffered_chunks)
+        session._task = asyncio.ensure_future(session._run(streaming_config, audio_source, compression))
+        session._task.add_done_callback(session._on_task_done)
+
+    def open_session(
+        self,
+        streaming_config: rasr.StreamingRecognitionConfig,
+        audio_source: Optional[Union[Iterable[bytes], AsyncIterable[bytes]]] = None,
+        on_response: Optional[SessionCallback] = None,
+        on_done: Optional[Callable[[StreamingSession, Optional[BaseException]], None]] = None,
+        sink: Optional[ResultSink] = None,
+        session_id: Optional[str] = None,
+        compression: Optional[Union[str, grpc.Compression]] = None,
+    ) -> StreamingSession:
+        """
+        Opens a streaming recognition session.
+
+        Args:
+            streaming_config (:obj:`riva.client.proto.riva_asr_pb2.StreamingRecognitionConfig`): a config for
+                streaming. See :meth:`ASRService.streaming_response_generator`.
+            audio_source (:obj:`Union[Iterable[bytes], AsyncIterable[bytes]]`, `optional`): an iterable with audio
+                chunks, e.g. :class:`AudioChunkFileIterator`. Usual iterables are read by worker threads and
+                asynchronous iterables are read in the event loop. A session ends when a source is exhausted. If
+                :obj:`None`, then audio has to be passed with :meth:`StreamingSession.push` and
+                :meth:`StreamingSession.end`.
+            on_response (:obj:`Callable[[StreamingSession, StreamingRecognizeResponse], None]`, `optional`):
+                a function which is called for every response.
+            on_done (:obj:`Callable[[StreamingSession, Optional[BaseException]], None]`, `optional`): a function
+                which is called when a session is finished with an exception if it failed.
+            sink (:obj:`riva.client.sinks.ResultSink`, `optional`): a sink which receives results of a session. It is
+                closed when a session is finished.
+            session_id (:obj:`str`, `optional`): an identifier of a session. Generated if not provided.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for the call.
+
+        Returns:
+            :obj:`StreamingSession`: an opened session.
+        """
+        self.start()
+        if session_id is None:
+            session_id = f"session-{next(self._session_counter)}"
+        session = StreamingSession(self, session_id, on_response, on_done, sink)
+        with self._sessions_lock:
+            if session_id in self.sessions:
+                raise ValueError(f"Session '{session_id}' is already open.")
+            self.sessions[session_id] = session
+        try:
+            self._call(self._open_in_loop(session, streaming_config, audio_source, compression))
+        except BaseException:
+            self._forget(session)
+            raise
+        return session
+
+    def _open_sessions(self) -> List[StreamingSession]:
+        with self._sessions_lock:
+            return list(self.sessions.values())
+
+    def wait_all(self, timeout: Optional[float] = None) -> None:
+        """Waits until all open sessions are finished. Exceptions of sessions are not raised."""
+        concurrent.futures.wait([session._done_future for session in self._open_sessions()], timeout)
+
+    async def _close_in_loop(self) -> None:
+        tasks = [session._task for session in self._open_sessions()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.auth.close()
+
+    def close(self) -> None:
+        """Cancels unfinished sessions, closes channels and stops an event loop thread."""
+        if self._thread is None:
+            return
+        self._call(self._close_in_loop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+        self.executor.shutdown(wait=False)
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
@@ -6,19 +6,49 @@ from typing import Dict, Union, Optional
 
 import pyaudio
 
+from riva.client.capture import AudioRingBuffer, CaptureStats
+
 
 class MicrophoneStream:
-    """Opens a recording stream as responses yielding the audio chunks."""
+    """
+    Opens a recording stream as responses yielding the audio chunks.
+
+    By default all captured audio is queued and everything captured since the previous chunk is yielded at once,
+    so a queue grows without limit while a consumer is stalled. If :param:`max_buffer_duration` is set, audio is
+    captured into a preallocated :class:`riva.client.capture.AudioRingBuffer` of this duration instead, chunks of
+    exactly :param:`chunk` frames are yielded, and audio which does not fit is handled according to
+    :param:`overflow_policy`, one of :obj:`riva.client.capture.OVERFLOW_POLICIES`. Overruns and capture
+    latencies are counted in :attr:`stats`.
+    """
 
-    def __init__(self, rate: int, chunk: int, device: int = None) -> None:
+    def __init__(
+        self,
+        rate: int,
+        chunk: int,
+        device: int = None,
+        max_buffer_duration: Optional[float] = None,
+        overflow_policy: str = 'drop-oldest',
+    ) -> None:
         self._rate = rate
         self._chunk = chunk
         self._device = device
 
         # Create a thread-safe buffer of audio data
-        self._buff = queue.Queue()
+        if max_buffer_duration is None:
+            self._buff = queue.Queue()
+            self._ring = None
+        else:
+            self._buff = None
+            self._ring = AudioRingBuffer(
+                max(int(max_buffer_duration * rate), chunk) * 2, chunk * 2, overflow_policy, frame_size=2
+            )
         self.closed = True
 
+    @property
+    def stats(self) -> Optional[CaptureStats]:
+        """Overrun and latency counters if :param:`max_buffer_duration` is set."""
+        return None if self._ring is None else self._ring.stats
+
     def __enter__(self):
         self._audio_interface = pyaudio.PyAudio()
         self._audio_stream = self._audio_interface.open(
@@ -36,12 +66,17 @@ class MicrophoneStream:
         return self
 
     def close(self) -> None:
+        # A ring buffer is closed first, because stopping a stream waits for a callback which may be blocked on
+        # a full buffer with ``block`` overflow policy.
+        if self._ring is not None:
+            self._ring.close()
         self._audio_stream.stop_stream()
         self._audio_stream.close()
         self.closed = True
         # Signal the responses to terminate so that the client's
         # streaming_recognize method will not block the process termination.
-        self._buff.put(None)
+        if self._ring is None:
+            self._buff.put(None)
         self._audio_interface.terminate()
 
     def __exit__(self, type, value, traceback):
@@ -49,12 +84,20 @@ class MicrophoneStream:
 
     def _fill_buffer(self, in_data, frame_count, time_info, status_flags):
         """Continuously collect data from the audio stream into the buffer."""
-        self._buff.put(in_data)
+        if self._ring is not None:
+            self._ring.write(in_data)
+        else:
+            self._buff.put(in_data)
         return None, pyaudio.paContinue
 
     def __next__(self) -> bytes:
         if self.closed:
             raise StopIteration
+        if self._ring is not None:
+            chunk = self._ring.read_chunk()
+            if chunk is None:
+                raise StopIteration
+            return chunk
         chunk = self._buff.get()
         if chunk is None:
             raise StopIteration
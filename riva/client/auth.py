@@ -1,42 +1,392 @@
 # SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
 # SPDX-License-Identifier: MIT
 
+import collections
+import itertools
 import os
+import random
+import threading
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
 import grpc
 
 
-def create_channel(
-    ssl_cert: Optional[Union[str, os.PathLike]] = None, use_ssl: bool = False, uri: str = "localhost:50051", metadata: Optional[List[Tuple[str, str]]] = None,
-) -> grpc.Channel:
+LOAD_BALANCING_POLICIES = ['round_robin', 'least_outstanding', 'power_of_two_choices']
+
+COMPRESSION_ALGORITHMS = {
+    'none': grpc.Compression.NoCompression,
+    'deflate': grpc.Compression.Deflate,
+    'gzip': grpc.Compression.Gzip,
+}
+
+ChannelOptions = List[Tuple[str, Any]]
+
+_KEEPALIVE_OPTIONS: ChannelOptions = [
+    # Pings keep idle streaming connections alive behind load balancers and proxies which drop idle connections.
+    ('grpc.keepalive_time_ms', 30_000),
+    ('grpc.keepalive_timeout_ms', 10_000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+]
+
+CHANNEL_OPTION_PROFILES: Dict[str, ChannelOptions] = {
+    # gRPC defaults: 4 MB receive limit, no keepalive pings.
+    'default': [],
+    # Long living streams, e.g. microphone transcription.
+    'streaming': _KEEPALIVE_OPTIONS,
+    # Offline recognition of long files and large text batches. Message size limits are raised to 1 GB and a per
+    # stream flow control window is increased to 8 MB, so that big messages are not throttled on high latency links.
+    # It is recommended to combine this profile with `compression="gzip"` for NLP and NMT requests.
+    'high_throughput': _KEEPALIVE_OPTIONS + [
+        ('grpc.max_send_message_length', 1 << 30),
+        ('grpc.max_receive_message_length', 1 << 30),
+        ('grpc.http2.lookahead_bytes', 8 << 20),
+    ],
+}
+
+
+def get_channel_options(channel_options: Optional[Union[str, ChannelOptions]]) -> ChannelOptions:
+    """
+    Returns a list of gRPC channel options. :param:`channel_options` is either a name of a profile from
+    :obj:`CHANNEL_OPTION_PROFILES`, or a list of ``(key, value)`` pairs, or :obj:`None`.
+
+    Raises:
+        :obj:`ValueError`: if there is no profile :param:`channel_options`.
+    """
+    if channel_options is None:
+        return []
+    if isinstance(channel_options, str):
+        if channel_options not in CHANNEL_OPTION_PROFILES:
+            raise ValueError(
+                f"Unknown channel options profile '{channel_options}'. "
+                f"Available profiles are {list(CHANNEL_OPTION_PROFILES)}"
+            )
+        return list(CHANNEL_OPTION_PROFILES[channel_options])
+    return [tuple(option) for option in channel_options]
+
+
+def get_compression(compression: Optional[Union[str, grpc.Compression]]) -> Optional[grpc.Compression]:
+    """
+    Converts a name of a compression algorithm from :obj:`COMPRESSION_ALGORITHMS` into :obj:`grpc.Compression`.
+
+    Raises:
+        :obj:`ValueError`: if :param:`compression` is an unknown name.
+    """
+    if isinstance(compression, str):
+        if compression not in COMPRESSION_ALGORITHMS:
+            raise ValueError(
+                f"Unknown compression algorithm '{compression}'. Available algorithms are {list(COMPRESSION_ALGORITHMS)}"
+            )
+        return COMPRESSION_ALGORITHMS[compression]
+    return compression
+
+
+def compression_kwargs(compression: Optional[Union[str, grpc.Compression]]) -> Dict[str, grpc.Compression]:
+    """
+    Returns keyword arguments for a stub call which override channel compression. If :param:`compression` is
+    :obj:`None`, then a channel default compression is used and an empty dictionary is returned.
+    """
+    if compression is None:
+        return {}
+    return {'compression': get_compression(compression)}
+
+
+def create_channel_credentials(
+    ssl_cert: Optional[Union[str, os.PathLike]] = None, use_ssl: bool = False, metadata: Optional[List[Tuple[str, str]]] = None,
+) -> Optional[grpc.ChannelCredentials]:
+    """Returns credentials for a secure channel or :obj:`None` if SSL is not used."""
 
     def metadata_callback(context, callback):
         callback(metadata, None)
 
-    if ssl_cert is not None or use_ssl:
-        root_certificates = None
-        if ssl_cert is not None:
-            ssl_cert = Path(ssl_cert).expanduser()
-            with open(ssl_cert, 'rb') as f:
-                root_certificates = f.read()
-        creds = grpc.ssl_channel_credentials(root_certificates)
-        if metadata:
-            auth_creds = grpc.metadata_call_credentials(metadata_callback)
-            creds = grpc.composite_channel_credentials(creds, auth_creds)
-        channel = grpc.secure_channel(uri, creds)
+    if ssl_cert is None and not use_ssl:
+        return None
+    root_certificates = None
+    if ssl_cert is not None:
+        ssl_cert = Path(ssl_cert).expanduser()
+        with open(ssl_cert, 'rb') as f:
+            root_certificates = f.read()
+    creds = grpc.ssl_channel_credentials(root_certificates)
+    if metadata:
+        auth_creds = grpc.metadata_call_credentials(metadata_callback)
+        creds = grpc.composite_channel_credentials(creds, auth_creds)
+    return creds
+
+
+def create_channel(
+    ssl_cert: Optional[Union[str, os.PathLike]] = None,
+    use_ssl: bool = False,
+    uri: str = "localhost:50051",
+    metadata: Optional[List[Tuple[str, str]]] = None,
+    options: Optional[ChannelOptions] = None,
+    compression: Optional[grpc.Compression] = None,
+) -> grpc.Channel:
+    creds = create_channel_credentials(ssl_cert, use_ssl, metadata)
+    if creds is not None:
+        channel = grpc.secure_channel(uri, creds, options=options, compression=compression)
     else:
-        channel = grpc.insecure_channel(uri)
+        channel = grpc.insecure_channel(uri, options=options, compression=compression)
     return channel
 
 
+def split_uris(uri: Union[str, Sequence[str]]) -> List[str]:
+    """
+    Converts :param:`uri` into a list of endpoints. A string may contain several comma separated endpoints, e.g.
+    ``"node1:50051,node2:50051"``.
+    """
+    if isinstance(uri, str):
+        uri = uri.split(',')
+    uris = [u.strip() for u in uri if u.strip()]
+    if not uris:
+        raise ValueError(f"At least one endpoint has to be provided whereas `uri={uri}` was given.")
+    return uris
+
+
+class _PooledMultiCallable:
+    """
+    Wraps multicallables of the same method created on every channel of a :class:`ChannelPool`. Every call is sent
+    to a channel selected by the pool and is counted as outstanding until the call is finished.
+    """
+    def __init__(self, pool: 'ChannelPool', multicallables: List[Any], response_streaming: bool) -> None:
+        self._pool = pool
+        self._multicallables = multicallables
+        self._response_streaming = response_streaming
+
+    def _start(self, method_name: str, args: Tuple[Any, ...], kwargs: Any) -> Any:
+        index = self._pool.acquire()
+        try:
+            call = getattr(self._multicallables[index], method_name)(*args, **kwargs)
+        except BaseException:
+            self._pool.release(index)
+            raise
+        call.add_done_callback(lambda _: self._pool.release(index))
+        return call
+
+    def __call__(self, *args, **kwargs) -> Any:
+        if self._response_streaming or self._pool.calls_return_call_objects:
+            return self._start('__call__', args, kwargs)
+        index = self._pool.acquire()
+        try:
+            return self._multicallables[index](*args, **kwargs)
+        finally:
+            self._pool.release(index)
+
+    def with_call(self, *args, **kwargs) -> Any:
+        index = self._pool.acquire()
+        try:
+            return self._multicallables[index].with_call(*args, **kwargs)
+        finally:
+            self._pool.release(index)
+
+    def future(self, *args, **kwargs) -> Any:
+        return self._start('future', args, kwargs)
+
+
+class ChannelPool(grpc.Channel):
+    """
+    A channel which holds several channels to one or several endpoints and spreads calls across them. It can be
+    passed to any gRPC stub instead of a usual channel. A channel is selected for every call, so a single stub
+    created on a pool uses all endpoints.
+
+    Supported load balancing policies:
+        - ``"round_robin"``: channels are used in turn,
+        - ``"least_outstanding"``: a channel with the smallest number of unfinished calls is used,
+        - ``"power_of_two_choices"``: two random channels are compared and the one with fewer unfinished calls
+          is used.
+
+    Calls to endpoints marked unavailable with :meth:`set_endpoint_available` are not sent while at least one
+    endpoint is available.
+    """
+    # If :obj:`True`, every call returns a call object which supports ``add_done_callback()`` as it is in
+    # :mod:`grpc.aio`.
+    calls_return_call_objects = False
+
+    def __init__(
+        self,
+        uris: Sequence[str],
+        channel_factory: Callable[[str], grpc.Channel],
+        channels_per_endpoint: int = 1,
+        load_balancing: str = 'round_robin',
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            uris (:obj:`Sequence[str]`): endpoints of Riva servers.
+            channel_factory (:obj:`Callable[[str], grpc.Channel]`): a function which creates a channel for an
+                endpoint.
+            channels_per_endpoint (:obj:`int`, defaults to :obj:`1`): a number of channels (HTTP/2 connections)
+                opened to every endpoint.
+            load_balancing (:obj:`str`, defaults to :obj:`"round_robin"`): one of :obj:`"round_robin"`,
+                :obj:`"least_outstanding"`, :obj:`"power_of_two_choices"`.
+
+        Raises:
+            :obj:`ValueError`: if :param:`load_balancing` or :param:`channels_per_endpoint` is invalid.
+        """
+        if load_balancing not in LOAD_BALANCING_POLICIES:
+            raise ValueError(
+                f"Not allowed value '{load_balancing}' of parameter `load_balancing`. "
+                f"Allowed values are {LOAD_BALANCING_POLICIES}"
+            )
+        if channels_per_endpoint < 1:
+            raise ValueError(
+                f"Parameter `channels_per_endpoint` has to be positive whereas "
+                f"`channels_per_endpoint={channels_per_endpoint}` was given."
+            )
+        self.uris: List[str] = list(uris)
+        self.load_balancing = load_balancing
+        self.channels: List[grpc.Channel] = []
+        self.channel_uris: List[str] = []
+        for uri in self.uris:
+            for _ in range(channels_per_endpoint):
+                self.channels.append(channel_factory(uri))
+                self.channel_uris.append(uri)
+        self.outstanding: List[int] = [0] * len(self.channels)
+        self._available = {uri: True for uri in self.uris}
+        self._candidates = list(range(len(self.channels)))
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._random = random.Random()
+
+    def set_endpoint_available(self, uri: str, available: bool) -> None:
+        """Includes an endpoint :param:`uri` into rotation or excludes it from rotation."""
+        with self._lock:
+            if self._available[uri] == available:
+                return
+            self._available[uri] = available
+            candidates = [i for i, u in enumerate(self.channel_uris) if self._available[u]]
+            # If all endpoints are unavailable, calls are still sent anywhere instead of failing on client side.
+            self._candidates = candidates if candidates else list(range(len(self.channels)))
+
+    def is_endpoint_available(self, uri: str) -> bool:
+        return self._available[uri]
+
+    def acquire(self) -> int:
+        """Selects a channel for a new call and returns its index. The call has to be finished with :meth:`release`."""
+        with self._lock:
+            candidates = self._candidates
+            if len(candidates) == 1:
+                index = candidates[0]
+            elif self.load_balancing == 'round_robin':
+                index = candidates[next(self._counter) % len(candidates)]
+            elif self.load_balancing == 'least_outstanding':
+                start = next(self._counter) % len(candidates)
+                index = min(
+                    itertools.chain(candidates[start:], candidates[:start]), key=self.outstanding.__getitem__
+                )
+            else:  # power_of_two_choices
+                first, second = self._random.sample(candidates, 2)
+                index = first if self.outstanding[first] <= self.outstanding[second] else second
+            self.outstanding[index] += 1
+        return index
+
+    def release(self, index: int) -> None:
+        with self._lock:
+            self.outstanding[index] -= 1
+
+    def _multicallable(self, kind: str, response_streaming: bool, method: str, *args, **kwargs) -> _PooledMultiCallable:
+        return _PooledMultiCallable(
+            self, [getattr(channel, kind)(method, *args, **kwargs) for channel in self.channels], response_streaming
+        )
+
+    def unary_unary(self, method, *args, **kwargs):
+        return self._multicallable('unary_unary', False, method, *args, **kwargs)
+
+    def unary_stream(self, method, *args, **kwargs):
+        return self._multicallable('unary_stream', True, method, *args, **kwargs)
+
+    def stream_unary(self, method, *args, **kwargs):
+        return self._multicallable('stream_unary', False, method, *args, **kwargs)
+
+    def stream_stream(self, method, *args, **kwargs):
+        return self._multicallable('stream_stream', True, method, *args, **kwargs)
+
+    def subscribe(self, callback, try_to_connect=False):
+        for channel in self.channels:
+            channel.subscribe(callback, try_to_connect=try_to_connect)
+
+    def unsubscribe(self, callback):
+        for channel in self.channels:
+            channel.unsubscribe(callback)
+
+    def close(self) -> None:
+        for channel in self.channels:
+            channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class ChannelRegistry:
+    """
+    A thread safe registry of channels shared by several :class:`Auth` instances. Channels are created once per key
+    and are reference counted, so many clients with the same connection settings use one connection and do one
+    TLS handshake.
+    """
+    def __init__(self) -> None:
+        self._channels: Dict[Hashable, Any] = {}
+        self._keys: Dict[int, Hashable] = {}
+        self._refcounts: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, channel_factory: Callable[[], Any]) -> Any:
+        """
+        Returns a channel registered for :param:`key`. If there is no such channel, then it is created with
+        :param:`channel_factory`. Every call has to be paired with a :meth:`release` call.
+        """
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = channel_factory()
+                self._channels[key] = channel
+                self._keys[id(channel)] = key
+                self._refcounts[key] = 0
+            self._refcounts[key] += 1
+        return channel
+
+    def release(self, channel: Any) -> bool:
+        """
+        Releases a reference to a :param:`channel`. Returns :obj:`True` if it was the last reference. In that case
+        the channel is removed from the registry and the caller is responsible for closing it. A channel which is not
+        in the registry, e.g. already released by its last user, is ignored and :obj:`False` is returned.
+        """
+        with self._lock:
+            key = self._keys.get(id(channel))
+            if key is None or self._channels.get(key) is not channel:
+                return False
+            self._refcounts[key] -= 1
+            if self._refcounts[key] > 0:
+                return False
+            del self._channels[key], self._keys[id(channel)], self._refcounts[key]
+        return True
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+
+CHANNEL_REGISTRY = ChannelRegistry()
+
+
 class Auth:
+    _channel_factory = staticmethod(create_channel)
+    _channel_pool_class = ChannelPool
+    _channel_registry = CHANNEL_REGISTRY
+
     def __init__(
         self,
         ssl_cert: Optional[Union[str, os.PathLike]] = None,
         use_ssl: bool = False,
-        uri: str = "localhost:50051",
+        uri: Union[str, List[str]] = "localhost:50051",
         metadata_args: List[List[str]] = None,
+        channels_per_endpoint: int = 1,
+        load_balancing: str = 'round_robin',
+        shared_channel: bool = False,
+        channel_options: Optional[Union[str, ChannelOptions]] = None,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> None:
         """
         A class responsible for establishing connection with a server and providing security metadata.
@@ -46,10 +396,30 @@ class Auth:
                 is :obj:`False` and :param:`ssl_cert` is not :obj:`None`, then SSL is used.
             use_ssl (:obj:`bool`, defaults to :obj:`False`): whether to use SSL. If :param:`ssl_cert` is :obj:`None`,
                 then SSL is still used but with default credentials.
-            uri (:obj:`str`, defaults to :obj:`"localhost:50051"`): a Riva URI.
+            uri (:obj:`Union[str, List[str]]`, defaults to :obj:`"localhost:50051"`): a Riva URI. Several URIs can be
+                passed as a list or as a comma separated string. In that case calls are spread across all of them.
+            channels_per_endpoint (:obj:`int`, defaults to :obj:`1`): a number of channels opened to every URI. More
+                than one channel allows to exceed a limit on number of concurrent streams in one HTTP/2 connection.
+            load_balancing (:obj:`str`, defaults to :obj:`"round_robin"`): a policy used for choosing a channel for
+                a call if there are several channels. One of :obj:`"round_robin"`, :obj:`"least_outstanding"`,
+                :obj:`"power_of_two_choices"`.
+            shared_channel (:obj:`bool`, defaults to :obj:`False`): whether to take channels from a process wide
+                registry. Instances of :class:`Auth` with same connection parameters and :param:`shared_channel=True`
+                share channels, so a connection is established only once. Shared channels are closed when
+                :meth:`close` is called for the last instance using them.
+            channel_options (:obj:`Union[str, List[Tuple[str, Any]]]`, `optional`): gRPC channel options, e.g.
+                keepalive settings and message size limits. Either a list of ``(key, value)`` pairs or a name of a
+                profile from :obj:`CHANNEL_OPTION_PROFILES`: :obj:`"default"`, :obj:`"streaming"` (keepalive
+                pings for long idle streams), :obj:`"high_throughput"` (keepalive, 1 GB message size limits and a
+                large flow control window for batch processing).
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a default compression for all calls made
+                through the channels: :obj:`"none"`, :obj:`"deflate"`, :obj:`"gzip"` or a
+                :obj:`grpc.Compression` value. Service methods accept ``compression`` parameter which overrides it
+                for one call.
         """
         self.ssl_cert: Optional[Path] = None if ssl_cert is None else Path(ssl_cert).expanduser()
-        self.uri: str = uri
+        self.uris: List[str] = split_uris(uri)
+        self.uri: str = self.uris[0]
         self.use_ssl: bool = use_ssl
         self.metadata = []
         if metadata_args:
@@ -57,7 +427,65 @@ class Auth:
                 if len(meta) != 2:
                     raise ValueError(f"Metadata should have 2 parameters in \"key\" \"value\" pair. Receieved {len(meta)} parameters.")
                 self.metadata.append(tuple(meta))
-        self.channel: grpc.Channel = create_channel(self.ssl_cert, self.use_ssl, self.uri, self.metadata)
+        self.shared_channel = shared_channel
+        self._closed = False
+        self.channel_options: ChannelOptions = get_channel_options(channel_options)
+        self.compression: Optional[grpc.Compression] = get_compression(compression)
+        channel_numbers = collections.Counter()
+
+        def create(u: str) -> grpc.Channel:
+            return self._channel_factory(
+                self.ssl_cert, self.use_ssl, u, self.metadata, self.channel_options, self.compression
+            )
+
+        def channel_factory(u: str) -> grpc.Channel:
+            if not self.shared_channel:
+                return create(u)
+            key = (
+                u,
+                channel_numbers[u],
+                self.ssl_cert,
+                self.use_ssl,
+                tuple(self.metadata),
+                tuple(self.channel_options),
+                self.compression,
+            )
+            channel_numbers[u] += 1
+            return self._channel_registry.acquire(key, lambda: create(u))
+
+        if len(self.uris) == 1 and channels_per_endpoint == 1:
+            self.channel: grpc.Channel = channel_factory(self.uri)
+        else:
+            self.channel: grpc.Channel = self._channel_pool_class(
+                self.uris,
+                channel_factory,
+                channels_per_endpoint=channels_per_endpoint,
+                load_balancing=load_balancing,
+            )
+
+    def _release_channels(self) -> List[grpc.Channel]:
+        """
+        Returns channels which are not used anymore and have to be closed. References to shared channels are
+        released only once, so repeated closing does not close channels of other instances.
+        """
+        if self._closed:
+            return []
+        self._closed = True
+        channels = self.channel.channels if isinstance(self.channel, ChannelPool) else [self.channel]
+        if not self.shared_channel:
+            return channels
+        return [channel for channel in channels if self._channel_registry.release(channel)]
+
+    def close(self) -> None:
+        """Closes channels. Shared channels are closed only if they are not used by other instances."""
+        for channel in self._release_channels():
+            channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     def get_auth_metadata(self) -> List[Tuple[str, str]]:
         """
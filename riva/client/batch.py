@@ -0,0 +1,322 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, TextIO, Union
+
+import grpc
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.asr import ASRService, AudioChunkFileIterator, add_audio_file_specs_to_config, get_wav_file_parameters
+from riva.client.results import CompactResult, compact_responses
+
+
+BATCH_MODES = ['offline', 'streaming']
+AUDIO_FILE_EXTENSIONS = ['.wav', '.flac', '.opus', '.ogg', '.raw', '.pcm']
+# Keys of a JSONL manifest line which may contain a path to an audio file.
+MANIFEST_PATH_KEYS = ['audio_filepath', 'audio_file', 'path']
+# Fields of final results which are kept while a file is transcribed.
+BATCH_RESULT_FIELDS = ['transcript', 'audio_processed']
+
+
+def read_manifest(manifest: Union[str, os.PathLike]) -> List[Path]:
+    """
+    Reads paths to audio files from a JSONL manifest. Every line has to contain one of keys :obj:`MANIFEST_PATH_KEYS`.
+    Relative paths are resolved relative to a directory of the manifest.
+    """
+    manifest = Path(manifest).expanduser()
+    files = []
+    with manifest.open() as f:
+        for line_i, line in enumerate(f):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            for key in MANIFEST_PATH_KEYS:
+                if key in entry:
+                    path = Path(entry[key]).expanduser()
+                    files.append(path if path.is_absolute() else manifest.parent / path)
+                    break
+            else:
+                raise ValueError(
+                    f"Line {line_i + 1} of manifest {manifest} does not contain a path to an audio file. Allowed "
+                    f"keys are {MANIFEST_PATH_KEYS}"
+                )
+    return files
+
+
+def collect_audio_files(inputs: Union[str, os.PathLike, Iterable[Union[str, os.PathLike]]]) -> List[Path]:
+    """
+    Collects audio files for batch transcription.
+
+    Args:
+        inputs (:obj:`Union[str, os.PathLike, Iterable[Union[str, os.PathLike]]]`): a directory, a glob pattern,
+            a JSONL manifest (a file with ``.jsonl`` or ``.json`` extension), an audio file, or an iterable of any
+            of them. Directories are searched recursively for files with extensions from
+            :obj:`AUDIO_FILE_EXTENSIONS`.
+
+    Returns:
+        :obj:`List[pathlib.Path]`: paths to audio files in order of appearance without duplicates.
+    """
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = [inputs]
+    files = []
+    for input_ in inputs:
+        path = Path(input_).expanduser()
+        if path.is_dir():
+            files.extend(
+                sorted(p for p in path.rglob('*') if p.is_file() and p.suffix.lower() in AUDIO_FILE_EXTENSIONS)
+            )
+        elif path.is_file() and path.suffix.lower() in ['.jsonl', '.json']:
+            files.extend(read_manifest(path))
+        elif path.is_file():
+            files.append(path)
+        else:
+            files.extend(sorted(Path(p) for p in glob.glob(str(path), recursive=True)))
+    return list(dict.fromkeys(files))
+
+
+def _checkpoint_key(audio_file: Union[str, os.PathLike]) -> str:
+    """Returns an absolute path of :param:`audio_file`, so that a job may be restarted from another directory."""
+    return str(Path(audio_file).expanduser().resolve())
+
+
+class BatchStats:
+    """Throughput statistics of :class:`BatchTranscriber`."""
+    def __init__(self) -> None:
+        self.start_time = time.monotonic()
+        self.num_files = 0
+        self.num_failed = 0
+        self.num_skipped = 0
+        # A total duration in seconds of successfully transcribed audio.
+        self.audio_duration = 0.0
+        # A total time in seconds spent on transcription of separate files.
+        self.processing_time = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    @property
+    def files_per_second(self) -> float:
+        return self.num_files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def audio_hours_per_hour(self) -> float:
+        return self.audio_duration / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def rtf(self) -> float:
+        """A real time factor: wall time divided by a duration of transcribed audio."""
+        return self.elapsed / self.audio_duration if self.audio_duration > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'files': self.num_files,
+            'failed': self.num_failed,
+            'skipped': self.num_skipped,
+            'audio_duration': self.audio_duration,
+            'processing_time': self.processing_time,
+            'elapsed': self.elapsed,
+            'files_per_second': self.files_per_second,
+            'audio_hours_per_hour': self.audio_hours_per_hour,
+            'rtf': self.rtf,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"files: {self.num_files} (failed: {self.num_failed}, skipped: {self.num_skipped}), "
+            f"files/s: {self.files_per_second:.2f}, audio hours/hour: {self.audio_hours_per_hour:.2f}, "
+            f"RTF: {self.rtf:.4f}"
+        )
+
+
+class BatchTranscriber:
+    """
+    Transcribes many audio files concurrently with offline or streaming ASR. A result for every file is appended
+    to a JSONL output as soon as the file is finished. Paths of successfully transcribed files are appended to
+    a checkpoint file as absolute paths, so a job restarted with the same checkpoint skips them even if paths are
+    given relative to another directory. Failed files are written to the output with an ``error`` field and are
+    retried on restart. A file is transcribed once even if it occurs several times in inputs.
+
+    .. code-block:: python
+
+        auth = riva.client.Auth(uri="node1:50051,node2:50051")
+        transcriber = riva.client.BatchTranscriber(
+            riva.client.ASRService(auth),
+            riva.client.RecognitionConfig(language_code="en-US"),
+            concurrency=2 * len(auth.uris),
+        )
+        stats = transcriber.run(riva.client.collect_audio_files("data/"), "results.jsonl")
+    """
+    def __init__(
+        self,
+        asr_service: ASRService,
+        config: rasr.RecognitionConfig,
+        mode: str = 'offline',
+        concurrency: int = 4,
+        chunk_n_frames: int = 1600,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            asr_service (:obj:`riva.client.asr.ASRService`): a service used for recognition.
+            config (:obj:`riva.client.proto.riva_asr_pb2.RecognitionConfig`): a recognition config. Sample rate
+                and number of channels are filled for every WAV file.
+            mode (:obj:`str`, defaults to :obj:`"offline"`): whether to send every file in one ``Recognize`` request
+                or to stream it with ``StreamingRecognize``. Allowed values are :obj:`BATCH_MODES`.
+            concurrency (:obj:`int`, defaults to :obj:`4`): a maximum number of files transcribed at the same time.
+                If :class:`riva.client.auth.Auth` of :param:`asr_service` has several endpoints, then requests are
+                spread over them, so concurrency per endpoint is ``concurrency / len(auth.uris)``.
+            chunk_n_frames (:obj:`int`, defaults to :obj:`1600`): a number of frames in one chunk in streaming mode.
+
+        Raises:
+            :obj:`ValueError`: if :param:`mode` is not allowed or if :param:`concurrency` is not positive.
+        """
+        if mode not in BATCH_MODES:
+            raise ValueError(f"Not allowed value '{mode}' of parameter `mode`. Allowed values are {BATCH_MODES}")
+        if concurrency < 1:
+            raise ValueError(f"Parameter `concurrency` has to be positive, whereas {concurrency} was given.")
+        self.asr_service = asr_service
+        self.config = config
+        self.mode = mode
+        self.concurrency = concurrency
+        self.chunk_n_frames = chunk_n_frames
+
+    def _file_config(self, audio_file: Path) -> rasr.RecognitionConfig:
+        config = rasr.RecognitionConfig()
+        config.CopyFrom(self.config)
+        add_audio_file_specs_to_config(config, audio_file)
+        return config
+
+    def _transcribe_offline(self, audio_file: Path) -> List[CompactResult]:
+        with audio_file.open('rb') as f:
+            data = f.read()
+        response = self.asr_service.offline_recognize(data, self._file_config(audio_file))
+        return list(compact_responses([response], BATCH_RESULT_FIELDS))
+
+    def _transcribe_streaming(self, audio_file: Path) -> List[CompactResult]:
+        streaming_config = rasr.StreamingRecognitionConfig(config=self._file_config(audio_file), interim_results=False)
+        with AudioChunkFileIterator(audio_file, self.chunk_n_frames) as audio_chunks:
+            return list(
+                compact_responses(
+                    self.asr_service.streaming_response_generator(audio_chunks, streaming_config),
+                    BATCH_RESULT_FIELDS,
+                )
+            )
+
+    def transcribe_file(self, audio_file: Union[str, os.PathLike]) -> Dict[str, Any]:
+        """
+        Transcribes one file and returns a record which is written to a JSONL output. A record contains fields
+        ``audio_filepath``, ``transcript``, ``duration``, ``processing_time`` and ``rtf``, or ``audio_filepath``
+        and ``error`` if recognition failed.
+        """
+        audio_file = Path(audio_file)
+        start = time.monotonic()
+        try:
+            if self.mode == 'offline':
+                results = self._transcribe_offline(audio_file)
+            else:
+                results = self._transcribe_streaming(audio_file)
+        except Exception as e:
+            # A failed file must not stop a job. It is retried on restart because it is not checkpointed.
+            error = e.details() if isinstance(e, grpc.RpcError) else repr(e)
+            return {'audio_filepath': str(audio_file), 'error': error}
+        processing_time = time.monotonic() - start
+        wav_parameters = get_wav_file_parameters(audio_file)
+        if wav_parameters is not None:
+            duration = wav_parameters['duration']
+        else:
+            duration = max((result.audio_processed for result in results), default=0.0)
+        return {
+            'audio_filepath': str(audio_file),
+            'transcript': "".join(result.transcript for result in results),
+            'duration': duration,
+            'processing_time': processing_time,
+            'rtf': processing_time / duration if duration > 0 else None,
+        }
+
+    def run(
+        self,
+        audio_files: Iterable[Union[str, os.PathLike]],
+        output: Union[str, os.PathLike, TextIO],
+        checkpoint: Optional[Union[str, os.PathLike]] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any], BatchStats], None]] = None,
+    ) -> BatchStats:
+        """
+        Transcribes :param:`audio_files` and appends results to :param:`output`.
+
+        Args:
+            audio_files (:obj:`Iterable[Union[str, os.PathLike]]`): files to transcribe, e.g. returned by
+                :func:`collect_audio_files`.
+            output (:obj:`Union[str, os.PathLike, TextIO]`): a path to a JSONL output file or an opened text file.
+                Results are appended to an existing file.
+            checkpoint (:obj:`Union[str, os.PathLike]`, `optional`): a path to a checkpoint file. Defaults to
+                the output path with ``.checkpoint`` suffix appended if :param:`output` is a path.
+            progress_callback (:obj:`Callable[[Dict[str, Any], BatchStats], None]`, `optional`): a function which
+                is called in the calling thread with a record and current statistics after every finished file.
+
+        Returns:
+            :obj:`BatchStats`: statistics of the job. Skipped files are not included in throughput.
+        """
+        if checkpoint is None and isinstance(output, (str, os.PathLike)):
+            checkpoint = f"{output}.checkpoint"
+        # Absolute paths of successfully transcribed files. Files submitted in this run are not submitted again, so
+        # a file gets at most one successful record.
+        done: Set[str] = set()
+        if checkpoint is not None and Path(checkpoint).exists():
+            with open(checkpoint) as f:
+                done = {_checkpoint_key(line.rstrip('\n')) for line in f if line.strip()}
+        submitted: Set[str] = set()
+        stats = BatchStats()
+        output_file = open(output, 'a') if isinstance(output, (str, os.PathLike)) else output
+        checkpoint_file = open(checkpoint, 'a') if checkpoint is not None else None
+
+        # Finished futures are handled in this thread, so outputs and statistics are written without a lock. Worker
+        # threads only run :meth:`transcribe_file`.
+        def on_done(future: Future) -> None:
+            record = future.result()
+            key = _checkpoint_key(record['audio_filepath'])
+            output_file.write(json.dumps(record) + '\n')
+            output_file.flush()
+            if 'error' in record:
+                stats.num_failed += 1
+            else:
+                stats.num_files += 1
+                stats.audio_duration += record['duration']
+                stats.processing_time += record['processing_time']
+                done.add(key)
+                if checkpoint_file is not None:
+                    checkpoint_file.write(key + '\n')
+                    checkpoint_file.flush()
+            if progress_callback is not None:
+                progress_callback(record, stats)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="riva-batch") as executor:
+                pending: Set[Future] = set()
+                for audio_file in audio_files:
+                    key = _checkpoint_key(audio_file)
+                    if key in done or key in submitted:
+                        stats.num_skipped += 1
+                        continue
+                    submitted.add(key)
+                    # Files are submitted lazily, so that a huge manifest does not create a future for every file.
+                    if len(pending) >= 2 * self.concurrency:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            on_done(future)
+                    pending.add(executor.submit(self.transcribe_file, audio_file))
+                for future in as_completed(pending):
+                    on_done(future)
+        finally:
+            if output_file is not output:
+                output_file.close()
+            if checkpoint_file is not None:
+                checkpoint_file.close()
+        return stats
@@ -0,0 +1,288 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+A content addressed on-disk cache of speech recognition responses. A key is a SHA-256 hash of audio and of
+a deterministic serialization of a recognition config, so a cached response is reused only if neither audio nor
+any config field, including speech contexts, endpointing and custom configuration, has changed. Responses are
+stored as zlib compressed protobuf messages. The least recently used entries are evicted when a total size of
+the cache exceeds a limit.
+
+.. code-block:: python
+
+    cache = riva.client.ResultCache("~/.cache/riva/asr")
+    asr_service = riva.client.ASRService(auth, result_cache=cache)
+    response = asr_service.offline_recognize(audio, config)  # A server is called only on a miss.
+    print(cache.stats)
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar, Union
+
+from google.protobuf.message import DecodeError
+
+import riva.client.proto.riva_asr_pb2 as rasr
+
+
+# Is changed if a format of cache entries or keys changes, so old entries are never read.
+CACHE_FORMAT_VERSION = 1
+CACHE_FILE_SUFFIX = '.rsp'
+DEFAULT_CACHE_MAX_SIZE = 1024**3
+_HASH_BLOCK_SIZE = 1024**2
+
+Entry = TypeVar('Entry')
+
+
+class CacheStats:
+    """Hit, miss and failed write counters of :class:`ResultCache`."""
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.write_errors = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'write_errors': self.write_errors,
+            'hit_rate': self.hit_rate,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"cache hits: {self.hits}, misses: {self.misses}, hit rate: {self.hit_rate:.1%}, "
+            f"evictions: {self.evictions}, write errors: {self.write_errors}"
+        )
+
+
+def _serialize_streaming_responses(responses: Iterable[rasr.StreamingRecognizeResponse]) -> bytes:
+    parts = []
+    for response in responses:
+        data = response.SerializeToString()
+        parts.append(struct.pack('<I', len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+def _parse_streaming_responses(data: bytes) -> List[rasr.StreamingRecognizeResponse]:
+    responses, position = [], 0
+    while position < len(data):
+        (size,) = struct.unpack_from('<I', data, position)
+        position += 4
+        if position + size > len(data):
+            raise DecodeError("Truncated streaming responses")
+        responses.append(rasr.StreamingRecognizeResponse.FromString(data[position : position + size]))
+        position += size
+    return responses
+
+
+def _remove(path: Path) -> None:
+    """Removes a cache file if possible. Files of a read-only or shared directory may be impossible to remove."""
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+class ResultCache:
+    """
+    Stores recognition responses in files ``<directory>/<2 hex digits>/<key>.rsp``. Entries are written
+    atomically, so several processes may share a directory, although every process enforces the size limit
+    only for entries it knows about. Recency of entries is kept in modification times of files, so LRU order
+    survives restarts. Instances are thread safe.
+
+    Only final results of streaming recognition are cached: a hit replays responses with final results and
+    skips partial ones.
+    """
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+        namespace: str = '',
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            directory (:obj:`Union[str, os.PathLike]`): a directory of the cache. It is created if it does not exist.
+            max_size (:obj:`int`, defaults to :obj:`1073741824`): a maximum total size in bytes of cache files.
+            namespace (:obj:`str`, defaults to :obj:`""`): a string which is added to every key, e.g. a server
+                version or a deployment name, so that results of different deployments are not mixed.
+
+        Raises:
+            :obj:`ValueError`: if :param:`max_size` is not positive.
+        """
+        if max_size <= 0:
+            raise ValueError(f"Parameter `max_size` has to be positive, whereas {max_size} was given.")
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.namespace = namespace
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self.size = 0
+        files = []
+        for path in self.directory.glob(f'*/*{CACHE_FILE_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self.size += size
+        with self._lock:
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _hasher(self, kind: str, config: Union[rasr.RecognitionConfig, rasr.StreamingRecognitionConfig]) -> Any:
+        hasher = hashlib.sha256()
+        # Map fields, e.g. `custom_configuration`, are serialized in the same order only in deterministic mode.
+        prefix = f'{CACHE_FORMAT_VERSION}:{kind}:{self.namespace}'.encode()
+        for part in (prefix, config.SerializeToString(deterministic=True)):
+            hasher.update(struct.pack('<Q', len(part)))
+            hasher.update(part)
+        return hasher
+
+    def offline_key(self, audio_bytes: Union[bytes, memoryview], config: rasr.RecognitionConfig) -> str:
+        """Returns a key of an offline response for :param:`audio_bytes` recognized with :param:`config`."""
+        hasher = self._hasher('offline', config)
+        hasher.update(audio_bytes)
+        return hasher.hexdigest()
+
+    def streaming_file_key(
+        self,
+        audio_file: Union[str, os.PathLike],
+        streaming_config: rasr.StreamingRecognitionConfig,
+        chunk_n_frames: int,
+    ) -> str:
+        """
+        Returns a key of streaming responses for :param:`audio_file` sent in chunks of :param:`chunk_n_frames`
+        frames with :param:`streaming_config`. A file is hashed in blocks, so it is not loaded into memory.
+        """
+        hasher = self._hasher(f'streaming:{chunk_n_frames}', streaming_config)
+        with open(audio_file, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}{CACHE_FILE_SUFFIX}'
+
+    def _lookup(self, key: str, parse: Callable[[bytes], Entry]) -> Optional[Entry]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            entry = parse(zlib.decompress(data))
+        except (OSError, zlib.error, DecodeError, struct.error) as e:
+            # A missing, unreadable or corrupted entry is a miss. Only a corrupted file is removed.
+            with self._lock:
+                self._forget(key)
+                self.stats.misses += 1
+            if not isinstance(e, OSError):
+                _remove(path)
+            return None
+        try:
+            # Modification times keep recency for other processes. A read-only cache is used without them.
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            if key not in self._entries:
+                # The entry was written by another process.
+                self._entries[key] = len(data)
+                self.size += len(data)
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return entry
+
+    def _write(self, key: str, data: bytes) -> None:
+        """
+        Stores an entry. Writing is best effort: if a directory is read-only or a disk is full, then the error is
+        counted in :attr:`stats` and a result of recognition is still returned to a caller.
+        """
+        path = self._path(key)
+        data = zlib.compress(data)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        except OSError:
+            with self._lock:
+                self.stats.write_errors += 1
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException as e:
+            _remove(Path(tmp_path))
+            if not isinstance(e, OSError):
+                raise
+            with self._lock:
+                self.stats.write_errors += 1
+            return
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(data)
+            self.size += len(data)
+            self._evict()
+
+    def _forget(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self.size -= size
+
+    def _evict(self) -> None:
+        while self.size > self.max_size and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.size -= size
+            self.stats.evictions += 1
+            _remove(self._path(key))
+
+    def get_offline(self, key: str) -> Optional[rasr.RecognizeResponse]:
+        """Returns a cached offline response or :obj:`None` on a miss."""
+        return self._lookup(key, rasr.RecognizeResponse.FromString)
+
+    def put_offline(self, key: str, response: rasr.RecognizeResponse) -> None:
+        self._write(key, response.SerializeToString())
+
+    def get_streaming(self, key: str) -> Optional[List[rasr.StreamingRecognizeResponse]]:
+        """Returns cached streaming responses with final results or :obj:`None` on a miss."""
+        return self._lookup(key, _parse_streaming_responses)
+
+    def put_streaming(self, key: str, responses: Iterable[rasr.StreamingRecognizeResponse]) -> None:
+        """Stores responses which contain final results. Partial results are dropped."""
+        finals = []
+        for response in responses:
+            results = [result for result in response.results if result.is_final]
+            if results:
+                final = rasr.StreamingRecognizeResponse(id=response.id)
+                final.results.extend(results)
+                finals.append(final)
+        self._write(key, _serialize_streaming_responses(finals))
+
+    def clear(self) -> None:
+        """Removes all entries known to this instance."""
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self.size = 0
+        for key in keys:
+            _remove(self._path(key))
@@ -0,0 +1,230 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+A bounded buffer between an audio capture callback and a consumer which sends audio to a server.
+:class:`AudioRingBuffer` stores audio in one preallocated :obj:`bytearray`, so memory does not grow when
+a consumer falls behind, e.g. while a network stalls. What happens to audio which does not fit is chosen by an
+overflow policy from :obj:`OVERFLOW_POLICIES`:
+
+- ``drop-oldest`` overwrites the oldest audio, so that latency stays bounded and recent speech is kept;
+- ``drop-newest`` discards new audio until there is free space, so that buffered audio stays continuous;
+- ``block`` makes a capture callback wait for free space, so that no audio is lost while a capture device
+  itself may overflow.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+
+OVERFLOW_POLICIES = ['drop-oldest', 'drop-newest', 'block']
+
+
+class CaptureStats:
+    """Overrun and latency counters of :class:`AudioRingBuffer`. Latencies are in seconds."""
+    def __init__(self) -> None:
+        self.overruns = 0
+        self.dropped_bytes = 0
+        self.chunks = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.chunks if self.chunks else 0.0
+
+    def add_latency(self, latency: float) -> None:
+        self.chunks += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'overruns': self.overruns,
+            'dropped_bytes': self.dropped_bytes,
+            'chunks': self.chunks,
+            'mean_latency': self.mean_latency,
+            'max_latency': self.max_latency,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"chunks: {self.chunks}, overruns: {self.overruns} ({self.dropped_bytes} bytes dropped), "
+            f"capture latency mean: {self.mean_latency * 1000:.1f} ms, max: {self.max_latency * 1000:.1f} ms"
+        )
+
+
+class AudioRingBuffer:
+    """
+    A thread safe ring buffer of PCM audio with one writer, e.g. a PyAudio callback, and one reader. The reader
+    receives chunks of exactly :param:`chunk_size` bytes, except for the last chunk after :meth:`close`.
+
+    A latency of a chunk is a time between capture of its first byte and the moment the chunk is read. It grows
+    when audio accumulates in the buffer and is bounded by a capacity of the buffer for ``drop-oldest`` policy.
+    """
+    def __init__(
+        self,
+        capacity: int,
+        chunk_size: int,
+        overflow_policy: str = 'drop-oldest',
+        frame_size: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            capacity (:obj:`int`): a size of the buffer in bytes. It is rounded down to a multiple of
+                :param:`frame_size` and has to hold at least one chunk.
+            chunk_size (:obj:`int`): a size in bytes of chunks returned by :meth:`read_chunk`. It has to be
+                a multiple of :param:`frame_size`.
+            overflow_policy (:obj:`str`, defaults to :obj:`"drop-oldest"`): one of :obj:`OVERFLOW_POLICIES`.
+            frame_size (:obj:`int`, defaults to :obj:`2`): a number of bytes in one frame. Audio is dropped in
+                whole frames.
+            clock (:obj:`Callable[[], float]`, defaults to :obj:`time.monotonic`): a source of time for latencies.
+
+        Raises:
+            :obj:`ValueError`: if :param:`overflow_policy` is not allowed or sizes are not consistent.
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Not allowed value '{overflow_policy}' of parameter `overflow_policy`. "
+                f"Allowed values are {OVERFLOW_POLICIES}"
+            )
+        capacity -= capacity % frame_size
+        if chunk_size <= 0 or chunk_size % frame_size or chunk_size > capacity:
+            raise ValueError(
+                f"Parameter `chunk_size` has to be a positive multiple of `frame_size` which is not greater than "
+                f"`capacity`, whereas chunk_size={chunk_size}, frame_size={frame_size} and capacity={capacity} "
+                f"were given."
+            )
+        self.capacity = capacity
+        self.chunk_size = chunk_size
+        self.overflow_policy = overflow_policy
+        self.frame_size = frame_size
+        self.clock = clock
+        self.stats = CaptureStats()
+        self.closed = False
+        self._buffer = bytearray(capacity)
+        # Absolute positions of the next byte to read and to write. Buffered bytes are [_read_pos, _write_pos).
+        self._read_pos = 0
+        self._write_pos = 0
+        # Absolute end positions of writes and times of their capture for latencies.
+        self._write_times: Deque[Tuple[int, float]] = deque()
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        return self._write_pos - self._read_pos
+
+    def _copy_in(self, data: memoryview) -> None:
+        start = self._write_pos % self.capacity
+        first = min(len(data), self.capacity - start)
+        self._buffer[start : start + first] = data[:first]
+        self._buffer[: len(data) - first] = data[first:]
+        self._write_pos += len(data)
+        self._write_times.append((self._write_pos, self.clock()))
+
+    def _copy_out(self, size: int) -> bytes:
+        start = self._read_pos % self.capacity
+        first = min(size, self.capacity - start)
+        data = bytes(self._buffer[start : start + first])
+        if first < size:
+            data += self._buffer[: size - first]
+        self._advance(size)
+        return data
+
+    def _advance(self, size: int) -> None:
+        self._read_pos += size
+        while self._write_times and self._write_times[0][0] <= self._read_pos:
+            self._write_times.popleft()
+
+    def _drop(self, size: int) -> None:
+        self.stats.dropped_bytes += size
+        self._advance(size)
+
+    def write(self, data: bytes) -> int:
+        """
+        Adds captured audio. Audio which does not fit is handled according to the overflow policy.
+
+        Returns:
+            :obj:`int`: a number of bytes of audio which were dropped, either old or new.
+        """
+        view = memoryview(data)
+        view = view[: len(view) - len(view) % self.frame_size]
+        with self._cond:
+            if self.closed:
+                return 0
+            dropped_before = self.stats.dropped_bytes
+            if self.overflow_policy == 'block':
+                blocked = False
+                while view:
+                    if len(self) == self.capacity and not blocked:
+                        # An overrun of a blocking buffer is a write which has to wait for a reader.
+                        self.stats.overruns += 1
+                        blocked = True
+                    while len(self) == self.capacity and not self.closed:
+                        self._cond.wait()
+                    if self.closed:
+                        break
+                    part = view[: self.capacity - len(self)]
+                    self._copy_in(part)
+                    view = view[len(part) :]
+                    self._cond.notify_all()
+                return 0
+            overflow = len(self) + len(view) - self.capacity
+            if overflow > 0:
+                self.stats.overruns += 1
+                if self.overflow_policy == 'drop-newest':
+                    self.stats.dropped_bytes += overflow
+                    view = view[: len(view) - overflow]
+                else:
+                    # Audio older than the last `capacity` bytes of `data` is dropped without being copied.
+                    skipped = max(len(view) - self.capacity, 0)
+                    self._drop(min(overflow, len(self)))
+                    if skipped:
+                        self.stats.dropped_bytes += skipped
+                        view = view[skipped:]
+            if view:
+                self._copy_in(view)
+                self._cond.notify_all()
+            return self.stats.dropped_bytes - dropped_before
+
+    def read_chunk(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Waits for a chunk of :attr:`chunk_size` bytes and returns it. After :meth:`close` remaining audio is
+        returned in a shorter chunk and then :obj:`None` is returned.
+
+        Returns:
+            :obj:`Optional[bytes]`: a chunk, or :obj:`None` if the buffer is closed and empty or if
+            :param:`timeout` expired.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self) >= self.chunk_size or self.closed, timeout):
+                return None
+            size = min(len(self), self.chunk_size)
+            if size == 0:
+                return None
+            captured = self._write_times[0][1]
+            chunk = self._copy_out(size)
+            self.stats.add_latency(self.clock() - captured)
+            self._cond.notify_all()
+            return chunk
+
+    def close(self) -> None:
+        """Stops accepting audio and wakes up a waiting reader and a blocked writer."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __iter__(self) -> 'AudioRingBuffer':
+        return self
+
+    def __next__(self) -> bytes:
+        chunk = self.read_chunk()
+        if chunk is None:
+            raise StopIteration
+        return chunk
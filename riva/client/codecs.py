@@ -0,0 +1,259 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+Incremental encoding of 16 bit PCM audio into compressed encodings of
+:class:`riva.client.proto.riva_audio_pb2.AudioEncoding`. :class:`AudioEncoder` wraps an iterable of PCM chunks and
+yields encoded bytes as soon as an encoder produces them, so a FLAC or Ogg Opus stream is sent while it is being
+encoded. Typical bandwidth savings for speech are 2x for ``MULAW`` and ``ALAW``, 2-4x for lossless ``FLAC`` and
+about 8x for ``OGGOPUS``.
+
+``FLAC`` and ``OGGOPUS`` require ``soundfile`` package (``pip install soundfile``). ``MULAW`` and ``ALAW`` have no
+dependencies and add no delay. A FLAC encoder emits a frame per 4096 samples and an Opus encoder emits an Ogg page
+about once a second, which adds up to this much delay to streaming recognition.
+"""
+
+import io
+import sys
+from array import array
+from functools import lru_cache
+from typing import Generator, Iterable, Optional, Union
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.proto.riva_audio_pb2 import AudioEncoding
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+
+ENCODER_ENCODINGS = ['FLAC', 'OGGOPUS', 'MULAW', 'ALAW']
+# Formats and subtypes of `soundfile` for encodings which require it.
+SOUNDFILE_FORMATS = {'FLAC': ('FLAC', 'PCM_16'), 'OGGOPUS': ('OGG', 'OPUS')}
+
+_ULAW_SEGMENT_ENDS = [0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]
+_ALAW_SEGMENT_ENDS = [0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF]
+
+
+def _segment(value: int, segment_ends: Iterable[int]) -> int:
+    for segment, end in enumerate(segment_ends):
+        if value <= end:
+            return segment
+    return 8
+
+
+def linear_to_ulaw(sample: int) -> int:
+    """Encodes a 16 bit sample with G.711 mu-law."""
+    value = sample >> 2
+    if value < 0:
+        value, mask = -value, 0x7F
+    else:
+        mask = 0xFF
+    value = min(value, 8159) + 0x21
+    segment = _segment(value, _ULAW_SEGMENT_ENDS)
+    if segment >= 8:
+        return 0x7F ^ mask
+    return ((segment << 4) | ((value >> (segment + 1)) & 0xF)) ^ mask
+
+
+def linear_to_alaw(sample: int) -> int:
+    """Encodes a 16 bit sample with G.711 A-law."""
+    value = sample >> 3
+    if value >= 0:
+        mask = 0xD5
+    else:
+        value, mask = -value - 1, 0x55
+    segment = _segment(value, _ALAW_SEGMENT_ENDS)
+    if segment >= 8:
+        return 0x7F ^ mask
+    return ((segment << 4) | ((value >> (1 if segment < 2 else segment)) & 0xF)) ^ mask
+
+
+@lru_cache(maxsize=None)
+def g711_table(encoding: str) -> bytes:
+    """Returns codes of all 16 bit samples indexed by samples as unsigned integers."""
+    encode = linear_to_ulaw if encoding == 'MULAW' else linear_to_alaw
+    return bytes(encode(i - 65536 if i >= 32768 else i) for i in range(65536))
+
+
+class _ForwardBuffer(io.RawIOBase):
+    """
+    A file for `soundfile` from which written bytes are taken for sending. Encoders seek back only on closing to
+    rewrite lengths in headers, and such writes into bytes which were already taken are dropped. Streamed headers
+    keep unknown lengths, which is allowed for streaming.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.taken = 0
+        self.position = 0
+        self.pending = bytearray()
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return b''
+
+    def write(self, data: Union[bytes, memoryview]) -> int:
+        n_bytes = len(data)
+        start = self.position - self.taken
+        self.position += n_bytes
+        if start < 0:
+            data = data[-start:]
+            start = 0
+        end = start + len(data)
+        if end > len(self.pending):
+            self.pending.extend(bytes(end - len(self.pending)))
+        self.pending[start:end] = data
+        return n_bytes
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        else:
+            self.position = self.taken + len(self.pending) + offset
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def take(self) -> bytes:
+        data = bytes(self.pending)
+        self.taken += len(data)
+        self.pending.clear()
+        return data
+
+
+class AudioEncoder:
+    """
+    Iterates over chunks of audio encoded from chunks of 16 bit little endian PCM audio in :param:`audio_chunks`,
+    e.g. chunks of :class:`riva.client.AudioChunkFileIterator` created with ``use_mmap=True``,
+    :class:`riva.client.audio_io.MicrophoneStream` or :class:`riva.client.resampling.AudioConverter`. Encoded chunks
+    form one stream of :param:`encoding` which can be sent both in streaming requests and, joined, in an offline
+    request. Use :meth:`update_config` to set a matching encoding in a recognition config.
+    """
+    def __init__(
+        self,
+        audio_chunks: Iterable[Union[bytes, memoryview]],
+        framerate: int,
+        encoding: str = 'FLAC',
+        n_channels: int = 1,
+        compression_level: Optional[float] = None,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            audio_chunks (:obj:`Iterable[Union[bytes, memoryview]]`): chunks of 16 bit PCM audio.
+            framerate (:obj:`int`): a sample rate of audio. ``OGGOPUS`` supports 8000, 12000, 16000, 24000 and 48000.
+            encoding (:obj:`str`, defaults to :obj:`"FLAC"`): one of :obj:`ENCODER_ENCODINGS`.
+            n_channels (:obj:`int`, defaults to :obj:`1`): a number of audio channels.
+            compression_level (:obj:`float`, `optional`): a compression level from :obj:`0.0` to :obj:`1.0` of
+                ``FLAC`` and ``OGGOPUS`` encoders. Higher levels give smaller FLAC streams and lower Opus bitrates.
+
+        Raises:
+            :obj:`ValueError`: if :param:`encoding` is not one of :obj:`ENCODER_ENCODINGS`.
+            :obj:`ImportError`: if :param:`encoding` requires ``soundfile`` and it is not installed.
+        """
+        if encoding not in ENCODER_ENCODINGS:
+            raise ValueError(
+                f"Not allowed value '{encoding}' of parameter `encoding`. Allowed values are {ENCODER_ENCODINGS}"
+            )
+        if encoding in SOUNDFILE_FORMATS and soundfile is None:
+            raise ImportError(f"Encoding {encoding} requires `soundfile` package. Install it: pip install soundfile")
+        self.audio_chunks = audio_chunks
+        self.framerate = framerate
+        self.encoding = encoding
+        self.n_channels = n_channels
+        self.compression_level = compression_level
+        self.frame_size = 2 * n_channels
+        self.input_bytes = 0
+        self.output_bytes = 0
+
+    @property
+    def compression_ratio(self) -> float:
+        """A ratio of sizes of PCM audio and encoded audio so far."""
+        return self.input_bytes / self.output_bytes if self.output_bytes else 0.0
+
+    def update_config(self, config: Union[rasr.StreamingRecognitionConfig, rasr.RecognitionConfig]) -> None:
+        """Sets encoding, sample rate and number of channels of encoded audio in :param:`config`."""
+        inner_config = config if isinstance(config, rasr.RecognitionConfig) else config.config
+        inner_config.encoding = AudioEncoding.Value(self.encoding)
+        inner_config.sample_rate_hertz = self.framerate
+        inner_config.audio_channel_count = self.n_channels
+
+    def close(self) -> None:
+        if hasattr(self.audio_chunks, 'close'):
+            self.audio_chunks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, traceback) -> None:
+        self.close()
+
+    def _aligned_chunks(self) -> Generator[bytes, None, None]:
+        tail = b''
+        for chunk in self.audio_chunks:
+            data = tail + bytes(chunk)
+            n_bytes = len(data) // self.frame_size * self.frame_size
+            tail = data[n_bytes:]
+            if n_bytes:
+                self.input_bytes += n_bytes
+                yield data[:n_bytes]
+
+    def _encode_g711(self) -> Generator[bytes, None, None]:
+        table = g711_table(self.encoding)
+        for data in self._aligned_chunks():
+            samples = array('H', data)
+            if sys.byteorder == 'big':
+                samples.byteswap()
+            yield bytes(map(table.__getitem__, samples))
+
+    def _open_soundfile(self, file: io.RawIOBase) -> 'soundfile.SoundFile':
+        file_format, subtype = SOUNDFILE_FORMATS[self.encoding]
+        kwargs = {} if self.compression_level is None else {'compression_level': self.compression_level}
+        return soundfile.SoundFile(file, 'w', self.framerate, self.n_channels, subtype, format=file_format, **kwargs)
+
+    def _encode_soundfile(self) -> Generator[bytes, None, None]:
+        buffer = _ForwardBuffer()
+        with self._open_soundfile(buffer) as encoder:
+            for data in self._aligned_chunks():
+                encoder.buffer_write(data, 'int16')
+                encoded = buffer.take()
+                if encoded:
+                    yield encoded
+        encoded = buffer.take()
+        if encoded:
+            yield encoded
+
+    def __iter__(self) -> Generator[bytes, None, None]:
+        chunks = self._encode_g711() if self.encoding in ('MULAW', 'ALAW') else self._encode_soundfile()
+        for chunk in chunks:
+            self.output_bytes += len(chunk)
+            yield chunk
+
+
+def encode_audio(pcm: Union[bytes, memoryview], framerate: int, encoding: str = 'FLAC', **kwargs) -> bytes:
+    """
+    Encodes whole 16 bit PCM audio, e.g. for :meth:`riva.client.ASRService.offline_recognize`. Unlike streamed
+    FLAC, the result has a complete header with a number of samples. Keyword arguments are passed to
+    :class:`AudioEncoder`.
+    """
+    encoder = AudioEncoder([pcm], framerate, encoding, **kwargs)
+    if encoding not in SOUNDFILE_FORMATS:
+        return b''.join(encoder)
+    buffer = io.BytesIO()
+    with encoder._open_soundfile(buffer) as file:
+        for data in encoder._aligned_chunks():
+            file.buffer_write(data, 'int16')
+    return buffer.getvalue()
@@ -0,0 +1,222 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import grpc
+
+import riva.client.proto.health_pb2 as rhealth
+import riva.client.proto.health_pb2_grpc as rhealth_srv
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_asr_pb2_grpc as rasr_srv
+from riva.client.auth import Auth, ChannelPool
+
+
+HEALTH_PROBES = ['health', 'asr_config']
+
+
+def probe_health(channel: grpc.Channel, timeout: float, metadata: List) -> None:
+    """Calls standard gRPC health checking protocol. Raises :obj:`RuntimeError` if a server is not serving."""
+    response = rhealth_srv.HealthStub(channel).Check(
+        rhealth.HealthCheckRequest(service=''), timeout=timeout, metadata=metadata
+    )
+    if response.status != rhealth.HealthCheckResponse.ServingStatus.SERVING:
+        raise RuntimeError(
+            f"Server status is {rhealth.HealthCheckResponse.ServingStatus.Name(response.status)}"
+        )
+
+
+def probe_asr_config(channel: grpc.Channel, timeout: float, metadata: List) -> None:
+    """Calls cheap ``GetRivaSpeechRecognitionConfig`` RPC which requires a working ASR service."""
+    rasr_srv.RivaSpeechRecognitionStub(channel).GetRivaSpeechRecognitionConfig(
+        rasr.RivaSpeechRecognitionConfigRequest(), timeout=timeout, metadata=metadata
+    )
+
+
+PROBE_FUNCTIONS: Dict[str, Callable[[grpc.Channel, float, List], None]] = {
+    'health': probe_health,
+    'asr_config': probe_asr_config,
+}
+
+
+class EndpointHealth:
+    """A state of an endpoint tracked by :class:`HealthChecker`."""
+    def __init__(self, uri: str) -> None:
+        self.uri = uri
+        self.healthy = True
+        # Exponentially smoothed probe latency in seconds.
+        self.latency: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.num_probes = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"EndpointHealth(uri={self.uri!r}, healthy={self.healthy}, latency={self.latency}, "
+            f"last_error={self.last_error!r})"
+        )
+
+
+class HealthChecker:
+    """
+    Periodically probes every endpoint of :class:`riva.client.auth.Auth` in a background thread and takes unhealthy
+    or slow endpoints out of rotation. An endpoint is excluded if :param:`unhealthy_threshold` probes in a row fail
+    or if its smoothed probe latency exceeds :param:`max_latency`. It is returned to rotation after
+    :param:`healthy_threshold` successful probes in a row which are fast enough.
+
+    Endpoints are taken out of rotation only if :attr:`riva.client.auth.Auth.channel` is a
+    :class:`riva.client.auth.ChannelPool`, i.e. if ``Auth`` was created with several URIs or channels. For a single
+    channel the health status is only tracked.
+
+    .. code-block:: python
+
+        auth = riva.client.Auth(uri="node1:50051,node2:50051")
+        with riva.client.HealthChecker(auth, interval=2.0, probes=['health', 'asr_config']):
+            asr_service = riva.client.ASRService(auth)
+            ...
+    """
+    def __init__(
+        self,
+        auth: Auth,
+        interval: float = 5.0,
+        timeout: float = 1.0,
+        probes: Sequence[str] = ('health',),
+        max_latency: Optional[float] = None,
+        unhealthy_threshold: int = 2,
+        healthy_threshold: int = 1,
+        latency_smoothing: float = 0.3,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            auth (:obj:`riva.client.auth.Auth`): an instance of :class:`Auth` which endpoints are checked.
+            interval (:obj:`float`, defaults to :obj:`5.0`): a time in seconds between probes of one endpoint.
+            timeout (:obj:`float`, defaults to :obj:`1.0`): a deadline in seconds for one probe RPC.
+            probes (:obj:`Sequence[str]`, defaults to :obj:`('health',)`): RPCs used for probing. Available values
+                are :obj:`"health"` (standard gRPC health checking protocol) and :obj:`"asr_config"`
+                (``GetRivaSpeechRecognitionConfig``). All probes have to succeed for an endpoint to be healthy.
+            max_latency (:obj:`float`, `optional`): if smoothed probe latency in seconds exceeds this value, then an
+                endpoint is considered overloaded and is taken out of rotation.
+            unhealthy_threshold (:obj:`int`, defaults to :obj:`2`): a number of consecutive failed probes after
+                which an endpoint is taken out of rotation.
+            healthy_threshold (:obj:`int`, defaults to :obj:`1`): a number of consecutive successful probes after
+                which an endpoint is returned to rotation.
+            latency_smoothing (:obj:`float`, defaults to :obj:`0.3`): a weight of the last probe latency in
+                exponentially smoothed latency.
+
+        Raises:
+            :obj:`ValueError`: if an unknown probe is passed in :param:`probes` or if :param:`auth` has
+                :mod:`grpc.aio` channels, e.g. :class:`riva.client.aio.Auth`, which cannot be probed from a thread.
+        """
+        for probe in probes:
+            if probe not in HEALTH_PROBES:
+                raise ValueError(f"Not allowed probe '{probe}' in parameter `probes`. Allowed values are {HEALTH_PROBES}")
+        self.auth = auth
+        self.interval = interval
+        self.timeout = timeout
+        self.probes = list(probes)
+        self.max_latency = max_latency
+        self.unhealthy_threshold = unhealthy_threshold
+        self.healthy_threshold = healthy_threshold
+        self.latency_smoothing = latency_smoothing
+        self.status: Dict[str, EndpointHealth] = {uri: EndpointHealth(uri) for uri in auth.uris}
+        self._channels: Dict[str, grpc.Channel] = {}
+        if isinstance(auth.channel, ChannelPool):
+            for channel, uri in zip(auth.channel.channels, auth.channel.channel_uris):
+                self._channels.setdefault(uri, channel)
+        else:
+            self._channels[auth.uri] = auth.channel
+        if any(isinstance(channel, grpc.aio.Channel) for channel in self._channels.values()):
+            raise ValueError(
+                "Parameter `auth` has asyncio channels which cannot be probed by a background thread. Pass "
+                "an instance of `riva.client.auth.Auth` instead of `riva.client.aio.Auth`."
+            )
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _probe(self, uri: str) -> None:
+        start = time.monotonic()
+        for probe in self.probes:
+            PROBE_FUNCTIONS[probe](self._channels[uri], self.timeout, self.auth.get_auth_metadata())
+        latency = time.monotonic() - start
+        state = self.status[uri]
+        state.last_latency = latency
+        if state.latency is None:
+            state.latency = latency
+        else:
+            state.latency += self.latency_smoothing * (latency - state.latency)
+
+    def check_endpoint(self, uri: str) -> EndpointHealth:
+        """Probes an endpoint :param:`uri` once and updates its status and its presence in rotation."""
+        state = self.status[uri]
+        state.num_probes += 1
+        try:
+            self._probe(uri)
+        except Exception as e:
+            # Any error, e.g. of a closed channel, makes a probe failed, so that a background thread keeps running.
+            if isinstance(e, grpc.RpcError):
+                state.last_error = e.details()
+            else:
+                state.last_error = str(e) if isinstance(e, RuntimeError) else repr(e)
+            succeeded = False
+        else:
+            if self.max_latency is not None and state.latency > self.max_latency:
+                state.last_error = f"Probe latency {state.latency:.3f}s exceeds {self.max_latency:.3f}s"
+                succeeded = False
+            else:
+                state.last_error = None
+                succeeded = True
+        if succeeded:
+            state.consecutive_failures = 0
+            state.consecutive_successes += 1
+            if not state.healthy and state.consecutive_successes >= self.healthy_threshold:
+                state.healthy = True
+        else:
+            state.consecutive_successes = 0
+            state.consecutive_failures += 1
+            if state.healthy and state.consecutive_failures >= self.unhealthy_threshold:
+                state.healthy = False
+        if isinstance(self.auth.channel, ChannelPool):
+            self.auth.channel.set_endpoint_available(uri, state.healthy)
+        return state
+
+    def check_all(self) -> Dict[str, EndpointHealth]:
+        """Probes all endpoints once."""
+        for uri in self.status:
+            self.check_endpoint(uri)
+        return self.status
+
+    def healthy_uris(self) -> List[str]:
+        return [uri for uri, state in self.status.items() if state.healthy]
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self.check_all()
+            self._stop_event.wait(self.interval)
+
+    def start(self) -> None:
+        """Starts probing in a background daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="riva-health-checker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
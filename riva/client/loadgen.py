@@ -0,0 +1,273 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generator, List, NamedTuple, Optional, Sequence
+
+import grpc
+
+from riva.client.metrics import Histogram
+
+
+# Processes which generate times at which requests arrive.
+ARRIVAL_PROCESSES = ['poisson', 'constant']
+# Percentiles of latencies included in reports.
+REPORT_PERCENTILES = [50, 90, 99, 99.9]
+
+
+class Workload(NamedTuple):
+    """
+    A kind of requests in a load test. :attr:`call` performs one complete request, e.g. sends a whole audio file in
+    a stream and reads all responses, and raises an exception if a request fails. A workload is chosen for every
+    arrival with a probability proportional to :attr:`weight`.
+    """
+    name: str
+    call: Callable[[], Any]
+    weight: float = 1.0
+
+
+def arrival_times(
+    rate: float, duration: float, process: str = 'poisson', rng: Optional[random.Random] = None
+) -> Generator[float, None, None]:
+    """
+    Generates times in seconds from the start of a test at which requests arrive.
+
+    Args:
+        rate (:obj:`float`): a mean number of requests per second.
+        duration (:obj:`float`): a duration of a test in seconds.
+        process (:obj:`str`, defaults to :obj:`'poisson'`): ``'poisson'`` for exponentially distributed intervals
+            between requests or ``'constant'`` for equal intervals.
+        rng (:obj:`random.Random`, `optional`): a random generator for reproducible tests.
+
+    Raises:
+        :obj:`ValueError`: if :param:`rate` is not positive or :param:`process` is not one of
+            :obj:`ARRIVAL_PROCESSES`.
+    """
+    if rate <= 0:
+        raise ValueError(f"Parameter `rate` has to be positive, whereas {rate} was given.")
+    if process not in ARRIVAL_PROCESSES:
+        raise ValueError(f"Parameter `process` has to be one of {ARRIVAL_PROCESSES}, whereas '{process}' was given.")
+    rng = random.Random() if rng is None else rng
+    t = 0.0
+    i = 0
+    while True:
+        if process == 'poisson':
+            t += rng.expovariate(rate)
+        else:
+            t = i / rate
+            i += 1
+        if t >= duration:
+            return
+        yield t
+
+
+def error_label(error: BaseException) -> str:
+    """Returns a gRPC status name for :obj:`grpc.RpcError` and an exception class name otherwise."""
+    if isinstance(error, grpc.RpcError) and hasattr(error, 'code'):
+        try:
+            return error.code().name
+        except Exception:
+            pass
+    return type(error).__name__
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class WorkloadStats:
+    """Outcomes of requests of one workload which arrived in a measurement window."""
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latencies: List[float] = []
+        self.histogram = Histogram()
+        self.errors: Dict[str, int] = {}
+
+    def add(self, latency: float, error: Optional[str] = None) -> None:
+        if error is None:
+            self.latencies.append(latency)
+            self.histogram.observe(latency)
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    @property
+    def num_errors(self) -> int:
+        return sum(self.errors.values())
+
+    def as_dict(self, measure_duration: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        total = len(latencies) + self.num_errors
+        return {
+            'requests': total,
+            'succeeded': len(latencies),
+            'errors': dict(self.errors),
+            'error_rate': self.num_errors / total if total else 0.0,
+            'throughput': len(latencies) / measure_duration if measure_duration > 0 else None,
+            'latency': {
+                'mean': sum(latencies) / len(latencies) if latencies else None,
+                'max': latencies[-1] if latencies else None,
+                **{f'p{q:g}': _percentile(latencies, q) for q in REPORT_PERCENTILES},
+            },
+            'histogram': self.histogram.as_dict()['buckets'],
+        }
+
+
+class LoadReport:
+    """A result of :meth:`LoadGenerator.run`. Latencies are measured from scheduled arrival times."""
+    def __init__(self, settings: Dict[str, Any], stats: Dict[str, WorkloadStats], measure_duration: float) -> None:
+        self.settings = settings
+        self.stats = stats
+        self.measure_duration = measure_duration
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = WorkloadStats('total')
+        for stats in self.stats.values():
+            for latency in stats.latencies:
+                total.add(latency)
+            for label, count in stats.errors.items():
+                total.errors[label] = total.errors.get(label, 0) + count
+        return {
+            'settings': self.settings,
+            'measure_duration': self.measure_duration,
+            'total': total.as_dict(self.measure_duration),
+            'workloads': {name: stats.as_dict(self.measure_duration) for name, stats in self.stats.items()},
+        }
+
+    def to_markdown(self) -> str:
+        report = self.as_dict()
+        percentile_names = [f'p{q:g}' for q in REPORT_PERCENTILES]
+
+        def fmt(value: Optional[float], spec: str = '.3f') -> str:
+            return '-' if value is None else format(value, spec)
+
+        lines = [
+            "# Load test report",
+            "",
+            ", ".join(f"{key}: {value}" for key, value in self.settings.items()),
+            "",
+            "| workload | requests | errors | throughput, 1/s | mean, s | "
+            + " | ".join(f"{name}, s" for name in percentile_names)
+            + " |",
+            "|" + "---|" * (5 + len(percentile_names)),
+        ]
+        rows = list(report['workloads'].items()) + [('total', report['total'])]
+        for name, stats in rows:
+            lines.append(
+                f"| {name} | {stats['requests']} | {stats['requests'] - stats['succeeded']} | "
+                f"{fmt(stats['throughput'], '.2f')} | {fmt(stats['latency']['mean'])} | "
+                + " | ".join(fmt(stats['latency'][p]) for p in percentile_names)
+                + " |"
+            )
+        if report['total']['errors']:
+            lines += ["", "| error | count |", "|---|---|"]
+            lines += [f"| {label} | {count} |" for label, count in sorted(report['total']['errors'].items())]
+        return "\n".join(lines) + "\n"
+
+
+class LoadGenerator:
+    """
+    Sends requests at an open loop arrival rate: a request is started at its arrival time whether or not previous
+    requests are finished, so server queueing delay is reflected in latencies instead of slowing down the load as in
+    closed loop tests with a fixed number of clients. A latency is measured from a scheduled arrival time, so delays
+    of a saturated client are not hidden either.
+
+    Requests which arrive during :attr:`warmup` seconds are sent but are not measured. If :attr:`max_in_flight`
+    requests are running at an arrival time, then the arrival is counted as a ``CLIENT_OVERLOADED`` error.
+    """
+    def __init__(
+        self,
+        workloads: Sequence[Workload],
+        rate: float,
+        duration: float,
+        warmup: float = 0.0,
+        process: str = 'poisson',
+        max_in_flight: int = 256,
+        seed: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            workloads (:obj:`Sequence[Workload]`): kinds of requests which are mixed according to their weights.
+            rate (:obj:`float`): a mean number of requests per second of all workloads.
+            duration (:obj:`float`): a duration of a measurement window in seconds.
+            warmup (:obj:`float`, defaults to :obj:`0.0`): a duration of a warm-up window in seconds which precedes
+                a measurement window.
+            process (:obj:`str`, defaults to :obj:`'poisson'`): an arrival process, one of
+                :obj:`ARRIVAL_PROCESSES`.
+            max_in_flight (:obj:`int`, defaults to :obj:`256`): a maximum number of concurrent requests and a number
+                of worker threads.
+            seed (:obj:`int`, `optional`): a seed of arrival times and workload choices.
+            clock (:obj:`Callable[[], float]`, defaults to :func:`time.monotonic`): a wall clock.
+            sleep (:obj:`Callable[[float], None]`, defaults to :func:`time.sleep`): a function for waiting.
+
+        Raises:
+            :obj:`ValueError`: if :param:`workloads` are empty or their weights are not positive.
+        """
+        if not workloads or any(workload.weight <= 0 for workload in workloads):
+            raise ValueError(
+                "Parameter `workloads` has to contain at least one workload and all weights have to be positive."
+            )
+        self.workloads = list(workloads)
+        self.rate = rate
+        self.duration = duration
+        self.warmup = warmup
+        self.process = process
+        self.max_in_flight = max_in_flight
+        self.seed = seed
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _execute(self, workload: Workload, scheduled: float, measured: bool, stats: WorkloadStats) -> None:
+        error = None
+        try:
+            workload.call()
+        except Exception as e:
+            error = error_label(e)
+        finally:
+            latency = self.clock() - scheduled
+            with self._lock:
+                self._in_flight -= 1
+                if measured:
+                    stats.add(latency, error)
+
+    def run(self) -> LoadReport:
+        """Sends requests until the end of a measurement window, waits for started requests and returns a report."""
+        rng = random.Random(self.seed)
+        weights = [workload.weight for workload in self.workloads]
+        stats = {workload.name: WorkloadStats(workload.name) for workload in self.workloads}
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="riva-load") as executor:
+            start = self.clock()
+            for t in arrival_times(self.rate, self.warmup + self.duration, self.process, rng):
+                workload = rng.choices(self.workloads, weights)[0]
+                delay = start + t - self.clock()
+                if delay > 0:
+                    self.sleep(delay)
+                measured = t >= self.warmup
+                with self._lock:
+                    if self._in_flight >= self.max_in_flight:
+                        if measured:
+                            stats[workload.name].add(0.0, 'CLIENT_OVERLOADED')
+                        continue
+                    self._in_flight += 1
+                executor.submit(self._execute, workload, start + t, measured, stats[workload.name])
+        settings = {
+            'rate': self.rate,
+            'process': self.process,
+            'warmup': self.warmup,
+            'duration': self.duration,
+            'max_in_flight': self.max_in_flight,
+            'workloads': {workload.name: workload.weight for workload in self.workloads},
+        }
+        return LoadReport(settings, stats, self.duration)
@@ -0,0 +1,396 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import bisect
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterable, AsyncGenerator, Callable, Dict, Generator, Iterable, List, Optional, Tuple
+
+import grpc
+
+from riva.client.wire import payload_size
+
+
+# Upper bounds in seconds of histogram buckets for latencies. The last bucket is unbounded.
+LATENCY_BUCKETS = [0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0, math.inf]
+# Upper bounds of histogram buckets for real time factors.
+RTF_BUCKETS = [0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 5.0, math.inf]
+# Names of histograms aggregated by :class:`LatencyRecorder` for every call type.
+LATENCY_HISTOGRAMS = ['time_to_first_response', 'time_to_first_partial', 'final_lag', 'duration', 'rtf']
+# A maximum number of sent chunks remembered by one record for computing of final result lags.
+MAX_PENDING_CHUNKS = 10000
+
+
+class Histogram:
+    """A histogram with fixed buckets. Memory does not depend on a number of observed values."""
+    def __init__(self, buckets: Optional[List[float]] = None) -> None:
+        self.buckets = LATENCY_BUCKETS if buckets is None else buckets
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Returns an upper bound of a bucket which contains :param:`q` percentile. The bound is limited by the maximum
+        observed value, so percentiles in the unbounded bucket are finite.
+        """
+        if not self.count:
+            return None
+        rank = math.ceil(q / 100 * self.count)
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= max(rank, 1):
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets, self.counts) if count},
+        }
+
+
+class StreamRecord:
+    """
+    Timings of one call. Audio sent to a server and received from a server is measured in bytes and is converted to
+    seconds with :attr:`bytes_per_second`, so audio clock is compared with wall clock.
+
+    Attributes:
+        time_to_first_response (:obj:`float`): seconds from the start of a call to the first response.
+        time_to_first_partial (:obj:`float`): seconds from the start of a call to the first not final result with
+            a transcript.
+        final_lags (:obj:`List[float]`): for every final result, seconds between sending of audio up to
+            ``audio_processed`` of the result, i.e. up to the end of an utterance, and receiving of the result.
+        rtf (:obj:`float`): a real time factor, i.e. a duration of a call divided by a duration of audio.
+    """
+    def __init__(
+        self,
+        call: str,
+        session_id: Optional[str] = None,
+        bytes_per_second: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.call = call
+        self.session_id = session_id
+        self.bytes_per_second = bytes_per_second
+        self.clock = clock
+        self.start_time = clock()
+        self.end_time: Optional[float] = None
+        self.error: Optional[str] = None
+        self.num_requests = 0
+        self.num_responses = 0
+        self.num_partials = 0
+        self.num_finals = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.audio_bytes_sent = 0
+        self.audio_bytes_received = 0
+        self.time_to_first_response: Optional[float] = None
+        self.time_to_first_partial: Optional[float] = None
+        self.final_lags: List[float] = []
+        self.on_finish: Optional[Callable[['StreamRecord'], None]] = None
+        # (audio seconds sent, wall clock time) after every chunk.
+        self._sent_chunks: deque = deque(maxlen=MAX_PENDING_CHUNKS)
+
+    def on_request(self, request_bytes: int, audio_bytes: int = 0) -> None:
+        self.num_requests += 1
+        self.bytes_sent += request_bytes
+        if audio_bytes:
+            self.audio_bytes_sent += audio_bytes
+            if self.bytes_per_second:
+                self._sent_chunks.append((self.audio_bytes_sent / self.bytes_per_second, self.clock()))
+
+    def _sent_time(self, audio_time: float) -> Optional[float]:
+        while self._sent_chunks:
+            chunk_audio_time, sent_time = self._sent_chunks[0]
+            if chunk_audio_time >= audio_time - 1e-6:
+                return sent_time
+            self._sent_chunks.popleft()
+        return None
+
+    def on_response(self, response_bytes: int, results: Iterable[Any] = (), audio_bytes: int = 0) -> None:
+        now = self.clock()
+        self.num_responses += 1
+        self.bytes_received += response_bytes
+        self.audio_bytes_received += audio_bytes
+        if self.time_to_first_response is None:
+            self.time_to_first_response = now - self.start_time
+        for result in results:
+            # Results of offline recognition do not have ``is_final`` field and are final.
+            if getattr(result, 'is_final', True):
+                self.num_finals += 1
+                sent_time = self._sent_time(result.audio_processed) if result.audio_processed else None
+                if sent_time is not None:
+                    self.final_lags.append(now - sent_time)
+            elif result.alternatives and result.alternatives[0].transcript:
+                self.num_partials += 1
+                if self.time_to_first_partial is None:
+                    self.time_to_first_partial = now - self.start_time
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        if self.end_time is not None:
+            return
+        self.end_time = self.clock()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self._sent_chunks.clear()
+        if self.on_finish is not None:
+            self.on_finish(self)
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end_time is None else self.end_time - self.start_time
+
+    @property
+    def audio_duration(self) -> Optional[float]:
+        if not self.bytes_per_second:
+            return None
+        # Audio is sent for recognition and translation and is received for synthesis.
+        return (self.audio_bytes_sent or self.audio_bytes_received) / self.bytes_per_second
+
+    @property
+    def rtf(self) -> Optional[float]:
+        if self.duration is None or not self.audio_duration:
+            return None
+        return self.duration / self.audio_duration
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'call': self.call,
+            'session_id': self.session_id,
+            'error': self.error,
+            'duration': self.duration,
+            'audio_duration': self.audio_duration,
+            'rtf': self.rtf,
+            'time_to_first_response': self.time_to_first_response,
+            'time_to_first_partial': self.time_to_first_partial,
+            'final_lags': self.final_lags,
+            'num_requests': self.num_requests,
+            'num_responses': self.num_responses,
+            'num_partials': self.num_partials,
+            'num_finals': self.num_finals,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+        }
+
+
+class LatencyRecorder:
+    """
+    Collects :class:`StreamRecord` of calls made by services and aggregates them into histograms per call type. Pass
+    an instance to a service, e.g. ``riva.client.ASRService(auth, latency_recorder=recorder)``. A recorder may be
+    shared by services and threads.
+
+    .. code-block:: python
+
+        recorder = riva.client.LatencyRecorder()
+        asr_service = riva.client.ASRService(auth, latency_recorder=recorder)
+        ...
+        print(recorder.summary()['asr.streaming']['time_to_first_partial']['p90'])
+    """
+    def __init__(self, max_records: int = 1000, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            max_records (:obj:`int`, defaults to :obj:`1000`): a number of the latest finished records kept in
+                :attr:`records`. Histograms include all records.
+            clock (:obj:`Callable[[], float]`, defaults to :func:`time.monotonic`): a wall clock.
+        """
+        self.clock = clock
+        self.records: deque = deque(maxlen=max_records)
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self, call: str, session_id: Optional[str] = None, bytes_per_second: Optional[float] = None
+    ) -> StreamRecord:
+        record = StreamRecord(call, session_id, bytes_per_second, self.clock)
+        record.on_finish = self._add
+        return record
+
+    def _add(self, record: StreamRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            stats = self.stats.get(record.call)
+            if stats is None:
+                stats = self.stats[record.call] = {
+                    'count': 0,
+                    'errors': 0,
+                    'num_responses': 0,
+                    'bytes_sent': 0,
+                    'bytes_received': 0,
+                    'audio_duration': 0.0,
+                    **{
+                        name: Histogram(RTF_BUCKETS if name == 'rtf' else LATENCY_BUCKETS)
+                        for name in LATENCY_HISTOGRAMS
+                    },
+                }
+            stats['count'] += 1
+            stats['errors'] += record.error is not None
+            stats['num_responses'] += record.num_responses
+            stats['bytes_sent'] += record.bytes_sent
+            stats['bytes_received'] += record.bytes_received
+            stats['audio_duration'] += record.audio_duration or 0.0
+            for name in ['time_to_first_response', 'time_to_first_partial', 'duration', 'rtf']:
+                value = getattr(record, name)
+                if value is not None:
+                    stats[name].observe(value)
+            for lag in record.final_lags:
+                stats['final_lag'].observe(lag)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Returns aggregated statistics for every call type, e.g. ``'asr.streaming'`` or ``'tts.online'``."""
+        with self._lock:
+            return {
+                call: {
+                    name: value.as_dict() if isinstance(value, Histogram) else value for name, value in stats.items()
+                }
+                for call, stats in self.stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self.stats.clear()
+
+
+def start_record(
+    recorder: Optional[LatencyRecorder], call: str, bytes_per_second: Optional[float] = None
+) -> Optional[StreamRecord]:
+    """Starts a record if :param:`recorder` is not :obj:`None`."""
+    return None if recorder is None else recorder.start(call, bytes_per_second=bytes_per_second)
+
+
+def pcm_bytes_per_second(sample_rate: int, channels: int = 1, sample_width: int = 2) -> Optional[int]:
+    """Returns a rate of PCM audio or :obj:`None` if :param:`sample_rate` is unknown."""
+    return sample_rate * max(channels, 1) * sample_width if sample_rate else None
+
+
+def _request_sizes(request: Any) -> Tuple[int, int]:
+    if isinstance(request, bytes):
+        # A request framed by :class:`riva.client.wire.AudioRequestFramer`.
+        return len(request), payload_size(request)
+    return request.ByteSize(), _audio_size(request)
+
+
+def _audio_size(message: Any) -> int:
+    for field in ('audio_content', 'audio'):
+        if hasattr(message, field):
+            return len(getattr(message, field))
+    if hasattr(message, 'speech'):
+        return len(message.speech.audio)
+    return 0
+
+
+def track_requests(requests: Iterable[Any], record: Optional[StreamRecord]) -> Iterable[Any]:
+    """Counts requests and audio sent to a server. Returns :param:`requests` as is if :param:`record` is None."""
+    if record is None:
+        return requests
+
+    def generator() -> Generator[Any, None, None]:
+        for request in requests:
+            record.on_request(*_request_sizes(request))
+            yield request
+
+    return generator()
+
+
+def track_responses(responses: Iterable[Any], record: Optional[StreamRecord]) -> Iterable[Any]:
+    """
+    Counts responses received from a server and finishes :param:`record` when a call ends. Returns
+    :param:`responses` as is if :param:`record` is None.
+    """
+    if record is None:
+        return responses
+
+    def generator() -> Generator[Any, None, None]:
+        error = None
+        try:
+            for response in responses:
+                record.on_response(response.ByteSize(), getattr(response, 'results', ()), _audio_size(response))
+                yield response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            record.finish(None if isinstance(error, GeneratorExit) else error)
+
+    return generator()
+
+
+async def track_async_requests(requests: AsyncIterable[Any], record: StreamRecord) -> AsyncGenerator[Any, None]:
+    """An asyncio version of :func:`track_requests`."""
+    async for request in requests:
+        record.on_request(*_request_sizes(request))
+        yield request
+
+
+async def track_async_responses(responses: AsyncIterable[Any], record: StreamRecord) -> AsyncGenerator[Any, None]:
+    """An asyncio version of :func:`track_responses`."""
+    error = None
+    try:
+        async for response in responses:
+            record.on_response(response.ByteSize(), getattr(response, 'results', ()), _audio_size(response))
+            yield response
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        record.finish(None if isinstance(error, GeneratorExit) else error)
+
+
+def track_unary_call(
+    func: Callable[..., Any], request: Any, record: Optional[StreamRecord], future: bool = False, **kwargs: Any
+) -> Any:
+    """
+    Calls a unary method :param:`func` of a stub and records timings of the call. If :param:`future` is
+    :obj:`True`, then :param:`func` has to be a ``future`` method and the record is finished when a future is done.
+    """
+    if record is None:
+        return func(request, **kwargs)
+    record.on_request(request.ByteSize(), _audio_size(request))
+    if future:
+        result = func(request, **kwargs)
+
+        def on_done(done_future: Any) -> None:
+            if done_future.cancelled():
+                record.finish(grpc.FutureCancelledError())
+            elif done_future.exception() is not None:
+                record.finish(done_future.exception())
+            else:
+                response = done_future.result()
+                record.on_response(response.ByteSize(), getattr(response, 'results', ()), _audio_size(response))
+                record.finish()
+
+        result.add_done_callback(on_done)
+        return result
+    try:
+        response = func(request, **kwargs)
+    except BaseException as e:
+        record.finish(e)
+        raise
+    record.on_response(response.ByteSize(), getattr(response, 'results', ()), _audio_size(response))
+    record.finish()
+    return response
@@ -0,0 +1,232 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+Dynamic micro-batching of single text NLP calls made from many threads. :class:`NLPMicroBatcher` collects texts
+submitted for the same method, model and language and sends them in one request as soon as a batch is full or
+the oldest text has waited for a maximum delay. Every caller receives a future of a response which contains only
+its own text, so results are used exactly like responses of :class:`riva.client.nlp.NLPService`.
+
+.. code-block:: python
+
+    batcher = riva.client.NLPMicroBatcher(riva.client.NLPService(auth), max_batch_size=32, max_delay=0.005)
+    # In request handler threads:
+    response = batcher.punctuate_text("can you hear me").result()
+    print(response.text[0])
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import riva.client.proto.riva_nlp_pb2 as rnlp
+from riva.client.nlp import NLPService
+
+
+MICRO_BATCH_METHODS = ['classify_text', 'classify_tokens', 'transform_text', 'punctuate_text']
+
+NLPResponse = Union[rnlp.TextClassResponse, rnlp.TokenClassResponse, rnlp.TextTransformResponse]
+# A method, a model name and a language code of texts which may be sent in one request.
+BatchKey = Tuple[str, Optional[str], str]
+
+
+def split_response(response: NLPResponse, n_items: int) -> List[NLPResponse]:
+    """Splits a response for a batch of :param:`n_items` texts into responses for single texts."""
+    items = response.text if isinstance(response, rnlp.TextTransformResponse) else response.results
+    if len(items) != n_items:
+        raise ValueError(f"A response contains {len(items)} results for a batch of {n_items} texts.")
+    responses = []
+    for item in items:
+        single = type(response)(id=response.id)
+        if isinstance(response, rnlp.TextTransformResponse):
+            single.text.append(item)
+        else:
+            single.results.append(item)
+        responses.append(single)
+    return responses
+
+
+class NLPMicroBatcher:
+    """
+    Coalesces single texts submitted from many threads into batched requests of :param:`nlp_service`. A batch
+    of texts with the same method, model name and language code is sent when it has :param:`max_batch_size` texts
+    or when its oldest text has waited :param:`max_delay` seconds. Requests are sent by a background thread, and
+    at most :param:`max_in_flight` requests are in flight at a time. Texts wait while all requests are in flight,
+    so batches grow under load.
+
+    Use it as a context manager or call :meth:`close`, which sends remaining texts and stops the thread.
+    """
+    def __init__(
+        self,
+        nlp_service: NLPService,
+        max_batch_size: int = 32,
+        max_delay: float = 0.005,
+        max_in_flight: int = 4,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            nlp_service (:obj:`riva.client.nlp.NLPService`): a service which sends batched requests.
+            max_batch_size (:obj:`int`, defaults to :obj:`32`): a maximum number of texts in one request.
+            max_delay (:obj:`float`, defaults to :obj:`0.005`): a maximum time in seconds for which a text waits for
+                other texts before a request is sent.
+            max_in_flight (:obj:`int`, defaults to :obj:`4`): a maximum number of requests in flight.
+
+        Raises:
+            :obj:`ValueError`: if :param:`max_batch_size` or :param:`max_in_flight` is not positive or
+                :param:`max_delay` is negative.
+        """
+        if max_batch_size < 1 or max_in_flight < 1 or max_delay < 0:
+            raise ValueError(
+                f"Parameters `max_batch_size` and `max_in_flight` have to be positive and parameter `max_delay` has "
+                f"to be non-negative, whereas max_batch_size={max_batch_size}, max_in_flight={max_in_flight} and "
+                f"max_delay={max_delay} were given."
+            )
+        self.nlp_service = nlp_service
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.num_batches = 0
+        self.num_items = 0
+        self.closed = False
+        # Submitted texts, their futures and submission times by keys of batches in order of submission.
+        self._pending: Dict[BatchKey, List[Tuple[str, Future, float]]] = {}
+        self._cond = threading.Condition()
+        self._in_flight = threading.Semaphore(max_in_flight)
+        self._thread = threading.Thread(target=self._dispatch, name="riva-nlp-microbatch", daemon=True)
+        self._thread.start()
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.num_items / self.num_batches if self.num_batches else 0.0
+
+    def submit(
+        self, method: str, text: str, model_name: Optional[str], language_code: str = 'en-US'
+    ) -> 'Future[NLPResponse]':
+        """
+        Adds :param:`text` to a batch of :param:`method` of :class:`riva.client.nlp.NLPService`.
+
+        Args:
+            method (:obj:`str`): one of :obj:`MICRO_BATCH_METHODS`.
+            text (:obj:`str`): a text to process.
+            model_name (:obj:`Optional[str]`): a model name. :obj:`None` is allowed only for ``punctuate_text``.
+            language_code (:obj:`str`, defaults to :obj:`"en-US"`): a language of a model.
+
+        Returns:
+            :obj:`concurrent.futures.Future`: a future of a response with a result for :param:`text` only. If
+            a request fails, the future raises the error of the request.
+
+        Raises:
+            :obj:`ValueError`: if :param:`method` is not allowed.
+            :obj:`RuntimeError`: if the batcher is closed.
+        """
+        if method not in MICRO_BATCH_METHODS:
+            raise ValueError(
+                f"Not allowed value '{method}' of parameter `method`. Allowed values are {MICRO_BATCH_METHODS}"
+            )
+        future: Future = Future()
+        with self._cond:
+            if self.closed:
+                raise RuntimeError("Cannot submit a text to a closed NLPMicroBatcher.")
+            items = self._pending.setdefault((method, model_name, language_code), [])
+            items.append((text, future, time.monotonic()))
+            if len(items) == 1 or len(items) == self.max_batch_size:
+                # A new batch changes the nearest deadline, and a full batch is ready.
+                self._cond.notify()
+        return future
+
+    def classify_text(self, text: str, model_name: str, language_code: str = 'en-US') -> 'Future[NLPResponse]':
+        return self.submit('classify_text', text, model_name, language_code)
+
+    def classify_tokens(self, text: str, model_name: str, language_code: str = 'en-US') -> 'Future[NLPResponse]':
+        return self.submit('classify_tokens', text, model_name, language_code)
+
+    def transform_text(self, text: str, model_name: str, language_code: str = 'en-US') -> 'Future[NLPResponse]':
+        return self.submit('transform_text', text, model_name, language_code)
+
+    def punctuate_text(
+        self, text: str, model_name: Optional[str] = None, language_code: str = 'en-US'
+    ) -> 'Future[NLPResponse]':
+        return self.submit('punctuate_text', text, model_name, language_code)
+
+    def _next_batch(self) -> Optional[Tuple[BatchKey, List[Tuple[str, Future, float]]]]:
+        """Waits for a batch which is full or expired. Returns :obj:`None` if the batcher is closed and empty."""
+        with self._cond:
+            while True:
+                if not self._pending:
+                    if self.closed:
+                        return None
+                    self._cond.wait()
+                    continue
+                # The batch with the oldest text goes first, so a busy key does not starve other keys.
+                key, items = min(self._pending.items(), key=lambda key_items: key_items[1][0][2])
+                timeout = items[0][2] + self.max_delay - time.monotonic()
+                full_key = next((k for k, v in self._pending.items() if len(v) >= self.max_batch_size), None)
+                if timeout > 0 and full_key is None and not self.closed:
+                    self._cond.wait(timeout)
+                    continue
+                if timeout > 0 and not self.closed:
+                    key, items = full_key, self._pending[full_key]
+                if len(items) > self.max_batch_size:
+                    self._pending[key] = items[self.max_batch_size :]
+                else:
+                    del self._pending[key]
+                return key, items[: self.max_batch_size]
+
+    def _dispatch(self) -> None:
+        while True:
+            # A slot is taken before a batch is formed, so texts keep accumulating while all requests are in flight.
+            self._in_flight.acquire()
+            next_batch = self._next_batch()
+            if next_batch is None:
+                self._in_flight.release()
+                return
+            self._send(*next_batch)
+
+    def _send(self, key: BatchKey, batch: List[Tuple[str, Future, float]]) -> None:
+        method, model_name, language_code = key
+        texts, futures = [], []
+        for text, future, _ in batch:
+            # Texts of futures cancelled by callers are not sent.
+            if future.set_running_or_notify_cancel():
+                texts.append(text)
+                futures.append(future)
+        if not texts:
+            self._in_flight.release()
+            return
+        self.num_batches += 1
+        self.num_items += len(texts)
+        try:
+            call = getattr(self.nlp_service, method)(texts, model_name, language_code, future=True)
+        except Exception as e:
+            self._in_flight.release()
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        def on_done(call: Any) -> None:
+            self._in_flight.release()
+            try:
+                responses = split_response(call.result(), len(futures))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                return
+            for future, response in zip(futures, responses):
+                future.set_result(response)
+
+        call.add_done_callback(on_done)
+
+    def close(self) -> None:
+        """Sends remaining texts immediately and stops the background thread. Responses may arrive later."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def __enter__(self) -> 'NLPMicroBatcher':
+        return self
+
+    def __exit__(self, type_, value, traceback) -> None:
+        self.close()
@@ -1,14 +1,19 @@
 # SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
 # SPDX-License-Identifier: MIT
 
-from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, Union
+import itertools
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Generator, Iterable, List, Optional, Tuple, Union
 
 from google.protobuf.message import Message
+import grpc
 from grpc._channel import _MultiThreadedRendezvous
 
 import riva.client.proto.riva_nlp_pb2 as rnlp
 import riva.client.proto.riva_nlp_pb2_grpc as rnlp_srv
 from riva.client import Auth
+from riva.client.auth import compression_kwargs
 
 
 def extract_all_text_classes_and_confidences(
@@ -87,6 +92,32 @@ def prepare_transform_text_request(
     return request
 
 
+def prepare_text_class_request(
+    input_strings: Union[List[str], str], model_name: str, language_code: str = 'en-US'
+) -> rnlp.TextClassRequest:
+    if isinstance(input_strings, str):
+        input_strings = [input_strings]
+    request = rnlp.TextClassRequest()
+    request.model.model_name = model_name
+    request.model.language_code = language_code
+    for q in input_strings:
+        request.text.append(q)
+    return request
+
+
+def prepare_token_class_request(
+    input_strings: Union[List[str], str], model_name: str, language_code: str = 'en-US'
+) -> rnlp.TokenClassRequest:
+    if isinstance(input_strings, str):
+        input_strings = [input_strings]
+    request = rnlp.TokenClassRequest()
+    request.model.model_name = model_name
+    request.model.language_code = language_code
+    for q in input_strings:
+        request.text.append(q)
+    return request
+
+
 class NLPService:
     """
     Provides
@@ -110,7 +141,12 @@ class NLPService:
         self.stub = rnlp_srv.RivaLanguageUnderstandingStub(self.auth.channel)
 
     def classify_text(
-        self, input_strings: Union[List[str], str], model_name: str, language_code: str = 'en-US', future: bool = False
+        self,
+        input_strings: Union[List[str], str],
+        model_name: str,
+        language_code: str = 'en-US',
+        future: bool = False,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[rnlp.TextClassResponse, _MultiThreadedRendezvous]:
         """
         Classifies text provided in :param:`input_strings`. For example, this method can be used for
@@ -124,6 +160,8 @@ class NLPService:
                 languages.
             future (:obj:`bool`, defaults to :obj:`False`): whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
         Returns:
             :obj:`Union[riva.client.proto.riva_nlp_pb2.TextClassResponse, grpc._channel._MultiThreadedRendezvous]`: a
             response with :param:`input_strings` classification results. You may find :class:`TextClassResponse`
@@ -132,18 +170,17 @@ class NLPService:
             If :param:`future` is :obj:`True`, then a future object is returned. You may retrieve a response from a
             future object by calling ``result()`` method.
         """
-        if isinstance(input_strings, str):
-            input_strings = [input_strings]
-        request = rnlp.TextClassRequest()
-        request.model.model_name = model_name
-        request.model.language_code = language_code
-        for q in input_strings:
-            request.text.append(q)
+        request = prepare_text_class_request(input_strings, model_name, language_code)
         func = self.stub.ClassifyText.future if future else self.stub.ClassifyText
-        return func(request, metadata=self.auth.get_auth_metadata())
+        return func(request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
 
     def classify_tokens(
-        self, input_strings: Union[List[str], str], model_name: str, language_code: str = 'en-US', future: bool = False
+        self,
+        input_strings: Union[List[str], str],
+        model_name: str,
+        language_code: str = 'en-US',
+        future: bool = False,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[rnlp.TokenClassResponse, _MultiThreadedRendezvous]:
         """
         Classifies tokens in texts in :param:`input_strings`. Can be used for slot classification or NER.
@@ -157,6 +194,8 @@ class NLPService:
                 languages.
             future (:obj:`bool`, defaults to :obj:`False`): whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
         Returns:
             :obj:`Union[riva.client.proto.riva_nlp_pb2.TokenClassResponse, grpc._channel._MultiThreadedRendezvous]`: a
             response with results. You may find :class:`TokenClassResponse` fields description `here
@@ -164,18 +203,17 @@ class NLPService:
             If :param:`future` is :obj:`True`, then a future object is returned. You may retrieve a response from a
             future object by calling ``result()`` method.
         """
-        if isinstance(input_strings, str):
-            input_strings = [input_strings]
-        request = rnlp.TokenClassRequest()
-        request.model.model_name = model_name
-        request.model.language_code = language_code
-        for q in input_strings:
-            request.text.append(q)
+        request = prepare_token_class_request(input_strings, model_name, language_code)
         func = self.stub.ClassifyTokens.future if future else self.stub.ClassifyTokens
-        return func(request, metadata=self.auth.get_auth_metadata())
+        return func(request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
 
     def transform_text(
-        self, input_strings: Union[List[str], str], model_name: str, language_code: str = 'en-US', future: bool = False
+        self,
+        input_strings: Union[List[str], str],
+        model_name: str,
+        language_code: str = 'en-US',
+        future: bool = False,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[rnlp.TextTransformResponse, _MultiThreadedRendezvous]:
         """
         The behavior of the function is defined entirely by the underlying model and may be used for
@@ -188,6 +226,8 @@ class NLPService:
             language_code (:obj:`str`): a string containing a language code for the model.
             future (:obj:`bool`, defaults to :obj:`False`): whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
         Returns:
             :obj:`Union[riva.client.proto.riva_nlp_pb2.TextTransformResponse, grpc._channel._MultiThreadedRendezvous]`: a
             model response. You may find :class:`TextTransformResponse` fields description `here
@@ -197,10 +237,14 @@ class NLPService:
         """
         request = prepare_transform_text_request(input_strings, model_name, language_code)
         func = self.stub.TransformText.future if future else self.stub.TransformText
-        return func(request, metadata=self.auth.get_auth_metadata())
+        return func(request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
 
     def analyze_entities(
-        self, input_string: str, language_code: str = 'en-US', future: bool = False
+        self,
+        input_string: str,
+        language_code: str = 'en-US',
+        future: bool = False,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[rnlp.TokenClassResponse, _MultiThreadedRendezvous]:
         """
         Accepts an input string and returns all named entities within the text, as well as a category and likelihood.
@@ -210,6 +254,8 @@ class NLPService:
             language_code (:obj:`str`): a language code.
             future (:obj:`bool`, defaults to :obj:`False`): whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
         Returns:
             :obj:`Union[riva.client.proto.riva_nlp_pb2.TokenClassResponse, grpc._channel._MultiThreadedRendezvous]`: a
             model response. You may find :class:`TokenClassResponse` fields description `here
@@ -220,10 +266,14 @@ class NLPService:
         request = rnlp.AnalyzeEntitiesRequest(query=input_string)
         request.options.lang = language_code
         func = self.stub.AnalyzeEntities.future if future else self.stub.AnalyzeEntities
-        return func(request, metadata=self.auth.get_auth_metadata())
+        return func(request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
 
     def analyze_intent(
-        self, input_string: str, options: Optional[rnlp.AnalyzeIntentOptions] = None, future: bool = False
+        self,
+        input_string: str,
+        options: Optional[rnlp.AnalyzeIntentOptions] = None,
+        future: bool = False,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[rnlp.AnalyzeIntentResponse, _MultiThreadedRendezvous]:
         """
         Accepts an input string and returns the most likely intent as well as slots relevant to that intent.
@@ -240,6 +290,8 @@ class NLPService:
                 Defaults to an instance of :obj:`AnalyzeIntentOptions` created without parameters.
             future (:obj:`bool`, defaults to :obj:`False`): whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
         Returns:
             :obj:`Union[riva.client.proto.riva_nlp_pb2.AnalyzeIntentResponse, grpc._channel._MultiThreadedRendezvous]`: a
             response with results. You may find fields description `here
@@ -251,7 +303,7 @@ class NLPService:
             options = rnlp.AnalyzeIntentOptions()
         request = rnlp.AnalyzeIntentRequest(query=input_string, options=options)
         func = self.stub.AnalyzeIntent.future if future else self.stub.AnalyzeIntent
-        return func(request, metadata=self.auth.get_auth_metadata())
+        return func(request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
 
     def punctuate_text(
         self,
@@ -259,6 +311,7 @@ class NLPService:
         model_name: Optional[str] = None,
         language_code: str = 'en-US',
         future: bool = False,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[rnlp.TextTransformResponse, _MultiThreadedRendezvous]:
         """
         Takes text with no- or limited- punctuation and returns the same text with corrected punctuation and
@@ -271,6 +324,8 @@ class NLPService:
             language_code (:obj:`str`): a string containing a language code for the model.
             future (:obj:`bool`, defaults to :obj:`False`): whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
         Returns:
             :obj:`Union[riva.client.proto.riva_nlp_pb2.TextTransformResponse, grpc._channel._MultiThreadedRendezvous]`: a
             response with results. You may find fields description `here
@@ -280,10 +335,15 @@ class NLPService:
         """
         request = prepare_transform_text_request(input_strings, model_name, language_code)
         func = self.stub.PunctuateText.future if future else self.stub.PunctuateText
-        return func(request, metadata=self.auth.get_auth_metadata())
+        return func(request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
 
     def natural_query(
-        self, query: str, context: str, top_n: int = 1, future: bool = False
+        self,
+        query: str,
+        context: str,
+        top_n: int = 1,
+        future: bool = False,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[rnlp.NaturalQueryResponse, _MultiThreadedRendezvous]:
         """
         A search function that enables querying one or more documents or contexts with a query that is written in
@@ -295,6 +355,8 @@ class NLPService:
             top_n (:obj:`int`): a maximum number of answers to return for the query.
             future (:obj:`bool`, defaults to :obj:`False`): whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
         Returns:
             :obj:`Union[riva.client.proto.riva_nlp_pb2.NaturalQueryResult, grpc._channel._MultiThreadedRendezvous]`: a
             response with a result. You may find fields description `here
@@ -304,33 +366,68 @@ class NLPService:
         """
         request = rnlp.NaturalQueryRequest(query=query, context=context, top_n=top_n)
         func = self.stub.NaturalQuery.future if future else self.stub.NaturalQuery
-        return func(request, metadata=self.auth.get_auth_metadata())
+        return func(request, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
+
 
+def batch_generator(examples: Iterable[Any], batch_size: int) -> Generator[List[Any], None, None]:
+    if isinstance(examples, list):
+        for i in range(0, len(examples), batch_size):
+            yield examples[i : i + batch_size]
+        return
+    examples = iter(examples)
+    batch = list(itertools.islice(examples, batch_size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(examples, batch_size))
 
-def batch_generator(examples: List[Any], batch_size: int) -> Generator[List[Any], None, None]:
-    for i in range(0, len(examples), batch_size):
-        yield examples[i : i + batch_size]
+
+def iter_batches_async(
+    b_gen: Iterable[List[Any]],
+    process_func: Callable[..., _MultiThreadedRendezvous],
+    kwargs_except_future_and_input: Dict[str, Any],
+    max_async_requests_to_queue: int,
+) -> Generator[Message, None, None]:
+    """
+    Sends batches from :param:`b_gen` with a sliding window of :param:`max_async_requests_to_queue` requests in
+    flight and yields responses in order of batches. A new batch is sent as soon as any request in the window is
+    completed, so a slow request does not stop sending of next batches. Responses which are completed before
+    responses of earlier batches wait for them, and at most ``2 * max_async_requests_to_queue`` requests are sent
+    or waiting at a time. Batches are taken from :param:`b_gen` only when they are sent, so inputs and responses
+    can be streamed.
+
+    If a request fails, its exception is raised when its response is due, and requests in flight are cancelled.
+    """
+    in_flight = threading.Semaphore(max_async_requests_to_queue)
+    pending: Deque[_MultiThreadedRendezvous] = deque()
+    try:
+        for batch in b_gen:
+            while pending and (pending[0].done() or len(pending) >= 2 * max_async_requests_to_queue):
+                yield pending.popleft().result()
+            in_flight.acquire()
+            try:
+                future = process_func(input_strings=batch, **kwargs_except_future_and_input, future=True)
+            except BaseException:
+                in_flight.release()
+                raise
+            future.add_done_callback(lambda _: in_flight.release())
+            pending.append(future)
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
 
 
 def process_batches_async(
-    b_gen: Generator[List[Any], None, None],
+    b_gen: Iterable[List[Any]],
     process_func: Callable[..., _MultiThreadedRendezvous],
     kwargs_except_future_and_input: Dict[str, Any],
     max_async_requests_to_queue: int,
 ) -> List[Message]:
-    responses = []
-    n_req = max_async_requests_to_queue
-    while n_req == max_async_requests_to_queue:
-        n_req = 0
-        futures = []
-        for batch in b_gen:
-            futures.append(process_func(input_strings=batch, **kwargs_except_future_and_input, future=True))
-            n_req += 1
-            if n_req == max_async_requests_to_queue:
-                break
-        for f in futures:
-            responses.append(f.result())
-    return responses
+    """Returns responses of :func:`iter_batches_async` in a list."""
+    return list(
+        iter_batches_async(b_gen, process_func, kwargs_except_future_and_input, max_async_requests_to_queue)
+    )
 
 
 def check_max_async_requests_to_queue(max_async_requests_to_queue: int) -> None:
@@ -341,6 +438,48 @@ def check_max_async_requests_to_queue(max_async_requests_to_queue: int) -> None:
         )
 
 
+def _iter_batch_responses(
+    process_func: Callable[..., Any],
+    input_strings: Iterable[str],
+    batch_size: int,
+    kwargs_except_future_and_input: Dict[str, Any],
+    max_async_requests_to_queue: int,
+) -> Generator[Message, None, None]:
+    check_max_async_requests_to_queue(max_async_requests_to_queue)
+    batches = batch_generator(input_strings, batch_size)
+    if max_async_requests_to_queue == 0:
+        for batch in batches:
+            yield process_func(input_strings=batch, **kwargs_except_future_and_input)
+    else:
+        yield from iter_batches_async(
+            batches, process_func, kwargs_except_future_and_input, max_async_requests_to_queue
+        )
+
+
+def iter_classify_text_batch(
+    nlp_service: NLPService,
+    input_strings: Iterable[str],
+    model_name: str,
+    batch_size: int,
+    language_code: str = 'en-US',
+    max_async_requests_to_queue: int = 0,
+) -> Generator[Tuple[str, float], None, None]:
+    """
+    Yields the most probable class and its confidence for every string of :param:`input_strings` in order as soon
+    as a response for its batch is received. :param:`input_strings` may be a generator, e.g. lines of a file
+    which is larger than memory. If :param:`max_async_requests_to_queue` is positive, then this number of
+    requests is kept in flight, see :func:`iter_batches_async`.
+    """
+    for response in _iter_batch_responses(
+        nlp_service.classify_text,
+        input_strings,
+        batch_size,
+        {'model_name': model_name, 'language_code': language_code},
+        max_async_requests_to_queue,
+    ):
+        yield from zip(*extract_most_probable_text_class_and_confidence(response))
+
+
 def classify_text_batch(
     nlp_service: NLPService,
     input_strings: List[str],
@@ -349,26 +488,43 @@ def classify_text_batch(
     language_code: str = 'en-US',
     max_async_requests_to_queue: int = 0,
 ) -> Tuple[List[str], List[float]]:
-    check_max_async_requests_to_queue(max_async_requests_to_queue)
-    if max_async_requests_to_queue == 0:
-        responses = []
-        for batch in batch_generator(input_strings, batch_size):
-            responses.append(nlp_service.classify_text(batch, model_name, language_code))
-    else:
-        responses = process_batches_async(
-            batch_generator(input_strings, batch_size),
-            nlp_service.classify_text,
-            {'model_name': model_name, 'language_code': language_code},
-            max_async_requests_to_queue,
-        )
     classes, confidences = [], []
-    for response in responses:
+    for response in _iter_batch_responses(
+        nlp_service.classify_text,
+        input_strings,
+        batch_size,
+        {'model_name': model_name, 'language_code': language_code},
+        max_async_requests_to_queue,
+    ):
         b_classes, b_confidences = extract_most_probable_text_class_and_confidence(response)
         classes += b_classes
         confidences += b_confidences
     return classes, confidences
 
 
+def iter_classify_tokens_batch(
+    nlp_service: NLPService,
+    input_strings: Iterable[str],
+    model_name: str,
+    batch_size: int,
+    language_code: str = 'en-US',
+    max_async_requests_to_queue: int = 0,
+) -> Generator[Tuple[List[str], List[str], List[float], List[int], List[int]], None, None]:
+    """
+    Yields tokens, their most probable classes, confidences, starts and ends for every string of
+    :param:`input_strings` in order as soon as a response for its batch is received. See
+    :func:`iter_classify_text_batch`.
+    """
+    for response in _iter_batch_responses(
+        nlp_service.classify_tokens,
+        input_strings,
+        batch_size,
+        {'model_name': model_name, 'language_code': language_code},
+        max_async_requests_to_queue,
+    ):
+        yield from zip(*extract_most_probable_token_classification_predictions(response))
+
+
 def classify_tokens_batch(
     nlp_service: NLPService,
     input_strings: List[str],
@@ -377,22 +533,14 @@ def classify_tokens_batch(
     language_code: str = 'en-US',
     max_async_requests_to_queue: int = 0,
 ) -> Tuple[List[List[str]], List[List[str]], List[List[float]], List[List[int]], List[List[int]]]:
-    check_max_async_requests_to_queue(max_async_requests_to_queue)
-    if max_async_requests_to_queue == 0:
-        responses = []
-        for batch in batch_generator(input_strings, batch_size):
-            responses.append(
-                nlp_service.classify_tokens(input_strings=batch, model_name=model_name, language_code=language_code)
-            )
-    else:
-        responses = process_batches_async(
-            batch_generator(input_strings, batch_size),
-            nlp_service.classify_tokens,
-            {'model_name': model_name, 'language_code': language_code},
-            max_async_requests_to_queue,
-        )
     tokens, token_classes, confidences, starts, ends = [], [], [], [], []
-    for response in responses:
+    for response in _iter_batch_responses(
+        nlp_service.classify_tokens,
+        input_strings,
+        batch_size,
+        {'model_name': model_name, 'language_code': language_code},
+        max_async_requests_to_queue,
+    ):
         b_t, b_tc, b_conf, b_s, b_e = extract_most_probable_token_classification_predictions(response)
         tokens += b_t
         token_classes += b_tc
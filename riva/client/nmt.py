@@ -1,26 +1,47 @@
 # SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
 # SPDX-License-Identifier: MIT
 
-from typing import Callable, Dict, Generator, Iterable, List, Optional, TextIO, Union
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, TextIO, Union
+import grpc
 from grpc._channel import _MultiThreadedRendezvous
 
 import riva.client.proto.riva_nmt_pb2 as riva_nmt
 import riva.client.proto.riva_nmt_pb2_grpc as riva_nmt_srv
 from riva.client import Auth
+from riva.client.auth import compression_kwargs
+from riva.client.metrics import LatencyRecorder, pcm_bytes_per_second, start_record, track_requests, track_responses
+from riva.client.wire import AudioRequestFramer, framed_stream_method
 
 def streaming_s2s_request_generator(
     audio_chunks: Iterable[bytes], streaming_config: riva_nmt.StreamingTranslateSpeechToSpeechConfig
 ) -> Generator[riva_nmt.StreamingTranslateSpeechToSpeechRequest, None, None]:
     yield riva_nmt.StreamingTranslateSpeechToSpeechRequest(config=streaming_config)
     for chunk in audio_chunks:
-        yield riva_nmt.StreamingTranslateSpeechToSpeechRequest(audio_content=chunk)
+        yield riva_nmt.StreamingTranslateSpeechToSpeechRequest(audio_content=bytes(chunk))
 
 def streaming_s2t_request_generator(
     audio_chunks: Iterable[bytes], streaming_config: riva_nmt.StreamingTranslateSpeechToTextConfig
 ) -> Generator[riva_nmt.StreamingTranslateSpeechToTextRequest, None, None]:
     yield riva_nmt.StreamingTranslateSpeechToTextRequest(config=streaming_config)
     for chunk in audio_chunks:
-        yield riva_nmt.StreamingTranslateSpeechToTextRequest(audio_content=chunk)
+        yield riva_nmt.StreamingTranslateSpeechToTextRequest(audio_content=bytes(chunk))
+
+def framed_streaming_request_generator(
+    audio_chunks: Iterable[bytes],
+    streaming_config: Union[
+        riva_nmt.StreamingTranslateSpeechToSpeechConfig, riva_nmt.StreamingTranslateSpeechToTextConfig
+    ],
+    request_class: Any,
+    framer: Optional[AudioRequestFramer] = None,
+) -> Generator[Any, None, None]:
+    """
+    Works like :func:`streaming_s2s_request_generator` and :func:`streaming_s2t_request_generator` but yields audio
+    requests as serialized bytes. Requests have to be sent with :func:`riva.client.wire.serialize_request`.
+    """
+    framer = AudioRequestFramer() if framer is None else framer
+    yield request_class(config=streaming_config)
+    for chunk in audio_chunks:
+        yield framer(chunk)
 
 def add_dnt_phrases_dict(req, dnt_phrases_dict):
     dnt_phrases = None
@@ -34,19 +55,49 @@ class NeuralMachineTranslationClient:
     """
     A class for translating text to text. Provides :meth:`translate` which returns translated text
     """
-    def __init__(self, auth: Auth) -> None:
+    def __init__(
+        self,
+        auth: Auth,
+        latency_recorder: Optional[LatencyRecorder] = None,
+        framed_audio_requests: bool = False,
+    ) -> None:
         """
         Initializes an instance of the class.
 
         Args:
             auth (:obj:`Auth`): an instance of :class:`riva.client.auth.Auth` which is used for authentication metadata
                 generation.
+            latency_recorder (:obj:`riva.client.metrics.LatencyRecorder`, `optional`): a recorder of timings of
+                streaming translation calls. Calls are not instrumented by default.
+            framed_audio_requests (:obj:`bool`, defaults to :obj:`False`): whether to frame audio chunks of streaming
+                translation directly into serialized requests. See :class:`riva.client.ASRService`.
         """
         self.auth = auth
+        self.latency_recorder = latency_recorder
         self.stub = riva_nmt_srv.RivaTranslationStub(self.auth.channel)
+        self.framed_audio_requests = framed_audio_requests
+        if framed_audio_requests:
+            self._framer = AudioRequestFramer()
+            self._framed_s2s = framed_stream_method(
+                self.auth.channel,
+                riva_nmt.DESCRIPTOR,
+                'RivaTranslation',
+                'StreamingTranslateSpeechToSpeech',
+                riva_nmt.StreamingTranslateSpeechToSpeechResponse,
+            )
+            self._framed_s2t = framed_stream_method(
+                self.auth.channel,
+                riva_nmt.DESCRIPTOR,
+                'RivaTranslation',
+                'StreamingTranslateSpeechToText',
+                riva_nmt.StreamingTranslateSpeechToTextResponse,
+            )
 
     def streaming_s2s_response_generator(
-        self, audio_chunks: Iterable[bytes], streaming_config: riva_nmt.StreamingTranslateSpeechToSpeechConfig
+        self,
+        audio_chunks: Iterable[bytes],
+        streaming_config: riva_nmt.StreamingTranslateSpeechToSpeechConfig,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Generator[riva_nmt.StreamingTranslateSpeechToSpeechResponse, None, None]:
         """
         Generates speech to speech translation responses for fragments of speech audio in :param:`audio_chunks`.
@@ -80,6 +131,9 @@ class NeuralMachineTranslationClient:
                     tts_config = SynthesizeSpeechConfig(sample_rate_hz=44100, voice_name="English-US.Female-1")
                     streaming_config = StreamingTranslateSpeechToSpeechConfig(asr_config, translation_config, tts_config)
 
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
+
         Yields:
             :obj:`riva.client.proto.riva_nmt_pb2.StreamingTranslateSpeechToSpeechResponse`: responses for audio chunks in
             :param:`audio_chunks`. You may find description of response fields in declaration of
@@ -87,13 +141,33 @@ class NeuralMachineTranslationClient:
             message `here
             <https://docs.nvidia.com/deeplearning/riva/user-guide/docs/reference/protos/protos.html#riva-proto-riva-nmt-proto>`_.
         """
-        generator = streaming_s2s_request_generator(audio_chunks, streaming_config)
-        for response in self.stub.StreamingTranslateSpeechToSpeech(generator, metadata=self.auth.get_auth_metadata()):
+        asr_config = streaming_config.asr_config.config
+        record = start_record(
+            self.latency_recorder,
+            'nmt.s2s',
+            pcm_bytes_per_second(asr_config.sample_rate_hertz, asr_config.audio_channel_count),
+        )
+        if self.framed_audio_requests:
+            requests = framed_streaming_request_generator(
+                audio_chunks, streaming_config, riva_nmt.StreamingTranslateSpeechToSpeechRequest, self._framer
+            )
+            method = self._framed_s2s
+        else:
+            requests = streaming_s2s_request_generator(audio_chunks, streaming_config)
+            method = self.stub.StreamingTranslateSpeechToSpeech
+        generator = track_requests(requests, record)
+        for response in track_responses(
+            method(generator, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)),
+            record,
+        ):
             yield response
 
 
     def streaming_s2t_response_generator(
-        self, audio_chunks: Iterable[bytes], streaming_config: riva_nmt.StreamingTranslateSpeechToTextConfig
+        self,
+        audio_chunks: Iterable[bytes],
+        streaming_config: riva_nmt.StreamingTranslateSpeechToTextConfig,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Generator[riva_nmt.StreamingTranslateSpeechToTextResponse, None, None]:
         """
         Generates speech to text translation responses for fragments of speech audio in :param:`audio_chunks`.
@@ -126,6 +200,9 @@ class NeuralMachineTranslationClient:
                     translation_config = TranslationConfig(source_language_code="es-US",  target_language_code="en-US")
                     streaming_config = StreamingTranslateSpeechToTextConfig(asr_config, translation_config)
 
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
+
         Yields:
             :obj:`riva.client.proto.riva_nmt_pb2.StreamingTranslateSpeechToTextResponse`: responses for audio chunks in
             :param:`audio_chunks`. You may find description of response fields in declaration of
@@ -133,8 +210,25 @@ class NeuralMachineTranslationClient:
             message `here
             <https://docs.nvidia.com/deeplearning/riva/user-guide/docs/reference/protos/protos.html#riva-proto-riva-nmt-proto>`_.
         """
-        generator = streaming_s2t_request_generator(audio_chunks, streaming_config)
-        for response in self.stub.StreamingTranslateSpeechToText(generator, metadata=self.auth.get_auth_metadata()):
+        asr_config = streaming_config.asr_config.config
+        record = start_record(
+            self.latency_recorder,
+            'nmt.s2t',
+            pcm_bytes_per_second(asr_config.sample_rate_hertz, asr_config.audio_channel_count),
+        )
+        if self.framed_audio_requests:
+            requests = framed_streaming_request_generator(
+                audio_chunks, streaming_config, riva_nmt.StreamingTranslateSpeechToTextRequest, self._framer
+            )
+            method = self._framed_s2t
+        else:
+            requests = streaming_s2t_request_generator(audio_chunks, streaming_config)
+            method = self.stub.StreamingTranslateSpeechToText
+        generator = track_requests(requests, record)
+        for response in track_responses(
+            method(generator, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)),
+            record,
+        ):
             yield response
 
 
@@ -146,6 +240,7 @@ class NeuralMachineTranslationClient:
         target_language: str,
         future: bool = False,
         dnt_phrases_dict: Optional[dict] = None,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[riva_nmt.TranslateTextResponse, _MultiThreadedRendezvous]:
         """
         Translate input list of input text :param:`text` using model :param:`model` from :param:`source_language` into :param:`target_language`
@@ -154,6 +249,8 @@ class NeuralMachineTranslationClient:
             text (:obj:`list[str]`): input text.
             future (:obj:`bool`, defaults to :obj:`False`): whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
 
         Returns:
             :obj:`Union[riva.client.proto.riva_nmt_pb2.TranslateTextResponse, grpc._channel._MultiThreadedRendezvous]`:
@@ -169,13 +266,14 @@ class NeuralMachineTranslationClient:
         )
         add_dnt_phrases_dict(req, dnt_phrases_dict)
         func = self.stub.TranslateText.future if future else self.stub.TranslateText
-        return func(req, metadata=self.auth.get_auth_metadata())
+        return func(req, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
 
     def get_config(
-            self,
-            model: str,
-            future: bool = False,
+        self,
+        model: str,
+        future: bool = False,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[riva_nmt.AvailableLanguageResponse, _MultiThreadedRendezvous]:
         req = riva_nmt.AvailableLanguageRequest(model=model)
         func = self.stub.ListSupportedLanguagePairs.future if future else self.stub.ListSupportedLanguagePairs
-        return func(req, metadata=self.auth.get_auth_metadata())
+        return func(req, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
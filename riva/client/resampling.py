@@ -0,0 +1,310 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+Client side conversion of PCM audio to a format of an ASR model: resampling, downmix to mono and conversion of
+8, 24 and 32 bit integer and float samples to 16 bit integers. Sending 16 kHz mono audio instead of 48 kHz stereo
+reduces traffic 6 times and saves resampling on a server. The module requires NumPy, which is not installed with
+the package: ``pip install numpy``.
+
+.. code-block:: python
+
+    converter = AudioConverter.from_wav_file("audio.wav", chunk_n_frames=4800, output_rate=16000)
+    converter.update_config(streaming_config)
+    for response in asr_service.streaming_response_generator(converter, streaming_config):
+        ...
+"""
+
+import math
+import os
+import struct
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, Iterable, Optional, Union
+
+import numpy as np
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.proto.riva_audio_pb2 import AudioEncoding
+
+
+# Sample widths in bytes of supported integer PCM samples. 8 bit samples are unsigned like in WAV files.
+INTEGER_SAMPLE_WIDTHS = [1, 2, 3, 4]
+# Sample widths in bytes of supported float PCM samples.
+FLOAT_SAMPLE_WIDTHS = [4, 8]
+# WAV format tags.
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def read_wav_format(input_file: Union[str, os.PathLike]) -> Dict[str, Any]:
+    """
+    Reads a header of a WAV file. Unlike :func:`riva.client.get_wav_file_parameters`, float and
+    ``WAVE_FORMAT_EXTENSIBLE`` files, which are usual for 24 bit audio, are supported.
+
+    Returns:
+        :obj:`Dict[str, Any]`: parameters ``framerate``, ``nchannels``, ``sampwidth``, ``float_samples``,
+        ``nframes``, ``data_offset`` and ``duration``.
+
+    Raises:
+        :obj:`ValueError`: if a file is not a WAV file or its sample format is not supported.
+    """
+    with Path(input_file).expanduser().open('rb') as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+            raise ValueError(f"File {input_file} is not a WAV file.")
+        parameters: Dict[str, Any] = {}
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"WAV file {input_file} does not contain `fmt ` and `data` chunks.")
+            chunk_id, size = header[:4], struct.unpack('<I', header[4:])[0]
+            if chunk_id == b'fmt ':
+                fmt = f.read(size + size % 2)
+                format_tag, n_channels, framerate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                    format_tag = struct.unpack('<H', fmt[24:26])[0]
+                if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+                    raise ValueError(f"WAV format {format_tag:#06x} of file {input_file} is not supported.")
+                parameters.update(
+                    framerate=framerate,
+                    nchannels=n_channels,
+                    sampwidth=block_align // n_channels,
+                    float_samples=format_tag == WAVE_FORMAT_IEEE_FLOAT,
+                )
+            elif chunk_id == b'data':
+                if not parameters:
+                    raise ValueError(f"Chunk `data` precedes chunk `fmt ` in WAV file {input_file}.")
+                frame_size = parameters['sampwidth'] * parameters['nchannels']
+                parameters['data_offset'] = f.tell()
+                # Sizes of streamed WAV files are often 0 or 0xFFFFFFFF, so a size is limited by a file size.
+                data_size = min(size, os.fstat(f.fileno()).st_size - parameters['data_offset'])
+                parameters['nframes'] = data_size // frame_size
+                parameters['duration'] = parameters['nframes'] / parameters['framerate']
+                return parameters
+            else:
+                f.seek(size + size % 2, 1)
+
+
+def decode_pcm(data: bytes, sample_width: int = 2, float_samples: bool = False, n_channels: int = 1) -> np.ndarray:
+    """
+    Converts little endian PCM audio to a :obj:`float32` array of shape ``(n_frames, n_channels)`` with values in
+    range ``[-1, 1]``.
+
+    Raises:
+        :obj:`ValueError`: if :param:`sample_width` is not in :obj:`INTEGER_SAMPLE_WIDTHS` or
+            :obj:`FLOAT_SAMPLE_WIDTHS` for float samples.
+    """
+    if float_samples:
+        if sample_width not in FLOAT_SAMPLE_WIDTHS:
+            raise ValueError(
+                f"Not allowed value '{sample_width}' of parameter `sample_width` for float samples. "
+                f"Allowed values are {FLOAT_SAMPLE_WIDTHS}"
+            )
+        samples = np.frombuffer(data, dtype=f'<f{sample_width}').astype(np.float32)
+    elif sample_width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((raw[:, 0] | raw[:, 1] << 8 | raw[:, 2] << 16) << 8 >> 8).astype(np.float32) / 2**23
+    elif sample_width in INTEGER_SAMPLE_WIDTHS:
+        samples = np.frombuffer(data, dtype=f'<i{sample_width}').astype(np.float32) / 2 ** (8 * sample_width - 1)
+    else:
+        raise ValueError(
+            f"Not allowed value '{sample_width}' of parameter `sample_width`. "
+            f"Allowed values are {INTEGER_SAMPLE_WIDTHS}"
+        )
+    return samples.reshape(-1, n_channels)
+
+
+def encode_pcm16(samples: np.ndarray) -> bytes:
+    """Converts float samples in range ``[-1, 1]`` to 16 bit little endian PCM. Samples out of range are clipped."""
+    return np.clip(np.rint(samples * 32768), -32768, 32767).astype('<i2').tobytes()
+
+
+class Resampler:
+    """
+    A streaming polyphase resampler with a Hann windowed sinc filter. An output sample ``n`` is taken at input time
+    ``n * input_rate / output_rate``, and filter taps for all fractional positions are computed once. Input which
+    is needed for following outputs is kept between calls of :meth:`process`, so chunks may have any length.
+    """
+    def __init__(
+        self, input_rate: int, output_rate: int, n_channels: int = 1, zero_crossings: int = 16, rolloff: float = 0.945
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            input_rate (:obj:`int`): a sample rate of input.
+            output_rate (:obj:`int`): a sample rate of output.
+            n_channels (:obj:`int`, defaults to :obj:`1`): a number of channels.
+            zero_crossings (:obj:`int`, defaults to :obj:`16`): a number of zero crossings of a sinc on each side of
+                a filter. More zero crossings give a sharper cutoff at a cost of more computations.
+            rolloff (:obj:`float`, defaults to :obj:`0.945`): a cutoff frequency relative to the Nyquist frequency of
+                the lower of the two rates.
+        """
+        gcd = math.gcd(input_rate, output_rate)
+        self.up, self.down = output_rate // gcd, input_rate // gcd
+        self.n_channels = n_channels
+        cutoff = min(1.0, self.up / self.down) * rolloff
+        self.half_width = math.ceil(zero_crossings / cutoff)
+        self.offsets = np.arange(-self.half_width + 1, self.half_width + 1)
+        t = self.offsets[None, :] - np.arange(self.up)[:, None] / self.up
+        window = 0.5 + 0.5 * np.cos(np.pi * np.clip(t / self.half_width, -1, 1))
+        filters = cutoff * np.sinc(cutoff * t) * window
+        self.filters = (filters / filters.sum(axis=1, keepdims=True)).astype(np.float32)
+        # Input before the start of audio is zeros.
+        self._buffer = np.zeros((self.half_width - 1, n_channels), dtype=np.float32)
+        self._buffer_start = -(self.half_width - 1)
+        self._next_output = 0
+        self._n_input = 0
+
+    def _resample(self, n_end: int) -> np.ndarray:
+        outputs = np.arange(self._next_output, n_end)
+        positions = outputs * self.down
+        indices = (positions // self.up)[:, None] + self.offsets[None, :] - self._buffer_start
+        result = np.einsum('nt,ntc->nc', self.filters[positions % self.up], self._buffer[indices])
+        self._next_output = max(n_end, self._next_output)
+        keep_from = (self._next_output * self.down) // self.up - self.half_width + 1 - self._buffer_start
+        self._buffer = self._buffer[keep_from:]
+        self._buffer_start += keep_from
+        return result
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resamples an array of shape ``(n_frames, n_channels)`` and returns output samples which are ready."""
+        if self.up == self.down:
+            return samples
+        self._buffer = np.concatenate([self._buffer, samples.astype(np.float32, copy=False)])
+        self._n_input += len(samples)
+        last_full_input = self._buffer_start + len(self._buffer) - self.half_width
+        # An output is ready if all its taps are in the buffer: position // up + half_width <= last input.
+        return self._resample(max(-(-last_full_input * self.up // self.down), self._next_output))
+
+    def flush(self) -> np.ndarray:
+        """Returns remaining output samples. Input after the end of audio is zeros."""
+        if self.up == self.down:
+            return np.zeros((0, self.n_channels), dtype=np.float32)
+        self._buffer = np.concatenate([self._buffer, np.zeros((self.half_width, self.n_channels), np.float32)])
+        return self._resample(-(-self._n_input * self.up // self.down))
+
+
+class AudioConverter:
+    """
+    Iterates over chunks of 16 bit PCM audio converted from chunks of :param:`audio_chunks`. A chunk may end in
+    the middle of a frame, e.g. chunks of :class:`riva.client.audio_io.MicrophoneStream`, and an unfinished frame is
+    carried to the next chunk. Input has to be raw PCM without a header, e.g. chunks of
+    :class:`riva.client.AudioChunkFileIterator` created with ``use_mmap=True`` or of :meth:`from_wav_file`.
+    """
+    def __init__(
+        self,
+        audio_chunks: Iterable[Union[bytes, memoryview]],
+        input_rate: int,
+        input_channels: int = 1,
+        sample_width: int = 2,
+        float_samples: bool = False,
+        output_rate: Optional[int] = 16000,
+        downmix: bool = True,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            audio_chunks (:obj:`Iterable[Union[bytes, memoryview]]`): chunks of raw PCM audio.
+            input_rate (:obj:`int`): a sample rate of input audio.
+            input_channels (:obj:`int`, defaults to :obj:`1`): a number of channels of input audio.
+            sample_width (:obj:`int`, defaults to :obj:`2`): a number of bytes in one input sample.
+            float_samples (:obj:`bool`, defaults to :obj:`False`): whether input samples are floats.
+            output_rate (:obj:`int`, `optional`, defaults to :obj:`16000`): a sample rate of output audio. If it is
+                :obj:`None`, then audio is not resampled.
+            downmix (:obj:`bool`, defaults to :obj:`True`): whether to average channels into one.
+        """
+        decode_pcm(b'', sample_width, float_samples)  # validates a sample format
+        self.audio_chunks = audio_chunks
+        self.input_rate = input_rate
+        self.input_channels = input_channels
+        self.sample_width = sample_width
+        self.float_samples = float_samples
+        self.output_rate = input_rate if output_rate is None else output_rate
+        self.output_channels = 1 if downmix else input_channels
+        self.frame_size = sample_width * input_channels
+        self.resampler = Resampler(self.input_rate, self.output_rate, self.output_channels)
+
+    @classmethod
+    def from_wav_file(
+        cls,
+        input_file: Union[str, os.PathLike],
+        chunk_n_frames: int,
+        delay_callback: Optional[Callable[[bytes, float], None]] = None,
+        **kwargs,
+    ) -> 'AudioConverter':
+        """
+        Creates a converter of a WAV file of any format supported by :func:`read_wav_format`. Keyword arguments are
+        passed to :class:`AudioConverter`.
+
+        Args:
+            input_file (:obj:`Union[str, os.PathLike]`): a path to a WAV file.
+            chunk_n_frames (:obj:`int`): a number of frames read from a file at once.
+            delay_callback (:obj:`Callable[[bytes, float], None]`, `optional`): a function which is called for every
+                read chunk with chunk data and its duration in seconds, e.g. :class:`riva.client.RealTimePacer`.
+        """
+        parameters = read_wav_format(input_file)
+
+        def read_chunks() -> Generator[bytes, None, None]:
+            frame_size = parameters['sampwidth'] * parameters['nchannels']
+            remaining = parameters['nframes'] * frame_size
+            with Path(input_file).expanduser().open('rb') as f:
+                f.seek(parameters['data_offset'])
+                while remaining > 0:
+                    data = f.read(min(chunk_n_frames * frame_size, remaining))
+                    if not data:
+                        return
+                    remaining -= len(data)
+                    if delay_callback is not None:
+                        delay_callback(data, len(data) / frame_size / parameters['framerate'])
+                    yield data
+
+        return cls(
+            read_chunks(),
+            parameters['framerate'],
+            input_channels=parameters['nchannels'],
+            sample_width=parameters['sampwidth'],
+            float_samples=parameters['float_samples'],
+            **kwargs,
+        )
+
+    def close(self) -> None:
+        """Closes a source of chunks if it can be closed, e.g. a file of :meth:`from_wav_file`."""
+        if hasattr(self.audio_chunks, 'close'):
+            self.audio_chunks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, traceback) -> None:
+        self.close()
+
+    def update_config(self, config: Union[rasr.StreamingRecognitionConfig, rasr.RecognitionConfig]) -> None:
+        """Sets encoding, sample rate and number of channels of output audio in :param:`config`."""
+        inner_config = config if isinstance(config, rasr.RecognitionConfig) else config.config
+        inner_config.encoding = AudioEncoding.LINEAR_PCM
+        inner_config.sample_rate_hertz = self.output_rate
+        inner_config.audio_channel_count = self.output_channels
+
+    def _convert(self, data: bytes) -> np.ndarray:
+        samples = decode_pcm(data, self.sample_width, self.float_samples, self.input_channels)
+        if self.output_channels < self.input_channels:
+            samples = samples.mean(axis=1, keepdims=True)
+        return self.resampler.process(samples)
+
+    def __iter__(self) -> Generator[bytes, None, None]:
+        tail = b''
+        for chunk in self.audio_chunks:
+            data = tail + bytes(chunk)
+            n_bytes = len(data) // self.frame_size * self.frame_size
+            tail = data[n_bytes:]
+            samples = self._convert(data[:n_bytes])
+            if len(samples):
+                yield encode_pcm16(samples)
+        samples = self.resampler.flush()
+        if len(samples):
+            yield encode_pcm16(samples)
@@ -0,0 +1,235 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+Compact speech recognition results. A protobuf result holds all alternatives, word lists and pipeline states of
+a response, and keeping it keeps all of them. :func:`compact_result` copies only requested fields of the most
+probable alternative into a slotted :class:`CompactResult`. Words are stored in arrays and word strings are
+interned, so a word of a long transcript costs a few bytes of array items and a reference to a shared string
+instead of a message object.
+"""
+
+from array import array
+from sys import intern
+from typing import Any, Dict, Generator, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union, overload
+
+import riva.client.proto.riva_asr_pb2 as rasr
+
+
+RESULT_FIELDS = [
+    'transcript',
+    'confidence',
+    'words',
+    'start_time',
+    'end_time',
+    'is_final',
+    'stability',
+    'channel_tag',
+    'audio_processed',
+    'vad_probabilities',
+]
+DEFAULT_RESULT_FIELDS = ['transcript', 'confidence', 'words', 'start_time', 'end_time', 'audio_processed']
+
+Result = Union[rasr.StreamingRecognitionResult, rasr.SpeechRecognitionResult]
+
+
+class Word(NamedTuple):
+    word: str
+    start_time: int
+    end_time: int
+    confidence: float
+
+
+class WordList(Sequence[Word]):
+    """
+    An immutable sequence of :class:`Word` stored column wise: words in a tuple, times in milliseconds in
+    :obj:`array('l')` and confidences in :obj:`array('f')`. :class:`Word` tuples are created on access.
+    """
+    __slots__ = ('texts', 'start_times', 'end_times', 'confidences')
+
+    def __init__(
+        self,
+        texts: Sequence[str] = (),
+        start_times: Iterable[int] = (),
+        end_times: Iterable[int] = (),
+        confidences: Iterable[float] = (),
+    ) -> None:
+        self.texts = tuple(texts)
+        self.start_times = array('l', start_times)
+        self.end_times = array('l', end_times)
+        self.confidences = array('f', confidences)
+
+    @classmethod
+    def from_proto(cls, words: Iterable[rasr.WordInfo]) -> 'WordList':
+        words = list(words)
+        return cls(
+            [intern(w.word) for w in words],
+            [w.start_time for w in words],
+            [w.end_time for w in words],
+            [w.confidence for w in words],
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @overload
+    def __getitem__(self, index: int) -> Word:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> 'WordList':
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Word, 'WordList']:
+        if isinstance(index, slice):
+            return WordList(
+                self.texts[index], self.start_times[index], self.end_times[index], self.confidences[index]
+            )
+        return Word(self.texts[index], self.start_times[index], self.end_times[index], self.confidences[index])
+
+    def __iter__(self) -> Iterator[Word]:
+        return map(Word, self.texts, self.start_times, self.end_times, self.confidences)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, WordList):
+            return NotImplemented
+        return (
+            self.texts == other.texts
+            and self.start_times == other.start_times
+            and self.end_times == other.end_times
+            and self.confidences == other.confidences
+        )
+
+    def __repr__(self) -> str:
+        return f"WordList({list(self)!r})"
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        return [word._asdict() for word in self]
+
+
+class CompactResult:
+    """
+    A speech recognition result with fields of its most probable alternative. Fields which were not requested in
+    :func:`compact_result` keep default values: empty strings and lists, zeros and :obj:`True` for ``is_final``.
+    Times are in milliseconds like in protobuf word infos, ``audio_processed`` is in seconds.
+    """
+    __slots__ = tuple(RESULT_FIELDS)
+
+    def __init__(
+        self,
+        transcript: str = '',
+        confidence: float = 0.0,
+        words: Optional[WordList] = None,
+        start_time: int = 0,
+        end_time: int = 0,
+        is_final: bool = True,
+        stability: float = 0.0,
+        channel_tag: int = 0,
+        audio_processed: float = 0.0,
+        vad_probabilities: Iterable[float] = (),
+    ) -> None:
+        self.transcript = transcript
+        self.confidence = confidence
+        self.words = WordList() if words is None else words
+        self.start_time = start_time
+        self.end_time = end_time
+        self.is_final = is_final
+        self.stability = stability
+        self.channel_tag = channel_tag
+        self.audio_processed = audio_processed
+        self.vad_probabilities = array('f', vad_probabilities)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CompactResult):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in RESULT_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"CompactResult(transcript={self.transcript!r}, is_final={self.is_final})"
+
+    def as_dict(self, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Returns JSON serializable values of :param:`fields`. By default all fields are returned."""
+        record = {}
+        for field in RESULT_FIELDS if fields is None else fields:
+            value = getattr(self, field)
+            if field == 'words':
+                value = value.as_dicts()
+            elif field == 'vad_probabilities':
+                value = value.tolist()
+            record[field] = value
+        return record
+
+
+def check_result_fields(fields: Iterable[str]) -> List[str]:
+    fields = list(fields)
+    unknown = [field for field in fields if field not in RESULT_FIELDS]
+    if unknown:
+        raise ValueError(f"Not allowed result fields {unknown}. Allowed fields are {RESULT_FIELDS}")
+    return fields
+
+
+def compact_result(result: Result, fields: Optional[Iterable[str]] = None) -> CompactResult:
+    """
+    Copies :param:`fields` of a streaming or offline speech recognition result into a :class:`CompactResult`.
+    Only requested fields are read from :param:`result`, so conversion of a transcript does not touch word lists.
+
+    Args:
+        result (:obj:`Union[riva.client.proto.riva_asr_pb2.StreamingRecognitionResult,
+            riva.client.proto.riva_asr_pb2.SpeechRecognitionResult]`): a result to convert.
+        fields (:obj:`Iterable[str]`, `optional`): names of fields to copy from :obj:`RESULT_FIELDS`. Defaults to
+            :obj:`DEFAULT_RESULT_FIELDS`. ``start_time`` and ``end_time`` are the start of the first word and the end
+            of the last word.
+
+    Returns:
+        :obj:`CompactResult`: a result which does not reference :param:`result`.
+    """
+    return _compact_result(result, DEFAULT_RESULT_FIELDS if fields is None else check_result_fields(fields))
+
+
+def _compact_result(result: Result, fields: List[str]) -> CompactResult:
+    compact = CompactResult()
+    alternative = result.alternatives[0] if result.alternatives else None
+    for field in fields:
+        if field in ('transcript', 'confidence'):
+            if alternative is not None:
+                setattr(compact, field, getattr(alternative, field))
+        elif field == 'words':
+            if alternative is not None:
+                compact.words = WordList.from_proto(alternative.words)
+        elif field in ('start_time', 'end_time'):
+            if alternative is not None and alternative.words:
+                word = alternative.words[0 if field == 'start_time' else -1]
+                setattr(compact, field, getattr(word, field))
+        elif field == 'vad_probabilities':
+            if hasattr(result, 'pipeline_states'):
+                compact.vad_probabilities = array('f', result.pipeline_states.vad_probabilities)
+        elif hasattr(result, field):
+            # `is_final` and `stability` are absent in offline results.
+            setattr(compact, field, getattr(result, field))
+    return compact
+
+
+def compact_responses(
+    responses: Iterable[Union[rasr.StreamingRecognizeResponse, rasr.RecognizeResponse]],
+    fields: Optional[Iterable[str]] = None,
+    finals_only: bool = True,
+) -> Generator[CompactResult, None, None]:
+    """
+    Converts results with alternatives in streaming or offline recognition :param:`responses` with
+    :func:`compact_result`. Responses are not kept, so they are freed as soon as they are converted.
+
+    Args:
+        responses (:obj:`Iterable[Union[riva.client.proto.riva_asr_pb2.StreamingRecognizeResponse,
+            riva.client.proto.riva_asr_pb2.RecognizeResponse]]`): responses, e.g. returned by
+            :meth:`riva.client.ASRService.streaming_response_generator`.
+        fields (:obj:`Iterable[str]`, `optional`): fields to copy. See :func:`compact_result`.
+        finals_only (:obj:`bool`, defaults to :obj:`True`): whether to skip partial results.
+
+    Yields:
+        :obj:`CompactResult`: converted results.
+    """
+    fields = DEFAULT_RESULT_FIELDS if fields is None else check_result_fields(fields)
+    for response in responses:
+        for result in response.results:
+            if result.alternatives and (not finals_only or getattr(result, 'is_final', True)):
+                yield _compact_result(result, fields)
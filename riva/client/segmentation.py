@@ -0,0 +1,189 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import copy
+import sys
+from array import array
+from typing import List, NamedTuple, Optional, Sequence, Union
+
+import riva.client.proto.riva_asr_pb2 as rasr
+
+
+# Array type codes of signed little endian PCM samples for supported sample widths.
+SAMPLE_WIDTH_TYPECODES = {2: 'h', 4: 'i'}
+# A duration in seconds of blocks in which energy is compared while looking for silence.
+SILENCE_BLOCK_DURATION = 0.02
+
+
+class AudioSegment(NamedTuple):
+    """A segment of PCM audio. Frame ``end_frame`` is not included."""
+    start_frame: int
+    end_frame: int
+
+
+def pcm_energy(pcm: Union[bytes, memoryview], sample_width: int = 2) -> float:
+    """
+    Returns a mean square of samples of little endian PCM audio. :param:`sample_width` has to be one of
+    :obj:`SAMPLE_WIDTH_TYPECODES`.
+    """
+    samples = array(SAMPLE_WIDTH_TYPECODES[sample_width], pcm)
+    if not samples:
+        return 0.0
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return sum(sample * sample for sample in samples) / len(samples)
+
+
+def find_quietest_frame(
+    pcm: Union[bytes, memoryview],
+    start_frame: int,
+    end_frame: int,
+    framerate: int,
+    sample_width: int = 2,
+    n_channels: int = 1,
+) -> int:
+    """
+    Finds a block with the lowest energy in frames from :param:`start_frame` to :param:`end_frame` of :param:`pcm`
+    and returns a frame in the middle of the block. If :param:`sample_width` is not supported, then
+    :param:`end_frame` is returned.
+    """
+    if sample_width not in SAMPLE_WIDTH_TYPECODES or end_frame <= start_frame:
+        return end_frame
+    frame_size = sample_width * n_channels
+    block_frames = max(int(SILENCE_BLOCK_DURATION * framerate), 1)
+    best_frame, best_energy = end_frame, None
+    for block_start in range(start_frame, end_frame, block_frames):
+        block_end = min(block_start + block_frames, end_frame)
+        energy = pcm_energy(pcm[block_start * frame_size : block_end * frame_size], sample_width)
+        if best_energy is None or energy < best_energy:
+            best_frame, best_energy = (block_start + block_end) // 2, energy
+    return best_frame
+
+
+def plan_audio_segments(
+    n_frames: int,
+    framerate: int,
+    segment_duration: float,
+    overlap: float = 0.0,
+    pcm: Optional[Union[bytes, memoryview]] = None,
+    silence_search: float = 0.0,
+    sample_width: int = 2,
+    n_channels: int = 1,
+) -> List[AudioSegment]:
+    """
+    Splits audio into segments which are not longer than :param:`segment_duration`.
+
+    Args:
+        n_frames (:obj:`int`): a number of frames in audio.
+        framerate (:obj:`int`): a sample rate of audio.
+        segment_duration (:obj:`float`): a maximum duration of a segment in seconds.
+        overlap (:obj:`float`, defaults to :obj:`0.0`): a duration in seconds by which neighboring segments
+            overlap. Overlap prevents words from being cut at fixed windows.
+        pcm (:obj:`Union[bytes, memoryview]`, `optional`): raw PCM audio. Required if :param:`silence_search`
+            is positive.
+        silence_search (:obj:`float`, defaults to :obj:`0.0`): a duration in seconds at the end of every segment
+            in which the quietest point is looked for. A segment is cut at this point instead of at a fixed window.
+        sample_width (:obj:`int`, defaults to :obj:`2`): a number of bytes in one sample.
+        n_channels (:obj:`int`, defaults to :obj:`1`): a number of audio channels.
+
+    Returns:
+        :obj:`List[AudioSegment]`: segments in order of time.
+
+    Raises:
+        :obj:`ValueError`: if :param:`segment_duration` is not positive or if :param:`overlap` is negative or is not
+            less than a half of :param:`segment_duration`.
+    """
+    if segment_duration <= 0:
+        raise ValueError(f"Parameter `segment_duration` has to be positive, whereas {segment_duration} was given.")
+    if overlap < 0 or 2 * overlap >= segment_duration:
+        raise ValueError(
+            f"Parameter `overlap` has to be non-negative and less than a half of `segment_duration`, whereas "
+            f"overlap={overlap} and segment_duration={segment_duration} were given."
+        )
+    segment_frames = int(segment_duration * framerate)
+    overlap_frames = int(overlap * framerate)
+    search_frames = int(silence_search * framerate) if pcm is not None else 0
+    segments = []
+    start = 0
+    while True:
+        end = start + segment_frames
+        if end >= n_frames:
+            segments.append(AudioSegment(start, n_frames))
+            return segments
+        if search_frames > 0:
+            end = find_quietest_frame(
+                pcm,
+                max(end - search_frames, start + 2 * overlap_frames + 1),
+                end,
+                framerate,
+                sample_width,
+                n_channels,
+            )
+        segments.append(AudioSegment(start, end))
+        start = end - overlap_frames
+
+
+def _rebase_result(
+    result: rasr.SpeechRecognitionResult, offset_ms: int, keep_from_ms: Optional[float], keep_to_ms: Optional[float]
+) -> rasr.SpeechRecognitionResult:
+    rebased = copy.deepcopy(result)
+    rebased.audio_processed += offset_ms / 1000
+    for alternative in rebased.alternatives:
+        for word in alternative.words:
+            word.start_time += offset_ms
+            word.end_time += offset_ms
+        if keep_from_ms is None and keep_to_ms is None:
+            continue
+        kept_words = [
+            copy.deepcopy(word)
+            for word in alternative.words
+            if (keep_from_ms is None or word.start_time >= keep_from_ms)
+            and (keep_to_ms is None or word.start_time < keep_to_ms)
+        ]
+        del alternative.words[:]
+        alternative.words.extend(kept_words)
+        alternative.transcript = " ".join(word.word for word in kept_words)
+    return rebased
+
+
+def merge_segment_responses(
+    responses: Sequence[rasr.RecognizeResponse],
+    segments: Sequence[AudioSegment],
+    framerate: int,
+    keep_words: bool = True,
+) -> rasr.RecognizeResponse:
+    """
+    Stitches responses for audio segments into one response. Word time offsets and ``audio_processed`` are rebased
+    to a timeline of original audio. If segments overlap, then words are deduplicated by a middle point of an
+    overlap: a word is kept only in a segment in which the middle point of the overlap is not passed yet. In this
+    case transcripts are rebuilt from kept words, so word time offsets have to be enabled in requests.
+
+    Args:
+        responses (:obj:`Sequence[riva.client.proto.riva_asr_pb2.RecognizeResponse]`): responses for
+            :param:`segments`.
+        segments (:obj:`Sequence[AudioSegment]`): segments returned by :func:`plan_audio_segments`.
+        framerate (:obj:`int`): a sample rate of audio.
+        keep_words (:obj:`bool`, defaults to :obj:`True`): whether to keep word time offsets in a merged response.
+
+    Returns:
+        :obj:`riva.client.proto.riva_asr_pb2.RecognizeResponse`: a response for whole audio.
+    """
+    merged = rasr.RecognizeResponse()
+    for i, (response, segment) in enumerate(zip(responses, segments)):
+        keep_from_ms, keep_to_ms = None, None
+        if i > 0 and segments[i - 1].end_frame > segment.start_frame:
+            keep_from_ms = (segment.start_frame + segments[i - 1].end_frame) / 2 * 1000 / framerate
+        if i + 1 < len(segments) and segments[i + 1].start_frame < segment.end_frame:
+            keep_to_ms = (segments[i + 1].start_frame + segment.end_frame) / 2 * 1000 / framerate
+        offset_ms = round(segment.start_frame * 1000 / framerate)
+        trimmed = keep_from_ms is not None or keep_to_ms is not None
+        for result in response.results:
+            rebased = _rebase_result(result, offset_ms, keep_from_ms, keep_to_ms)
+            if trimmed and rebased.alternatives and not rebased.alternatives[0].words:
+                # All words of a result belong to a neighboring segment.
+                continue
+            if not keep_words:
+                for alternative in rebased.alternatives:
+                    del alternative.words[:]
+            merged.results.append(rebased)
+    return merged
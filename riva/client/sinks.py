@@ -0,0 +1,424 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import abc
+import csv
+import io
+import json
+import os
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple, Union
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.results import DEFAULT_RESULT_FIELDS, CompactResult, _compact_result, check_result_fields
+
+
+PRINT_STREAMING_ADDITIONAL_INFO_MODES = ['no', 'time', 'confidence']
+CSV_SINK_COLUMNS = ['stream_id', 'event', 'time', 'transcript', 'confidence', 'stability', 'start_time', 'end_time']
+
+OutputFile = Union[os.PathLike, str, TextIO]
+
+
+class ResultSink:
+    """
+    A base class for consumers of streaming speech recognition results. :func:`dispatch_responses` calls
+    :meth:`on_vad_states` for every result with VAD probabilities, :meth:`on_partial` or :meth:`on_final` for every
+    result with alternatives, and :meth:`on_response_end` after every response with results. Results are passed as
+    :class:`riva.client.proto.riva_asr_pb2.StreamingRecognitionResult`, so transcripts, confidence, stability and word
+    time offsets are taken by a sink only if it needs them. A sink which receives results of several streams one
+    after another is notified about the start of every stream with :meth:`on_stream_start`. All methods do nothing
+    by default.
+    """
+    def on_stream_start(self) -> None:
+        pass
+
+    def on_vad_states(self, result: rasr.StreamingRecognitionResult) -> None:
+        pass
+
+    def on_partial(self, result: rasr.StreamingRecognitionResult) -> None:
+        pass
+
+    def on_final(self, result: rasr.StreamingRecognitionResult) -> None:
+        pass
+
+    def on_response_end(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def dispatch_responses(responses: Iterable[rasr.StreamingRecognizeResponse], sink: ResultSink) -> None:
+    """Passes results from streaming speech recognition :param:`responses` to :param:`sink`."""
+    for response in responses:
+        if not response.results:
+            continue
+        for result in response.results:
+            if len(result.pipeline_states.vad_probabilities) > 0:
+                sink.on_vad_states(result)
+            if not result.alternatives:
+                continue
+            if result.is_final:
+                sink.on_final(result)
+            else:
+                sink.on_partial(result)
+        sink.on_response_end()
+
+
+def _open_output_files(
+    output_file: Union[OutputFile, List[OutputFile]], file_mode: str, newline: Optional[str] = None
+) -> Tuple[List[TextIO], List[bool]]:
+    if not isinstance(output_file, list):
+        output_file = [output_file]
+    files, file_opened = [], []
+    try:
+        for elem in output_file:
+            if isinstance(elem, io.TextIOBase):
+                files.append(elem)
+                file_opened.append(False)
+            else:
+                files.append(Path(elem).expanduser().open(file_mode, newline=newline))
+                file_opened.append(True)
+    except BaseException:
+        for f, opened in zip(files, file_opened):
+            if opened:
+                f.close()
+        raise
+    return files, file_opened
+
+
+class FanOutSink(ResultSink):
+    """Passes all events to several sinks, e.g. to :class:`ConsoleSink` and :class:`JsonlSink`."""
+    def __init__(self, sinks: Sequence[ResultSink]) -> None:
+        self.sinks = list(sinks)
+
+    def on_stream_start(self) -> None:
+        for sink in self.sinks:
+            sink.on_stream_start()
+
+    def on_vad_states(self, result: rasr.StreamingRecognitionResult) -> None:
+        for sink in self.sinks:
+            sink.on_vad_states(result)
+
+    def on_partial(self, result: rasr.StreamingRecognitionResult) -> None:
+        for sink in self.sinks:
+            sink.on_partial(result)
+
+    def on_final(self, result: rasr.StreamingRecognitionResult) -> None:
+        for sink in self.sinks:
+            sink.on_final(result)
+
+    def on_response_end(self) -> None:
+        for sink in self.sinks:
+            sink.on_response_end()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+class ConsoleSink(ResultSink):
+    """
+    Writes human readable results to files or streams. This is the sink used by
+    :func:`riva.client.asr.print_streaming`, see its description of parameters.
+    """
+    def __init__(
+        self,
+        output_file: Optional[Union[OutputFile, List[OutputFile]]] = None,
+        additional_info: str = 'no',
+        word_time_offsets: bool = False,
+        show_intermediate: bool = False,
+        file_mode: str = 'w',
+    ) -> None:
+        if additional_info not in PRINT_STREAMING_ADDITIONAL_INFO_MODES:
+            raise ValueError(
+                f"Not allowed value '{additional_info}' of parameter `additional_info`. "
+                f"Allowed values are {PRINT_STREAMING_ADDITIONAL_INFO_MODES}"
+            )
+        if additional_info != PRINT_STREAMING_ADDITIONAL_INFO_MODES[0] and show_intermediate:
+            warnings.warn(
+                f"`show_intermediate=True` will not work if "
+                f"`additional_info != {PRINT_STREAMING_ADDITIONAL_INFO_MODES[0]}`. `additional_info={additional_info}`"
+            )
+        if additional_info != PRINT_STREAMING_ADDITIONAL_INFO_MODES[1] and word_time_offsets:
+            warnings.warn(
+                f"`word_time_offsets=True` will not work if "
+                f"`additional_info != {PRINT_STREAMING_ADDITIONAL_INFO_MODES[1]}`. `additional_info={additional_info}"
+            )
+        self.additional_info = additional_info
+        self.word_time_offsets = word_time_offsets
+        self.show_intermediate = show_intermediate
+        self.output_file, self.file_opened = _open_output_files(
+            [sys.stdout] if output_file is None else output_file, file_mode
+        )
+        self.start_time = time.time()  # used in 'time` additional_info
+        self.num_chars_printed = 0  # used in 'no' additional_info
+        self.partial_transcript = ""
+
+    def on_stream_start(self) -> None:
+        self.start_time = time.time()
+        self.num_chars_printed = 0
+        self.partial_transcript = ""
+
+    def on_vad_states(self, result: rasr.StreamingRecognitionResult) -> None:
+        vad_prob_logs = "VAD States: "
+        for vad_state in result.pipeline_states.vad_probabilities:
+            vad_prob_logs += str(vad_state) + " "
+        for f in self.output_file:
+            f.write(vad_prob_logs + "\n")
+
+    def on_partial(self, result: rasr.StreamingRecognitionResult) -> None:
+        transcript = result.alternatives[0].transcript
+        if self.additional_info == 'confidence':
+            for f in self.output_file:
+                f.write(f'>> {transcript}\n')
+                f.write(f'Stability: {result.stability:9.4f}\n')
+        else:
+            self.partial_transcript += transcript
+
+    def on_final(self, result: rasr.StreamingRecognitionResult) -> None:
+        transcript = result.alternatives[0].transcript
+        if self.additional_info == 'no':
+            if self.show_intermediate:
+                overwrite_chars = ' ' * (self.num_chars_printed - len(transcript))
+                for i, f in enumerate(self.output_file):
+                    f.write("## " + transcript + (overwrite_chars if not self.file_opened[i] else '') + "\n")
+                self.num_chars_printed = 0
+            else:
+                for i, alternative in enumerate(result.alternatives):
+                    for f in self.output_file:
+                        f.write(
+                            f'##'
+                            + (f'(alternative {i + 1})' if i > 0 else '')
+                            + f' {alternative.transcript}\n'
+                        )
+        elif self.additional_info == 'time':
+            for i, alternative in enumerate(result.alternatives):
+                for f in self.output_file:
+                    f.write(
+                        f"Time {time.time() - self.start_time:.2f}s: Transcript {i}: {alternative.transcript}\n"
+                    )
+            if self.word_time_offsets:
+                for f in self.output_file:
+                    f.write("Timestamps:\n")
+                    f.write('{: <40s}{: <16s}{: <16s}\n'.format('Word', 'Start (ms)', 'End (ms)'))
+                    for word_info in result.alternatives[0].words:
+                        f.write(
+                            f'{word_info.word: <40s}{word_info.start_time: <16.0f}'
+                            f'{word_info.end_time: <16.0f}\n'
+                        )
+        else:  # additional_info == 'confidence'
+            for f in self.output_file:
+                f.write(f'## {transcript}\n')
+                f.write(f'Confidence: {result.alternatives[0].confidence:9.4f}\n')
+
+    def on_response_end(self) -> None:
+        partial_transcript, self.partial_transcript = self.partial_transcript, ""
+        if self.additional_info == 'no':
+            if self.show_intermediate and partial_transcript != '':
+                overwrite_chars = ' ' * (self.num_chars_printed - len(partial_transcript))
+                for i, f in enumerate(self.output_file):
+                    f.write(">> " + partial_transcript + ('\n' if self.file_opened[i] else overwrite_chars + '\r'))
+                self.num_chars_printed = len(partial_transcript) + 3
+        elif self.additional_info == 'time':
+            for f in self.output_file:
+                if partial_transcript:
+                    f.write(f">>>Time {time.time():.2f}s: {partial_transcript}\n")
+        else:
+            for f in self.output_file:
+                f.write('----\n')
+
+    def close(self) -> None:
+        for opened, f in zip(self.file_opened, self.output_file):
+            if opened:
+                f.close()
+        self.file_opened = [False] * len(self.output_file)
+
+
+class BufferedFileSink(ResultSink, abc.ABC):
+    """
+    A base class for sinks which write machine readable records. Events are stored in a buffer together with their
+    timestamps and results, and records are formatted and written only when :param:`buffer_size` events are
+    accumulated or when a sink is flushed or closed. Buffered results are converted to
+    :class:`riva.client.results.CompactResult` with :attr:`result_fields`, so a buffer does not keep responses.
+    One sink is expected to be used for one stream in one thread.
+    """
+    result_fields = ['transcript', 'confidence', 'stability', 'channel_tag', 'audio_processed']
+
+    def __init__(
+        self,
+        output_file: OutputFile,
+        buffer_size: int = 1000,
+        include_partials: bool = False,
+        word_time_offsets: bool = False,
+        stream_id: Optional[str] = None,
+        file_mode: str = 'w',
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            output_file (:obj:`Union[os.PathLike, str, TextIO]`): a path to an output file or a text stream.
+            buffer_size (:obj:`int`, defaults to :obj:`1000`): a number of events after which records are written.
+            include_partials (:obj:`bool`, defaults to :obj:`False`): whether to write partial results.
+            word_time_offsets (:obj:`bool`, defaults to :obj:`False`): whether to write word time offsets of final
+                results.
+            stream_id (:obj:`str`, `optional`): an identifier written in every record, e.g. a name of an audio file.
+                Useful if results of several streams are merged.
+            file_mode (:obj:`str`, defaults to :obj:`"w"`): a mode in which a file is opened.
+        """
+        output_files, file_opened = _open_output_files(output_file, file_mode, newline='')
+        self.output_file: Optional[TextIO] = output_files[0]
+        self.file_opened = file_opened[0]
+        self.buffer_size = buffer_size
+        self.include_partials = include_partials
+        self.word_time_offsets = word_time_offsets
+        self.stream_id = stream_id
+        self.start_time = time.monotonic()
+        self.buffer: List[Tuple[str, float, CompactResult]] = []
+        self._final_fields = self.result_fields + (['words'] if word_time_offsets else [])
+
+    def _add(self, event: str, result: rasr.StreamingRecognitionResult) -> None:
+        if event == 'vad':
+            fields = ['vad_probabilities']
+        else:
+            fields = self._final_fields if event == 'final' else self.result_fields
+        self.buffer.append((event, time.monotonic() - self.start_time, _compact_result(result, fields)))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def on_vad_states(self, result: rasr.StreamingRecognitionResult) -> None:
+        self._add('vad', result)
+
+    def on_partial(self, result: rasr.StreamingRecognitionResult) -> None:
+        if self.include_partials:
+            self._add('partial', result)
+
+    def on_final(self, result: rasr.StreamingRecognitionResult) -> None:
+        self._add('final', result)
+
+    @abc.abstractmethod
+    def _write_events(self, events: List[Tuple[str, float, CompactResult]]) -> None:
+        """Formats buffered events and writes them to :attr:`output_file`."""
+
+    def flush(self) -> None:
+        if self.output_file is None:
+            return
+        if self.buffer:
+            events, self.buffer = self.buffer, []
+            self._write_events(events)
+        self.output_file.flush()
+
+    def close(self) -> None:
+        if self.output_file is None:
+            return
+        self.flush()
+        if self.file_opened:
+            self.output_file.close()
+        self.output_file = None
+
+
+class JsonlSink(BufferedFileSink):
+    """
+    Writes one JSON object per event. Every object contains fields ``event`` (:obj:`"partial"`, :obj:`"final"` or
+    :obj:`"vad"`), ``time`` (seconds since the sink creation) and ``stream_id`` if it is set. Partial and final
+    events contain ``transcript``, ``confidence``, ``stability``, ``channel_tag`` and ``audio_processed``, and final
+    events contain ``words`` if :param:`word_time_offsets` is :obj:`True`. VAD events contain ``vad_probabilities``.
+    """
+    def _event_to_dict(self, event: str, event_time: float, result: CompactResult) -> Dict[str, Any]:
+        record = {'event': event, 'time': round(event_time, 6)}
+        if self.stream_id is not None:
+            record['stream_id'] = self.stream_id
+        if event == 'vad':
+            record['vad_probabilities'] = result.vad_probabilities.tolist()
+            return record
+        record.update(result.as_dict(self.result_fields))
+        if self.word_time_offsets and event == 'final':
+            record['words'] = result.words.as_dicts()
+        return record
+
+    def _write_events(self, events: List[Tuple[str, float, CompactResult]]) -> None:
+        self.output_file.write(
+            "".join(json.dumps(self._event_to_dict(*event)) + "\n" for event in events)
+        )
+
+
+class CsvSink(BufferedFileSink):
+    """
+    Writes one row per event with columns :obj:`CSV_SINK_COLUMNS`. If :param:`word_time_offsets` is :obj:`True`, then
+    every final event is followed by rows with event ``word`` for every word. For VAD events ``transcript`` column
+    contains space separated VAD probabilities.
+    """
+    delimiter = ','
+    result_fields = ['transcript', 'confidence', 'stability']
+
+    def __init__(self, output_file: OutputFile, *args, header: bool = True, **kwargs) -> None:
+        super().__init__(output_file, *args, **kwargs)
+        self.writer = csv.writer(self.output_file, delimiter=self.delimiter, lineterminator='\n')
+        if header:
+            self.writer.writerow(CSV_SINK_COLUMNS)
+
+    def _event_rows(self, event: str, event_time: float, result: CompactResult) -> List[List]:
+        event_time = round(event_time, 6)
+        if event == 'vad':
+            probabilities = " ".join(str(p) for p in result.vad_probabilities)
+            return [[self.stream_id, event, event_time, probabilities, '', '', '', '']]
+        rows = [[self.stream_id, event, event_time, result.transcript, result.confidence, result.stability, '', '']]
+        if self.word_time_offsets and event == 'final':
+            for w in result.words:
+                rows.append([self.stream_id, 'word', event_time, w.word, w.confidence, '', w.start_time, w.end_time])
+        return rows
+
+    def _write_events(self, events: List[Tuple[str, float, CompactResult]]) -> None:
+        for event in events:
+            self.writer.writerows(self._event_rows(*event))
+
+
+class TsvSink(CsvSink):
+    """The same as :class:`CsvSink` but columns are separated with tabs."""
+    delimiter = '\t'
+
+
+class TranscriptSink(ResultSink):
+    """
+    Keeps final results as :class:`riva.client.results.CompactResult` for applications which keep transcripts in
+    memory, e.g. hours of word level transcripts. Only :param:`fields` are copied from results, so responses are
+    freed after they are dispatched.
+    """
+    def __init__(self, fields: Optional[Sequence[str]] = None, include_partials: bool = False) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            fields (:obj:`Sequence[str]`, `optional`): fields of results to keep from
+                :obj:`riva.client.results.RESULT_FIELDS`. Defaults to
+                :obj:`riva.client.results.DEFAULT_RESULT_FIELDS`.
+            include_partials (:obj:`bool`, defaults to :obj:`False`): whether to keep the latest partial result in
+                :attr:`partial`.
+        """
+        self.fields = check_result_fields(DEFAULT_RESULT_FIELDS if fields is None else fields)
+        self.include_partials = include_partials
+        self.results: List[CompactResult] = []
+        self.partial: Optional[CompactResult] = None
+
+    def on_partial(self, result: rasr.StreamingRecognitionResult) -> None:
+        if self.include_partials:
+            self.partial = _compact_result(result, self.fields)
+
+    def on_final(self, result: rasr.StreamingRecognitionResult) -> None:
+        self.results.append(_compact_result(result, self.fields))
+        self.partial = None
+
+    @property
+    def transcript(self) -> str:
+        """Final transcripts joined in order of arrival."""
+        return "".join(result.transcript for result in self.results)
@@ -0,0 +1,509 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+An in-process stand-in for a Riva server. It serves the same gRPC services as a real server with synthetic
+responses, so client overhead, throughput and latency can be measured on any machine without a GPU.
+
+.. code-block:: python
+
+    from riva.client.testing import LatencyModel, MockRivaServer
+
+    with MockRivaServer(latency={'StreamingRecognize': LatencyModel(base=0.02)}, error_rate=0.01) as server:
+        auth = riva.client.Auth(uri=server.address)
+        ...
+"""
+
+import itertools
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Generator, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+import grpc
+
+import riva.client.proto.health_pb2 as rhealth
+import riva.client.proto.health_pb2_grpc as rhealth_srv
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_asr_pb2_grpc as rasr_srv
+import riva.client.proto.riva_nlp_pb2 as rnlp
+import riva.client.proto.riva_nlp_pb2_grpc as rnlp_srv
+import riva.client.proto.riva_nmt_pb2 as rnmt
+import riva.client.proto.riva_nmt_pb2_grpc as rnmt_srv
+import riva.client.proto.riva_tts_pb2 as rtts
+import riva.client.proto.riva_tts_pb2_grpc as rtts_srv
+
+
+# Words from which mock transcripts are built.
+MOCK_WORDS = ['riva', 'mock', 'server', 'speech', 'recognition', 'result']
+
+
+class LatencyModel(NamedTuple):
+    """
+    A processing time of a request or a response in seconds:
+    ``base + per_audio_second * audio_seconds + per_character * characters + uniform(0, jitter)``.
+    """
+    base: float = 0.0
+    per_audio_second: float = 0.0
+    per_character: float = 0.0
+    jitter: float = 0.0
+
+    def delay(self, rng: random.Random, audio_seconds: float = 0.0, characters: int = 0) -> float:
+        jitter = rng.uniform(0, self.jitter) if self.jitter > 0 else 0.0
+        return self.base + self.per_audio_second * audio_seconds + self.per_character * characters + jitter
+
+
+def _words(start_index: int, n_words: int) -> List[str]:
+    return [MOCK_WORDS[(start_index + i) % len(MOCK_WORDS)] for i in range(n_words)]
+
+
+def _token_class_values(text: str) -> List[rnlp.TokenClassValue]:
+    """Splits :param:`text` into whitespace separated tokens with one mock label and character spans."""
+    return [
+        rnlp.TokenClassValue(
+            token=match.group(),
+            label=[rnlp.Classification(class_name='mock', score=1.0)],
+            span=[rnlp.Span(start=match.start(), end=match.end())],
+        )
+        for match in re.finditer(r'\S+', text)
+    ]
+
+
+class _AudioStream:
+    """Turns audio of a recognition stream into partial and final results at a configured cadence."""
+    def __init__(self, server: 'MockRivaServer', config: rasr.RecognitionConfig, interim_results: bool) -> None:
+        self.server = server
+        self.config = config
+        self.interim_results = interim_results
+        channels = max(config.audio_channel_count, 1)
+        self.bytes_per_second = (config.sample_rate_hertz or 16000) * 2 * channels
+        self.audio_bytes = 0
+        self.utterance_start = 0.0
+        self.last_partial = 0.0
+        self.word_index = 0
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.audio_bytes / self.bytes_per_second
+
+    def result(self, is_final: bool) -> rasr.StreamingRecognitionResult:
+        duration = self.audio_seconds - self.utterance_start
+        n_words = max(round(duration * self.server.words_per_second), 1)
+        words = _words(self.word_index, n_words)
+        alternative = rasr.SpeechRecognitionAlternative(transcript=" ".join(words), confidence=1.0)
+        if self.config.enable_word_time_offsets:
+            word_duration = duration / n_words
+            for i, word in enumerate(words):
+                start = self.utterance_start + i * word_duration
+                alternative.words.append(
+                    rasr.WordInfo(
+                        word=word,
+                        start_time=round(start * 1000),
+                        end_time=round((start + word_duration) * 1000),
+                        confidence=1.0,
+                    )
+                )
+        result = rasr.StreamingRecognitionResult(
+            alternatives=[alternative],
+            is_final=is_final,
+            stability=1.0 if is_final else 0.5,
+            audio_processed=self.audio_seconds,
+        )
+        if is_final:
+            self.word_index += n_words
+            self.utterance_start = self.audio_seconds
+        return result
+
+    def add(self, audio: bytes) -> List[rasr.StreamingRecognitionResult]:
+        self.audio_bytes += len(audio)
+        if self.audio_seconds - self.utterance_start >= self.server.final_interval:
+            self.last_partial = self.audio_seconds
+            return [self.result(True)]
+        if self.interim_results and self.audio_seconds - self.last_partial >= self.server.partial_interval:
+            self.last_partial = self.audio_seconds
+            return [self.result(False)]
+        return []
+
+    def flush(self) -> List[rasr.StreamingRecognitionResult]:
+        return [self.result(True)] if self.audio_seconds > self.utterance_start else []
+
+
+class _SpeechRecognitionServicer(rasr_srv.RivaSpeechRecognitionServicer):
+    def __init__(self, server: 'MockRivaServer') -> None:
+        self.server = server
+
+    def Recognize(self, request: rasr.RecognizeRequest, context: grpc.ServicerContext) -> rasr.RecognizeResponse:
+        stream = _AudioStream(self.server, request.config, interim_results=False)
+        self.server._begin('Recognize', context, audio_seconds=len(request.audio) / stream.bytes_per_second)
+        response = rasr.RecognizeResponse()
+        final_bytes = max(int(self.server.final_interval * stream.bytes_per_second), 1)
+        for start in range(0, len(request.audio), final_bytes):
+            stream.audio_bytes = min(start + final_bytes, len(request.audio))
+            result = stream.result(True)
+            response.results.append(
+                rasr.SpeechRecognitionResult(alternatives=result.alternatives, audio_processed=result.audio_processed)
+            )
+        return response
+
+    def StreamingRecognize(
+        self, request_iterator: Iterable[rasr.StreamingRecognizeRequest], context: grpc.ServicerContext
+    ) -> Generator[rasr.StreamingRecognizeResponse, None, None]:
+        for results in self.server._recognize_stream('StreamingRecognize', request_iterator, context):
+            yield rasr.StreamingRecognizeResponse(results=results)
+
+    def GetRivaSpeechRecognitionConfig(
+        self, request: rasr.RivaSpeechRecognitionConfigRequest, context: grpc.ServicerContext
+    ) -> rasr.RivaSpeechRecognitionConfigResponse:
+        self.server._begin('GetRivaSpeechRecognitionConfig', context)
+        return rasr.RivaSpeechRecognitionConfigResponse()
+
+
+class _SpeechSynthesisServicer(rtts_srv.RivaSpeechSynthesisServicer):
+    def __init__(self, server: 'MockRivaServer') -> None:
+        self.server = server
+
+    def Synthesize(
+        self, request: rtts.SynthesizeSpeechRequest, context: grpc.ServicerContext
+    ) -> rtts.SynthesizeSpeechResponse:
+        self.server._begin('Synthesize', context, characters=len(request.text))
+        return rtts.SynthesizeSpeechResponse(audio=self.server._silence(request, len(request.text)))
+
+    def SynthesizeOnline(
+        self, request: rtts.SynthesizeSpeechRequest, context: grpc.ServicerContext
+    ) -> Generator[rtts.SynthesizeSpeechResponse, None, None]:
+        self.server._begin('SynthesizeOnline', context, characters=len(request.text))
+        audio = self.server._silence(request, len(request.text))
+        chunk_size = max(int(self.server.tts_chunk_duration * (request.sample_rate_hz or 44100)) * 2, 2)
+        model = self.server._latency_model('SynthesizeOnline')
+        for start in range(0, len(audio), chunk_size):
+            if start > 0:
+                self.server._sleep(model.per_audio_second * self.server.tts_chunk_duration)
+            yield rtts.SynthesizeSpeechResponse(audio=audio[start : start + chunk_size])
+
+    def GetRivaSynthesisConfig(
+        self, request: rtts.RivaSynthesisConfigRequest, context: grpc.ServicerContext
+    ) -> rtts.RivaSynthesisConfigResponse:
+        self.server._begin('GetRivaSynthesisConfig', context)
+        return rtts.RivaSynthesisConfigResponse()
+
+
+class _LanguageUnderstandingServicer(rnlp_srv.RivaLanguageUnderstandingServicer):
+    def __init__(self, server: 'MockRivaServer') -> None:
+        self.server = server
+
+    def _transform(
+        self, method: str, request: rnlp.TextTransformRequest, context: grpc.ServicerContext
+    ) -> rnlp.TextTransformResponse:
+        self.server._begin(method, context, characters=sum(len(text) for text in request.text))
+        return rnlp.TextTransformResponse(
+            text=[text[:1].upper() + text[1:] + ('' if text.endswith('.') else '.') for text in request.text]
+        )
+
+    def TransformText(
+        self, request: rnlp.TextTransformRequest, context: grpc.ServicerContext
+    ) -> rnlp.TextTransformResponse:
+        return self._transform('TransformText', request, context)
+
+    def PunctuateText(
+        self, request: rnlp.TextTransformRequest, context: grpc.ServicerContext
+    ) -> rnlp.TextTransformResponse:
+        return self._transform('PunctuateText', request, context)
+
+    def ClassifyText(self, request: rnlp.TextClassRequest, context: grpc.ServicerContext) -> rnlp.TextClassResponse:
+        self.server._begin('ClassifyText', context, characters=sum(len(text) for text in request.text))
+        return rnlp.TextClassResponse(
+            results=[
+                rnlp.ClassificationResult(labels=[rnlp.Classification(class_name='mock', score=1.0)])
+                for _ in request.text
+            ]
+        )
+
+    def ClassifyTokens(self, request: rnlp.TokenClassRequest, context: grpc.ServicerContext) -> rnlp.TokenClassResponse:
+        self.server._begin('ClassifyTokens', context, characters=sum(len(text) for text in request.text))
+        return rnlp.TokenClassResponse(
+            results=[rnlp.TokenClassSequence(results=_token_class_values(text)) for text in request.text]
+        )
+
+    def AnalyzeEntities(
+        self, request: rnlp.AnalyzeEntitiesRequest, context: grpc.ServicerContext
+    ) -> rnlp.TokenClassResponse:
+        self.server._begin('AnalyzeEntities', context, characters=len(request.query))
+        return rnlp.TokenClassResponse(results=[rnlp.TokenClassSequence(results=_token_class_values(request.query))])
+
+    def AnalyzeIntent(
+        self, request: rnlp.AnalyzeIntentRequest, context: grpc.ServicerContext
+    ) -> rnlp.AnalyzeIntentResponse:
+        self.server._begin('AnalyzeIntent', context, characters=len(request.query))
+        domain = request.options.domain or 'mock'
+        return rnlp.AnalyzeIntentResponse(
+            intent=rnlp.Classification(class_name=f'{domain}.mock', score=1.0),
+            slots=_token_class_values(request.query),
+            domain_str=domain,
+            domain=rnlp.Classification(class_name=domain, score=1.0),
+        )
+
+    def NaturalQuery(
+        self, request: rnlp.NaturalQueryRequest, context: grpc.ServicerContext
+    ) -> rnlp.NaturalQueryResponse:
+        self.server._begin('NaturalQuery', context, characters=len(request.query) + len(request.context))
+        # Answers are the first words of a context.
+        words = request.context.split()
+        return rnlp.NaturalQueryResponse(
+            results=[
+                rnlp.NaturalQueryResult(answer=" ".join(words[: i + 1]), score=1.0 / (i + 1))
+                for i in range(min(max(request.top_n, 1), len(words)))
+            ]
+        )
+
+    def GetRivaNLPConfig(
+        self, request: rnlp.RivaNLPConfigRequest, context: grpc.ServicerContext
+    ) -> rnlp.RivaNLPConfigResponse:
+        self.server._begin('GetRivaNLPConfig', context)
+        return rnlp.RivaNLPConfigResponse()
+
+
+class _TranslationServicer(rnmt_srv.RivaTranslationServicer):
+    def __init__(self, server: 'MockRivaServer') -> None:
+        self.server = server
+
+    def TranslateText(
+        self, request: rnmt.TranslateTextRequest, context: grpc.ServicerContext
+    ) -> rnmt.TranslateTextResponse:
+        self.server._begin('TranslateText', context, characters=sum(len(text) for text in request.texts))
+        return rnmt.TranslateTextResponse(
+            translations=[rnmt.Translation(text=text, language=request.target_language) for text in request.texts]
+        )
+
+    def ListSupportedLanguagePairs(
+        self, request: rnmt.AvailableLanguageRequest, context: grpc.ServicerContext
+    ) -> rnmt.AvailableLanguageResponse:
+        self.server._begin('ListSupportedLanguagePairs', context)
+        return rnmt.AvailableLanguageResponse()
+
+    def StreamingTranslateSpeechToText(
+        self, request_iterator: Iterable[rnmt.StreamingTranslateSpeechToTextRequest], context: grpc.ServicerContext
+    ) -> Generator[rnmt.StreamingTranslateSpeechToTextResponse, None, None]:
+        for results in self.server._recognize_stream('StreamingTranslateSpeechToText', request_iterator, context):
+            yield rnmt.StreamingTranslateSpeechToTextResponse(results=results)
+
+    def StreamingTranslateSpeechToSpeech(
+        self, request_iterator: Iterable[rnmt.StreamingTranslateSpeechToSpeechRequest], context: grpc.ServicerContext
+    ) -> Generator[rnmt.StreamingTranslateSpeechToSpeechResponse, None, None]:
+        requests = iter(request_iterator)
+        first = next(requests, None)
+        if first is None:
+            return
+        tts_request = rtts.SynthesizeSpeechRequest(sample_rate_hz=first.config.tts_config.sample_rate_hz)
+        for results in self.server._recognize_stream(
+            'StreamingTranslateSpeechToSpeech', itertools.chain([first], requests), context
+        ):
+            for result in results:
+                if result.is_final:
+                    yield rnmt.StreamingTranslateSpeechToSpeechResponse(
+                        speech=rtts.SynthesizeSpeechResponse(
+                            audio=self.server._silence(tts_request, len(result.alternatives[0].transcript))
+                        )
+                    )
+
+
+class _HealthServicer(rhealth_srv.HealthServicer):
+    def __init__(self, server: 'MockRivaServer') -> None:
+        self.server = server
+
+    def Check(self, request: rhealth.HealthCheckRequest, context: grpc.ServicerContext) -> rhealth.HealthCheckResponse:
+        return rhealth.HealthCheckResponse(status=rhealth.HealthCheckResponse.ServingStatus.SERVING)
+
+
+class MockRivaServer:
+    """
+    A local gRPC server which implements ``RivaSpeechRecognition``, ``RivaSpeechSynthesis``,
+    ``RivaLanguageUnderstanding``, ``RivaTranslation`` and health checking services with synthetic responses.
+
+    Recognition streams return a partial result every :attr:`partial_interval` seconds of audio if interim results
+    are requested and a final result every :attr:`final_interval` seconds of audio. Transcripts contain
+    :attr:`words_per_second` words per second of audio, so response sizes grow with audio like in a real server.
+    Synthesis returns silence of :attr:`tts_seconds_per_character` seconds per character of text.
+
+    Latencies are modeled with :class:`LatencyModel`. For unary calls the model delay is applied once before
+    a response. For recognition streams the delay of every response includes ``per_audio_second`` multiplied by
+    the audio received since the previous response, and ``base`` delay is applied to the first response only.
+    For ``SynthesizeOnline`` the ``base`` delay is a time to first audio and ``per_audio_second`` applies to every
+    next chunk.
+
+    With :attr:`error_rate` probability a call fails with :attr:`error_code` before the first response. Methods
+    which are subject to failures may be limited with :attr:`error_methods`.
+    """
+    def __init__(
+        self,
+        port: int = 0,
+        host: str = 'localhost',
+        max_workers: int = 64,
+        latency: Optional[Union[LatencyModel, Dict[str, LatencyModel]]] = None,
+        partial_interval: float = 0.2,
+        final_interval: float = 2.0,
+        words_per_second: float = 2.5,
+        tts_seconds_per_character: float = 0.06,
+        tts_chunk_duration: float = 0.1,
+        error_rate: float = 0.0,
+        error_code: grpc.StatusCode = grpc.StatusCode.UNAVAILABLE,
+        error_methods: Optional[Sequence[str]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Initializes an instance of the class. A server is started by :meth:`start` or on entering a ``with`` block.
+
+        Args:
+            port (:obj:`int`, defaults to :obj:`0`): a port to listen on. If :obj:`0`, then a free port is chosen and
+                is available in :attr:`port` after start.
+            host (:obj:`str`, defaults to :obj:`'localhost'`): a host to listen on.
+            max_workers (:obj:`int`, defaults to :obj:`64`): a number of server threads, i.e. a maximum number of
+                concurrently served calls.
+            latency (:obj:`Union[LatencyModel, Dict[str, LatencyModel]]`, `optional`): a latency model for all
+                methods or a dictionary from method names, e.g. ``'StreamingRecognize'``, to models. Methods missing
+                from a dictionary respond without delay.
+            partial_interval (:obj:`float`, defaults to :obj:`0.2`): seconds of audio between partial results.
+            final_interval (:obj:`float`, defaults to :obj:`2.0`): seconds of audio in one final result.
+            words_per_second (:obj:`float`, defaults to :obj:`2.5`): a number of words in transcripts per second
+                of audio.
+            tts_seconds_per_character (:obj:`float`, defaults to :obj:`0.06`): seconds of synthesized audio per
+                character of text.
+            tts_chunk_duration (:obj:`float`, defaults to :obj:`0.1`): seconds of audio in one ``SynthesizeOnline``
+                response.
+            error_rate (:obj:`float`, defaults to :obj:`0.0`): a probability of a call failure.
+            error_code (:obj:`grpc.StatusCode`, defaults to :obj:`grpc.StatusCode.UNAVAILABLE`): a status of
+                injected failures.
+            error_methods (:obj:`Sequence[str]`, `optional`): names of methods which fail. By default any method
+                may fail.
+            seed (:obj:`int`, `optional`): a seed of jitter and failures.
+        """
+        self.port = port
+        self.host = host
+        self.max_workers = max_workers
+        self.latency = latency
+        self.partial_interval = partial_interval
+        self.final_interval = final_interval
+        self.words_per_second = words_per_second
+        self.tts_seconds_per_character = tts_seconds_per_character
+        self.tts_chunk_duration = tts_chunk_duration
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.error_methods = None if error_methods is None else set(error_methods)
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[grpc.Server] = None
+
+    @property
+    def address(self) -> str:
+        """An address for :class:`riva.client.Auth`, e.g. ``'localhost:50051'``."""
+        return f"{self.host}:{self.port}"
+
+    def start(self) -> 'MockRivaServer':
+        if self._server is not None:
+            return self
+        server = grpc.server(ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="riva-mock"))
+        rasr_srv.add_RivaSpeechRecognitionServicer_to_server(_SpeechRecognitionServicer(self), server)
+        rtts_srv.add_RivaSpeechSynthesisServicer_to_server(_SpeechSynthesisServicer(self), server)
+        rnlp_srv.add_RivaLanguageUnderstandingServicer_to_server(_LanguageUnderstandingServicer(self), server)
+        rnmt_srv.add_RivaTranslationServicer_to_server(_TranslationServicer(self), server)
+        rhealth_srv.add_HealthServicer_to_server(_HealthServicer(self), server)
+        port = server.add_insecure_port(f"{self.host}:{self.port}")
+        if port == 0:
+            raise RuntimeError(f"Failed to listen on {self.host}:{self.port}")
+        self.port = port
+        server.start()
+        self._server = server
+        return self
+
+    def stop(self, grace: Optional[float] = None) -> None:
+        if self._server is not None:
+            self._server.stop(grace).wait()
+            self._server = None
+
+    def __enter__(self) -> 'MockRivaServer':
+        return self.start()
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.stop()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.errors.clear()
+
+    def _latency_model(self, method: str) -> LatencyModel:
+        if isinstance(self.latency, LatencyModel):
+            return self.latency
+        if isinstance(self.latency, dict):
+            return self.latency.get(method, LatencyModel())
+        return LatencyModel()
+
+    def _delay(self, method: str, audio_seconds: float = 0.0, characters: int = 0, base: bool = True) -> float:
+        model = self._latency_model(method)
+        if not base:
+            model = model._replace(base=0.0)
+        with self._lock:
+            return model.delay(self._rng, audio_seconds, characters)
+
+    @staticmethod
+    def _sleep(seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _count_call(self, method: str, context: grpc.ServicerContext) -> None:
+        """Counts a call and aborts it if a failure is injected."""
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            fail = (
+                self.error_rate > 0
+                and (self.error_methods is None or method in self.error_methods)
+                and self._rng.random() < self.error_rate
+            )
+            if fail:
+                self.errors[method] = self.errors.get(method, 0) + 1
+        if fail:
+            context.abort(self.error_code, f"Injected failure of {method}")
+
+    def _begin(
+        self, method: str, context: grpc.ServicerContext, audio_seconds: float = 0.0, characters: int = 0
+    ) -> None:
+        """Counts a call, injects a failure and sleeps for a modeled latency of a unary call."""
+        self._count_call(method, context)
+        self._sleep(self._delay(method, audio_seconds, characters))
+
+    def _silence(self, request: rtts.SynthesizeSpeechRequest, characters: int) -> bytes:
+        n_frames = int(characters * self.tts_seconds_per_character * (request.sample_rate_hz or 44100))
+        return bytes(2 * n_frames)
+
+    def _recognize_stream(
+        self, method: str, request_iterator: Iterable[Any], context: grpc.ServicerContext
+    ) -> Generator[List[rasr.StreamingRecognitionResult], None, None]:
+        """Consumes requests of a recognition or speech translation stream and yields lists of results."""
+        self._count_call(method, context)
+        stream = None
+        first = True
+        audio_since_response = 0.0
+        for request in request_iterator:
+            if stream is None:
+                # Speech translation requests contain a recognition config inside a translation config.
+                config = request.streaming_config if hasattr(request, 'streaming_config') else request.config.asr_config
+                stream = _AudioStream(self, config.config, config.interim_results)
+                continue
+            if not request.audio_content:
+                continue
+            audio_since_response += len(request.audio_content) / stream.bytes_per_second
+            results = stream.add(request.audio_content)
+            if results:
+                self._sleep(self._delay(method, audio_since_response, base=first))
+                first = False
+                audio_since_response = 0.0
+                yield results
+        if stream is not None:
+            results = stream.flush()
+            if results:
+                self._sleep(self._delay(method, audio_since_response, base=first))
+                yield results
+
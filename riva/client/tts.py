@@ -3,11 +3,14 @@
 
 from typing import Generator, Optional, Union
 
+import grpc
 from grpc._channel import _MultiThreadedRendezvous
 
 import riva.client.proto.riva_tts_pb2 as rtts
 import riva.client.proto.riva_tts_pb2_grpc as rtts_srv
 from riva.client import Auth
+from riva.client.auth import compression_kwargs
+from riva.client.metrics import LatencyRecorder, pcm_bytes_per_second, start_record, track_responses
 from riva.client.proto.riva_audio_pb2 import AudioEncoding
 import wave
 
@@ -19,20 +22,56 @@ def add_custom_dictionary_to_config(req, custom_dictionary):
         result_string = ','.join(result_list)
         req.custom_dictionary = result_string
 
+
+def prepare_synthesize_request(
+    text: str,
+    voice_name: Optional[str] = None,
+    language_code: str = 'en-US',
+    encoding: AudioEncoding = AudioEncoding.LINEAR_PCM,
+    sample_rate_hz: int = 44100,
+    audio_prompt_file: Optional[str] = None,
+    audio_prompt_encoding: AudioEncoding = AudioEncoding.LINEAR_PCM,
+    quality: int = 20,
+    custom_dictionary: Optional[dict] = None,
+) -> rtts.SynthesizeSpeechRequest:
+    req = rtts.SynthesizeSpeechRequest(
+        text=text,
+        language_code=language_code,
+        sample_rate_hz=sample_rate_hz,
+        encoding=encoding,
+    )
+    if voice_name is not None:
+        req.voice_name = voice_name
+    if audio_prompt_file is not None:
+        with wave.open(str(audio_prompt_file), 'rb') as wf:
+            rate = wf.getframerate()
+            req.zero_shot_data.sample_rate_hz = rate
+        with audio_prompt_file.open('rb') as wav_f:
+            audio_data = wav_f.read()
+            req.zero_shot_data.audio_prompt = audio_data
+        req.zero_shot_data.encoding = audio_prompt_encoding
+        req.zero_shot_data.quality = quality
+
+    add_custom_dictionary_to_config(req, custom_dictionary)
+    return req
+
 class SpeechSynthesisService:
     """
     A class for synthesizing speech from text. Provides :meth:`synthesize` which returns entire audio for a text
     and :meth:`synthesize_online` which returns audio in small chunks as it is becoming available.
     """
-    def __init__(self, auth: Auth) -> None:
+    def __init__(self, auth: Auth, latency_recorder: Optional[LatencyRecorder] = None) -> None:
         """
         Initializes an instance of the class.
 
         Args:
             auth (:obj:`Auth`): an instance of :class:`riva.client.auth.Auth` which is used for authentication metadata
                 generation.
+            latency_recorder (:obj:`riva.client.metrics.LatencyRecorder`, `optional`): a recorder of timings of
+                :meth:`synthesize_online` calls. Calls are not instrumented by default.
         """
         self.auth = auth
+        self.latency_recorder = latency_recorder
         self.stub = rtts_srv.RivaSpeechSynthesisStub(self.auth.channel)
 
     def synthesize(
@@ -47,6 +86,7 @@ class SpeechSynthesisService:
         quality: int = 20,
         future: bool = False,
         custom_dictionary: Optional[dict] = None,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Union[rtts.SynthesizeSpeechResponse, _MultiThreadedRendezvous]:
         """
         Synthesizes an entire audio for text :param:`text`.
@@ -66,6 +106,8 @@ class SpeechSynthesisService:
             future (:obj:`bool`, defaults to :obj:`False`): Whether to return an async result instead of usual
                 response. You can get a response by calling ``result()`` method of the future object.
             custom_dictionary (:obj:`dict`, `optional`): Dictionary with key-value pair containing grapheme and corresponding phoneme
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
 
         Returns:
             :obj:`Union[riva.client.proto.riva_tts_pb2.SynthesizeSpeechResponse, grpc._channel._MultiThreadedRendezvous]`:
@@ -73,28 +115,19 @@ class SpeechSynthesisService:
             description `here
             <https://docs.nvidia.com/deeplearning/riva/user-guide/docs/reference/protos/protos.html#riva-proto-riva-tts-proto>`_.
         """
-        req = rtts.SynthesizeSpeechRequest(
-            text=text,
-            language_code=language_code,
-            sample_rate_hz=sample_rate_hz,
-            encoding=encoding,
+        req = prepare_synthesize_request(
+            text,
+            voice_name,
+            language_code,
+            encoding,
+            sample_rate_hz,
+            audio_prompt_file,
+            audio_prompt_encoding,
+            quality,
+            custom_dictionary,
         )
-        if voice_name is not None:
-            req.voice_name = voice_name
-        if audio_prompt_file is not None:
-            with wave.open(str(audio_prompt_file), 'rb') as wf:
-                rate = wf.getframerate()
-                req.zero_shot_data.sample_rate_hz = rate
-            with audio_prompt_file.open('rb') as wav_f:
-                audio_data = wav_f.read()
-                req.zero_shot_data.audio_prompt = audio_data
-            req.zero_shot_data.encoding = audio_prompt_encoding
-            req.zero_shot_data.quality = quality
-
-        add_custom_dictionary_to_config(req, custom_dictionary)
-
         func = self.stub.Synthesize.future if future else self.stub.Synthesize
-        return func(req, metadata=self.auth.get_auth_metadata())
+        return func(req, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression))
 
     def synthesize_online(
         self,
@@ -107,6 +140,7 @@ class SpeechSynthesisService:
         audio_prompt_encoding: AudioEncoding = AudioEncoding.LINEAR_PCM,
         quality: int = 20,
         custom_dictionary: Optional[dict] = None,
+        compression: Optional[Union[str, grpc.Compression]] = None,
     ) -> Generator[rtts.SynthesizeSpeechResponse, None, None]:
         """
         Synthesizes and yields output audio chunks for text :param:`text` as the chunks
@@ -125,6 +159,8 @@ class SpeechSynthesisService:
             quality: (:obj:`int`): This defines the number of times decoder is run. Higher number improves quality of generated
                                    audio but also takes longer to generate the audio. Ranges between 1-40.
             custom_dictionary (:obj:`dict`, `optional`): Dictionary with key-value pair containing grapheme and corresponding phoneme
+            compression (:obj:`Union[str, grpc.Compression]`, `optional`): a compression algorithm for this call
+                which overrides a default compression of :class:`riva.client.auth.Auth`, e.g. :obj:`"gzip"`.
 
         Yields:
             :obj:`riva.client.proto.riva_tts_pb2.SynthesizeSpeechResponse`: a response with output. You may find
@@ -133,25 +169,25 @@ class SpeechSynthesisService:
             If :param:`future` is :obj:`True`, then a future object is returned. You may retrieve a response from a
             future object by calling ``result()`` method.
         """
-        req = rtts.SynthesizeSpeechRequest(
-            text=text,
-            language_code=language_code,
-            sample_rate_hz=sample_rate_hz,
-            encoding=encoding,
+        req = prepare_synthesize_request(
+            text,
+            voice_name,
+            language_code,
+            encoding,
+            sample_rate_hz,
+            audio_prompt_file,
+            audio_prompt_encoding,
+            quality,
+            custom_dictionary,
+        )
+        record = start_record(
+            self.latency_recorder,
+            'tts.online',
+            pcm_bytes_per_second(sample_rate_hz) if encoding == AudioEncoding.LINEAR_PCM else None,
+        )
+        if record is not None:
+            record.on_request(req.ByteSize())
+        return track_responses(
+            self.stub.SynthesizeOnline(req, metadata=self.auth.get_auth_metadata(), **compression_kwargs(compression)),
+            record,
         )
-        if voice_name is not None:
-            req.voice_name = voice_name
-
-        if audio_prompt_file is not None:
-            with wave.open(str(audio_prompt_file), 'rb') as wf:
-                rate = wf.getframerate()
-                req.zero_shot_data.sample_rate_hz = rate
-            with audio_prompt_file.open('rb') as wav_f:
-                audio_data = wav_f.read()
-                req.zero_shot_data.audio_prompt = audio_data
-            req.zero_shot_data.encoding = audio_prompt_encoding
-            req.zero_shot_data.quality = quality
-
-        add_custom_dictionary_to_config(req, custom_dictionary)                   
-
-        return self.stub.SynthesizeOnline(req, metadata=self.auth.get_auth_metadata())
@@ -0,0 +1,254 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+Client side trimming of long silences in PCM audio. :class:`SilenceTrimmer` wraps any iterable of audio chunks,
+e.g. :class:`riva.client.AudioChunkFileIterator` or :class:`riva.client.audio_io.MicrophoneStream`, and yields only
+speech with short pads of silence around it. Positions of removed audio are kept in a :class:`TimestampMap` which
+rebases word time offsets and ``audio_processed`` of responses to the timeline of original audio.
+
+.. code-block:: python
+
+    trimmer = riva.client.SilenceTrimmer(audio_chunks, framerate=16000)
+    responses = asr_service.streaming_response_generator(trimmer, streaming_config)
+    for response in trimmer.timestamps.rebase_responses(responses):
+        ...
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Callable, Generator, Iterable, List, Optional, Tuple, TypeVar, Union
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.segmentation import SAMPLE_WIDTH_TYPECODES, SILENCE_BLOCK_DURATION, pcm_energy
+
+
+Response = TypeVar('Response', rasr.StreamingRecognizeResponse, rasr.RecognizeResponse)
+
+
+class EnergySpeechDetector:
+    """
+    Classifies a block of PCM audio as speech if its RMS level is above :param:`threshold_db` decibels relative
+    to full scale. Speech in call recordings is usually above -35 dBFS and line noise is below -50 dBFS.
+    """
+    def __init__(self, threshold_db: float = -45.0, sample_width: int = 2) -> None:
+        if sample_width not in SAMPLE_WIDTH_TYPECODES:
+            raise ValueError(
+                f"Not allowed value '{sample_width}' of parameter `sample_width`. "
+                f"Allowed values are {list(SAMPLE_WIDTH_TYPECODES)}"
+            )
+        self.threshold_db = threshold_db
+        self.sample_width = sample_width
+        full_scale = 2 ** (8 * sample_width - 1)
+        self.threshold_energy = (full_scale * 10 ** (threshold_db / 20)) ** 2
+
+    def __call__(self, block: bytes) -> bool:
+        return pcm_energy(block, self.sample_width) > self.threshold_energy
+
+
+class TimestampMap:
+    """
+    Maps positions in trimmed audio to positions in original audio. Every removed piece of audio is recorded as
+    a frame of trimmed audio at which the piece was removed and a total number of frames removed up to this point.
+    Pieces are added by a thread which reads audio and may be looked up concurrently by a thread which reads
+    responses.
+    """
+    def __init__(self, framerate: int) -> None:
+        self.framerate = framerate
+        self._trimmed_frames: List[int] = [0]
+        self._removed_frames: List[int] = [0]
+        self._lock = threading.Lock()
+
+    def add_gap(self, trimmed_frame: int, n_frames: int) -> None:
+        """Records that :param:`n_frames` frames of original audio were removed at :param:`trimmed_frame`."""
+        with self._lock:
+            if trimmed_frame == self._trimmed_frames[-1]:
+                self._removed_frames[-1] += n_frames
+            else:
+                self._trimmed_frames.append(trimmed_frame)
+                self._removed_frames.append(self._removed_frames[-1] + n_frames)
+
+    @property
+    def removed_frames(self) -> int:
+        return self._removed_frames[-1]
+
+    def gaps(self) -> List[Tuple[int, int]]:
+        """Returns pairs of frames in trimmed audio and total numbers of frames removed up to them."""
+        with self._lock:
+            return list(zip(self._trimmed_frames, self._removed_frames))
+
+    def to_original(self, seconds: float, end: bool = False) -> float:
+        """
+        Converts a time in seconds of trimmed audio to a time of original audio. A time exactly at a gap is placed
+        after the gap, or before it if :param:`end` is :obj:`True`, so that ends of words are not stretched over
+        removed audio.
+        """
+        frame = seconds * self.framerate
+        with self._lock:
+            i = (bisect_left if end else bisect_right)(self._trimmed_frames, frame) - 1
+            removed = self._removed_frames[max(i, 0)]
+        return seconds + removed / self.framerate
+
+    def to_original_ms(self, milliseconds: int, end: bool = False) -> int:
+        return round(self.to_original(milliseconds / 1000, end) * 1000)
+
+    def rebase_response(self, response: Response) -> Response:
+        """Rebases word time offsets and ``audio_processed`` of streaming or offline :param:`response` in place."""
+        for result in response.results:
+            result.audio_processed = self.to_original(result.audio_processed, end=True)
+            for alternative in result.alternatives:
+                for word in alternative.words:
+                    word.start_time = self.to_original_ms(word.start_time)
+                    word.end_time = self.to_original_ms(word.end_time, end=True)
+        return response
+
+    def rebase_responses(self, responses: Iterable[Response]) -> Generator[Response, None, None]:
+        for response in responses:
+            yield self.rebase_response(response)
+
+
+class SilenceTrimmer:
+    """
+    Iterates over chunks of PCM audio from which long silences are removed. Audio is classified in blocks of
+    :param:`block_duration` seconds. A silence longer than :param:`min_silence` seconds is shortened to
+    :param:`hangover` seconds after the preceding speech and :param:`hangover` seconds before the following speech,
+    so that a server still sees ends of utterances and beginnings of words are not cut. Shorter silences are kept
+    as is. The first :param:`hangover` seconds after speech are yielded at once, and the rest of a silence is held
+    until it is known whether the silence is long.
+
+    Only little endian LINEAR_PCM audio without a header is supported, e.g. chunks of
+    :class:`riva.client.AudioChunkFileIterator` created with ``use_mmap=True``.
+    """
+    def __init__(
+        self,
+        audio_chunks: Iterable[Union[bytes, memoryview]],
+        framerate: int,
+        sample_width: int = 2,
+        n_channels: int = 1,
+        min_silence: float = 1.0,
+        hangover: float = 0.3,
+        threshold_db: float = -45.0,
+        speech_detector: Optional[Callable[[bytes], bool]] = None,
+        block_duration: float = SILENCE_BLOCK_DURATION,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            audio_chunks (:obj:`Iterable[Union[bytes, memoryview]]`): chunks of raw PCM audio.
+            framerate (:obj:`int`): a sample rate of audio.
+            sample_width (:obj:`int`, defaults to :obj:`2`): a number of bytes in one sample.
+            n_channels (:obj:`int`, defaults to :obj:`1`): a number of audio channels.
+            min_silence (:obj:`float`, defaults to :obj:`1.0`): a duration in seconds of the shortest silence which
+                is shortened.
+            hangover (:obj:`float`, defaults to :obj:`0.3`): a duration in seconds of silence kept at each side of
+                a shortened silence. If it is :obj:`0.0`, then long silences are dropped completely.
+            threshold_db (:obj:`float`, defaults to :obj:`-45.0`): a level of :class:`EnergySpeechDetector` in dBFS.
+                Ignored if :param:`speech_detector` is provided.
+            speech_detector (:obj:`Callable[[bytes], bool]`, `optional`): a function which returns :obj:`True` if
+                a block of audio contains speech, e.g. a model based VAD like
+                ``lambda block: vad.is_speech(block, 16000)`` of ``webrtcvad``. Defaults to
+                :class:`EnergySpeechDetector`.
+            block_duration (:obj:`float`, defaults to :obj:`0.02`): a duration in seconds of classified blocks.
+
+        Raises:
+            :obj:`ValueError`: if :param:`min_silence` is not positive or :param:`hangover` is negative.
+        """
+        if min_silence <= 0 or hangover < 0:
+            raise ValueError(
+                f"Parameter `min_silence` has to be positive and parameter `hangover` has to be non-negative, "
+                f"whereas min_silence={min_silence} and hangover={hangover} were given."
+            )
+        self.audio_chunks = audio_chunks
+        self.framerate = framerate
+        self.frame_size = sample_width * n_channels
+        self.min_silence_frames = int(min_silence * framerate)
+        self.hangover_frames = int(hangover * framerate)
+        self.block_size = max(int(block_duration * framerate), 1) * self.frame_size
+        self.speech_detector = (
+            EnergySpeechDetector(threshold_db, sample_width) if speech_detector is None else speech_detector
+        )
+        self.timestamps = TimestampMap(framerate)
+        self.input_frames = 0
+        self.output_frames = 0
+        self._speech_seen = False
+        self._silence_frames = 0
+        self._pending: List[bytes] = []
+        self._pending_frames = 0
+
+    @property
+    def removed_fraction(self) -> float:
+        """A fraction of audio which was removed so far."""
+        return self.timestamps.removed_frames / self.input_frames if self.input_frames else 0.0
+
+    def _drop_pending_head(self, keep_frames: int) -> None:
+        while self._pending and self._pending_frames - len(self._pending[0]) // self.frame_size >= keep_frames:
+            n_frames = len(self._pending.pop(0)) // self.frame_size
+            self._pending_frames -= n_frames
+            self.timestamps.add_gap(self.output_frames, n_frames)
+
+    def _emit(self, kept: List[bytes], block: bytes) -> None:
+        kept.append(block)
+        self.output_frames += len(block) // self.frame_size
+
+    def _flush_pending(self, kept: List[bytes]) -> None:
+        if self._silence_frames > self.min_silence_frames:
+            self._drop_pending_head(self.hangover_frames)
+        for block in self._pending:
+            self._emit(kept, block)
+        self._pending, self._pending_frames = [], 0
+
+    def _process(self, data: bytes) -> bytes:
+        kept: List[bytes] = []
+        for start in range(0, len(data), self.block_size):
+            block = data[start : start + self.block_size]
+            n_frames = len(block) // self.frame_size
+            self.input_frames += n_frames
+            if self.speech_detector(block):
+                self._flush_pending(kept)
+                self._speech_seen = True
+                self._silence_frames = 0
+                self._emit(kept, block)
+                continue
+            self._silence_frames += n_frames
+            if self._speech_seen and self._silence_frames <= self.hangover_frames:
+                self._emit(kept, block)
+                continue
+            self._pending.append(block)
+            self._pending_frames += n_frames
+            if self._silence_frames > self.min_silence_frames:
+                # The silence is long, so only its last `hangover` seconds may be sent before the next speech.
+                self._drop_pending_head(self.hangover_frames)
+        return b''.join(kept)
+
+    def __iter__(self) -> Generator[bytes, None, None]:
+        tail = b''
+        for chunk in self.audio_chunks:
+            data = tail + bytes(chunk)
+            n_bytes = len(data) // self.block_size * self.block_size
+            tail = data[n_bytes:]
+            kept = self._process(data[:n_bytes])
+            if kept:
+                yield kept
+        kept = [self._process(tail[: len(tail) // self.frame_size * self.frame_size])]
+        if self._silence_frames > self.min_silence_frames:
+            # A trailing silence is long, and its first `hangover` seconds are already sent.
+            self._drop_pending_head(0)
+        else:
+            self._flush_pending(kept)
+        kept = b''.join(kept)
+        if kept:
+            yield kept
+
+
+def trim_silence(pcm: Union[bytes, memoryview], framerate: int, **kwargs) -> Tuple[bytes, TimestampMap]:
+    """
+    Removes long silences from raw PCM audio for offline recognition. Keyword arguments are passed to
+    :class:`SilenceTrimmer`.
+
+    Returns:
+        :obj:`Tuple[bytes, TimestampMap]`: trimmed audio and a map which rebases a response for trimmed audio with
+        :meth:`TimestampMap.rebase_response`.
+    """
+    trimmer = SilenceTrimmer([pcm], framerate, **kwargs)
+    return b''.join(trimmer), trimmer.timestamps
@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+A fast path for audio requests of streaming calls. Every audio request of ``StreamingRecognize``,
+``StreamingTranslateSpeechToText`` and ``StreamingTranslateSpeechToSpeech`` contains only ``audio_content`` field,
+so its wire format is a field tag, a varint length and audio bytes. Such requests are framed directly into bytes
+instead of creating a protobuf message for every chunk and serializing it afterwards. Framed requests are passed
+through a request serializer which returns bytes as is and serializes usual messages, e.g. a config request.
+"""
+
+from typing import Any, Dict, Union
+
+from google.protobuf.descriptor import FileDescriptor
+
+
+# Wire type of length-delimited protobuf fields.
+LENGTH_DELIMITED_WIRE_TYPE = 2
+# A number of ``audio_content`` field in streaming requests of recognition and speech translation.
+AUDIO_CONTENT_FIELD_NUMBER = 2
+
+
+def encode_varint(value: int) -> bytes:
+    """Encodes a non-negative integer as a protobuf varint."""
+    result = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            result.append(byte | 0x80)
+        else:
+            result.append(byte)
+            return bytes(result)
+
+
+class AudioRequestFramer:
+    """
+    Builds serialized streaming requests with ``audio_content`` field. Headers are cached by chunk length because
+    almost all chunks of a stream have the same length, so framing of a chunk is one concatenation.
+    """
+    def __init__(self, field_number: int = AUDIO_CONTENT_FIELD_NUMBER, max_cached_headers: int = 64) -> None:
+        self.tag = encode_varint(field_number << 3 | LENGTH_DELIMITED_WIRE_TYPE)
+        self.max_cached_headers = max_cached_headers
+        self._headers: Dict[int, bytes] = {}
+
+    def header(self, length: int) -> bytes:
+        header = self._headers.get(length)
+        if header is None:
+            header = self.tag + encode_varint(length)
+            if len(self._headers) < self.max_cached_headers:
+                self._headers[length] = header
+        return header
+
+    def __call__(self, chunk: Union[bytes, bytearray, memoryview]) -> bytes:
+        return b''.join((self.header(len(chunk)), chunk))
+
+
+def payload_size(frame: bytes) -> int:
+    """Returns a size of a payload of a frame built by :class:`AudioRequestFramer`."""
+    position = 1
+    while frame[position] & 0x80:
+        position += 1
+    return len(frame) - position - 1
+
+
+def serialize_request(request: Any) -> bytes:
+    """A request serializer for stub calls which accepts both framed bytes and protobuf messages."""
+    if isinstance(request, bytes):
+        return request
+    return request.SerializeToString()
+
+
+def framed_stream_method(
+    channel: Any, file_descriptor: FileDescriptor, service_name: str, method_name: str, response_class: Any
+) -> Any:
+    """
+    Creates a stream-stream callable on :param:`channel` with :func:`serialize_request` as a request serializer.
+    Works with both :class:`grpc.Channel` and :class:`grpc.aio.Channel`.
+    """
+    service = file_descriptor.services_by_name[service_name]
+    return channel.stream_stream(
+        f"/{service.full_name}/{method_name}",
+        request_serializer=serialize_request,
+        response_deserializer=response_class.FromString,
+    )
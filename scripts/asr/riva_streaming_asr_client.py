@@ -2,25 +2,30 @@
 # SPDX-License-Identifier: MIT
 
 import argparse
+import json
 import os
 import queue
 import time
 from pathlib import Path
 from threading import Thread
-from typing import Union
+from typing import Optional, Union
 
 import riva.client
+import riva.client.aio
 from riva.client.asr import get_wav_file_parameters
 from riva.client.argparse_utils import add_asr_config_argparse_parameters, add_connection_argparse_parameters
 
 
+OUTPUT_FORMATS = ['text', 'jsonl', 'csv', 'tsv']
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Streaming transcription via Riva AI Services. Unlike `scripts/asr/transcribe_file.py` script, "
         "this script can perform transcription several times on same audio if `--num-iterations` is "
         "greater than 1. If `--num-clients` is greater than 1, then a file will be transcribed independently "
         "in several threads. Unlike other ASR scripts, this script does not print output but saves it in files "
-        "which names follow a format `output_<thread_num>.txt`.",
+        "which names follow a format `output_<thread_num>.<extension>` where extension depends on `--output-format`.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser.add_argument("--num-clients", default=1, type=int, help="Number of client threads.")
@@ -34,69 +39,225 @@ def parse_args() -> argparse.Namespace:
         help="Option to simulate realtime transcription. Audio fragments are sent to a server at a pace that mimics "
         "normal speech.",
     )
+    parser.add_argument(
+        "--realtime-speed",
+        type=float,
+        default=1.0,
+        help="A multiplier of audio clock used with `--simulate-realtime`. Values greater than 1 send audio faster "
+        "than real time.",
+    )
+    parser.add_argument(
+        "--realtime-jitter",
+        type=float,
+        default=0.0,
+        help="A maximum random delay in seconds added to a send time of every chunk with `--simulate-realtime`.",
+    )
+    parser.add_argument(
+        "--realtime-burst",
+        type=float,
+        default=0.0,
+        help="A duration of audio in seconds sent without delays at the start of a stream with `--simulate-realtime`.",
+    )
     parser.add_argument(
         "--file-streaming-chunk", type=int, default=1600, help="Number of frames in one chunk sent to server."
     )
+    parser.add_argument(
+        "--output-format",
+        default="text",
+        choices=OUTPUT_FORMATS,
+        help="A format of output files. `text` is human readable output with time stamps. Other formats are "
+        "buffered machine readable records which are cheaper to produce for many streams.",
+    )
+    parser.add_argument(
+        "--channels-per-endpoint",
+        type=int,
+        default=1,
+        help="Number of channels opened to every server from `--server`. Using several channels allows to exceed "
+        "a limit on number of concurrent streams in one connection.",
+    )
+    parser.add_argument(
+        "--load-balancing",
+        default="round_robin",
+        choices=riva.client.auth.LOAD_BALANCING_POLICIES,
+        help="A policy for spreading streams across servers and channels.",
+    )
+    parser.add_argument(
+        "--multiplex",
+        action="store_true",
+        help="Run all streams in one event loop with `riva.client.StreamingSessionManager` instead of starting "
+        "a thread for every client. Allows thousands of concurrent streams.",
+    )
+    parser.add_argument(
+        "--latency-report",
+        type=Path,
+        help="A path to a JSON file to which latency statistics of all streams are written: time to first partial, "
+        "lag of final results behind the end of utterances, real time factor, and bytes sent and received.",
+    )
+    parser.add_argument(
+        "--framed-audio-requests",
+        action="store_true",
+        help="Frame audio chunks directly into serialized requests instead of creating a protobuf message for every "
+        "chunk. Reduces client CPU usage when many streams are run.",
+    )
     parser = add_connection_argparse_parameters(parser)
     parser = add_asr_config_argparse_parameters(parser, max_alternatives=True, profanity_filter=True, word_time_offsets=True)
     args = parser.parse_args()
     if args.max_alternatives < 1:
         parser.error("`--max-alternatives` must be greater than or equal to 1")
+    if args.multiplex and args.simulate_realtime:
+        parser.error("`--simulate-realtime` is not supported with `--multiplex`")
     return args
 
 
+def create_sink(args: argparse.Namespace, output_file: Path) -> riva.client.ResultSink:
+    if args.output_format == 'text':
+        return riva.client.ConsoleSink(
+            output_file, additional_info='time', word_time_offsets=args.word_time_offsets, file_mode='a'
+        )
+    sink_class = {'jsonl': riva.client.JsonlSink, 'csv': riva.client.CsvSink, 'tsv': riva.client.TsvSink}
+    return sink_class[args.output_format](
+        output_file, word_time_offsets=args.word_time_offsets, stream_id=output_file.stem, file_mode='a'
+    )
+
+
+def create_streaming_config(args: argparse.Namespace) -> riva.client.StreamingRecognitionConfig:
+    config = riva.client.StreamingRecognitionConfig(
+        config=riva.client.RecognitionConfig(
+            language_code=args.language_code,
+            model=args.model_name,
+            max_alternatives=args.max_alternatives,
+            profanity_filter=args.profanity_filter,
+            enable_automatic_punctuation=args.automatic_punctuation,
+            verbatim_transcripts=not args.no_verbatim_transcripts,
+            enable_word_time_offsets=args.word_time_offsets,
+        ),
+        interim_results=True,
+    )
+    riva.client.add_endpoint_parameters_to_config(
+        config,
+        args.start_history,
+        args.start_threshold,
+        args.stop_history,
+        args.stop_history_eou,
+        args.stop_threshold,
+        args.stop_threshold_eou
+    )
+    riva.client.add_custom_configuration_to_config(
+        config,
+        args.custom_configuration
+    )
+    riva.client.add_word_boosting_to_config(config, args.boosted_lm_words, args.boosted_lm_score)
+    return config
+
+
 def streaming_transcription_worker(
-    args: argparse.Namespace, output_file: Union[str, os.PathLike], thread_i: int, exception_queue: queue.Queue
+    args: argparse.Namespace,
+    output_file: Union[str, os.PathLike],
+    thread_i: int,
+    exception_queue: queue.Queue,
+    latency_recorder: Optional[riva.client.LatencyRecorder] = None,
 ) -> None:
     output_file = Path(output_file).expanduser()
+    auth = None
     try:
-        auth = riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata)
-        asr_service = riva.client.ASRService(auth)
-        config = riva.client.StreamingRecognitionConfig(
-            config=riva.client.RecognitionConfig(
-                language_code=args.language_code,
-                model=args.model_name,
-                max_alternatives=args.max_alternatives,
-                profanity_filter=args.profanity_filter,
-                enable_automatic_punctuation=args.automatic_punctuation,
-                verbatim_transcripts=not args.no_verbatim_transcripts,
-                enable_word_time_offsets=args.word_time_offsets,
-            ),
-            interim_results=True,
-        )
-        riva.client.add_endpoint_parameters_to_config(
-            config,
-            args.start_history,
-            args.start_threshold,
-            args.stop_history,
-            args.stop_history_eou,
-            args.stop_threshold,
-            args.stop_threshold_eou
+        auth = riva.client.Auth(
+            args.ssl_cert,
+            args.use_ssl,
+            args.server,
+            args.metadata,
+            channels_per_endpoint=args.channels_per_endpoint,
+            load_balancing=args.load_balancing,
+            shared_channel=True,
+            channel_options=args.channel_options,
+            compression=args.compression,
         )
-        riva.client.add_custom_configuration_to_config(
-            config,
-            args.custom_configuration
+        asr_service = riva.client.ASRService(
+            auth, latency_recorder=latency_recorder, framed_audio_requests=args.framed_audio_requests
         )
-        riva.client.add_word_boosting_to_config(config, args.boosted_lm_words, args.boosted_lm_score)
-        for _ in range(args.num_iterations):
-            with riva.client.AudioChunkFileIterator(
-                args.input_file,
-                args.file_streaming_chunk,
-                delay_callback=riva.client.sleep_audio_length if args.simulate_realtime else None,
-            ) as audio_chunk_iterator:
-                riva.client.print_streaming(
-                    responses=asr_service.streaming_response_generator(
-                        audio_chunks=audio_chunk_iterator,
-                        streaming_config=config,
-                    ),
-                    output_file=output_file,
-                    additional_info='time',
-                    file_mode='a',
-                    word_time_offsets=args.word_time_offsets,
-                )
+        config = create_streaming_config(args)
+        with create_sink(args, output_file) as sink:
+            for _ in range(args.num_iterations):
+                sink.on_stream_start()
+                with riva.client.AudioChunkFileIterator(
+                    args.input_file,
+                    args.file_streaming_chunk,
+                    delay_callback=riva.client.RealTimePacer(
+                        speed=args.realtime_speed, jitter=args.realtime_jitter, burst=args.realtime_burst
+                    ) if args.simulate_realtime else None,
+                ) as audio_chunk_iterator:
+                    riva.client.dispatch_responses(
+                        asr_service.streaming_response_generator(
+                            audio_chunks=audio_chunk_iterator,
+                            streaming_config=config,
+                        ),
+                        sink,
+                    )
     except BaseException as e:
         exception_queue.put((e, thread_i))
         raise
+    finally:
+        if auth is not None:
+            auth.close()
+
+
+def run_multiplexed(
+    args: argparse.Namespace, extension: str, latency_recorder: Optional[riva.client.LatencyRecorder] = None
+) -> None:
+    config = create_streaming_config(args)
+    output_files = [Path(f"output_{i:d}.{extension}") for i in range(args.num_clients)]
+    # Machine readable sinks are shared by all iterations of a stream. Text sinks print times since the start of
+    # a stream, so a new text sink is opened for every session and is closed by the session.
+    session_sinks = args.output_format == 'text'
+    sinks = [] if session_sinks else [create_sink(args, output_file) for output_file in output_files]
+
+    def create_auth() -> riva.client.aio.Auth:
+        return riva.client.aio.Auth(
+            args.ssl_cert,
+            args.use_ssl,
+            args.server,
+            args.metadata,
+            channels_per_endpoint=args.channels_per_endpoint,
+            load_balancing=args.load_balancing,
+            channel_options=args.channel_options,
+            compression=args.compression,
+        )
+
+    try:
+        with riva.client.StreamingSessionManager(
+            create_auth, latency_recorder=latency_recorder, framed_audio_requests=args.framed_audio_requests
+        ) as manager:
+            for _ in range(args.num_iterations):
+                sessions = [
+                    manager.open_session(
+                        config,
+                        audio_source=riva.client.AudioChunkFileIterator(args.input_file, args.file_streaming_chunk),
+                        on_response=None if session_sinks else (
+                            lambda session, response, sink=sinks[i]: riva.client.dispatch_responses((response,), sink)
+                        ),
+                        sink=create_sink(args, output_file) if session_sinks else None,
+                    )
+                    for i, output_file in enumerate(output_files)
+                ]
+                for i, session in enumerate(sessions):
+                    try:
+                        session.wait()
+                    except Exception as e:
+                        raise RuntimeError(f"A stream with index {i} failed with error:\n{e}") from e
+    finally:
+        for sink in sinks:
+            sink.close()
+
+
+def write_latency_report(args: argparse.Namespace, latency_recorder: Optional[riva.client.LatencyRecorder]) -> None:
+    if latency_recorder is None:
+        return
+    report = {
+        'summary': latency_recorder.summary(),
+        'streams': [record.as_dict() for record in latency_recorder.records],
+    }
+    with args.latency_report.expanduser().open('w') as f:
+        json.dump(report, f, indent=2)
+    print("Latency report written to", args.latency_report)
 
 
 def main() -> None:
@@ -104,10 +265,20 @@ def main() -> None:
     print("Number of clients:", args.num_clients)
     print("Number of iteration:", args.num_iterations)
     print("Input file:", args.input_file)
+    extension = 'txt' if args.output_format == 'text' else args.output_format
+    latency_recorder = riva.client.LatencyRecorder() if args.latency_report is not None else None
+    if args.multiplex:
+        run_multiplexed(args, extension, latency_recorder)
+        print(str(args.num_clients), f"streams done, output written to output_<stream_id>.{extension}")
+        write_latency_report(args, latency_recorder)
+        return
     threads = []
     exception_queue = queue.Queue()
     for i in range(args.num_clients):
-        t = Thread(target=streaming_transcription_worker, args=[args, f"output_{i:d}.txt", i, exception_queue])
+        t = Thread(
+            target=streaming_transcription_worker,
+            args=[args, f"output_{i:d}.{extension}", i, exception_queue, latency_recorder],
+        )
         t.start()
         threads.append(t)
     while True:
@@ -126,7 +297,8 @@ def main() -> None:
         if all_dead:
             break
         time.sleep(0.05)
-    print(str(args.num_clients), "threads done, output written to output_<thread_id>.txt")
+    print(str(args.num_clients), f"threads done, output written to output_<thread_id>.{extension}")
+    write_latency_report(args, latency_recorder)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import argparse
+
+import riva.client
+from riva.client.argparse_utils import (
+    add_asr_config_argparse_parameters,
+    add_connection_argparse_parameters,
+    add_result_cache_argparse_parameters,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Batch transcription of many files via Riva AI Services. Files are transcribed concurrently "
+        "and results are appended to a JSONL file as soon as files are finished. Paths of transcribed files are "
+        "saved in a checkpoint file, so a restarted job skips them.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--input",
+        required=True,
+        nargs='+',
+        help="Directories, glob patterns, JSONL manifests with `audio_filepath` field, or audio files to transcribe.",
+    )
+    parser.add_argument("--output", required=True, help="A path to a JSONL file to which results are appended.")
+    parser.add_argument(
+        "--checkpoint", help="A path to a checkpoint file. By default `<output>.checkpoint` is used."
+    )
+    parser.add_argument(
+        "--mode",
+        default="offline",
+        choices=riva.client.batch.BATCH_MODES,
+        help="Whether to send every file in one request or to stream it.",
+    )
+    parser.add_argument(
+        "--concurrency-per-endpoint",
+        type=int,
+        default=4,
+        help="A number of files transcribed concurrently on every server from `--server`.",
+    )
+    parser.add_argument(
+        "--file-streaming-chunk", type=int, default=1600, help="Number of frames in one chunk in streaming mode."
+    )
+    parser = add_connection_argparse_parameters(parser)
+    parser = add_asr_config_argparse_parameters(parser, profanity_filter=True)
+    parser = add_result_cache_argparse_parameters(parser)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    auth = riva.client.Auth(
+        args.ssl_cert,
+        args.use_ssl,
+        args.server,
+        args.metadata,
+        channel_options=args.channel_options,
+        compression=args.compression,
+    )
+    config = riva.client.RecognitionConfig(
+        language_code=args.language_code,
+        model=args.model_name,
+        max_alternatives=1,
+        profanity_filter=args.profanity_filter,
+        enable_automatic_punctuation=args.automatic_punctuation,
+        verbatim_transcripts=not args.no_verbatim_transcripts,
+    )
+    riva.client.add_word_boosting_to_config(config, args.boosted_lm_words, args.boosted_lm_score)
+    riva.client.add_custom_configuration_to_config(config, args.custom_configuration)
+    audio_files = riva.client.collect_audio_files(args.input)
+    print(f"Found {len(audio_files)} files")
+    result_cache = None
+    if args.result_cache is not None:
+        result_cache = riva.client.ResultCache(args.result_cache, args.result_cache_size * 1024**2)
+    transcriber = riva.client.BatchTranscriber(
+        riva.client.ASRService(auth, result_cache=result_cache),
+        config,
+        mode=args.mode,
+        concurrency=args.concurrency_per_endpoint * len(auth.uris),
+        chunk_n_frames=args.file_streaming_chunk,
+    )
+
+    def print_progress(record: dict, stats: riva.client.BatchStats) -> None:
+        if 'error' in record:
+            print(f"\nFailed {record['audio_filepath']}: {record['error']}")
+        print(f"\r{stats}", end="", flush=True)
+
+    try:
+        stats = transcriber.run(audio_files, args.output, args.checkpoint, progress_callback=print_progress)
+    finally:
+        auth.close()
+    print(f"\nFinished. {stats}")
+    if result_cache is not None:
+        print(result_cache.stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,17 @@
 # SPDX-License-Identifier: MIT
 
 import argparse
+from typing import Callable, Optional, Union
 
 import os
 import riva.client
-from riva.client.argparse_utils import add_asr_config_argparse_parameters, add_connection_argparse_parameters
+from riva.client.argparse_utils import (
+    add_asr_config_argparse_parameters,
+    add_connection_argparse_parameters,
+    add_result_cache_argparse_parameters,
+    add_silence_trimming_argparse_parameters,
+)
+from riva.client.codecs import ENCODER_ENCODINGS
 
 
 def parse_args() -> argparse.Namespace:
@@ -52,21 +59,71 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--print-confidence", action="store_true", help="Whether to print stability and confidence of transcript."
     )
+    parser.add_argument(
+        "--resample-rate",
+        type=int,
+        help="If set, then a WAV file is converted to 16 bit PCM with this sample rate before it is sent. Integer "
+        "and float WAV files of any bit depth are supported. Requires NumPy.",
+    )
+    parser.add_argument(
+        "--keep-channels",
+        action="store_true",
+        help="Do not downmix channels into one when `--resample-rate` is set.",
+    )
+    parser.add_argument(
+        "--encode-audio",
+        choices=ENCODER_ENCODINGS,
+        help="If set, then 16 bit audio is compressed with this encoding before it is sent. FLAC and OGGOPUS "
+        "require `soundfile` package and add up to 0.25 and 1 second of latency respectively.",
+    )
     parser = add_connection_argparse_parameters(parser)
     parser = add_asr_config_argparse_parameters(parser, max_alternatives=True, profanity_filter=True, word_time_offsets=True)
+    parser = add_silence_trimming_argparse_parameters(parser)
+    parser = add_result_cache_argparse_parameters(parser)
     args = parser.parse_args()
     if args.play_audio or args.output_device is not None or args.list_devices:
         import riva.client.audio_io
     return args
 
 
+def open_audio_chunks(
+    args: argparse.Namespace, delay_callback: Optional[Callable[[bytes, float], None]]
+) -> Union[riva.client.AudioChunkFileIterator, 'riva.client.resampling.AudioConverter']:
+    if args.resample_rate is not None:
+        from riva.client.resampling import AudioConverter
+
+        return AudioConverter.from_wav_file(
+            args.input_file,
+            args.file_streaming_chunk,
+            delay_callback,
+            output_rate=args.resample_rate,
+            downmix=not args.keep_channels,
+        )
+    return riva.client.AudioChunkFileIterator(
+        args.input_file,
+        args.file_streaming_chunk,
+        delay_callback,
+        use_mmap=args.trim_silence or args.encode_audio is not None,
+    )
+
+
 def main() -> None:
     args = parse_args()
     if args.list_devices:
         riva.client.audio_io.list_output_devices()
         return
-    auth = riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata)
-    asr_service = riva.client.ASRService(auth)
+    auth = riva.client.Auth(
+        args.ssl_cert,
+        args.use_ssl,
+        args.server,
+        args.metadata,
+        channel_options=args.channel_options,
+        compression=args.compression,
+    )
+    result_cache = None
+    if args.result_cache is not None:
+        result_cache = riva.client.ResultCache(args.result_cache, args.result_cache_size * 1024**2)
+    asr_service = riva.client.ASRService(auth, result_cache=result_cache)
 
     if args.list_models:
         asr_models = dict()
@@ -113,6 +170,15 @@ def main() -> None:
         config,
         args.custom_configuration
     )
+    if (args.trim_silence or args.encode_audio is not None) and args.resample_rate is None:
+        wav_parameters = riva.client.get_wav_file_parameters(args.input_file)
+        if wav_parameters is None:
+            print("`--trim-silence` and `--encode-audio` are supported only for WAV files.")
+            return
+        if args.encode_audio is not None and wav_parameters['sampwidth'] != 2:
+            print("`--encode-audio` requires 16 bit audio. Add `--resample-rate` to convert audio.")
+            return
+        riva.client.add_audio_file_specs_to_config(config, args.input_file)
     sound_callback = None
     try:
         if args.play_audio or args.output_device is not None:
@@ -122,18 +188,51 @@ def main() -> None:
             )
             delay_callback = sound_callback
         else:
-            delay_callback = riva.client.sleep_audio_length if args.simulate_realtime else None
-        with riva.client.AudioChunkFileIterator(
-            args.input_file, args.file_streaming_chunk, delay_callback,
-        ) as audio_chunk_iterator:
+            delay_callback = riva.client.RealTimePacer() if args.simulate_realtime else None
+        with open_audio_chunks(args, delay_callback) as audio_chunk_iterator:
+            audio_chunks, trimmer = audio_chunk_iterator, None
+            if args.resample_rate is not None:
+                audio_chunk_iterator.update_config(config)
+            if args.trim_silence:
+                if args.resample_rate is not None:
+                    sample_width = 2  # Converted audio is 16 bit PCM.
+                else:
+                    sample_width = audio_chunk_iterator.file_parameters['sampwidth']
+                audio_chunks = trimmer = riva.client.SilenceTrimmer(
+                    audio_chunk_iterator,
+                    config.config.sample_rate_hertz,
+                    sample_width=sample_width,
+                    n_channels=config.config.audio_channel_count,
+                    min_silence=args.min_silence,
+                    hangover=args.silence_hangover,
+                    threshold_db=args.silence_threshold_db,
+                )
+            encoder = None
+            if args.encode_audio is not None:
+                audio_chunks = encoder = riva.client.AudioEncoder(
+                    audio_chunks,
+                    config.config.sample_rate_hertz,
+                    args.encode_audio,
+                    n_channels=config.config.audio_channel_count,
+                )
+                encoder.update_config(config)
+            responses = asr_service.streaming_response_generator(
+                audio_chunks=audio_chunks,
+                streaming_config=config,
+            )
+            if trimmer is not None:
+                responses = trimmer.timestamps.rebase_responses(responses)
             riva.client.print_streaming(
-                responses=asr_service.streaming_response_generator(
-                    audio_chunks=audio_chunk_iterator,
-                    streaming_config=config,
-                ),
+                responses=responses,
                 show_intermediate=args.show_intermediate,
                 additional_info="confidence" if args.print_confidence else "no",
             )
+            if trimmer is not None:
+                print(f"Silence trimming removed {trimmer.removed_fraction:.1%} of audio.")
+            if encoder is not None:
+                print(f"{args.encode_audio} encoding reduced audio size {encoder.compression_ratio:.1f} times.")
+            if result_cache is not None:
+                print(result_cache.stats)
     finally:
         if sound_callback is not None and sound_callback.opened:
             sound_callback.close()
@@ -1,9 +1,16 @@
 import argparse
+import mmap
+import wave
 from pathlib import Path
 
 import grpc
 import riva.client
-from riva.client.argparse_utils import add_asr_config_argparse_parameters, add_connection_argparse_parameters
+from riva.client.argparse_utils import (
+    add_asr_config_argparse_parameters,
+    add_connection_argparse_parameters,
+    add_result_cache_argparse_parameters,
+    add_silence_trimming_argparse_parameters,
+)
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -13,18 +20,99 @@ def parse_args() -> argparse.Namespace:
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser.add_argument("--input-file", required=True, type=Path, help="A path to a local file to transcribe.")
+    parser.add_argument(
+        "--segment-duration",
+        type=float,
+        default=0.0,
+        help="If positive, then a WAV file is split into segments of at most this duration in seconds which are "
+        "transcribed concurrently and stitched into one transcript. Useful for long files which exceed a message "
+        "size limit.",
+    )
+    parser.add_argument(
+        "--segment-overlap",
+        type=float,
+        default=0.0,
+        help="A duration in seconds by which neighboring segments overlap if `--segment-duration` is positive.",
+    )
+    parser.add_argument(
+        "--silence-search",
+        type=float,
+        default=2.0,
+        help="A duration in seconds at the end of every segment in which the quietest point is used as a cut point. "
+        "If 0, then segments are cut at fixed windows.",
+    )
+    parser.add_argument(
+        "--max-in-flight", type=int, default=4, help="A maximum number of segments transcribed concurrently."
+    )
     parser = add_connection_argparse_parameters(parser)
     parser = add_asr_config_argparse_parameters(parser, max_alternatives=True, profanity_filter=True, word_time_offsets=True)
+    parser = add_silence_trimming_argparse_parameters(parser)
+    parser = add_result_cache_argparse_parameters(parser)
 
     args = parser.parse_args()
+    if args.trim_silence and args.segment_duration > 0:
+        parser.error("`--trim-silence` is not supported with `--segment-duration`")
     args.input_file = args.input_file.expanduser()
     return args
 
 
+def recognize_segmented(
+    asr_service: riva.client.ASRService, config: riva.client.RecognitionConfig, args: argparse.Namespace
+) -> riva.client.proto.riva_asr_pb2.RecognizeResponse:
+    wav_parameters = riva.client.get_wav_file_parameters(args.input_file)
+    if wav_parameters is None:
+        raise ValueError("`--segment-duration` is supported only for WAV files.")
+    riva.client.add_audio_file_specs_to_config(config, args.input_file)
+    start = wav_parameters['data_offset']
+    end = start + wav_parameters['nframes'] * wav_parameters['sampwidth'] * wav_parameters['nchannels']
+    with args.input_file.open('rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view, view[start:end] as pcm:
+            return asr_service.offline_recognize_segmented(
+                pcm,
+                config,
+                segment_duration=args.segment_duration,
+                overlap=args.segment_overlap,
+                silence_search=args.silence_search,
+                max_in_flight=args.max_in_flight,
+                sample_width=wav_parameters['sampwidth'],
+            )
+
+
+def recognize_trimmed(
+    asr_service: riva.client.ASRService, config: riva.client.RecognitionConfig, args: argparse.Namespace
+) -> riva.client.proto.riva_asr_pb2.RecognizeResponse:
+    wav_parameters = riva.client.get_wav_file_parameters(args.input_file)
+    if wav_parameters is None:
+        raise ValueError("`--trim-silence` is supported only for WAV files.")
+    riva.client.add_audio_file_specs_to_config(config, args.input_file)
+    with wave.open(str(args.input_file), 'rb') as wav_f:
+        pcm = wav_f.readframes(wav_f.getnframes())
+    trimmed, timestamps = riva.client.trim_silence(
+        pcm,
+        wav_parameters['framerate'],
+        sample_width=wav_parameters['sampwidth'],
+        n_channels=wav_parameters['nchannels'],
+        min_silence=args.min_silence,
+        hangover=args.silence_hangover,
+        threshold_db=args.silence_threshold_db,
+    )
+    return timestamps.rebase_response(asr_service.offline_recognize(trimmed, config))
+
+
 def main() -> None:
     args = parse_args()
-    auth = riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata)
-    asr_service = riva.client.ASRService(auth)
+    auth = riva.client.Auth(
+        args.ssl_cert,
+        args.use_ssl,
+        args.server,
+        args.metadata,
+        channel_options=args.channel_options,
+        compression=args.compression,
+    )
+    result_cache = None
+    if args.result_cache is not None:
+        result_cache = riva.client.ResultCache(args.result_cache, args.result_cache_size * 1024**2)
+    asr_service = riva.client.ASRService(auth, result_cache=result_cache)
     config = riva.client.RecognitionConfig(
         language_code=args.language_code,
         max_alternatives=args.max_alternatives,
@@ -48,12 +136,19 @@ def main() -> None:
         args.stop_threshold_eou
     )
     
-    with args.input_file.open('rb') as fh:
-        data = fh.read()
     try:
-        riva.client.print_offline(response=asr_service.offline_recognize(data, config))
+        if args.segment_duration > 0:
+            riva.client.print_offline(response=recognize_segmented(asr_service, config, args))
+        elif args.trim_silence:
+            riva.client.print_offline(response=recognize_trimmed(asr_service, config, args))
+        else:
+            with args.input_file.open('rb') as fh:
+                data = fh.read()
+            riva.client.print_offline(response=asr_service.offline_recognize(data, config))
     except grpc.RpcError as e:
         print(e.details())
+    if result_cache is not None:
+        print(result_cache.stats)
 
 
 if __name__ == "__main__":
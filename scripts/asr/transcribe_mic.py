@@ -5,6 +5,7 @@ import argparse
 
 import riva.client
 from riva.client.argparse_utils import add_asr_config_argparse_parameters, add_connection_argparse_parameters
+from riva.client.capture import OVERFLOW_POLICIES
 
 import riva.client.audio_io
 
@@ -32,6 +33,27 @@ def parse_args() -> argparse.Namespace:
         default=1600,
         help="A maximum number of frames in a audio chunk sent to server.",
     )
+    parser.add_argument(
+        "--max-stream-duration",
+        type=float,
+        default=0.0,
+        help="If positive, a stream is closed at the first final result after this number of seconds and a new "
+        "stream continues transcription. A failed stream is reopened and audio after the last final result is "
+        "replayed. Use it for unbounded sessions which exceed server stream limits.",
+    )
+    parser.add_argument(
+        "--max-buffer-duration",
+        type=float,
+        help="If set, then captured audio is kept in a preallocated ring buffer of this duration in seconds and "
+        "audio which does not fit while a network stalls is handled according to `--overflow-policy`. By default "
+        "captured audio is queued without limit.",
+    )
+    parser.add_argument(
+        "--overflow-policy",
+        default="drop-oldest",
+        choices=OVERFLOW_POLICIES,
+        help="What to do with audio which does not fit into a buffer of `--max-buffer-duration`.",
+    )
     args = parser.parse_args()
     return args
 
@@ -41,7 +63,14 @@ def main() -> None:
     if args.list_devices:
         riva.client.audio_io.list_input_devices()
         return
-    auth = riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata)
+    auth = riva.client.Auth(
+        args.ssl_cert,
+        args.use_ssl,
+        args.server,
+        args.metadata,
+        channel_options=args.channel_options,
+        compression=args.compression,
+    )
     asr_service = riva.client.ASRService(auth)
     config = riva.client.StreamingRecognitionConfig(
         config=riva.client.RecognitionConfig(
@@ -75,14 +104,28 @@ def main() -> None:
         args.sample_rate_hz,
         args.file_streaming_chunk,
         device=args.input_device,
+        max_buffer_duration=args.max_buffer_duration,
+        overflow_policy=args.overflow_policy,
     ) as audio_chunk_iterator:
-        riva.client.print_streaming(
-            responses=asr_service.streaming_response_generator(
+        if args.max_stream_duration > 0:
+            responses = asr_service.rolling_streaming_response_generator(
+                audio_chunks=audio_chunk_iterator,
+                streaming_config=config,
+                max_stream_duration=args.max_stream_duration,
+            )
+        else:
+            responses = asr_service.streaming_response_generator(
                 audio_chunks=audio_chunk_iterator,
                 streaming_config=config,
-            ),
-            show_intermediate=True,
-        )
+            )
+        try:
+            riva.client.print_streaming(
+                responses=responses,
+                show_intermediate=True,
+            )
+        finally:
+            if audio_chunk_iterator.stats is not None:
+                print(f"Capture: {audio_chunk_iterator.stats}")
 
 
 if __name__ == '__main__':
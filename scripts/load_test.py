@@ -0,0 +1,177 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import argparse
+import json
+import wave
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import riva.client
+from riva.client.argparse_utils import add_connection_argparse_parameters
+from riva.client.loadgen import ARRIVAL_PROCESSES, LoadGenerator, Workload
+
+
+WORKLOAD_TYPES = ['asr_streaming', 'asr_offline', 'tts', 'tts_online', 'nlp_punctuation', 'nmt']
+
+
+def parse_workload(value: str) -> tuple:
+    name, _, weight = value.partition(':')
+    if name not in WORKLOAD_TYPES:
+        raise argparse.ArgumentTypeError(f"workload has to be one of {WORKLOAD_TYPES}, whereas '{name}' was given")
+    try:
+        return name, float(weight) if weight else 1.0
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"weight of workload '{name}' is not a number: '{weight}'")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Open loop load test of Riva AI Services. Requests arrive at a given rate whether or not previous "
+        "requests are finished, so queueing delay shows up in latencies. Latencies are measured from scheduled "
+        "arrival times. Requests which arrive during `--warmup` are not measured.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--workload",
+        action="append",
+        type=parse_workload,
+        help=f"A workload in format `<type>[:<weight>]`, where type is one of {WORKLOAD_TYPES}. Can be used several "
+        f"times for a mixed load. Workloads are chosen for arrivals with probabilities proportional to weights. "
+        f"By default only `asr_streaming` is used.",
+    )
+    parser.add_argument("--rate", type=float, required=True, help="A mean number of requests per second.")
+    parser.add_argument("--duration", type=float, default=60.0, help="A duration of measurement in seconds.")
+    parser.add_argument("--warmup", type=float, default=10.0, help="A duration of warm-up before measurement.")
+    parser.add_argument("--arrival", default="poisson", choices=ARRIVAL_PROCESSES, help="An arrival process.")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=256,
+        help="A maximum number of concurrent requests. Arrivals above this limit are reported as `CLIENT_OVERLOADED`.",
+    )
+    parser.add_argument("--seed", type=int, help="A seed of arrival times and workload choices.")
+    parser.add_argument("--input-file", type=Path, help="A WAV file with LINEAR_PCM encoding for ASR workloads.")
+    parser.add_argument(
+        "--file-streaming-chunk", type=int, default=1600, help="Number of frames in one chunk of ASR streams."
+    )
+    parser.add_argument(
+        "--simulate-realtime",
+        action="store_true",
+        help="Send audio of ASR streams at real time pace. Otherwise audio is sent as fast as possible.",
+    )
+    parser.add_argument(
+        "--text",
+        default="The quick brown fox jumps over the lazy dog.",
+        help="A text for TTS, NLP and NMT workloads.",
+    )
+    parser.add_argument("--language-code", default="en-US", help="A language of ASR, TTS and NLP requests.")
+    parser.add_argument("--voice", help="A TTS voice. By default a server chooses a voice.")
+    parser.add_argument("--sample-rate-hz", type=int, default=44100, help="A sample rate of synthesized audio.")
+    parser.add_argument("--nmt-model", default="", help="An NMT model name.")
+    parser.add_argument("--source-language-code", default="en", help="A source language of NMT requests.")
+    parser.add_argument("--target-language-code", default="de", help="A target language of NMT requests.")
+    parser.add_argument(
+        "--mock-server",
+        action="store_true",
+        help="Run against an in-process `riva.client.testing.MockRivaServer` instead of `--server` to measure "
+        "overhead of the client itself.",
+    )
+    parser.add_argument("--report-json", type=Path, help="A path to a JSON report.")
+    parser.add_argument("--report-markdown", type=Path, help="A path to a Markdown report.")
+    parser = add_connection_argparse_parameters(parser)
+    args = parser.parse_args()
+    if args.workload is None:
+        args.workload = [('asr_streaming', 1.0)]
+    if args.input_file is None and any(name.startswith('asr') for name, _ in args.workload):
+        parser.error("`--input-file` is required for ASR workloads")
+    return args
+
+
+def create_workload_calls(args: argparse.Namespace, auth: riva.client.Auth) -> Dict[str, Callable[[], None]]:
+    asr_service = riva.client.ASRService(auth)
+    tts_service = riva.client.SpeechSynthesisService(auth)
+    nlp_service = riva.client.NLPService(auth)
+    nmt_client = riva.client.NeuralMachineTranslationClient(auth)
+    calls = {}
+    if args.input_file is not None:
+        with wave.open(str(args.input_file), 'rb') as wav_f:
+            audio = wav_f.readframes(wav_f.getnframes())
+        asr_config = riva.client.RecognitionConfig(language_code=args.language_code, max_alternatives=1)
+        riva.client.add_audio_file_specs_to_config(asr_config, args.input_file)
+        streaming_config = riva.client.StreamingRecognitionConfig(config=asr_config, interim_results=True)
+
+        def asr_streaming() -> None:
+            with riva.client.AudioChunkFileIterator(
+                args.input_file,
+                args.file_streaming_chunk,
+                delay_callback=riva.client.RealTimePacer() if args.simulate_realtime else None,
+            ) as audio_chunks:
+                for _ in asr_service.streaming_response_generator(audio_chunks, streaming_config):
+                    pass
+
+        calls['asr_streaming'] = asr_streaming
+        calls['asr_offline'] = lambda: asr_service.offline_recognize(audio, asr_config)
+
+    def tts_online() -> None:
+        for _ in tts_service.synthesize_online(
+            args.text, args.voice, args.language_code, sample_rate_hz=args.sample_rate_hz
+        ):
+            pass
+
+    calls['tts'] = lambda: tts_service.synthesize(
+        args.text, args.voice, args.language_code, sample_rate_hz=args.sample_rate_hz
+    )
+    calls['tts_online'] = tts_online
+    calls['nlp_punctuation'] = lambda: nlp_service.punctuate_text([args.text], language_code=args.language_code)
+    calls['nmt'] = lambda: nmt_client.translate(
+        [args.text], args.nmt_model, args.source_language_code, args.target_language_code
+    )
+    return calls
+
+
+def main() -> None:
+    args = parse_args()
+    mock_server = None
+    if args.mock_server:
+        from riva.client.testing import MockRivaServer
+
+        mock_server = MockRivaServer(max_workers=args.max_in_flight).start()
+        args.server = mock_server.address
+    auth = riva.client.Auth(
+        args.ssl_cert,
+        args.use_ssl,
+        args.server,
+        args.metadata,
+        channel_options=args.channel_options,
+        compression=args.compression,
+    )
+    calls = create_workload_calls(args, auth)
+    workloads: List[Workload] = [Workload(name, calls[name], weight) for name, weight in args.workload]
+    generator = LoadGenerator(
+        workloads,
+        rate=args.rate,
+        duration=args.duration,
+        warmup=args.warmup,
+        process=args.arrival,
+        max_in_flight=args.max_in_flight,
+        seed=args.seed,
+    )
+    print(f"Running {args.warmup:g}s warm-up and {args.duration:g}s measurement at {args.rate:g} requests/s")
+    try:
+        report = generator.run()
+    finally:
+        auth.close()
+        if mock_server is not None:
+            mock_server.stop()
+    markdown = report.to_markdown()
+    print(markdown)
+    if args.report_markdown is not None:
+        args.report_markdown.expanduser().write_text(markdown)
+    if args.report_json is not None:
+        with args.report_json.expanduser().open('w') as f:
+            json.dump(report.as_dict(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
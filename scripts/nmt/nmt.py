@@ -121,7 +121,14 @@ def main() -> None:
 
     args = parse_args()
 
-    auth = riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata)
+    auth = riva.client.Auth(
+        args.ssl_cert,
+        args.use_ssl,
+        args.server,
+        args.metadata,
+        channel_options=args.channel_options,
+        compression=args.compression,
+    )
     nmt_client = riva.client.NeuralMachineTranslationClient(auth)
 
     if args.list_models:
@@ -82,7 +82,14 @@ def main() -> None:
         riva.client.audio_io.list_output_devices()
         return
 
-    auth = riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata)
+    auth = riva.client.Auth(
+        args.ssl_cert,
+        args.use_ssl,
+        args.server,
+        args.metadata,
+        channel_options=args.channel_options,
+        compression=args.compression,
+    )
     service = riva.client.SpeechSynthesisService(auth)
     nchannels = 1
     sampwidth = 2
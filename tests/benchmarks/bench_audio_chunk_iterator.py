@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+Compares throughput and memory allocations of reading and mmap-backed modes of
+:class:`riva.client.asr.AudioChunkFileIterator`.
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_audio_chunk_iterator.py --duration 600 --chunk-frames 1600
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.asr import AudioChunkFileIterator, streaming_request_generator
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark of reading and mmap-backed modes of AudioChunkFileIterator.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--duration", type=float, default=600.0, help="Duration of a generated WAV file in seconds.")
+    parser.add_argument("--sample-rate-hz", type=int, default=16000, help="Sample rate of a generated WAV file.")
+    parser.add_argument("--chunk-frames", type=int, default=1600, help="A number of frames in one chunk.")
+    parser.add_argument("--repeats", type=int, default=5, help="A number of runs of each mode. Best time is reported.")
+    return parser.parse_args()
+
+
+def write_wav(path: Path, duration: float, sample_rate_hz: int) -> None:
+    n_frames = int(duration * sample_rate_hz)
+    block = bytes(range(256)) * 128
+    with wave.open(str(path), 'wb') as wav_f:
+        wav_f.setnchannels(1)
+        wav_f.setsampwidth(2)
+        wav_f.setframerate(sample_rate_hz)
+        remaining = n_frames * 2
+        while remaining > 0:
+            wav_f.writeframes(block[:remaining])
+            remaining -= len(block)
+
+
+def consume_chunks(path: Path, chunk_frames: int, use_mmap: bool) -> int:
+    n_bytes = 0
+    with AudioChunkFileIterator(path, chunk_frames, use_mmap=use_mmap) as chunks:
+        for chunk in chunks:
+            n_bytes += len(chunk)
+    return n_bytes
+
+
+def consume_requests(path: Path, chunk_frames: int, use_mmap: bool) -> int:
+    n_bytes = 0
+    with AudioChunkFileIterator(path, chunk_frames, use_mmap=use_mmap) as chunks:
+        for request in streaming_request_generator(chunks, rasr.StreamingRecognitionConfig()):
+            n_bytes += len(request.audio_content)
+    return n_bytes
+
+
+def measure(func, path: Path, chunk_frames: int, use_mmap: bool, repeats: int) -> dict:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        n_bytes = func(path, chunk_frames, use_mmap)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(path, chunk_frames, use_mmap)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'seconds': best,
+        'throughput_mb_s': n_bytes / best / 2**20,
+        'peak_kb': peak / 2**10,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "benchmark.wav"
+        write_wav(path, args.duration, args.sample_rate_hz)
+        print(f"File size: {path.stat().st_size / 2**20:.1f} MB, chunk: {args.chunk_frames} frames")
+        print(f"{'scenario':<10} {'mode':<6} {'time, s':>10} {'MB/s':>10} {'peak, KB':>10}")
+        for name, func in [('chunks', consume_chunks), ('requests', consume_requests)]:
+            for use_mmap in [False, True]:
+                result = measure(func, path, args.chunk_frames, use_mmap, args.repeats)
+                print(
+                    f"{name:<10} {'mmap' if use_mmap else 'read':<6} {result['seconds']:>10.4f} "
+                    f"{result['throughput_mb_s']:>10.1f} {result['peak_kb']:>10.1f}"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,404 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+Microbenchmarks of client hot paths. Every benchmark measures the client code alone: gRPC stubs are replaced with
+functions which return prepared responses. For every benchmark ops/s and allocations of one operation are reported:
+peak memory allocated during an operation, which includes temporary objects, and a number of memory blocks which
+an operation allocates and which are alive when it returns. CPython does not count allocations, so blocks which are
+freed before an operation returns are visible only in the peak. Results can be saved as a baseline and compared
+with it.
+
+.. code-block:: bash
+
+    python tests/benchmarks/run_microbenchmarks.py --save-baseline tests/benchmarks/baseline.json
+    python tests/benchmarks/run_microbenchmarks.py --baseline tests/benchmarks/baseline.json --tolerance 0.2
+
+Absolute numbers depend on a machine, so a baseline should be saved on the machine where comparisons are made.
+"""
+
+import argparse
+import io
+import json
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import grpc
+
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_nlp_pb2 as rnlp
+import riva.client.proto.riva_nmt_pb2 as rnmt
+import riva.client.proto.riva_tts_pb2 as rtts
+from riva.client import nlp
+from riva.client.asr import (
+    AudioChunkFileIterator,
+    framed_streaming_request_generator,
+    print_streaming,
+    streaming_request_generator,
+)
+from riva.client.capture import AudioRingBuffer
+from riva.client.codecs import AudioEncoder, soundfile
+from riva.client.nmt import add_dnt_phrases_dict
+from riva.client.results import RESULT_FIELDS, compact_responses
+from riva.client.sinks import PRINT_STREAMING_ADDITIONAL_INFO_MODES
+from riva.client.tts import SpeechSynthesisService, add_custom_dictionary_to_config
+from riva.client.vad import SilenceTrimmer
+from riva.client.wire import serialize_request
+
+try:
+    from riva.client.resampling import AudioConverter
+except ImportError:  # NumPy is not installed
+    AudioConverter = None
+
+
+# A benchmark setup receives a temporary directory and returns an operation to measure.
+BENCHMARKS: Dict[str, Callable[[Path], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    def register(setup: Callable[[Path], Callable[[], Any]]) -> Callable[[Path], Callable[[], Any]]:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+class FakeAuth:
+    """Provides a channel and metadata to services. The channel never connects because stubs are replaced."""
+    def __init__(self) -> None:
+        self.channel = grpc.insecure_channel('localhost:1')
+
+    def get_auth_metadata(self) -> List:
+        return []
+
+
+def streaming_responses(
+    n_utterances: int = 5, partials_per_utterance: int = 10
+) -> List[rasr.StreamingRecognizeResponse]:
+    responses = []
+    words = ["the", "quick", "brown", "fox", "jumps", "over", "the", "lazy", "dog"]
+    for u in range(n_utterances):
+        for p in range(partials_per_utterance + 1):
+            is_final = p == partials_per_utterance
+            n_words = len(words) if is_final else 1 + p * (len(words) - 1) // partials_per_utterance
+            alternative = rasr.SpeechRecognitionAlternative(
+                transcript=" ".join(words[:n_words]),
+                confidence=0.9,
+                words=[
+                    rasr.WordInfo(word=word, start_time=u * 5000 + i * 300, end_time=u * 5000 + i * 300 + 250)
+                    for i, word in enumerate(words[:n_words])
+                ],
+            )
+            responses.append(
+                rasr.StreamingRecognizeResponse(
+                    results=[
+                        rasr.StreamingRecognitionResult(
+                            alternatives=[alternative],
+                            is_final=is_final,
+                            stability=0.9,
+                            audio_processed=u * 5 + p * 0.4,
+                        )
+                    ]
+                )
+            )
+    return responses
+
+
+def write_wav(path: Path, duration: float, sample_rate_hz: int = 16000) -> None:
+    with wave.open(str(path), 'wb') as wav_f:
+        wav_f.setnchannels(1)
+        wav_f.setsampwidth(2)
+        wav_f.setframerate(sample_rate_hz)
+        wav_f.writeframes(bytes(int(duration * sample_rate_hz) * 2))
+
+
+@benchmark('asr.streaming_request_generator')
+def setup_streaming_request_generator(tmp_dir: Path) -> Callable[[], Any]:
+    chunks = [bytes(3200)] * 100
+    config = rasr.StreamingRecognitionConfig(config=rasr.RecognitionConfig(sample_rate_hertz=16000))
+    return lambda: sum(1 for _ in streaming_request_generator(chunks, config))
+
+
+# Requests are serialized as gRPC does it, so that the whole client cost of a stream of 100 chunks is compared.
+for _framed in [False, True]:
+
+    @benchmark(f"asr.serialized_stream[{'framed' if _framed else 'message'}]")
+    def setup_serialized_stream(tmp_dir: Path, framed: bool = _framed) -> Callable[[], Any]:
+        chunks = [bytes(3200)] * 100
+        config = rasr.StreamingRecognitionConfig(config=rasr.RecognitionConfig(sample_rate_hertz=16000))
+        generator = framed_streaming_request_generator if framed else streaming_request_generator
+        return lambda: sum(len(serialize_request(request)) for request in generator(chunks, config))
+
+
+for _use_mmap in [False, True]:
+
+    @benchmark(f"asr.AudioChunkFileIterator[{'mmap' if _use_mmap else 'read'}]")
+    def setup_audio_chunk_file_iterator(tmp_dir: Path, use_mmap: bool = _use_mmap) -> Callable[[], Any]:
+        path = tmp_dir / "audio.wav"
+        if not path.exists():
+            write_wav(path, 10.0)
+
+        def op() -> int:
+            with AudioChunkFileIterator(path, 1600, use_mmap=use_mmap) as chunks:
+                return sum(len(chunk) for chunk in chunks)
+
+        return op
+
+
+for _mode in PRINT_STREAMING_ADDITIONAL_INFO_MODES:
+
+    @benchmark(f"asr.print_streaming[{_mode}]")
+    def setup_print_streaming(tmp_dir: Path, mode: str = _mode) -> Callable[[], Any]:
+        responses = streaming_responses()
+        return lambda: print_streaming(
+            responses, output_file=io.StringIO(), additional_info=mode, word_time_offsets=mode == 'time'
+        )
+
+
+@benchmark('asr.compact_responses')
+def setup_compact_responses(tmp_dir: Path) -> Callable[[], Any]:
+    responses = streaming_responses()
+    return lambda: sum(1 for _ in compact_responses(responses, RESULT_FIELDS, finals_only=False))
+
+
+@benchmark('vad.SilenceTrimmer')
+def setup_silence_trimmer(tmp_dir: Path) -> Callable[[], Any]:
+    # 2 seconds of audio with speech in every other 0.5 second.
+    speech = b''.join(struct.pack('<h', (i % 64 - 32) * 256) for i in range(8000))
+    chunks = [speech, bytes(16000)] * 2
+    return lambda: sum(len(chunk) for chunk in SilenceTrimmer(chunks, 16000, min_silence=0.2, hangover=0.1))
+
+
+if AudioConverter is not None:
+
+    @benchmark('resampling.AudioConverter[48k stereo]')
+    def setup_audio_converter(tmp_dir: Path) -> Callable[[], Any]:
+        # 1 second of audio in 0.1 second chunks.
+        chunks = [bytes(range(256)) * 75] * 10
+        return lambda: sum(len(chunk) for chunk in AudioConverter(chunks, 48000, input_channels=2))
+
+
+@benchmark('capture.AudioRingBuffer')
+def setup_audio_ring_buffer(tmp_dir: Path) -> Callable[[], Any]:
+    # 1 second of 10 ms capture callbacks read in 0.1 second chunks through a 0.5 second buffer.
+    callback_data = bytes(320)
+
+    def op() -> int:
+        ring = AudioRingBuffer(16000, 3200)
+        n_bytes = 0
+        for i in range(100):
+            ring.write(callback_data)
+            if i % 10 == 9:
+                n_bytes += len(ring.read_chunk())
+        return n_bytes
+
+    return op
+
+
+@benchmark('codecs.AudioEncoder[MULAW]')
+def setup_mulaw_encoder(tmp_dir: Path) -> Callable[[], Any]:
+    # 1 second of audio in 0.1 second chunks.
+    chunks = [bytes(range(256)) * 12 + bytes(128)] * 10
+    return lambda: sum(len(chunk) for chunk in AudioEncoder(chunks, 16000, 'MULAW'))
+
+
+if soundfile is not None:
+
+    @benchmark('codecs.AudioEncoder[FLAC]')
+    def setup_flac_encoder(tmp_dir: Path) -> Callable[[], Any]:
+        chunks = [bytes(range(256)) * 12 + bytes(128)] * 10
+        return lambda: sum(len(chunk) for chunk in AudioEncoder(chunks, 16000, 'FLAC'))
+
+
+@benchmark('nlp.extract_text_classes')
+def setup_extract_text_classes(tmp_dir: Path) -> Callable[[], Any]:
+    response = rnlp.TextClassResponse(
+        results=[
+            rnlp.ClassificationResult(
+                labels=[rnlp.Classification(class_name=f"class_{i}", score=1 / (i + 1)) for i in range(5)]
+            )
+            for _ in range(32)
+        ]
+    )
+
+    def op() -> Any:
+        nlp.extract_all_text_classes_and_confidences(response)
+        return nlp.extract_most_probable_text_class_and_confidence(response)
+
+    return op
+
+
+@benchmark('nlp.extract_token_classification')
+def setup_extract_token_classification(tmp_dir: Path) -> Callable[[], Any]:
+    response = rnlp.TokenClassResponse(
+        results=[
+            rnlp.TokenClassSequence(
+                results=[
+                    rnlp.TokenClassValue(
+                        token=f"token{t}",
+                        label=[rnlp.Classification(class_name="LOC", score=0.9)],
+                        span=[rnlp.Span(start=t * 7, end=t * 7 + 6)],
+                    )
+                    for t in range(20)
+                ]
+            )
+            for _ in range(8)
+        ]
+    )
+
+    def op() -> Any:
+        nlp.extract_all_token_classification_predictions(response)
+        return nlp.extract_most_probable_token_classification_predictions(response)
+
+    return op
+
+
+@benchmark('nlp.extract_transformed_texts')
+def setup_extract_transformed_texts(tmp_dir: Path) -> Callable[[], Any]:
+    response = rnlp.TextTransformResponse(text=[f"Sentence number {i}." for i in range(32)])
+
+    def op() -> Any:
+        nlp.extract_all_transformed_texts(response)
+        return nlp.extract_most_probable_transformed_text(response)
+
+    return op
+
+
+@benchmark('nmt.add_dnt_phrases_dict')
+def setup_add_dnt_phrases_dict(tmp_dir: Path) -> Callable[[], Any]:
+    phrases = {f"phrase {i}": f"translation {i}" for i in range(50)}
+    return lambda: add_dnt_phrases_dict(rnmt.TranslateTextRequest(), phrases)
+
+
+@benchmark('tts.add_custom_dictionary_to_config')
+def setup_add_custom_dictionary_to_config(tmp_dir: Path) -> Callable[[], Any]:
+    dictionary = {f"word{i}": f"W ER1 D {i}" for i in range(50)}
+    return lambda: add_custom_dictionary_to_config(rtts.SynthesizeSpeechRequest(), dictionary)
+
+
+@benchmark('tts.synthesize')
+def setup_synthesize(tmp_dir: Path) -> Callable[[], Any]:
+    service = SpeechSynthesisService(FakeAuth())
+    response = rtts.SynthesizeSpeechResponse(audio=bytes(44100))
+    service.stub.Synthesize = lambda request, metadata=None, **kwargs: response
+    return lambda: service.synthesize(
+        "The quick brown fox jumps over the lazy dog.", "English-US.Female-1", custom_dictionary={"fox": "F AA1 K S"}
+    )
+
+
+def measure(op: Callable[[], Any], min_time: float, repeats: int, traced_ops: int = 50) -> Dict[str, float]:
+    """
+    Returns best ops/s of :param:`repeats` batches and allocations of an operation averaged over :param:`traced_ops`
+    traced operations: peak memory allocated during an operation above memory at its start, and a number of blocks
+    allocated by an operation and alive at its end.
+    """
+    n_ops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(n_ops):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        n_ops = max(n_ops * 2, int(n_ops * min_time / max(elapsed, 1e-9) * 1.2))
+    best = elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(n_ops):
+            op()
+        best = min(best, time.perf_counter() - start)
+    traced_ops = max(min(traced_ops, n_ops), 1)
+    # Blocks of snapshots themselves are excluded from comparisons.
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    total_peak = 0
+    new_blocks = 0
+    tracemalloc.start()
+    # The first iteration is not counted, because filtering and comparison of snapshots cache compiled patterns.
+    for i in range(traced_ops + 1):
+        before = tracemalloc.take_snapshot().filter_traces(filters)
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        op()
+        peak = tracemalloc.get_traced_memory()[1] - start_memory
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+        if i > 0:
+            total_peak += peak
+            # Differences are summed by line, so blocks freed on one line do not offset blocks allocated on another.
+            new_blocks += sum(max(stat.count_diff, 0) for stat in after.compare_to(before, 'lineno'))
+    tracemalloc.stop()
+    return {
+        'ops_per_s': n_ops / best,
+        'us_per_op': best / n_ops * 1e6,
+        'peak_kb_per_op': total_peak / traced_ops / 2**10,
+        'new_blocks_per_op': new_blocks / traced_ops,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Returns names of benchmarks whose ops/s dropped below the baseline by more than :param:`tolerance`."""
+    regressions = []
+    for name, result in results.items():
+        if name in baseline and result['ops_per_s'] < baseline[name]['ops_per_s'] * (1 - tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Microbenchmarks of client hot paths with comparison against a baseline.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--filter", help="Run only benchmarks whose names contain this string.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="A minimum duration of one measured batch.")
+    parser.add_argument("--repeats", type=int, default=5, help="A number of measured batches. Best one is reported.")
+    parser.add_argument("--output", type=Path, help="A path to a JSON file with results.")
+    parser.add_argument("--save-baseline", type=Path, help="A path to which results are saved as a baseline.")
+    parser.add_argument("--baseline", type=Path, help="A path to a baseline to compare with.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="An allowed relative drop of ops/s against a baseline. The script exits with code 1 if it is exceeded.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    baseline: Optional[Dict[str, Dict[str, float]]] = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+    results = {}
+    header = f"{'benchmark':<42} {'ops/s':>12} {'us/op':>10} {'peak KB/op':>10} {'blocks/op':>10}"
+    print(header + (f" {'vs baseline':>12}" if baseline is not None else ""))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, setup in BENCHMARKS.items():
+            if args.filter and args.filter not in name:
+                continue
+            result = measure(setup(Path(tmp_dir)), args.min_time, args.repeats)
+            results[name] = result
+            line = (
+                f"{name:<42} {result['ops_per_s']:>12.1f} {result['us_per_op']:>10.2f} "
+                f"{result['peak_kb_per_op']:>10.2f} {result['new_blocks_per_op']:>10.2f}"
+            )
+            if baseline is not None and name in baseline:
+                line += f" {result['ops_per_s'] / baseline[name]['ops_per_s'] - 1:>+12.1%}"
+            print(line)
+    for path in [args.output, args.save_baseline]:
+        if path is not None:
+            path.write_text(json.dumps(results, indent=2) + "\n")
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressions over {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from typing import AsyncGenerator, List
+from unittest.mock import AsyncMock, Mock, patch
+
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_nlp_pb2 as rnlp
+import riva.client.proto.riva_tts_pb2 as rtts
+from riva.client.aio import ASRService, NLPService, SpeechSynthesisService
+
+from .helpers import set_auth_mock
+
+
+AUDIO_CHUNKS = [b'a' * 100, b'b' * 100, b'c' * 100]
+RECOGNITION_CONFIG = rasr.RecognitionConfig()
+STREAMING_RECOGNITION_CONFIG = rasr.StreamingRecognitionConfig()
+RECOGNIZE_RESPONSE = rasr.RecognizeResponse()
+TEXT_CLASS_RESPONSE = rnlp.TextClassResponse()
+SYNTHESIZE_RESPONSE = rtts.SynthesizeSpeechResponse()
+
+
+class StreamingCallMock:
+    """Consumes requests like a server and returns a response for every audio chunk."""
+    def __init__(self) -> None:
+        self.requests: List[rasr.StreamingRecognizeRequest] = []
+
+    def __call__(self, requests, metadata=None) -> AsyncGenerator[rasr.StreamingRecognizeResponse, None]:
+        async def responses():
+            async for request in requests:
+                self.requests.append(request)
+                if request.audio_content:
+                    yield rasr.StreamingRecognizeResponse()
+        return responses()
+
+
+async def async_audio_chunks() -> AsyncGenerator[bytes, None]:
+    for chunk in AUDIO_CHUNKS:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+def riva_asr_stub_init_patch(self, channel):
+    self.Recognize = AsyncMock(return_value=RECOGNIZE_RESPONSE)
+    self.StreamingRecognize = StreamingCallMock()
+
+
+def riva_nlp_stub_init_patch(self, channel):
+    self.ClassifyText = AsyncMock(return_value=TEXT_CLASS_RESPONSE)
+
+
+def riva_tts_stub_init_patch(self, channel):
+    async def synthesize_online(request, metadata=None):
+        for _ in range(3):
+            yield SYNTHESIZE_RESPONSE
+    self.SynthesizeOnline = Mock(side_effect=synthesize_online)
+
+
+@patch("riva.client.proto.riva_asr_pb2_grpc.RivaSpeechRecognitionStub.__init__", riva_asr_stub_init_patch)
+class TestASRService:
+    def test_offline_recognize(self) -> None:
+        auth, return_value_of_get_auth_metadata = set_auth_mock()
+        service = ASRService(auth)
+        resp = asyncio.run(service.offline_recognize(AUDIO_CHUNKS[0], RECOGNITION_CONFIG))
+        assert resp is RECOGNIZE_RESPONSE
+        service.stub.Recognize.assert_awaited_with(
+            rasr.RecognizeRequest(config=RECOGNITION_CONFIG, audio=AUDIO_CHUNKS[0]),
+            metadata=return_value_of_get_auth_metadata,
+        )
+
+    def test_streaming_response_generator(self) -> None:
+        auth, _ = set_auth_mock()
+        service = ASRService(auth)
+
+        async def collect(audio_chunks):
+            return [r async for r in service.streaming_response_generator(audio_chunks, STREAMING_RECOGNITION_CONFIG)]
+
+        for audio_chunks in [AUDIO_CHUNKS, async_audio_chunks()]:
+            service.stub.StreamingRecognize.requests.clear()
+            responses = asyncio.run(collect(audio_chunks))
+            assert len(responses) == len(AUDIO_CHUNKS)
+            requests = service.stub.StreamingRecognize.requests
+            assert requests[0].HasField('streaming_config')
+            assert [r.audio_content for r in requests[1:]] == AUDIO_CHUNKS
+
+
+@patch("riva.client.proto.riva_nlp_pb2_grpc.RivaLanguageUnderstandingStub.__init__", riva_nlp_stub_init_patch)
+def test_concurrent_classify_text() -> None:
+    auth, _ = set_auth_mock()
+    service = NLPService(auth)
+
+    async def classify():
+        return await asyncio.gather(*[service.classify_text(f"text {i}", 'model') for i in range(10)])
+
+    assert asyncio.run(classify()) == [TEXT_CLASS_RESPONSE] * 10
+    assert service.stub.ClassifyText.await_count == 10
+
+
+@patch("riva.client.proto.riva_tts_pb2_grpc.RivaSpeechSynthesisStub.__init__", riva_tts_stub_init_patch)
+def test_synthesize_online() -> None:
+    auth, _ = set_auth_mock()
+    service = SpeechSynthesisService(auth)
+
+    async def collect():
+        return [r async for r in service.synthesize_online("Hello", "voice")]
+
+    assert len(asyncio.run(collect())) == 3
+    assert service.stub.SynthesizeOnline.call_args.args[0].voice_name == "voice"
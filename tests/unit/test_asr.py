@@ -1,13 +1,27 @@
 # SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
 # SPDX-License-Identifier: MIT
 
+import concurrent.futures
+import mmap
+import threading
+import wave
 from math import ceil
+from pathlib import Path
 from typing import Any, Generator, List, Union
-from unittest.mock import patch, Mock
+from unittest.mock import AsyncMock, patch, Mock
+
+import grpc
+import pytest
 
 import riva.client.proto.riva_asr_pb2 as rasr
-from riva.client import ASRService
-from riva.client.asr import streaming_request_generator
+from riva.client import ASRService, ResultSink
+from riva.client.asr import (
+    AudioChunkFileIterator,
+    RealTimePacer,
+    StreamingSessionManager,
+    streaming_request_generator,
+)
+from riva.client.wire import AudioRequestFramer
 
 from .helpers import set_auth_mock
 
@@ -64,6 +78,15 @@ class TestSpeechSynthesisService:
         assert isinstance(resp, rasr.RecognizeResponse)
         RECOGNIZE_MOCK.assert_called_with(RECOGNIZE_REQUEST, metadata=return_value_of_get_auth_metadata)
 
+    def test_offline_recognize_compression(self) -> None:
+        auth, return_value_of_get_auth_metadata = set_auth_mock()
+        service = ASRService(auth)
+        RECOGNIZE_MOCK.reset_mock()
+        service.offline_recognize(AUDIO_BYTES_1_SECOND, config=RECOGNITION_CONFIG, compression='gzip')
+        RECOGNIZE_MOCK.assert_called_with(
+            RECOGNIZE_REQUEST, metadata=return_value_of_get_auth_metadata, compression=grpc.Compression.Gzip
+        )
+
     def test_offline_recognize_future(self) -> None:
         auth, return_value_of_get_auth_metadata = set_auth_mock()
         service = ASRService(auth)
@@ -73,6 +96,61 @@ class TestSpeechSynthesisService:
         assert isinstance(resp, rasr.RecognizeResponse)
         RECOGNIZE_MOCK.future.assert_called_with(RECOGNIZE_REQUEST, metadata=return_value_of_get_auth_metadata)
 
+    def test_offline_recognize_segmented(self) -> None:
+        auth, return_value_of_get_auth_metadata = set_auth_mock()
+        service = ASRService(auth)
+        requests = []
+
+        def recognize_future(request, metadata):
+            requests.append(request)
+            # Every segment contains one word at its start.
+            response = rasr.RecognizeResponse(
+                results=[
+                    rasr.SpeechRecognitionResult(
+                        alternatives=[
+                            rasr.SpeechRecognitionAlternative(
+                                transcript=f"word{len(requests)}",
+                                words=[rasr.WordInfo(word=f"word{len(requests)}", start_time=10, end_time=50)],
+                            )
+                        ]
+                    )
+                ]
+            )
+            return Mock(result=Mock(return_value=response))
+
+        service.stub.Recognize = Mock()
+        service.stub.Recognize.future = Mock(side_effect=recognize_future)
+        config = rasr.RecognitionConfig(sample_rate_hertz=SAMPLE_RATE_HZ, audio_channel_count=1)
+        response = service.offline_recognize_segmented(
+            memoryview(AUDIO_BYTES_1_SECOND), config, segment_duration=0.4, silence_search=0.0, max_in_flight=2
+        )
+        assert [len(request.audio) for request in requests] == [35280, 35280, 17640]
+        assert all(not request.config.enable_word_time_offsets for request in requests)
+        assert [result.alternatives[0].transcript for result in response.results] == ["word1", "word2", "word3"]
+        assert not response.results[1].alternatives[0].words
+
+    def test_offline_recognize_segmented_requires_sample_rate(self) -> None:
+        auth, _ = set_auth_mock()
+        service = ASRService(auth)
+        with pytest.raises(ValueError):
+            service.offline_recognize_segmented(AUDIO_BYTES_1_SECOND, RECOGNITION_CONFIG)
+
+    def test_offline_recognize_segmented_error_releases_memory_mapped_audio(self, tmp_path: Path) -> None:
+        auth, _ = set_auth_mock()
+        service = ASRService(auth)
+        service.stub.Recognize = Mock()
+        service.stub.Recognize.future = Mock(
+            return_value=Mock(result=Mock(side_effect=FakeRpcError(grpc.StatusCode.UNAVAILABLE)))
+        )
+        config = rasr.RecognitionConfig(sample_rate_hertz=SAMPLE_RATE_HZ, audio_channel_count=1)
+        audio_file = tmp_path / 'audio.raw'
+        audio_file.write_bytes(AUDIO_BYTES_1_SECOND)
+        # An error of a request has to reach a caller instead of `BufferError` raised when the mmap is closed.
+        with pytest.raises(grpc.RpcError):
+            with audio_file.open('rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view, view[100:] as pcm:
+                    service.offline_recognize_segmented(pcm, config, segment_duration=0.4, silence_search=0.1)
+
     def test_streaming_response_generator(self) -> None:
         auth, return_value_of_get_auth_metadata = set_auth_mock()
         service = ASRService(auth)
@@ -92,3 +170,341 @@ class TestSpeechSynthesisService:
         assert len(STREAMING_RECOGNIZE_MOCK.call_args.kwargs) == 1
         assert 'metadata' in STREAMING_RECOGNIZE_MOCK.call_args.kwargs
         assert STREAMING_RECOGNIZE_MOCK.call_args.kwargs['metadata'] == return_value_of_get_auth_metadata
+
+
+def write_wav(path: Path, n_frames: int, nchannels: int = 1) -> bytes:
+    frames = bytes(i % 256 for i in range(n_frames * SAMPLE_WIDTH * nchannels))
+    with wave.open(str(path), 'wb') as wav_f:
+        wav_f.setnchannels(nchannels)
+        wav_f.setsampwidth(SAMPLE_WIDTH)
+        wav_f.setframerate(SAMPLE_RATE_HZ)
+        wav_f.writeframes(frames)
+    return frames
+
+
+class TestAudioChunkFileIterator:
+    def test_mmap_yields_pcm_data(self, tmp_path: Path) -> None:
+        frames = write_wav(tmp_path / "audio.wav", 1000, nchannels=2)
+        with AudioChunkFileIterator(tmp_path / "audio.wav", 300, use_mmap=True) as chunks:
+            chunks = list(chunks)
+        assert all(isinstance(chunk, memoryview) for chunk in chunks)
+        assert [len(chunk) for chunk in chunks] == [1200, 1200, 1200, 400]
+        assert b''.join(chunks) == frames
+
+    def test_mmap_delay_callback(self, tmp_path: Path) -> None:
+        frames = write_wav(tmp_path / "audio.wav", SAMPLE_RATE_HZ)
+        delay_callback = Mock()
+        for _ in AudioChunkFileIterator(tmp_path / "audio.wav", SAMPLE_RATE_HZ // 2, delay_callback, use_mmap=True):
+            pass
+        assert delay_callback.call_count == 2
+        assert [call.args[1] for call in delay_callback.call_args_list] == [0.5, 0.5]
+        assert delay_callback.call_args_list[0].args[0] == frames[: len(frames) // 2]
+
+    def test_mmap_close_with_alive_chunks(self, tmp_path: Path) -> None:
+        write_wav(tmp_path / "audio.wav", 1000)
+        chunk_iterator = AudioChunkFileIterator(tmp_path / "audio.wav", 100, use_mmap=True)
+        chunk = next(chunk_iterator)
+        chunk_iterator.close()
+        chunk_iterator.close()
+        assert len(bytes(chunk)) == 100 * SAMPLE_WIDTH
+
+    def test_mmap_empty_file(self, tmp_path: Path) -> None:
+        (tmp_path / "audio.raw").write_bytes(b'')
+        assert list(AudioChunkFileIterator(tmp_path / "audio.raw", 100, use_mmap=True)) == []
+
+    def test_streaming_request_generator_converts_memoryview(self) -> None:
+        requests = list(streaming_request_generator([memoryview(AUDIO_CHUNKS[0])], STREAMING_RECOGNITION_CONFIG))
+        assert requests[1].audio_content == AUDIO_CHUNKS[0]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRealTimePacer:
+    def test_no_drift(self) -> None:
+        clock = FakeClock()
+        pacer = RealTimePacer(clock=clock, sleep=clock.sleep)
+        for _ in range(10):
+            # Request creation and sending take time which has to be absorbed by pacing.
+            clock.now += 0.03
+            pacer(b'', 0.1)
+        assert abs(clock.now - 100.0 - 1.0 - 0.03) < 1e-9
+        assert pacer.lag == 0.0
+
+    def test_speed_and_burst(self) -> None:
+        clock = FakeClock()
+        pacer = RealTimePacer(speed=2.0, burst=0.5, clock=clock, sleep=clock.sleep)
+        for _ in range(10):
+            pacer(b'', 0.1)
+        assert len(clock.sleeps) == 5
+        assert abs(clock.now - 100.25) < 1e-9
+
+    def test_lag(self) -> None:
+        clock = FakeClock()
+        pacer = RealTimePacer(clock=clock, sleep=clock.sleep)
+        pacer(b'', 0.1)
+        clock.now += 0.5
+        pacer(b'', 0.1)
+        assert abs(pacer.lag - 0.4) < 1e-9
+        pacer.reset()
+        assert pacer.start_time is None and pacer.lag == 0.0
+
+    def test_jitter_does_not_accumulate(self) -> None:
+        clock = FakeClock()
+        pacer = RealTimePacer(jitter=0.05, clock=clock, sleep=clock.sleep, seed=0)
+        for _ in range(100):
+            pacer(b'', 0.1)
+        assert 10.0 <= clock.now - 100.0 <= 10.05
+
+    def test_invalid_parameters(self) -> None:
+        with pytest.raises(ValueError):
+            RealTimePacer(speed=0)
+        with pytest.raises(ValueError):
+            RealTimePacer(jitter=-1)
+
+
+class AsyncStreamingCallMock:
+    """Consumes requests like a server and returns a response with a transcript for every audio chunk."""
+    def __call__(self, requests, metadata=None):
+        async def responses():
+            async for request in requests:
+                if request.audio_content:
+                    yield rasr.StreamingRecognizeResponse(
+                        results=[
+                            rasr.StreamingRecognitionResult(
+                                is_final=True,
+                                alternatives=[
+                                    rasr.SpeechRecognitionAlternative(transcript=request.audio_content.decode("latin-1"))
+                                ],
+                            )
+                        ]
+                    )
+        return responses()
+
+
+def riva_asr_aio_stub_init_patch(self, channel):
+    self.StreamingRecognize = AsyncStreamingCallMock()
+
+
+@patch("riva.client.proto.riva_asr_pb2_grpc.RivaSpeechRecognitionStub.__init__", riva_asr_aio_stub_init_patch)
+class TestStreamingSessionManager:
+    @staticmethod
+    def auth_factory():
+        auth, _ = set_auth_mock()
+        auth.close = AsyncMock()
+        return auth
+
+    def test_push_and_sources(self, tmp_path: Path) -> None:
+        write_wav(tmp_path / "audio.wav", 300)
+        transcripts = {}
+        done = []
+
+        def on_response(session, response):
+            transcripts.setdefault(session.session_id, []).append(response.results[0].alternatives[0].transcript)
+
+        with StreamingSessionManager(self.auth_factory, max_buffered_chunks=2) as manager:
+            pushed = [manager.open_session(STREAMING_RECOGNITION_CONFIG, on_response=on_response) for _ in range(20)]
+            from_file = manager.open_session(
+                STREAMING_RECOGNITION_CONFIG,
+                audio_source=AudioChunkFileIterator(tmp_path / "audio.wav", 100, use_mmap=True),
+                on_done=lambda session, exception: done.append((session.session_id, exception)),
+                session_id="file",
+            )
+            for i in range(5):
+                for session in pushed:
+                    session.push(f"{session.session_id}:{i}".encode())
+            for session in pushed:
+                session.end()
+            manager.wait_all(timeout=10)
+            assert not manager.sessions
+        for session in pushed:
+            assert transcripts[session.session_id] == [f"{session.session_id}:{i}" for i in range(5)]
+            assert session.done() and session.num_responses == 5
+        assert from_file.num_responses == 3
+        assert done == [("file", None)]
+        with pytest.raises(RuntimeError):
+            pushed[0].push(b'a')
+
+    def test_sink(self) -> None:
+        sink = Mock(spec=ResultSink)
+        with StreamingSessionManager(self.auth_factory) as manager:
+            session = manager.open_session(STREAMING_RECOGNITION_CONFIG, sink=sink)
+            session.push(b'a')
+            session.end()
+            session.wait(timeout=10)
+        sink.on_stream_start.assert_called_once()
+        sink.on_final.assert_called_once()
+        sink.close.assert_called_once()
+
+    def test_open_from_many_threads(self) -> None:
+        barrier = threading.Barrier(8)
+        opened, rejected = [], []
+
+        def open_session(session_id: str) -> None:
+            barrier.wait(timeout=5)
+            try:
+                opened.append(manager.open_session(STREAMING_RECOGNITION_CONFIG, session_id=session_id))
+            except ValueError:
+                rejected.append(session_id)
+
+        with StreamingSessionManager(self.auth_factory) as manager:
+            threads = [threading.Thread(target=open_session, args=(f"id-{i % 2}",), daemon=True) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+            assert sorted(session.session_id for session in opened) == ["id-0", "id-1"]
+            assert len(rejected) == 6
+            finished = opened[0]
+            finished.end()
+            finished.wait(timeout=10)
+            reopened = manager.open_session(STREAMING_RECOGNITION_CONFIG, session_id=finished.session_id)
+            # A late done callback of a finished session keeps a session which reuses its identifier.
+            manager._forget(finished)
+            assert manager.sessions[finished.session_id] is reopened
+            manager._forget(reopened)
+            assert finished.session_id not in manager.sessions
+            for session in [reopened, *opened[1:]]:
+                session.end()
+                session.wait(timeout=10)
+
+    def test_backpressure_and_cancel(self) -> None:
+        with StreamingSessionManager(self.auth_factory, max_buffered_chunks=1, max_concurrent_streams=1) as manager:
+            blocker = manager.open_session(STREAMING_RECOGNITION_CONFIG)
+            waiting = manager.open_session(STREAMING_RECOGNITION_CONFIG)
+            # The second session waits for a stream slot, so its buffer is not drained.
+            waiting.push(b'a')
+            with pytest.raises(concurrent.futures.TimeoutError):
+                waiting.push(b'b', timeout=0.05)
+            blocker.cancel()
+            with pytest.raises(concurrent.futures.CancelledError):
+                blocker.wait(timeout=5)
+            waiting.push(b'b', timeout=5)
+            waiting.end()
+            waiting.wait(timeout=5)
+            assert waiting.num_responses == 2
+
+
+class FakeRpcError(grpc.RpcError):
+    def __init__(self, code: grpc.StatusCode) -> None:
+        self._code = code
+
+    def code(self) -> grpc.StatusCode:
+        return self._code
+
+
+class SyncStreamingCallMock:
+    """
+    Records audio of every call and returns a result for every chunk. Every ``final_every``-th result is final.
+    A call with index from ``failures`` fails with a given status after ``fail_after`` chunks.
+    """
+    def __init__(self, bytes_per_second: int, final_every: int = 1, failures=None, fail_after: int = 0) -> None:
+        self.bytes_per_second = bytes_per_second
+        self.final_every = final_every
+        self.failures = failures or {}
+        self.fail_after = fail_after
+        self.calls: List[bytes] = []
+
+    def __call__(self, requests, metadata=None):
+        call_i = len(self.calls)
+        self.calls.append(b'')
+        for i, request in enumerate(r for r in requests if r.audio_content):
+            if call_i in self.failures and i == self.fail_after:
+                raise FakeRpcError(self.failures[call_i])
+            start_ms = round(len(self.calls[call_i]) * 1000 / self.bytes_per_second)
+            self.calls[call_i] += request.audio_content
+            yield rasr.StreamingRecognizeResponse(
+                results=[
+                    rasr.StreamingRecognitionResult(
+                        is_final=(i + 1) % self.final_every == 0,
+                        audio_processed=len(self.calls[call_i]) / self.bytes_per_second,
+                        alternatives=[
+                            rasr.SpeechRecognitionAlternative(
+                                words=[rasr.WordInfo(word=str(request.audio_content[0]), start_time=start_ms)]
+                            )
+                        ],
+                    )
+                ]
+            )
+
+
+class TestRollingStreamingResponseGenerator:
+    SAMPLE_RATE = 1000
+    CHUNKS = [bytes([i]) * 200 for i in range(30)]  # 0.1 second chunks
+    CONFIG = rasr.StreamingRecognitionConfig(config=rasr.RecognitionConfig(sample_rate_hertz=SAMPLE_RATE))
+
+    def get_service(self, call: SyncStreamingCallMock) -> ASRService:
+        auth, _ = set_auth_mock()
+        with patch("riva.client.proto.riva_asr_pb2_grpc.RivaSpeechRecognitionStub.__init__", riva_asr_stub_init_patch):
+            service = ASRService(auth)
+        service.stub.StreamingRecognize = call
+        return service
+
+    def test_rollover(self) -> None:
+        call = SyncStreamingCallMock(2 * self.SAMPLE_RATE)
+        responses = list(
+            self.get_service(call).rolling_streaming_response_generator(
+                self.CHUNKS, self.CONFIG, max_stream_duration=1.0
+            )
+        )
+        assert len(call.calls) == 3
+        assert b''.join(call.calls) == b''.join(self.CHUNKS)
+        words = [response.results[0].alternatives[0].words[0] for response in responses]
+        assert [word.word for word in words] == [str(i) for i in range(30)]
+        assert [word.start_time for word in words] == [i * 100 for i in range(30)]
+        assert responses[-1].results[0].audio_processed == pytest.approx(3.0)
+
+    def test_framed_audio_requests(self) -> None:
+        call = SyncStreamingCallMock(2 * self.SAMPLE_RATE)
+        service = self.get_service(call)
+        usual = list(service.rolling_streaming_response_generator(self.CHUNKS, self.CONFIG, max_stream_duration=1.0))
+        call.calls.clear()
+        sent = []
+
+        def parse(requests):
+            for request in requests:
+                sent.append(request)
+                yield rasr.StreamingRecognizeRequest.FromString(request) if isinstance(request, bytes) else request
+
+        service.framed_audio_requests = True
+        service._framer = AudioRequestFramer()
+        service._framed_streaming_recognize = lambda requests, metadata=None: call(parse(requests), metadata)
+        framed = list(service.rolling_streaming_response_generator(self.CHUNKS, self.CONFIG, max_stream_duration=1.0))
+        assert framed == usual
+        assert [request for request in sent if not isinstance(request, bytes)] == [
+            rasr.StreamingRecognizeRequest(streaming_config=self.CONFIG)
+        ] * len(call.calls)
+
+    def test_replay_after_failure(self) -> None:
+        call = SyncStreamingCallMock(
+            2 * self.SAMPLE_RATE, final_every=3, failures={0: grpc.StatusCode.UNAVAILABLE}, fail_after=5
+        )
+        responses = list(
+            self.get_service(call).rolling_streaming_response_generator(self.CHUNKS, self.CONFIG, retry_backoff=0.0)
+        )
+        assert len(call.calls) == 2
+        assert call.calls[0] == b''.join(self.CHUNKS[:5])
+        # Audio after the last final result is replayed.
+        assert call.calls[1] == b''.join(self.CHUNKS[3:])
+        words = [response.results[0].alternatives[0].words[0] for response in responses[5:]]
+        assert [word.start_time for word in words] == [i * 100 for i in range(3, 30)]
+
+    def test_errors(self) -> None:
+        call = SyncStreamingCallMock(
+            2 * self.SAMPLE_RATE, failures={0: grpc.StatusCode.INVALID_ARGUMENT}, fail_after=1
+        )
+        service = self.get_service(call)
+        with pytest.raises(grpc.RpcError):
+            list(service.rolling_streaming_response_generator(self.CHUNKS, self.CONFIG, retry_backoff=0.0))
+        with pytest.raises(ValueError):
+            next(service.rolling_streaming_response_generator(self.CHUNKS, STREAMING_RECOGNITION_CONFIG))
@@ -4,8 +4,17 @@
 from unittest.mock import Mock, patch
 
 import grpc
+import pytest
 
-from riva.client.auth import create_channel, Auth
+from riva.client.auth import (
+    CHANNEL_OPTION_PROFILES,
+    Auth,
+    ChannelPool,
+    ChannelRegistry,
+    compression_kwargs,
+    create_channel,
+    get_channel_options,
+)
 
 
 @patch("grpc.insecure_channel", Mock(return_value="insecure_channel"))
@@ -24,3 +33,136 @@ class TestAuth:
         auth = Auth()
         metadata = auth.get_auth_metadata()
         assert metadata == []
+
+    @patch("grpc.insecure_channel", Mock(side_effect=lambda uri, **kwargs: Mock(name=uri)))
+    def test_several_uris_create_pool(self) -> None:
+        auth = Auth(uri="node1:50051, node2:50051", channels_per_endpoint=2)
+        assert isinstance(auth.channel, ChannelPool)
+        assert auth.uris == ["node1:50051", "node2:50051"]
+        assert auth.channel.channel_uris == ["node1:50051", "node1:50051", "node2:50051", "node2:50051"]
+
+
+def make_pool(n_uris: int, channels_per_endpoint: int = 1, load_balancing: str = 'round_robin') -> ChannelPool:
+    return ChannelPool(
+        [f"node{i}:50051" for i in range(n_uris)],
+        lambda uri: Mock(name=uri),
+        channels_per_endpoint=channels_per_endpoint,
+        load_balancing=load_balancing,
+    )
+
+
+class TestChannelPool:
+    def test_wrong_load_balancing(self) -> None:
+        with pytest.raises(ValueError):
+            make_pool(2, load_balancing='random')
+
+    def test_round_robin(self) -> None:
+        pool = make_pool(3)
+        indices = [pool.acquire() for _ in range(6)]
+        assert indices == [0, 1, 2, 0, 1, 2]
+        assert pool.outstanding == [2, 2, 2]
+        for i in indices:
+            pool.release(i)
+        assert pool.outstanding == [0, 0, 0]
+
+    @pytest.mark.parametrize("load_balancing", ['least_outstanding', 'power_of_two_choices'])
+    def test_least_loaded_channel_is_selected(self, load_balancing: str) -> None:
+        pool = make_pool(2, load_balancing=load_balancing)
+        pool.outstanding[0] = 5
+        assert pool.acquire() == 1
+
+    def test_unavailable_endpoint_is_skipped(self) -> None:
+        pool = make_pool(2, channels_per_endpoint=2)
+        pool.set_endpoint_available("node0:50051", False)
+        assert {pool.acquire() for _ in range(4)} == {2, 3}
+        pool.set_endpoint_available("node1:50051", False)
+        assert {pool.acquire() for _ in range(4)} == {0, 1, 2, 3}
+
+    def test_unary_call_is_released(self) -> None:
+        pool = make_pool(2)
+        multicallable = pool.unary_unary('/Service/Method')
+        for channel in pool.channels:
+            channel.unary_unary.return_value.return_value = channel._mock_name
+        assert multicallable('request') == "node0:50051"
+        assert multicallable('request') == "node1:50051"
+        assert pool.outstanding == [0, 0]
+
+    def test_streaming_call_is_released_when_done(self) -> None:
+        pool = make_pool(1, channels_per_endpoint=2)
+        multicallable = pool.unary_stream('/Service/Method')
+        call = multicallable('request')
+        assert pool.outstanding == [1, 0]
+        done_callback = call.add_done_callback.call_args.args[0]
+        done_callback(call)
+        assert pool.outstanding == [0, 0]
+
+
+@patch("grpc.insecure_channel", Mock(side_effect=lambda uri, **kwargs: Mock(name=uri)))
+class TestChannelRegistry:
+    def test_channels_are_shared_and_closed_by_last_user(self) -> None:
+        grpc.insecure_channel.reset_mock()
+        registry = ChannelRegistry()
+        with patch.object(Auth, '_channel_registry', registry):
+            auths = [Auth(uri="node1:50051", shared_channel=True) for _ in range(3)]
+            other = Auth(uri="node2:50051", shared_channel=True)
+            assert grpc.insecure_channel.call_count == 2
+            assert len({id(auth.channel) for auth in auths}) == 1
+            assert len(registry) == 2
+            for auth in auths[:-1]:
+                auth.close()
+            auths[0].channel.close.assert_not_called()
+            auths[-1].close()
+            auths[0].channel.close.assert_called_once()
+            assert len(registry) == 1
+            other.close()
+            assert len(registry) == 0
+
+    def test_pool_channels_are_shared(self) -> None:
+        registry = ChannelRegistry()
+        with patch.object(Auth, '_channel_registry', registry):
+            first = Auth(uri="node1:50051,node2:50051", channels_per_endpoint=2, shared_channel=True)
+            second = Auth(uri="node1:50051,node2:50051", channels_per_endpoint=2, shared_channel=True)
+            assert len(set(map(id, first.channel.channels))) == 4
+            assert list(map(id, first.channel.channels)) == list(map(id, second.channel.channels))
+            first.close()
+            second.close()
+            assert len(registry) == 0
+
+    def test_double_close_does_not_close_channel_of_other_instance(self) -> None:
+        registry = ChannelRegistry()
+        with patch.object(Auth, '_channel_registry', registry):
+            first = Auth(uri="node1:50051", shared_channel=True)
+            second = Auth(uri="node1:50051", shared_channel=True)
+            with first:
+                pass
+            first.close()
+            second.channel.close.assert_not_called()
+            assert len(registry) == 1
+            second.close()
+            second.close()
+            second.channel.close.assert_called_once()
+            assert not registry.release(second.channel)
+            assert len(registry) == 0
+
+
+class TestChannelOptions:
+    def test_profile(self) -> None:
+        assert get_channel_options(None) == []
+        assert ('grpc.max_receive_message_length', 1 << 30) in get_channel_options('high_throughput')
+        assert get_channel_options([['grpc.keepalive_time_ms', 1000]]) == [('grpc.keepalive_time_ms', 1000)]
+        with pytest.raises(ValueError):
+            get_channel_options('fastest')
+
+    def test_compression_kwargs(self) -> None:
+        assert compression_kwargs(None) == {}
+        assert compression_kwargs('gzip') == {'compression': grpc.Compression.Gzip}
+        assert compression_kwargs(grpc.Compression.Deflate) == {'compression': grpc.Compression.Deflate}
+        with pytest.raises(ValueError):
+            compression_kwargs('zstd')
+
+    @patch("grpc.insecure_channel", Mock(return_value="insecure_channel"))
+    def test_options_are_passed_to_channel(self) -> None:
+        Auth(channel_options='streaming', compression='gzip')
+        grpc.insecure_channel.assert_called_with(
+            "localhost:50051", options=CHANNEL_OPTION_PROFILES['streaming'], compression=grpc.Compression.Gzip
+        )
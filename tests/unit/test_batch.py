@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import json
+import threading
+import wave
+from pathlib import Path
+from typing import List
+from unittest.mock import Mock
+
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.batch import BatchTranscriber, collect_audio_files
+
+
+SAMPLE_RATE_HZ = 16000
+
+
+def write_wav(path: Path, duration: float = 0.5) -> Path:
+    with wave.open(str(path), 'wb') as wav_f:
+        wav_f.setnchannels(1)
+        wav_f.setsampwidth(2)
+        wav_f.setframerate(SAMPLE_RATE_HZ)
+        wav_f.writeframes(b'\x00\x00' * int(duration * SAMPLE_RATE_HZ))
+    return path
+
+
+def make_files(directory: Path, n: int) -> List[Path]:
+    return [write_wav(directory / f"audio_{i}.wav") for i in range(n)]
+
+
+def offline_recognize(audio_bytes: bytes, config: rasr.RecognitionConfig) -> rasr.RecognizeResponse:
+    assert config.sample_rate_hertz == SAMPLE_RATE_HZ
+    return rasr.RecognizeResponse(
+        results=[rasr.SpeechRecognitionResult(alternatives=[rasr.SpeechRecognitionAlternative(transcript="hello")])]
+    )
+
+
+def read_jsonl(path: Path) -> List[dict]:
+    with path.open() as f:
+        return [json.loads(line) for line in f]
+
+
+class TestCollectAudioFiles:
+    def test_directory_manifest_and_glob(self, tmp_path: Path) -> None:
+        files = make_files(tmp_path, 3)
+        (tmp_path / "notes.txt").write_text("not audio")
+        manifest = tmp_path / "manifest.jsonl"
+        manifest.write_text(
+            json.dumps({'audio_filepath': "audio_2.wav"}) + "\n" + json.dumps({'audio_filepath': str(files[0])}) + "\n"
+        )
+        assert collect_audio_files(tmp_path) == files
+        assert collect_audio_files(manifest) == [files[2], files[0]]
+        assert collect_audio_files([str(tmp_path / "audio_1*"), manifest]) == [files[1], files[2], files[0]]
+
+    def test_manifest_without_path(self, tmp_path: Path) -> None:
+        manifest = tmp_path / "manifest.jsonl"
+        manifest.write_text(json.dumps({'text': "hello"}) + "\n")
+        with pytest.raises(ValueError):
+            collect_audio_files(manifest)
+
+
+class TestBatchTranscriber:
+    def test_offline_and_resume(self, tmp_path: Path) -> None:
+        files = make_files(tmp_path, 5)
+        asr_service = Mock(offline_recognize=Mock(side_effect=offline_recognize))
+        transcriber = BatchTranscriber(asr_service, rasr.RecognitionConfig(), concurrency=2)
+        output = tmp_path / "results.jsonl"
+        stats = transcriber.run(files[:3], output)
+        assert stats.num_files == 3
+        assert stats.audio_duration == pytest.approx(1.5)
+        records = read_jsonl(output)
+        assert sorted(record['audio_filepath'] for record in records) == [str(f) for f in files[:3]]
+        assert all(record['transcript'] == "hello" for record in records)
+
+        stats = transcriber.run(files, output)
+        assert stats.num_skipped == 3
+        assert stats.num_files == 2
+        assert asr_service.offline_recognize.call_count == 5
+        assert len(read_jsonl(output)) == 5
+
+    def test_resume_with_relative_and_duplicate_paths(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        files = make_files(tmp_path, 3)
+        (tmp_path / "sub").mkdir()
+        asr_service = Mock(offline_recognize=Mock(side_effect=offline_recognize))
+        transcriber = BatchTranscriber(asr_service, rasr.RecognitionConfig())
+        output = tmp_path / "results.jsonl"
+        transcriber.run(files[:2], output)
+        monkeypatch.chdir(tmp_path / "sub")
+        inputs = ["../audio_0.wav", "./../audio_1.wav", "../audio_2.wav", "../sub/../audio_2.wav"]
+        stats = transcriber.run(inputs, output)
+        assert (stats.num_files, stats.num_skipped) == (1, 3)
+        assert asr_service.offline_recognize.call_count == 3
+        assert [record['audio_filepath'] for record in read_jsonl(output)][2:] == ["../audio_2.wav"]
+        checkpoint = (tmp_path / "results.jsonl.checkpoint").read_text().splitlines()
+        assert sorted(checkpoint) == [str(f.resolve()) for f in files]
+
+    def test_progress_callback_runs_in_calling_thread(self, tmp_path: Path) -> None:
+        files = make_files(tmp_path, 6)
+        asr_service = Mock(offline_recognize=Mock(side_effect=offline_recognize))
+        transcriber = BatchTranscriber(asr_service, rasr.RecognitionConfig(), concurrency=2)
+        threads = []
+
+        def progress_callback(record, stats) -> None:
+            threads.append(threading.get_ident())
+
+        stats = transcriber.run(files, tmp_path / "results.jsonl", progress_callback=progress_callback)
+        assert stats.num_files == 6
+        assert threads == [threading.get_ident()] * 6
+
+    def test_failed_files_are_retried(self, tmp_path: Path) -> None:
+        files = make_files(tmp_path, 2)
+        asr_service = Mock(offline_recognize=Mock(side_effect=RuntimeError("server is down")))
+        transcriber = BatchTranscriber(asr_service, rasr.RecognitionConfig())
+        output = tmp_path / "results.jsonl"
+        stats = transcriber.run(files, output)
+        assert stats.num_failed == 2
+        assert all('server is down' in record['error'] for record in read_jsonl(output))
+        asr_service.offline_recognize.side_effect = offline_recognize
+        stats = transcriber.run(files, output)
+        assert stats.num_files == 2 and stats.num_skipped == 0
+
+    def test_streaming(self, tmp_path: Path) -> None:
+        files = make_files(tmp_path, 1)
+
+        def streaming_response_generator(audio_chunks, streaming_config):
+            for _ in audio_chunks:
+                pass
+            for transcript, is_final in [("hel", False), ("hello ", True), ("world", True)]:
+                yield rasr.StreamingRecognizeResponse(
+                    results=[
+                        rasr.StreamingRecognitionResult(
+                            alternatives=[rasr.SpeechRecognitionAlternative(transcript=transcript)], is_final=is_final
+                        )
+                    ]
+                )
+
+        asr_service = Mock(streaming_response_generator=Mock(side_effect=streaming_response_generator))
+        transcriber = BatchTranscriber(asr_service, rasr.RecognitionConfig(), mode='streaming')
+        output = tmp_path / "results.jsonl"
+        transcriber.run(files, output)
+        assert read_jsonl(output)[0]['transcript'] == "hello world"
+
+    def test_invalid_mode(self) -> None:
+        with pytest.raises(ValueError):
+            BatchTranscriber(Mock(), rasr.RecognitionConfig(), mode='batch')
@@ -0,0 +1,180 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import errno
+import wave
+import zlib
+from concurrent.futures import Future
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.asr import ASRService, AudioChunkFileIterator
+from riva.client.cache import ResultCache
+
+from .helpers import set_auth_mock
+
+
+def recognize_response(transcript: str) -> rasr.RecognizeResponse:
+    return rasr.RecognizeResponse(
+        results=[rasr.SpeechRecognitionResult(alternatives=[rasr.SpeechRecognitionAlternative(transcript=transcript)])]
+    )
+
+
+def make_done_future(transcript: str) -> Future:
+    future = Future()
+    future.set_result(recognize_response(transcript))
+    return future
+
+
+def streaming_response(transcript: str, is_final: bool) -> rasr.StreamingRecognizeResponse:
+    return rasr.StreamingRecognizeResponse(
+        results=[
+            rasr.StreamingRecognitionResult(
+                alternatives=[rasr.SpeechRecognitionAlternative(transcript=transcript)], is_final=is_final
+            )
+        ]
+    )
+
+
+def write_wav(path: Path, n_frames: int = 3200) -> Path:
+    with wave.open(str(path), 'wb') as wav_f:
+        wav_f.setnchannels(1)
+        wav_f.setsampwidth(2)
+        wav_f.setframerate(16000)
+        wav_f.writeframes(b'\x01\x00' * n_frames)
+    return path
+
+
+def make_service(cache: ResultCache) -> ASRService:
+    auth, _ = set_auth_mock()
+    with patch('riva.client.proto.riva_asr_pb2_grpc.RivaSpeechRecognitionStub'):
+        return ASRService(auth, result_cache=cache)
+
+
+class TestResultCache:
+    def test_key_depends_on_audio_config_and_namespace(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+        config = rasr.RecognitionConfig(language_code='en-US')
+        config.custom_configuration['a'] = '1'
+        config.custom_configuration['b'] = '2'
+        same_config = rasr.RecognitionConfig(language_code='en-US')
+        same_config.custom_configuration['b'] = '2'
+        same_config.custom_configuration['a'] = '1'
+        key = cache.offline_key(b'audio', config)
+        assert cache.offline_key(b'audio', same_config) == key
+        assert cache.offline_key(b'other', config) != key
+        config.endpointing_config.start_history = 100
+        assert cache.offline_key(b'audio', config) != key
+        assert ResultCache(tmp_path, namespace='v2').offline_key(b'audio', same_config) != key
+
+    def test_lru_eviction(self, tmp_path: Path) -> None:
+        entry_size = len(zlib.compress(recognize_response('0').SerializeToString()))
+        cache = ResultCache(tmp_path, max_size=3 * entry_size)
+        for i in range(3):
+            cache.put_offline(str(i) * 64, recognize_response(str(i)))
+        assert cache.get_offline('0' * 64) is not None
+        cache.put_offline('3' * 64, recognize_response('3'))
+        assert cache.stats.evictions == 1
+        assert cache.get_offline('1' * 64) is None
+        responses = [cache.get_offline(str(i) * 64) for i in (0, 2, 3)]
+        assert [response.results[0].alternatives[0].transcript for response in responses] == ['0', '2', '3']
+        assert cache.stats.hits == 4
+        assert cache.stats.misses == 1
+        # Recency is restored from modification times of files.
+        assert len(ResultCache(tmp_path, max_size=3 * entry_size)) == 3
+
+    def test_corrupted_entry_is_miss(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+        key = 'ab' * 32
+        cache.put_offline(key, recognize_response('hello'))
+        path = next(tmp_path.glob('*/*.rsp'))
+        path.write_bytes(b'garbage')
+        assert cache.get_offline(key) is None
+        assert not path.exists()
+        assert cache.stats.misses == 1
+
+    def test_read_only_cache(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+        key = 'ef' * 32
+        cache.put_offline(key, recognize_response('hello'))
+        with patch('os.utime', Mock(side_effect=PermissionError)):
+            assert cache.get_offline(key).results[0].alternatives[0].transcript == 'hello'
+        with patch.object(Path, 'read_bytes', Mock(side_effect=PermissionError)):
+            assert cache.get_offline(key) is None
+        assert next(tmp_path.glob('*/*.rsp')).exists()
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_failed_write_is_counted(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+        with patch('tempfile.mkstemp', Mock(side_effect=OSError(errno.ENOSPC, "No space left on device"))):
+            cache.put_offline('ab' * 32, recognize_response('hello'))
+        with patch('os.replace', Mock(side_effect=PermissionError)):
+            cache.put_streaming('cd' * 32, [streaming_response('hello', True)])
+        assert cache.stats.write_errors == 2
+        assert len(cache) == 0
+        assert list(tmp_path.glob('*/*')) == []
+        cache.put_offline('ab' * 32, recognize_response('hello'))
+        with patch.object(Path, 'unlink', Mock(side_effect=PermissionError)):
+            cache.clear()
+        assert len(cache) == 0
+
+    def test_streaming_keeps_finals(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+        cache.put_streaming('cd' * 32, [streaming_response('hel', False), streaming_response('hello', True)])
+        responses = cache.get_streaming('cd' * 32)
+        assert [r.results[0].alternatives[0].transcript for r in responses] == ['hello']
+
+
+class TestASRServiceCache:
+    def test_offline_recognize(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+        service = make_service(cache)
+        service.stub.Recognize = Mock(return_value=recognize_response('hello'))
+        config = rasr.RecognitionConfig(language_code='en-US')
+        for _ in range(2):
+            assert service.offline_recognize(b'audio', config).results[0].alternatives[0].transcript == 'hello'
+        assert service.offline_recognize(b'audio', config, future=True).result() == recognize_response('hello')
+        service.offline_recognize(b'audio', rasr.RecognitionConfig(language_code='de-DE'))
+        assert service.stub.Recognize.call_count == 2
+        assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+
+    def test_failed_write_does_not_fail_recognition(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+        service = make_service(cache)
+        service.stub.Recognize = Mock(return_value=recognize_response('hello'))
+        service.stub.Recognize.future = Mock(side_effect=lambda *args, **kwargs: make_done_future('hello'))
+        config = rasr.RecognitionConfig(language_code='en-US')
+        with patch('tempfile.mkstemp', Mock(side_effect=OSError(errno.ENOSPC, "No space left on device"))):
+            assert service.offline_recognize(b'audio', config) == recognize_response('hello')
+            assert service.offline_recognize(b'audio', config, future=True).result() == recognize_response('hello')
+        assert cache.stats.write_errors == 2
+
+    def test_streaming_file(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+        service = make_service(cache)
+        service.stub.StreamingRecognize = Mock(
+            side_effect=lambda requests, **kwargs: (
+                list(requests) and [streaming_response('hel', False), streaming_response('hello', True)]
+            )
+        )
+        audio_file = write_wav(tmp_path / 'audio.wav')
+        config = rasr.StreamingRecognitionConfig(config=rasr.RecognitionConfig(language_code='en-US'))
+        transcripts = []
+        for _ in range(2):
+            with AudioChunkFileIterator(audio_file, 1600) as audio_chunks:
+                responses = service.streaming_response_generator(audio_chunks, config)
+                transcripts.append([r.results[0].alternatives[0].transcript for r in responses])
+        assert transcripts == [['hel', 'hello'], ['hello']]
+        assert service.stub.StreamingRecognize.call_count == 1
+        # Chunks of other iterables are not identified, so they are not cached.
+        list(service.streaming_response_generator([b'\x00' * 3200], config))
+        assert service.stub.StreamingRecognize.call_count == 2
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_not_positive_max_size(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        ResultCache(tmp_path, max_size=0)
@@ -0,0 +1,145 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from riva.client.capture import AudioRingBuffer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def samples(start: int, n: int) -> bytes:
+    return b''.join(i.to_bytes(2, 'little') for i in range(start, start + n))
+
+
+class TestAudioRingBuffer:
+    def test_fixed_size_chunks_across_wraparound(self) -> None:
+        ring = AudioRingBuffer(capacity=20, chunk_size=8)
+        data = samples(0, 40)
+        out = []
+        for start in range(0, len(data), 6):
+            ring.write(data[start : start + 6])
+            while len(ring) >= 8:
+                out.append(ring.read_chunk())
+        ring.close()
+        out.extend(iter(ring))
+        assert all(len(chunk) == 8 for chunk in out[:-1])
+        assert b''.join(out) == data
+        assert ring.stats.overruns == 0
+
+    def test_drop_oldest(self) -> None:
+        ring = AudioRingBuffer(capacity=8, chunk_size=4, overflow_policy='drop-oldest')
+        assert ring.write(samples(0, 3)) == 0
+        assert ring.write(samples(3, 3)) == 4
+        assert ring.read_chunk() == samples(2, 2)
+        # A write longer than the buffer keeps only its end.
+        assert ring.write(samples(10, 6)) == 8
+        ring.close()
+        assert b''.join(ring) == samples(12, 4)
+        assert ring.stats.overruns == 2
+        assert ring.stats.dropped_bytes == 12
+
+    def test_drop_newest(self) -> None:
+        ring = AudioRingBuffer(capacity=8, chunk_size=4, overflow_policy='drop-newest')
+        ring.write(samples(0, 3))
+        assert ring.write(samples(3, 3)) == 4
+        ring.close()
+        assert b''.join(ring) == samples(0, 4)
+        assert ring.stats.overruns == 1
+
+    def test_block(self) -> None:
+        ring = AudioRingBuffer(capacity=8, chunk_size=4, overflow_policy='block')
+        ring.write(samples(0, 4))
+        writer = threading.Thread(target=ring.write, args=(samples(4, 2),), daemon=True)
+        writer.start()
+        time.sleep(0.05)
+        assert writer.is_alive()
+        assert ring.read_chunk() == samples(0, 2)
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        ring.close()
+        assert b''.join(ring) == samples(2, 4)
+        assert ring.stats.overruns == 1
+        assert ring.stats.dropped_bytes == 0
+
+    def test_close_wakes_blocked_writer_and_reader(self) -> None:
+        ring = AudioRingBuffer(capacity=4, chunk_size=4, overflow_policy='block')
+        ring.write(samples(0, 2))
+        writer = threading.Thread(target=ring.write, args=(samples(2, 2),), daemon=True)
+        writer.start()
+        ring.close()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        assert ring.read_chunk() == samples(0, 2)
+        assert ring.read_chunk() is None
+        assert AudioRingBuffer(4, 4).read_chunk(timeout=0.01) is None
+
+    def test_latency(self) -> None:
+        clock = FakeClock()
+        ring = AudioRingBuffer(capacity=16, chunk_size=4, clock=clock)
+        ring.write(samples(0, 2))
+        clock.now = 0.5
+        ring.write(samples(2, 2))
+        clock.now = 1.0
+        ring.read_chunk()
+        ring.read_chunk()
+        assert ring.stats.chunks == 2
+        assert ring.stats.max_latency == pytest.approx(1.0)
+        assert ring.stats.last_latency == pytest.approx(0.5)
+        assert ring.stats.mean_latency == pytest.approx(0.75)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {'capacity': 8, 'chunk_size': 4, 'overflow_policy': 'grow'},
+            {'capacity': 8, 'chunk_size': 3},
+            {'capacity': 4, 'chunk_size': 8},
+        ],
+    )
+    def test_not_allowed_parameters(self, kwargs: dict) -> None:
+        with pytest.raises(ValueError):
+            AudioRingBuffer(**kwargs)
+
+
+class FakePyAudioStream:
+    """Like PortAudio, stopping a stream waits until a running callback returns."""
+    def __init__(self, callback_thread: threading.Thread) -> None:
+        self.callback_thread = callback_thread
+
+    def stop_stream(self) -> None:
+        self.callback_thread.join()
+
+    def close(self) -> None:
+        pass
+
+
+def test_microphone_stream_close_releases_blocked_callback() -> None:
+    # PyAudio needs a sound device, so only the callback side of a stream is simulated.
+    with patch.dict(sys.modules, {'pyaudio': Mock(paContinue=0)}):
+        from riva.client.audio_io import MicrophoneStream
+
+        stream = MicrophoneStream(rate=8, chunk=4, max_buffer_duration=1.0, overflow_policy='block')
+        callback = threading.Thread(
+            target=lambda: [stream._fill_buffer(samples(0, 4), 4, None, 0) for _ in range(3)], daemon=True
+        )
+        callback.start()
+        time.sleep(0.05)
+        assert callback.is_alive()
+        stream._audio_stream = FakePyAudioStream(callback)
+        stream._audio_interface = Mock()
+        closing = threading.Thread(target=stream.close, daemon=True)
+        closing.start()
+        closing.join(timeout=5)
+        assert not closing.is_alive()
+        assert stream.stats.overruns == 1
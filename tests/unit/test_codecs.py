@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import io
+import math
+import struct
+import warnings
+
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.codecs import ENCODER_ENCODINGS, AudioEncoder, _ForwardBuffer, encode_audio
+from riva.client.proto.riva_audio_pb2 import AudioEncoding
+
+
+ALL_SAMPLES = struct.pack('<65536h', *range(-32768, 32768))
+
+
+def speech_like(duration: float, framerate: int = 16000) -> bytes:
+    n_frames = int(duration * framerate)
+    return struct.pack(
+        f'<{n_frames}h',
+        *(int(8000 * math.sin(i / 5) * math.sin(i / 3000) + 500 * math.sin(i * 1.7)) for i in range(n_frames)),
+    )
+
+
+def split(data: bytes, chunk_size: int) -> list:
+    return [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+class TestG711:
+    @pytest.mark.parametrize("encoding,function", [('MULAW', 'lin2ulaw'), ('ALAW', 'lin2alaw')])
+    def test_matches_audioop(self, encoding: str, function: str) -> None:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            audioop = pytest.importorskip('audioop')
+        assert encode_audio(ALL_SAMPLES, 8000, encoding) == getattr(audioop, function)(ALL_SAMPLES, 2)
+
+    def test_chunks_with_partial_samples(self) -> None:
+        chunks = split(ALL_SAMPLES, 1001)
+        encoder = AudioEncoder(chunks, 8000, 'MULAW')
+        assert b''.join(encoder) == encode_audio(ALL_SAMPLES, 8000, 'MULAW')
+        assert encoder.compression_ratio == 2.0
+
+
+class TestForwardBuffer:
+    def test_rewrites_of_taken_bytes_are_dropped(self) -> None:
+        buffer = _ForwardBuffer()
+        buffer.write(b'header')
+        assert buffer.take() == b'header'
+        buffer.write(b'body')
+        buffer.seek(2)
+        assert buffer.write(b'XXXXXX') == 6
+        buffer.seek(0, io.SEEK_END)
+        assert buffer.tell() == 10
+        assert buffer.take() == b'XXdy'
+        assert buffer.take() == b''
+
+
+class TestAudioEncoder:
+    def test_not_allowed_encoding(self) -> None:
+        with pytest.raises(ValueError):
+            AudioEncoder([], 16000, 'LINEAR_PCM')
+
+    @pytest.mark.parametrize("encoding", ENCODER_ENCODINGS)
+    def test_update_config(self, encoding: str) -> None:
+        if encoding in ('FLAC', 'OGGOPUS'):
+            pytest.importorskip('soundfile')
+        config = rasr.StreamingRecognitionConfig(config=rasr.RecognitionConfig(sample_rate_hertz=44100))
+        AudioEncoder([], 8000, encoding, n_channels=2).update_config(config)
+        assert config.config.encoding == AudioEncoding.Value(encoding)
+        assert config.config.sample_rate_hertz == 8000
+        assert config.config.audio_channel_count == 2
+
+    def test_flac_stream_is_lossless(self) -> None:
+        soundfile = pytest.importorskip('soundfile')
+        np = pytest.importorskip('numpy')
+        pcm = speech_like(1.0)
+        whole = encode_audio(pcm, 16000, 'FLAC')
+        data, framerate = soundfile.read(io.BytesIO(whole), dtype='int16')
+        assert framerate == 16000
+        assert data.tobytes() == np.frombuffer(pcm, '<i2').tobytes()
+        encoder = AudioEncoder(split(pcm, 3201), 16000, 'FLAC')
+        chunks = list(encoder)
+        # A frame is emitted per 4096 samples before the end of audio.
+        assert len(chunks) > 2
+        streamed = b''.join(chunks)
+        # Only lengths and a checksum in STREAMINFO header, which are rewritten on closing, differ.
+        assert streamed[:4] == b'fLaC'
+        assert streamed[42:] == whole[42:]
+        assert encoder.compression_ratio > 1.5
+
+    def test_opus_stream(self) -> None:
+        soundfile = pytest.importorskip('soundfile')
+        pcm = speech_like(2.0)
+        encoder = AudioEncoder(split(pcm, 3200), 16000, 'OGGOPUS')
+        streamed = b''.join(encoder)
+        assert streamed[:4] == b'OggS'
+        assert encoder.compression_ratio > 5
+        data, framerate = soundfile.read(io.BytesIO(streamed), dtype='int16')
+        assert framerate == 16000
+        assert len(data) == len(pcm) // 2
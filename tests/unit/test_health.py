@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+from unittest.mock import Mock, patch
+
+import grpc
+import pytest
+
+import riva.client.proto.health_pb2 as rhealth
+from riva.client.auth import Auth
+from riva.client.health import HealthChecker
+
+
+SERVING_RESPONSE = rhealth.HealthCheckResponse(status=rhealth.HealthCheckResponse.ServingStatus.SERVING)
+NOT_SERVING_RESPONSE = rhealth.HealthCheckResponse(status=rhealth.HealthCheckResponse.ServingStatus.NOT_SERVING)
+
+# Health check responses for every endpoint. Test cases modify this dictionary.
+ENDPOINT_RESPONSES = {}
+
+
+class UnavailableError(grpc.RpcError):
+    def details(self) -> str:
+        return "unavailable"
+
+
+def check_patch(request, timeout=None, metadata=None, channel=None):
+    response = ENDPOINT_RESPONSES[channel._mock_name]
+    if isinstance(response, Exception):
+        raise response
+    return response
+
+
+def health_stub_init_patch(self, channel):
+    self.Check = Mock(side_effect=lambda *args, **kwargs: check_patch(*args, **kwargs, channel=channel))
+
+
+def make_auth() -> Auth:
+    with patch("grpc.insecure_channel", Mock(side_effect=lambda uri, **kwargs: Mock(name=uri))):
+        return Auth(uri="node0:50051,node1:50051", channels_per_endpoint=2)
+
+
+@patch("riva.client.proto.health_pb2_grpc.HealthStub.__init__", health_stub_init_patch)
+class TestHealthChecker:
+    def test_wrong_probe(self) -> None:
+        with pytest.raises(ValueError):
+            HealthChecker(make_auth(), probes=['ping'])
+
+    def test_failed_endpoint_is_taken_out_of_rotation_and_returned(self) -> None:
+        auth = make_auth()
+        checker = HealthChecker(auth, unhealthy_threshold=2)
+        ENDPOINT_RESPONSES.update({"node0:50051": SERVING_RESPONSE, "node1:50051": UnavailableError()})
+        checker.check_all()
+        assert checker.healthy_uris() == ["node0:50051", "node1:50051"]
+        checker.check_all()
+        assert checker.healthy_uris() == ["node0:50051"]
+        assert checker.status["node1:50051"].last_error == "unavailable"
+        assert {auth.channel.acquire() for _ in range(4)} == {0, 1}
+        ENDPOINT_RESPONSES["node1:50051"] = SERVING_RESPONSE
+        checker.check_all()
+        assert checker.healthy_uris() == ["node0:50051", "node1:50051"]
+        assert auth.channel.is_endpoint_available("node1:50051")
+
+    def test_not_serving_endpoint(self) -> None:
+        auth = make_auth()
+        checker = HealthChecker(auth, unhealthy_threshold=1)
+        ENDPOINT_RESPONSES.update({"node0:50051": NOT_SERVING_RESPONSE, "node1:50051": SERVING_RESPONSE})
+        checker.check_all()
+        assert checker.healthy_uris() == ["node1:50051"]
+        assert checker.status["node0:50051"].last_error == "Server status is NOT_SERVING"
+
+    def test_slow_endpoint(self) -> None:
+        auth = make_auth()
+        checker = HealthChecker(auth, unhealthy_threshold=1, max_latency=0.5)
+        ENDPOINT_RESPONSES.update({"node0:50051": SERVING_RESPONSE, "node1:50051": SERVING_RESPONSE})
+        with patch("time.monotonic", Mock(side_effect=[0.0, 0.1, 0.0, 1.0])):
+            checker.check_all()
+        assert checker.status["node0:50051"].latency == pytest.approx(0.1)
+        assert checker.healthy_uris() == ["node0:50051"]
+
+    def test_background_thread(self) -> None:
+        auth = make_auth()
+        ENDPOINT_RESPONSES.update({"node0:50051": SERVING_RESPONSE, "node1:50051": SERVING_RESPONSE})
+        with HealthChecker(auth, interval=0.01) as checker:
+            assert checker._thread.is_alive()
+        assert checker._thread is None
+        assert checker.status["node0:50051"].num_probes >= 1
+
+    def test_unexpected_error_is_failed_probe(self) -> None:
+        auth = make_auth()
+        checker = HealthChecker(auth, unhealthy_threshold=1)
+        ENDPOINT_RESPONSES.update(
+            {"node0:50051": SERVING_RESPONSE, "node1:50051": ValueError("Cannot invoke RPC on closed channel!")}
+        )
+        with checker:
+            checker.check_all()
+            assert checker._thread.is_alive()
+        assert checker.healthy_uris() == ["node0:50051"]
+        assert checker.status["node1:50051"].last_error == "ValueError('Cannot invoke RPC on closed channel!')"
+
+    def test_asyncio_channels_are_not_allowed(self) -> None:
+        auth = make_auth()
+        auth.channel = Mock(spec=grpc.aio.Channel)
+        with pytest.raises(ValueError):
+            HealthChecker(auth)
@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import random
+import threading
+
+import grpc
+import pytest
+
+from riva.client.loadgen import LoadGenerator, Workload, arrival_times, error_label
+
+
+class FakeRpcError(grpc.RpcError):
+    def code(self) -> grpc.StatusCode:
+        return grpc.StatusCode.UNAVAILABLE
+
+
+class TestArrivalTimes:
+    def test_constant(self) -> None:
+        assert list(arrival_times(4, 1.0, 'constant')) == [0.0, 0.25, 0.5, 0.75]
+
+    def test_poisson_rate(self) -> None:
+        times = list(arrival_times(100, 100.0, 'poisson', random.Random(0)))
+        assert times == sorted(times)
+        assert 9500 < len(times) < 10500
+
+    def test_errors(self) -> None:
+        with pytest.raises(ValueError):
+            next(arrival_times(0, 1.0))
+        with pytest.raises(ValueError):
+            next(arrival_times(1, 1.0, 'uniform'))
+
+
+def test_error_label() -> None:
+    assert error_label(FakeRpcError()) == 'UNAVAILABLE'
+    assert error_label(ValueError()) == 'ValueError'
+
+
+class TestLoadGenerator:
+    def test_open_loop(self) -> None:
+        calls = {'ok': 0, 'failing': 0}
+        lock = threading.Lock()
+
+        def ok() -> None:
+            with lock:
+                calls['ok'] += 1
+
+        def failing() -> None:
+            with lock:
+                calls['failing'] += 1
+            raise FakeRpcError()
+
+        generator = LoadGenerator(
+            [Workload('ok', ok, 3.0), Workload('failing', failing, 1.0)],
+            rate=200,
+            duration=0.5,
+            warmup=0.25,
+            process='constant',
+            seed=0,
+        )
+        report = generator.run().as_dict()
+        # All 150 arrivals are sent, but only 100 arrivals from the measurement window are reported.
+        assert calls['ok'] + calls['failing'] == 150
+        assert report['total']['requests'] == 100
+        assert report['workloads']['failing']['errors'] == {'UNAVAILABLE': report['workloads']['failing']['requests']}
+        assert report['workloads']['ok']['succeeded'] == report['workloads']['ok']['requests'] > 50
+        latency = report['workloads']['ok']['latency']
+        assert 0 <= latency['p50'] <= latency['p90'] <= latency['p99'] <= latency['p99.9'] == latency['max']
+        markdown = generator.run().to_markdown()
+        assert "| failing |" in markdown and "| UNAVAILABLE |" in markdown
+
+    def test_client_overload(self) -> None:
+        release = threading.Event()
+        generator = LoadGenerator(
+            [Workload('slow', lambda: release.wait(5))], rate=100, duration=0.1, process='constant', max_in_flight=2
+        )
+        timer = threading.Timer(0.3, release.set)
+        timer.start()
+        report = generator.run().as_dict()
+        timer.join()
+        assert report['total']['succeeded'] == 2
+        assert report['total']['errors'] == {'CLIENT_OVERLOADED': 8}
+
+    def test_invalid_workloads(self) -> None:
+        with pytest.raises(ValueError):
+            LoadGenerator([], rate=1, duration=1)
+        with pytest.raises(ValueError):
+            LoadGenerator([Workload('zero', lambda: None, 0.0)], rate=1, duration=1)
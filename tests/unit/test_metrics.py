@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+from typing import List
+from unittest.mock import Mock, patch
+
+import grpc
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client import ASRService, LatencyRecorder
+from riva.client.metrics import Histogram
+
+from .helpers import set_auth_mock
+
+
+SAMPLE_RATE_HZ = 1000
+BYTES_PER_SECOND = 2 * SAMPLE_RATE_HZ
+CONFIG = rasr.StreamingRecognitionConfig(config=rasr.RecognitionConfig(sample_rate_hertz=SAMPLE_RATE_HZ))
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def result(transcript: str, is_final: bool, audio_processed: float = 0.0) -> rasr.StreamingRecognitionResult:
+    return rasr.StreamingRecognitionResult(
+        is_final=is_final,
+        audio_processed=audio_processed,
+        alternatives=[rasr.SpeechRecognitionAlternative(transcript=transcript)],
+    )
+
+
+class StreamingCallMock:
+    """Advances a clock by 0.1 second for every chunk and returns a partial result and a final result at the end."""
+    def __init__(self, clock: FakeClock, latency: float) -> None:
+        self.clock = clock
+        self.latency = latency
+
+    def __call__(self, requests, metadata=None):
+        processed = 0
+        for request in requests:
+            if not request.audio_content:
+                continue
+            self.clock.now += 0.1
+            processed += len(request.audio_content)
+            if processed == BYTES_PER_SECOND // 10:
+                yield rasr.StreamingRecognizeResponse(results=[result("he", False)])
+        self.clock.now += self.latency
+        yield rasr.StreamingRecognizeResponse(results=[result("hello", True, processed / BYTES_PER_SECOND)])
+
+
+class TestHistogram:
+    def test_percentiles(self) -> None:
+        histogram = Histogram([1.0, 2.0, 5.0, float('inf')])
+        for value in [0.5] * 5 + [1.5] * 4 + [100.0]:
+            histogram.observe(value)
+        assert histogram.count == 10
+        assert histogram.mean == pytest.approx(10.85)
+        assert histogram.percentile(50) == 1.0
+        assert histogram.percentile(90) == 2.0
+        assert histogram.percentile(99) == 100.0
+        assert histogram.as_dict()['buckets'] == {'1.0': 5, '2.0': 4, 'inf': 1}
+
+    def test_empty(self) -> None:
+        assert Histogram().percentile(50) is None
+
+
+@patch("riva.client.proto.riva_asr_pb2_grpc.RivaSpeechRecognitionStub.__init__", lambda self, channel: None)
+class TestLatencyRecorder:
+    def test_streaming(self) -> None:
+        clock = FakeClock()
+        recorder = LatencyRecorder(clock=clock)
+        auth, _ = set_auth_mock()
+        service = ASRService(auth, latency_recorder=recorder)
+        service.stub.StreamingRecognize = StreamingCallMock(clock, latency=0.25)
+        chunks = [b'a' * (BYTES_PER_SECOND // 10)] * 20
+        responses = list(service.streaming_response_generator(chunks, CONFIG))
+        assert len(responses) == 2
+        [record] = recorder.records
+        assert record.time_to_first_partial == pytest.approx(0.1)
+        # The last chunk is sent at 1.9 seconds and is processed for 0.1 second before the final result latency.
+        assert record.final_lags == [pytest.approx(0.35)]
+        assert record.audio_duration == pytest.approx(2.0)
+        assert record.rtf == pytest.approx(2.25 / 2.0)
+        assert record.num_requests == 21 and record.num_responses == 2
+        assert record.num_partials == 1 and record.num_finals == 1
+        assert record.bytes_sent > 4000 and record.bytes_received > 0
+        summary = recorder.summary()['asr.streaming']
+        assert summary['count'] == 1 and summary['errors'] == 0
+        assert summary['final_lag']['p50'] == pytest.approx(0.35)
+
+    def test_offline_and_errors(self) -> None:
+        clock = FakeClock()
+        recorder = LatencyRecorder(clock=clock)
+        auth, _ = set_auth_mock()
+        service = ASRService(auth, latency_recorder=recorder)
+
+        def recognize(request, metadata=None):
+            clock.now += 0.5
+            return rasr.RecognizeResponse(results=[rasr.SpeechRecognitionResult(audio_processed=1.0)])
+
+        service.stub.Recognize = recognize
+        service.offline_recognize(b'a' * BYTES_PER_SECOND, CONFIG.config)
+        service.stub.Recognize = Mock(side_effect=grpc.RpcError("unavailable"))
+        with pytest.raises(grpc.RpcError):
+            service.offline_recognize(b'a' * BYTES_PER_SECOND, CONFIG.config)
+        records: List = list(recorder.records)
+        assert records[0].rtf == pytest.approx(0.5) and records[0].final_lags == [pytest.approx(0.5)]
+        assert records[1].error is not None
+        summary = recorder.summary()['asr.offline']
+        assert summary['count'] == 2 and summary['errors'] == 1
+
+    def test_not_instrumented_by_default(self) -> None:
+        auth, _ = set_auth_mock()
+        service = ASRService(auth)
+        responses = iter([rasr.StreamingRecognizeResponse()])
+        service.stub.StreamingRecognize = Mock(return_value=responses)
+        assert list(service.streaming_response_generator([b'a'], CONFIG)) == [rasr.StreamingRecognizeResponse()]
@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import pytest
+
+import riva.client.proto.riva_nlp_pb2 as rnlp
+from riva.client.microbatch import NLPMicroBatcher, split_response
+
+
+class FakeNLPService:
+    """Answers batched calls in a thread pool and records sent batches."""
+    def __init__(self, fail: bool = False) -> None:
+        self.batches: List[Tuple[str, List[str], Optional[str], str]] = []
+        self.fail = fail
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.lock = threading.Lock()
+
+    def _call(self, method: str, texts: List[str], model_name: Optional[str], language_code: str) -> Future:
+        with self.lock:
+            self.batches.append((method, texts, model_name, language_code))
+        if method == 'classify_text':
+            response = rnlp.TextClassResponse()
+            for text in texts:
+                response.results.add().labels.add(class_name=f"{model_name}:{text}", score=1.0)
+        else:
+            response = rnlp.TextTransformResponse(text=[text.capitalize() + '.' for text in texts])
+        if self.fail:
+            response = rnlp.TextTransformResponse()
+        return self.executor.submit(lambda: response)
+
+    def classify_text(self, texts, model_name, language_code='en-US', future=False) -> Future:
+        return self._call('classify_text', texts, model_name, language_code)
+
+    def punctuate_text(self, texts, model_name=None, language_code='en-US', future=False) -> Future:
+        return self._call('punctuate_text', texts, model_name, language_code)
+
+
+class TestNLPMicroBatcher:
+    def test_coalesces_texts_of_many_threads(self) -> None:
+        service = FakeNLPService()
+        texts = [f"text {i}" for i in range(40)]
+        with NLPMicroBatcher(service, max_batch_size=8, max_delay=0.05) as batcher:
+            with ThreadPoolExecutor(max_workers=40) as callers:
+                responses = list(
+                    callers.map(lambda text: batcher.punctuate_text(text).result(timeout=5).text[0], texts)
+                )
+        assert responses == [text.capitalize() + '.' for text in texts]
+        assert all(len(batch_texts) <= 8 for _, batch_texts, _, _ in service.batches)
+        assert len(service.batches) < len(texts)
+        assert batcher.num_items == 40
+        assert batcher.mean_batch_size > 1
+
+    def test_batches_are_separated_by_method_model_and_language(self) -> None:
+        service = FakeNLPService()
+        with NLPMicroBatcher(service, max_batch_size=8, max_delay=0.05) as batcher:
+            futures = [
+                batcher.classify_text("a", "model-1"),
+                batcher.classify_text("b", "model-2"),
+                batcher.classify_text("c", "model-1"),
+                batcher.classify_text("d", "model-1", language_code="de-DE"),
+                batcher.punctuate_text("e"),
+            ]
+        labels = [future.result(timeout=5) for future in futures]
+        assert [response.results[0].labels[0].class_name for response in labels[:4]] == [
+            "model-1:a",
+            "model-2:b",
+            "model-1:c",
+            "model-1:d",
+        ]
+        assert sorted(service.batches) == [
+            ('classify_text', ['a', 'c'], 'model-1', 'en-US'),
+            ('classify_text', ['b'], 'model-2', 'en-US'),
+            ('classify_text', ['d'], 'model-1', 'de-DE'),
+            ('punctuate_text', ['e'], None, 'en-US'),
+        ]
+
+    def test_full_batch_is_sent_without_delay(self) -> None:
+        service = FakeNLPService()
+        batcher = NLPMicroBatcher(service, max_batch_size=2, max_delay=60)
+        futures = [batcher.punctuate_text(text) for text in ["a", "b"]]
+        assert [future.result(timeout=5).text[0] for future in futures] == ["A.", "B."]
+        batcher.close()
+
+    def test_failed_split_is_raised_to_every_caller(self) -> None:
+        with NLPMicroBatcher(FakeNLPService(fail=True), max_delay=0.01) as batcher:
+            futures = [batcher.punctuate_text(text) for text in ["a", "b"]]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+
+    def test_closed_and_not_allowed(self) -> None:
+        batcher = NLPMicroBatcher(FakeNLPService())
+        with pytest.raises(ValueError):
+            batcher.submit('analyze_intent', "a", None)
+        batcher.close()
+        with pytest.raises(RuntimeError):
+            batcher.punctuate_text("a")
+        with pytest.raises(ValueError):
+            NLPMicroBatcher(FakeNLPService(), max_batch_size=0)
+
+
+def test_split_response() -> None:
+    response = rnlp.TextTransformResponse(text=["A.", "B."])
+    assert [r.text[0] for r in split_response(response, 2)] == ["A.", "B."]
+    with pytest.raises(ValueError):
+        split_response(response, 3)
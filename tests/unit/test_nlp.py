@@ -1,11 +1,17 @@
 # SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
 # SPDX-License-Identifier: MIT
 
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Union
 from unittest.mock import patch, Mock
 
+import pytest
+
 import riva.client.proto.riva_nlp_pb2 as rnlp
 from riva.client import NLPService
+from riva.client.nlp import batch_generator, classify_text_batch, iter_batches_async, iter_classify_text_batch
 
 from .helpers import set_auth_mock
 
@@ -216,3 +222,97 @@ class TestSpeechSynthesisService:
         resp = service.natural_query(INPUT_STRINGS[0], INPUT_STRINGS[1], TOP_N, future=True)
         assert isinstance(resp, rnlp.NaturalQueryResponse)
         NATURAL_QUERY_MOCK.future.assert_called_with(NATURAL_QUERY_REQUEST, metadata=return_value_of_get_auth_metadata)
+
+
+def text_class_response(input_strings: List[str]) -> rnlp.TextClassResponse:
+    response = rnlp.TextClassResponse()
+    for text in input_strings:
+        response.results.add().labels.add(class_name=text.upper(), score=0.5)
+    return response
+
+
+class TestIterBatchesAsync:
+    def test_slow_request_does_not_stop_window(self) -> None:
+        futures = {}
+        submitted_while_first_pending = []
+
+        def process(input_strings: List[int], future: bool) -> Future:
+            i = input_strings[0]
+            if 0 in futures:
+                submitted_while_first_pending.append(not futures[0].done())
+            futures[i] = Future()
+            if i == 0:
+                threading.Timer(0.1, futures[i].set_result, [i]).start()
+            else:
+                futures[i].set_result(i)
+            return futures[i]
+
+        responses = list(iter_batches_async(batch_generator(list(range(8)), 1), process, {}, 2))
+        assert responses == list(range(8))
+        # A window of 2 requests keeps sending while the first request is slow, up to 4 requests waiting in order.
+        assert submitted_while_first_pending[:3] == [True, True, True]
+
+    def test_number_of_requests_in_flight(self) -> None:
+        lock = threading.Lock()
+        running, max_running = [0], [0]
+
+        def work(batch: List[int]) -> List[int]:
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.005 * (batch[0] % 3))
+            with lock:
+                running[0] -= 1
+            return batch
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            responses = iter_batches_async(
+                batch_generator(iter(range(50)), 3),
+                lambda input_strings, future: executor.submit(work, input_strings),
+                {},
+                3,
+            )
+            assert [x for batch in responses for x in batch] == list(range(50))
+        assert max_running[0] <= 3
+
+    def test_error_is_raised_in_order(self) -> None:
+        def process(input_strings: List[int], future: bool) -> Future:
+            f = Future()
+            if input_strings[0] == 2:
+                f.set_exception(RuntimeError("failed"))
+            else:
+                f.set_result(input_strings[0])
+            return f
+
+        responses = iter_batches_async(batch_generator(list(range(5)), 1), process, {}, 2)
+        assert [next(responses), next(responses)] == [0, 1]
+        with pytest.raises(RuntimeError):
+            next(responses)
+
+
+class TestClassifyTextBatch:
+    @pytest.mark.parametrize("max_async_requests_to_queue", [0, 2])
+    def test_classify_text_batch(self, max_async_requests_to_queue: int) -> None:
+        def classify_text(
+            input_strings: List[str], future: bool = False, **kwargs
+        ) -> Union[Future, rnlp.TextClassResponse]:
+            response = text_class_response(input_strings)
+            if not future:
+                return response
+            f = Future()
+            f.set_result(response)
+            return f
+
+        nlp_service = Mock(classify_text=Mock(side_effect=classify_text))
+        texts = [f"text {i}" for i in range(7)]
+        classes, confidences = classify_text_batch(
+            nlp_service, texts, MODEL_NAME, 3, max_async_requests_to_queue=max_async_requests_to_queue
+        )
+        assert classes == [text.upper() for text in texts]
+        assert confidences == [0.5] * 7
+        streamed = list(
+            iter_classify_text_batch(
+                nlp_service, iter(texts), MODEL_NAME, 3, max_async_requests_to_queue=max_async_requests_to_queue
+            )
+        )
+        assert streamed == list(zip(classes, confidences))
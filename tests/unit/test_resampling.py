@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import struct
+from pathlib import Path
+
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.proto.riva_audio_pb2 import AudioEncoding
+
+np = pytest.importorskip("numpy")
+
+from riva.client.resampling import AudioConverter, Resampler, decode_pcm, encode_pcm16, read_wav_format  # noqa: E402
+
+
+def sine(frequency: float, framerate: int, duration: float, amplitude: float = 0.5) -> np.ndarray:
+    return amplitude * np.sin(2 * np.pi * frequency * np.arange(int(framerate * duration)) / framerate)
+
+
+def write_wav(path: Path, data: bytes, framerate: int, n_channels: int, sample_width: int, format_tag: int) -> None:
+    fmt = struct.pack(
+        '<HHIIHH',
+        format_tag,
+        n_channels,
+        framerate,
+        framerate * n_channels * sample_width,
+        n_channels * sample_width,
+        8 * sample_width,
+    )
+    if format_tag == 0xFFFE:
+        fmt += struct.pack('<HHI', 22, 8 * sample_width, 0) + struct.pack('<H', 1) + bytes(14)
+    body = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'data' + struct.pack('<I', len(data)) + data
+    path.write_bytes(b'RIFF' + struct.pack('<I', len(body)) + body)
+
+
+class TestDecodePcm:
+    @pytest.mark.parametrize("sample_width", [1, 2, 3, 4])
+    def test_integer_samples(self, sample_width: int) -> None:
+        full_scale = 2 ** (8 * sample_width - 1)
+        values = [0, full_scale // 2, -full_scale, full_scale - 1]
+        if sample_width == 1:
+            data = bytes(v + 128 for v in values)
+        else:
+            data = b''.join(v.to_bytes(sample_width, 'little', signed=True) for v in values)
+        samples = decode_pcm(data, sample_width, n_channels=2)
+        assert samples.shape == (2, 2)
+        assert samples.ravel() == pytest.approx([0.0, 0.5, -1.0, 1.0], abs=1 / full_scale)
+
+    def test_float_samples_and_encoding(self) -> None:
+        samples = decode_pcm(np.array([0.25, -1.5], '<f4').tobytes(), 4, float_samples=True)
+        assert np.frombuffer(encode_pcm16(samples), '<i2').tolist() == [8192, -32768]
+
+    def test_unsupported_sample_width(self) -> None:
+        with pytest.raises(ValueError, match="Allowed values"):
+            decode_pcm(b'', 2, float_samples=True)
+
+
+class TestResampler:
+    @pytest.mark.parametrize("input_rate,output_rate", [(44100, 16000), (48000, 16000), (8000, 16000)])
+    def test_sine_is_preserved(self, input_rate: int, output_rate: int) -> None:
+        resampler = Resampler(input_rate, output_rate)
+        x = sine(440, input_rate, 1.0)[:, None]
+        y = np.concatenate([resampler.process(x[i : i + 777]) for i in range(0, len(x), 777)] + [resampler.flush()])
+        assert len(y) == output_rate
+        expected = sine(440, output_rate, 1.0)
+        assert np.abs(y[100:-100, 0] - expected[100:-100]).max() < 1e-3
+
+    def test_frequencies_above_nyquist_are_removed(self) -> None:
+        resampler = Resampler(48000, 16000)
+        y = np.concatenate([resampler.process(sine(10000, 48000, 0.5)[:, None]), resampler.flush()])
+        assert np.abs(y[100:-100]).max() < 0.01
+
+
+class TestAudioConverter:
+    def test_chunk_boundaries_do_not_change_output(self) -> None:
+        x = np.round(np.stack([sine(1000, 44100, 0.5), sine(300, 44100, 0.5)], axis=1) * 2**23).astype(np.int32)
+        data = b''.join(int(v).to_bytes(3, 'little', signed=True) for v in x.ravel())
+        whole = b''.join(AudioConverter([data], 44100, input_channels=2, sample_width=3))
+        chunked = b''.join(
+            AudioConverter([data[i : i + 1001] for i in range(0, len(data), 1001)], 44100, 2, sample_width=3)
+        )
+        assert whole == chunked
+        assert len(whole) == 2 * 8000
+
+    @pytest.mark.parametrize("format_tag,sample_width", [(3, 4), (0xFFFE, 3)])
+    def test_from_wav_file(self, tmp_path: Path, format_tag: int, sample_width: int) -> None:
+        x = np.stack([sine(440, 48000, 0.25)] * 2, axis=1)
+        if format_tag == 3:
+            data = x.astype('<f4').tobytes()
+        else:
+            data = b''.join(int(v).to_bytes(3, 'little', signed=True) for v in np.round(x.ravel() * 2**23))
+        path = tmp_path / "audio.wav"
+        write_wav(path, data, 48000, 2, sample_width, format_tag)
+        parameters = read_wav_format(path)
+        assert parameters['float_samples'] == (format_tag == 3)
+        assert parameters['sampwidth'] == sample_width and parameters['nframes'] == 12000
+        durations = []
+        with AudioConverter.from_wav_file(path, 4800, lambda chunk, duration: durations.append(duration)) as converter:
+            y = np.frombuffer(b''.join(converter), '<i2') / 32768
+        assert durations == [0.1, 0.1, 0.05]
+        assert np.abs(y[100:-100] - sine(440, 16000, 0.25)[100:-100]).max() < 1e-3
+        config = rasr.StreamingRecognitionConfig()
+        converter.update_config(config)
+        assert (config.config.encoding, config.config.sample_rate_hertz, config.config.audio_channel_count) == (
+            AudioEncoding.LINEAR_PCM,
+            16000,
+            1,
+        )
+
+    def test_not_a_wav_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "audio.raw"
+        path.write_bytes(bytes(100))
+        with pytest.raises(ValueError, match="not a WAV file"):
+            read_wav_format(path)
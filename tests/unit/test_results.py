@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.results import (
+    RESULT_FIELDS,
+    CompactResult,
+    Word,
+    WordList,
+    compact_responses,
+    compact_result,
+)
+from riva.client.sinks import TranscriptSink, dispatch_responses
+
+
+def make_result(transcript: str, is_final: bool = True, n_words: int = 3) -> rasr.StreamingRecognitionResult:
+    words = [
+        rasr.WordInfo(word=f"w{i}", start_time=100 * i, end_time=100 * i + 50, confidence=0.5) for i in range(n_words)
+    ]
+    result = rasr.StreamingRecognitionResult(
+        is_final=is_final,
+        stability=0.25,
+        channel_tag=1,
+        audio_processed=1.5,
+        alternatives=[
+            rasr.SpeechRecognitionAlternative(transcript=transcript, confidence=0.75, words=words),
+            rasr.SpeechRecognitionAlternative(transcript="other"),
+        ],
+    )
+    result.pipeline_states.vad_probabilities.extend([0.25, 0.5])
+    return result
+
+
+class TestCompactResult:
+    def test_all_fields(self) -> None:
+        compact = compact_result(make_result("hello"), RESULT_FIELDS)
+        assert compact.as_dict() == {
+            'transcript': "hello",
+            'confidence': 0.75,
+            'words': [
+                {'word': f"w{i}", 'start_time': 100 * i, 'end_time': 100 * i + 50, 'confidence': 0.5}
+                for i in range(3)
+            ],
+            'start_time': 0,
+            'end_time': 250,
+            'is_final': True,
+            'stability': 0.25,
+            'channel_tag': 1,
+            'audio_processed': 1.5,
+            'vad_probabilities': [0.25, 0.5],
+        }
+        assert compact.words[1] == Word("w1", 100, 150, 0.5)
+        assert compact.words[1:] == WordList(["w1", "w2"], [100, 200], [150, 250], [0.5, 0.5])
+
+    def test_only_requested_fields_are_copied(self) -> None:
+        compact = compact_result(make_result("hello", is_final=False), ['transcript'])
+        assert compact == CompactResult(transcript="hello")
+        assert len(compact.words) == 0 and compact.is_final
+
+    def test_offline_result(self) -> None:
+        result = rasr.SpeechRecognitionResult(
+            alternatives=[rasr.SpeechRecognitionAlternative(transcript="hi")], audio_processed=2.0
+        )
+        compact = compact_result(result, ['transcript', 'is_final', 'stability', 'vad_probabilities'])
+        assert compact == CompactResult(transcript="hi")
+
+    def test_unknown_field(self) -> None:
+        with pytest.raises(ValueError, match="Allowed fields"):
+            compact_result(make_result("hello"), ['transcript', 'speaker'])
+
+    def test_slots(self) -> None:
+        with pytest.raises(AttributeError):
+            CompactResult().extra = 1
+        word_strings = [compact_result(make_result(t)).words.texts[0] for t in ["a", "b"]]
+        assert word_strings[0] is word_strings[1]
+
+
+def test_compact_responses_and_transcript_sink() -> None:
+    responses = [
+        rasr.StreamingRecognizeResponse(results=[make_result("he", is_final=False)]),
+        rasr.StreamingRecognizeResponse(results=[make_result("hello ")]),
+        rasr.StreamingRecognizeResponse(results=[rasr.StreamingRecognitionResult(is_final=True)]),
+        rasr.StreamingRecognizeResponse(results=[make_result("world")]),
+    ]
+    assert [r.transcript for r in compact_responses(responses)] == ["hello ", "world"]
+    assert [r.transcript for r in compact_responses(responses, finals_only=False)] == ["he", "hello ", "world"]
+    sink = TranscriptSink(fields=['transcript', 'start_time'], include_partials=True)
+    dispatch_responses(responses[:1], sink)
+    assert sink.partial.transcript == "he"
+    dispatch_responses(responses[1:], sink)
+    assert sink.transcript == "hello world" and sink.partial is None
+    assert [r.start_time for r in sink.results] == [0, 0]
@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+from array import array
+
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.segmentation import AudioSegment, merge_segment_responses, plan_audio_segments
+
+
+FRAMERATE = 1000
+
+
+def make_response(*words) -> rasr.RecognizeResponse:
+    alternative = rasr.SpeechRecognitionAlternative(
+        transcript=" ".join(word for word, _ in words),
+        words=[rasr.WordInfo(word=word, start_time=start, end_time=start + 100) for word, start in words],
+    )
+    return rasr.RecognizeResponse(
+        results=[rasr.SpeechRecognitionResult(alternatives=[alternative], audio_processed=1.0)]
+    )
+
+
+class TestPlanAudioSegments:
+    def test_fixed_windows_with_overlap(self) -> None:
+        segments = plan_audio_segments(2500, FRAMERATE, 1.0, overlap=0.2)
+        assert segments == [
+            AudioSegment(0, 1000), AudioSegment(800, 1800), AudioSegment(1600, 2500)
+        ]
+
+    def test_cut_at_silence(self) -> None:
+        samples = array('h', [1000] * 3000)
+        for i in range(700, 740):
+            samples[i] = 0
+        segments = plan_audio_segments(
+            3000, FRAMERATE, 1.0, pcm=samples.tobytes(), silence_search=0.5
+        )
+        assert segments[0] == AudioSegment(0, 710)
+        assert segments[1].start_frame == 710
+        assert segments[-1].end_frame == 3000
+
+    def test_invalid_overlap(self) -> None:
+        with pytest.raises(ValueError):
+            plan_audio_segments(2500, FRAMERATE, 1.0, overlap=0.5)
+
+
+class TestMergeSegmentResponses:
+    def test_rebase_without_overlap(self) -> None:
+        segments = [AudioSegment(0, 1000), AudioSegment(1000, 2000)]
+        merged = merge_segment_responses(
+            [make_response(("hello", 100)), make_response(("world", 200))], segments, FRAMERATE
+        )
+        assert [result.alternatives[0].transcript for result in merged.results] == ["hello", "world"]
+        assert merged.results[1].alternatives[0].words[0].start_time == 1200
+        assert merged.results[1].audio_processed == pytest.approx(2.0)
+
+    def test_deduplicate_overlap(self) -> None:
+        segments = [AudioSegment(0, 1000), AudioSegment(800, 1800)]
+        responses = [
+            make_response(("one", 100), ("two", 850), ("three", 950)),
+            make_response(("two", 40), ("three", 160), ("four", 600)),
+        ]
+        merged = merge_segment_responses(responses, segments, FRAMERATE, keep_words=False)
+        assert [result.alternatives[0].transcript for result in merged.results] == ["one two", "three four"]
+        assert not merged.results[0].alternatives[0].words
@@ -0,0 +1,135 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import csv
+import io
+import json
+from pathlib import Path
+from typing import List
+from unittest.mock import Mock, patch
+
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.sinks import (
+    CSV_SINK_COLUMNS,
+    BufferedFileSink,
+    ConsoleSink,
+    CsvSink,
+    FanOutSink,
+    JsonlSink,
+    ResultSink,
+    TsvSink,
+    dispatch_responses,
+)
+
+
+def make_responses() -> List[rasr.StreamingRecognizeResponse]:
+    partial = rasr.StreamingRecognitionResult(
+        alternatives=[rasr.SpeechRecognitionAlternative(transcript="hel")], stability=0.5
+    )
+    final = rasr.StreamingRecognitionResult(
+        is_final=True,
+        alternatives=[
+            rasr.SpeechRecognitionAlternative(
+                transcript="hello",
+                confidence=0.75,
+                words=[rasr.WordInfo(word="hello", start_time=100, end_time=500, confidence=0.75)],
+            )
+        ],
+    )
+    final.pipeline_states.vad_probabilities.extend([0.25, 0.5])
+    return [
+        rasr.StreamingRecognizeResponse(),
+        rasr.StreamingRecognizeResponse(results=[partial]),
+        rasr.StreamingRecognizeResponse(results=[final]),
+    ]
+
+
+class TestDispatchResponses:
+    def test_events(self) -> None:
+        sink = Mock(spec=ResultSink)
+        dispatch_responses(make_responses(), sink)
+        assert sink.on_partial.call_count == 1
+        assert sink.on_final.call_count == 1
+        assert sink.on_vad_states.call_count == 1
+        assert sink.on_response_end.call_count == 2
+
+    def test_fan_out(self) -> None:
+        sinks = [Mock(spec=ResultSink), Mock(spec=ResultSink)]
+        with FanOutSink(sinks) as sink:
+            dispatch_responses(make_responses(), sink)
+        for s in sinks:
+            assert s.on_final.call_count == 1
+            s.close.assert_called_once()
+        sink.on_stream_start()
+        for s in sinks:
+            s.on_stream_start.assert_called_once()
+
+
+class TestBufferedSinks:
+    def test_base_class_is_abstract(self) -> None:
+        with pytest.raises(TypeError):
+            BufferedFileSink(io.StringIO())
+
+    def test_jsonl(self) -> None:
+        output = io.StringIO()
+        with JsonlSink(output, include_partials=True, word_time_offsets=True, stream_id="a.wav") as sink:
+            dispatch_responses(make_responses(), sink)
+            assert output.getvalue() == ""
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [record['event'] for record in records] == ['partial', 'vad', 'final']
+        assert all(record['stream_id'] == "a.wav" for record in records)
+        assert records[0]['stability'] == 0.5
+        assert records[1]['vad_probabilities'] == [0.25, 0.5]
+        assert records[2]['transcript'] == "hello"
+        assert records[2]['confidence'] == 0.75
+        assert records[2]['words'] == [{'word': "hello", 'start_time': 100, 'end_time': 500, 'confidence': 0.75}]
+
+    def test_jsonl_buffer_size(self) -> None:
+        output = io.StringIO()
+        sink = JsonlSink(output, buffer_size=1)
+        dispatch_responses(make_responses(), sink)
+        assert len(output.getvalue().splitlines()) == 2
+        sink.close()
+        sink.close()
+
+    def test_csv_file(self, tmp_path: Path) -> None:
+        with CsvSink(tmp_path / "out.csv", word_time_offsets=True) as sink:
+            dispatch_responses(make_responses(), sink)
+        with (tmp_path / "out.csv").open(newline='') as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == CSV_SINK_COLUMNS
+        assert [row[1] for row in rows[1:]] == ['vad', 'final', 'word']
+        assert rows[2][3] == "hello"
+        assert rows[3][6:] == ['100', '500']
+
+    def test_tsv(self) -> None:
+        output = io.StringIO()
+        with TsvSink(output, header=False) as sink:
+            dispatch_responses(make_responses(), sink)
+        rows = [line.split('\t') for line in output.getvalue().splitlines()]
+        assert [row[1] for row in rows] == ['vad', 'final']
+        assert rows[1][3:5] == ['hello', '0.75']
+
+
+class TestConsoleSink:
+    def test_confidence(self) -> None:
+        output = io.StringIO()
+        with ConsoleSink(output, additional_info='confidence') as sink:
+            dispatch_responses(make_responses(), sink)
+        assert output.getvalue() == (
+            ">> hel\nStability:    0.5000\n----\nVAD States: 0.25 0.5 \n## hello\nConfidence:    0.7500\n----\n"
+        )
+
+    def test_time_restarts_with_stream(self) -> None:
+        output = io.StringIO()
+        with patch('riva.client.sinks.time.time', side_effect=[100.0, 103.0, 110.0, 111.5]):
+            with ConsoleSink(output, additional_info='time') as sink:
+                dispatch_responses(make_responses()[2:], sink)
+                sink.on_stream_start()
+                dispatch_responses(make_responses()[2:], sink)
+        assert [line.split(':')[0] for line in output.getvalue().splitlines() if line.startswith('Time')] == [
+            'Time 3.00s',
+            'Time 1.50s',
+        ]
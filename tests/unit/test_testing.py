@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import time
+
+import grpc
+import pytest
+
+import riva.client
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.testing import LatencyModel, MockRivaServer
+
+
+SAMPLE_RATE_HZ = 16000
+CHUNKS = [bytes(2 * 1600)] * 50  # 5 seconds of audio in 0.1 second chunks
+CONFIG = rasr.RecognitionConfig(sample_rate_hertz=SAMPLE_RATE_HZ, enable_word_time_offsets=True)
+
+
+@pytest.fixture
+def server():
+    with MockRivaServer(partial_interval=0.5, final_interval=2.0) as server:
+        yield server
+
+
+@pytest.fixture
+def auth(server):
+    auth = riva.client.Auth(uri=server.address)
+    yield auth
+    auth.close()
+
+
+class TestMockRivaServer:
+    def test_streaming_recognition(self, auth) -> None:
+        responses = list(
+            riva.client.ASRService(auth).streaming_response_generator(
+                CHUNKS, rasr.StreamingRecognitionConfig(config=CONFIG, interim_results=True)
+            )
+        )
+        results = [response.results[0] for response in responses]
+        finals = [result for result in results if result.is_final]
+        assert [result.audio_processed for result in finals] == pytest.approx([2.0, 4.0, 5.0])
+        assert len(results) - len(finals) == 8
+        assert finals[1].alternatives[0].words[0].start_time == 2000
+        assert len(finals[0].alternatives[0].transcript.split()) == 5
+
+    def test_unary_services(self, server, auth) -> None:
+        response = riva.client.ASRService(auth).offline_recognize(b''.join(CHUNKS), CONFIG)
+        assert len(response.results) == 3
+        tts = riva.client.SpeechSynthesisService(auth)
+        assert len(tts.synthesize("a" * 10, sample_rate_hz=1000).audio) == 2 * 600
+        chunks = [response.audio for response in tts.synthesize_online("a" * 10, sample_rate_hz=1000)]
+        assert len(chunks) == 6 and len(b''.join(chunks)) == 2 * 600
+        assert riva.client.NLPService(auth).punctuate_text(["hello"]).text == ["Hello."]
+        translation = riva.client.NeuralMachineTranslationClient(auth).translate(["hello"], "", "en", "de")
+        assert translation.translations[0].text == "hello"
+        assert server.calls == {
+            'Recognize': 1, 'Synthesize': 1, 'SynthesizeOnline': 1, 'PunctuateText': 1, 'TranslateText': 1
+        }
+
+    def test_language_understanding(self, server, auth) -> None:
+        nlp = riva.client.NLPService(auth)
+        tokens, classes, _, starts, ends = riva.client.extract_most_probable_token_classification_predictions(
+            nlp.classify_tokens(["hello  world", "riva"], "ner")
+        )
+        assert tokens == [["hello", "world"], ["riva"]]
+        assert classes == [["mock", "mock"], ["mock"]]
+        assert (starts, ends) == ([[0, 7], [0]], [[5, 12], [4]])
+        assert [token.token for token in nlp.analyze_entities("Where is Santa Clara").results[0].results][-1] == "Clara"
+        intent = nlp.analyze_intent("what is the weather", riva.client.AnalyzeIntentOptions(domain="weather"))
+        assert (intent.intent.class_name, intent.domain_str, len(intent.slots)) == ("weather.mock", "weather", 4)
+        answers = nlp.natural_query("who?", "Riva is a speech SDK.", top_n=2).results
+        assert [answer.answer for answer in answers] == ["Riva", "Riva is"]
+        assert server.calls == {'ClassifyTokens': 1, 'AnalyzeEntities': 1, 'AnalyzeIntent': 1, 'NaturalQuery': 1}
+
+    def test_errors_and_latency(self) -> None:
+        with MockRivaServer(
+            latency={'TranslateText': LatencyModel(base=0.2)},
+            error_rate=1.0,
+            error_code=grpc.StatusCode.RESOURCE_EXHAUSTED,
+            error_methods=['PunctuateText'],
+        ) as server:
+            auth = riva.client.Auth(uri=server.address)
+            try:
+                with pytest.raises(grpc.RpcError) as e:
+                    riva.client.NLPService(auth).punctuate_text(["hello"])
+                assert e.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+                start = time.monotonic()
+                riva.client.NeuralMachineTranslationClient(auth).translate(["hello"], "", "en", "de")
+                assert time.monotonic() - start >= 0.2
+                assert server.errors == {'PunctuateText': 1}
+            finally:
+                auth.close()
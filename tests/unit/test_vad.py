@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import math
+import struct
+from typing import List
+
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client.vad import EnergySpeechDetector, SilenceTrimmer, TimestampMap, trim_silence
+
+
+FRAMERATE = 16000
+
+
+def tone(duration: float) -> bytes:
+    return b''.join(struct.pack('<h', int(8000 * math.sin(i / 5))) for i in range(int(duration * FRAMERATE)))
+
+
+def silence(duration: float) -> bytes:
+    return bytes(2 * int(duration * FRAMERATE))
+
+
+def split(pcm: bytes, chunk_size: int = 3000) -> List[bytes]:
+    return [pcm[i : i + chunk_size] for i in range(0, len(pcm), chunk_size)]
+
+
+class TestEnergySpeechDetector:
+    def test_threshold(self) -> None:
+        detector = EnergySpeechDetector(threshold_db=-45.0)
+        assert detector(tone(0.02))
+        assert not detector(silence(0.02))
+        assert not detector(struct.pack('<4h', 50, -50, 50, -50))  # about -56 dBFS
+
+    def test_unsupported_sample_width(self) -> None:
+        with pytest.raises(ValueError, match="Allowed values"):
+            EnergySpeechDetector(sample_width=3)
+
+
+class TestSilenceTrimmer:
+    def test_long_silences_are_shortened(self) -> None:
+        pcm = silence(3) + tone(1) + silence(0.5) + tone(1) + silence(5) + tone(1) + silence(2)
+        trimmer = SilenceTrimmer(split(pcm), FRAMERATE, min_silence=1.0, hangover=0.3)
+        trimmed = b''.join(trimmer)
+        assert len(trimmed) == 2 * int(4.7 * FRAMERATE)
+        assert trimmer.timestamps.gaps() == [
+            (0, 2.7 * FRAMERATE),
+            (3.1 * FRAMERATE, 7.1 * FRAMERATE),
+            (4.7 * FRAMERATE, 8.8 * FRAMERATE),
+        ]
+        assert trimmer.removed_fraction == pytest.approx(8.8 / 13.5)
+        assert trimmed[: len(silence(0.3))] == silence(0.3)
+
+    def test_zero_hangover_drops_silence(self) -> None:
+        pcm = tone(1) + silence(2) + tone(1)
+        assert b''.join(SilenceTrimmer(split(pcm), FRAMERATE, hangover=0.0)) == tone(1) + tone(1)
+
+    def test_speech_and_short_silences_are_kept(self) -> None:
+        pcm = silence(0.5) + tone(1) + silence(0.8) + tone(0.51)
+        trimmed, timestamps = trim_silence(pcm, FRAMERATE)
+        assert trimmed == pcm
+        assert timestamps.removed_frames == 0
+
+    def test_custom_speech_detector(self) -> None:
+        blocks = []
+        trimmer = SilenceTrimmer([bytes(640)] * 3, FRAMERATE, speech_detector=lambda b: blocks.append(b) or True)
+        assert b''.join(trimmer) == bytes(1920)
+        assert [len(b) for b in blocks] == [640, 640, 640]
+
+    def test_invalid_parameters(self) -> None:
+        with pytest.raises(ValueError):
+            SilenceTrimmer([], FRAMERATE, hangover=-1.0)
+
+
+class TestTimestampMap:
+    def test_rebase_response(self) -> None:
+        timestamps = TimestampMap(FRAMERATE)
+        timestamps.add_gap(0, 2 * FRAMERATE)
+        timestamps.add_gap(FRAMERATE, FRAMERATE)
+        response = rasr.StreamingRecognizeResponse(
+            results=[
+                rasr.StreamingRecognitionResult(
+                    audio_processed=1.0,
+                    alternatives=[
+                        rasr.SpeechRecognitionAlternative(
+                            words=[
+                                rasr.WordInfo(start_time=100, end_time=1000),
+                                rasr.WordInfo(start_time=1000, end_time=1500),
+                            ]
+                        )
+                    ],
+                )
+            ]
+        )
+        result = timestamps.rebase_response(response).results[0]
+        assert result.audio_processed == pytest.approx(3.0)
+        assert [(w.start_time, w.end_time) for w in result.alternatives[0].words] == [(2100, 3000), (4000, 4500)]
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import pytest
+
+import riva.client
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_nmt_pb2 as rnmt
+from riva.client.asr import framed_streaming_request_generator
+from riva.client.metrics import LatencyRecorder
+from riva.client.testing import MockRivaServer
+from riva.client.wire import AudioRequestFramer, encode_varint, payload_size, serialize_request
+
+
+CONFIG = rasr.RecognitionConfig(sample_rate_hertz=16000)
+
+
+class TestAudioRequestFramer:
+    @pytest.mark.parametrize("length", [0, 1, 127, 128, 3200, 16383, 16384, 2**21 + 5])
+    def test_frame_matches_serialized_message(self, length: int) -> None:
+        chunk = bytes(range(256)) * (length // 256) + bytes(length % 256)
+        framer = AudioRequestFramer()
+        frame = framer(chunk)
+        assert frame == rasr.StreamingRecognizeRequest(audio_content=chunk).SerializeToString()
+        assert frame == rnmt.StreamingTranslateSpeechToTextRequest(audio_content=chunk).SerializeToString()
+        assert rasr.StreamingRecognizeRequest.FromString(frame).audio_content == chunk
+        assert payload_size(frame) == length
+
+    def test_memoryview_and_bytearray_chunks(self) -> None:
+        framer = AudioRequestFramer()
+        assert framer(memoryview(b'abc')) == framer(bytearray(b'abc')) == framer(b'abc')
+
+    def test_header_cache_is_bounded(self) -> None:
+        framer = AudioRequestFramer(max_cached_headers=2)
+        for length in range(5):
+            framer(bytes(length))
+        assert len(framer._headers) == 2
+        assert framer.header(4) == framer.tag + encode_varint(4)
+
+    def test_serialize_request(self) -> None:
+        request = rasr.StreamingRecognizeRequest(streaming_config=rasr.StreamingRecognitionConfig(config=CONFIG))
+        assert serialize_request(request) == request.SerializeToString()
+        assert serialize_request(b'\x12\x01a') == b'\x12\x01a'
+
+    def test_framed_streaming_request_generator(self) -> None:
+        streaming_config = rasr.StreamingRecognitionConfig(config=CONFIG)
+        requests = list(framed_streaming_request_generator([b'ab', b'cd'], streaming_config))
+        assert requests[0] == rasr.StreamingRecognizeRequest(streaming_config=streaming_config)
+        assert [rasr.StreamingRecognizeRequest.FromString(r).audio_content for r in requests[1:]] == [b'ab', b'cd']
+
+
+class TestFramedStreamingCalls:
+    def test_framed_and_message_streams_give_same_results(self) -> None:
+        chunks = [bytes(3200)] * 30
+        streaming_config = rasr.StreamingRecognitionConfig(config=CONFIG, interim_results=True)
+        with MockRivaServer(partial_interval=0.5, final_interval=1.0) as server:
+            auth = riva.client.Auth(uri=server.address)
+            try:
+                recorder = LatencyRecorder()
+                framed = list(
+                    riva.client.ASRService(
+                        auth, latency_recorder=recorder, framed_audio_requests=True
+                    ).streaming_response_generator(chunks, streaming_config)
+                )
+                usual = list(riva.client.ASRService(auth).streaming_response_generator(chunks, streaming_config))
+                assert framed == usual
+                assert recorder.records[0].audio_bytes_sent == 3200 * 30
+                nmt_client = riva.client.NeuralMachineTranslationClient(auth, framed_audio_requests=True)
+                translated = list(
+                    nmt_client.streaming_s2t_response_generator(
+                        chunks, rnmt.StreamingTranslateSpeechToTextConfig(asr_config=streaming_config)
+                    )
+                )
+                assert translated
+                assert server.calls['StreamingTranslateSpeechToText'] == 1
+            finally:
+                auth.close()